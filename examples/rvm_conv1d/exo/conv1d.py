@@ -51,20 +51,17 @@ def gen_conv1d():
 
 class RVM_TILE(StaticMemory):
     NUM_RVM_TILES = 8
-    StaticMemory.init_state(NUM_RVM_TILES)
-    tile_dict = {}
 
     @classmethod
-    def reset_allocations(cls):
-        cls.init_state(cls.NUM_RVM_TILES)
-        cls.tile_dict = {}
+    def num_chunks(cls):
+        return cls.NUM_RVM_TILES
 
     @classmethod
     def can_read(cls):
         return False
 
     @classmethod
-    def alloc(cls, new_name, prim_type, shape, srcinfo):
+    def alloc(cls, new_name, prim_type, shape, srcinfo, chunk):
         if not (len(shape) == 2):
             raise MemGenError("Must be a 2D tile.")
         if not (shape[0].isdecimal() and int(shape[0]) == 4):
@@ -72,16 +69,10 @@ class RVM_TILE(StaticMemory):
         if not (shape[1].isdecimal() and int(shape[1]) == 4):
             raise MemGenError("Number of tile columns must be 4.")
 
-        tile_num = cls.find_free_chunk()
-        cls.mark(tile_num)
-        cls.tile_dict[new_name] = tile_num
-        return f'#define {new_name} "m{7-tile_num}"'
+        return f'#define {new_name} "m{7-chunk}"'
 
     @classmethod
-    def free(cls, new_name, prim_type, shape, srcinfo):
-        tile_num = cls.tile_dict[new_name]
-        del cls.tile_dict[new_name]
-        cls.unmark(tile_num)
+    def free(cls, new_name, prim_type, shape, srcinfo, chunk):
         return f"#undef {new_name}"
 
 
@@ -1,4 +1,5 @@
 import ast as pyast
+import functools
 import inspect
 import re
 import types
@@ -23,6 +24,7 @@ from .rewrite.new_eff import Check_Aliasing
 from .core.proc_eqv import decl_new_proc, derive_proc, assert_eqv_proc, check_eqv_proc
 from .frontend.pyparser import get_ast_from_python, Parser, get_src_locals
 from .frontend.typecheck import TypeChecker
+from .frontend import instr_cache
 
 from . import API_cursors as C
 from .core import internal_cursors as IC
@@ -36,6 +38,10 @@ def proc(f, _instr=None) -> "Procedure":
     if not isinstance(f, types.FunctionType):
         raise TypeError("@proc decorator must be applied to a function")
 
+    return _parse_proc(f, get_src_locals(depth=3 if _instr else 2), _instr)
+
+
+def _parse_proc(f, srclocals, _instr=None):
     body, getsrcinfo = get_ast_from_python(f)
     assert isinstance(body, pyast.FunctionDef)
 
@@ -43,14 +49,18 @@ def proc(f, _instr=None) -> "Procedure":
         body,
         getsrcinfo,
         func_globals=f.__globals__,
-        srclocals=get_src_locals(depth=3 if _instr else 2),
+        srclocals=srclocals,
         instr=_instr,
         as_func=True,
     )
     return Procedure(parser.result())
 
 
-def instr(c_instr, c_global=""):
+def instr(c_instr, c_global="", *, lazy=False):
+    """
+    With `lazy=True`, the instruction is only parsed and checked when it is
+    first used, which keeps importing large instruction libraries cheap.
+    """
     if not isinstance(c_instr, str):
         raise TypeError("@instr decorator must be @instr(<your instuction>)")
 
@@ -58,11 +68,26 @@ def instr(c_instr, c_global=""):
         if not isinstance(f, types.FunctionType):
             raise TypeError("@instr decorator must be applied to a function")
 
-        return proc(f, _instr=(c_instr, c_global))
+        srclocals = get_src_locals(depth=2)
+
+        def make():
+            key = instr_cache.cache_key(f, c_instr, c_global)
+            if (cached := instr_cache.load(key)) is not None:
+                return Procedure(cached)
+
+            p = _parse_proc(f, srclocals, (c_instr, c_global))
+            instr_cache.store(key, p._loopir_proc)
+            return p
+
+        return LazyProcedure(make, is_instr=True) if lazy else make()
 
     return inner
 
 
+# @instr for instruction libraries, whose procs are only built when first used
+lazy_instr = functools.partial(instr, lazy=True)
+
+
 def config(_cls=None, *, readwrite=True):
     def parse_config(cls):
         if not inspect.isclass(cls):
@@ -143,16 +168,124 @@ class FindDup(LoopIR.LoopIR_Do):
 #   Procedure Objects
 
 
-def compile_procs(proc_list, basedir: Path, c_file: str, h_file: str):
-    c_data, h_data = compile_procs_to_strings(proc_list, h_file)
+def compile_procs(
+    proc_list,
+    basedir: Path,
+    c_file: str,
+    h_file: str,
+    *,
+    strength_reduce=False,
+    hoist_windows=False,
+    inline_subprocs=False,
+    strict_registers=False,
+):
+    c_data, h_data = compile_procs_to_strings(
+        proc_list,
+        h_file,
+        strength_reduce=strength_reduce,
+        hoist_windows=hoist_windows,
+        inline_subprocs=inline_subprocs,
+        strict_registers=strict_registers,
+    )
     (basedir / c_file).write_text(c_data)
     (basedir / h_file).write_text(h_data)
 
 
-def compile_procs_to_strings(proc_list, h_file_name: str):
+def compile_procs_to_strings(
+    proc_list,
+    h_file_name: str,
+    *,
+    strength_reduce=False,
+    hoist_windows=False,
+    inline_subprocs=False,
+    strict_registers=False,
+):
+    """
+    Compile `proc_list` (and every procedure they call) to the contents of
+    a C source and header file.
+
+    `strength_reduce` selects the procedures whose loops advance pointers
+    to the accessed buffers instead of recomputing every offset.  It is
+    either a bool applying to all procedures, or a list of procedures
+    (or procedure names).
+
+    `hoist_windows` selects, in the same way, the procedures whose loops
+    construct their loop-invariant windows ahead of the loop.  The selected
+    internal procedures also take windows with constant strides (asserted
+    with `stride(x, d) == c`) as plain pointers.
+
+    `inline_subprocs` selects the internal procedures which are emitted as
+    always-inline functions when they are small, called only once, or
+    called from an innermost loop.  The scheduled procedures are unchanged.
+
+    A `RegisterPressureWarning` is issued for every procedure that keeps
+    more vector registers live at once than its memory provides (see
+    `Memory.num_registers`).  `strict_registers` selects the procedures for
+    which this is an error (a `MemGenError`) instead.
+    """
     assert isinstance(proc_list, list)
     assert all(isinstance(p, Procedure) for p in proc_list)
-    return run_compile([p._loopir_proc for p in proc_list], h_file_name)
+    return run_compile(
+        [p._loopir_proc for p in proc_list],
+        h_file_name,
+        strength_reduce=_proc_names(strength_reduce),
+        hoist_windows=_proc_names(hoist_windows),
+        inline_subprocs=_proc_names(inline_subprocs),
+        strict_registers=_proc_names(strict_registers),
+    )
+
+
+def interpret(proc, **kwargs):
+    """
+    Run `proc` on the arguments in `kwargs` (given by name) without
+    compiling it, updating the NumPy arrays passed for its numeric arguments
+    in place.  Sizes, indices and strides are given as integers, and scalar
+    arguments as (0-d) arrays or Python numbers.
+
+    Loop nests with affine indices are evaluated as NumPy array operations,
+    and instructions are run by their semantics.  This requires NumPy.
+    """
+    from .backend.LoopIR_interpreter import run_interpreter
+
+    assert isinstance(proc, Procedure)
+    run_interpreter(proc._loopir_proc, kwargs)
+
+
+def analyze_cost(proc, sizes):
+    """
+    Statically estimate the cost of running `proc` with the sizes, indices
+    and integers given by name in `sizes`: the trip count of every loop,
+    the floating-point operations per precision, the bytes loaded from and
+    stored to each memory, the number of calls to each instruction, and the
+    reuse distance of every buffer access at each enclosing loop.  Returns a
+    `CostReport`.
+    """
+    from .rewrite.cost_analysis import analyze_cost
+
+    assert isinstance(proc, Procedure)
+    return analyze_cost(proc._loopir_proc, sizes)
+
+
+def analyze_footprint(proc, sizes, cache_sizes=None):
+    """
+    Estimate the data touched by every loop of `proc`, with the sizes,
+    indices and integers given by name in `sizes`: for each buffer, the
+    number of distinct elements accessed by one iteration of the loop and
+    by the whole loop.  Loops touching more bytes than fit in one of the
+    `cache_sizes` (a dict from cache names to capacities in bytes, by
+    default `DEFAULT_CACHE_SIZES`) are flagged.  Returns a
+    `FootprintReport`, whose loops can be looked up by cursor.
+    """
+    from .rewrite.cost_analysis import analyze_footprint
+
+    assert isinstance(proc, Procedure)
+    return analyze_footprint(proc._loopir_proc, sizes, cache_sizes)
+
+
+def _proc_names(procs):
+    if isinstance(procs, bool):
+        return procs
+    return frozenset(p.name() if isinstance(p, Procedure) else p for p in procs)
 
 
 class Procedure(ProcedureBase):
@@ -167,9 +300,15 @@ class Procedure(ProcedureBase):
 
         _mod_config = _mod_config or frozenset()
 
+        # solver queries and seconds spent bounds checking a parsed proc
+        bounds_check_stats = None
         if isinstance(proc, LoopIR.UAST.proc):
             proc = TypeChecker(proc).get_loopir()
-            CheckBounds(proc)
+            checker = CheckBounds(proc)
+            bounds_check_stats = {
+                "n_queries": checker.n_queries,
+                "elapsed": checker.elapsed,
+            }
             Check_Aliasing(proc)
 
         assert isinstance(proc, LoopIR.LoopIR.proc)
@@ -192,6 +331,7 @@ class Procedure(ProcedureBase):
         self._loopir_proc = proc
         self._provenance_eq_Procedure = _provenance_eq_Procedure
         self._forward = _forward
+        self._bounds_check_stats = bounds_check_stats
 
     def forward(self, cur: C.Cursor):
         p = self
@@ -295,8 +435,16 @@ class Procedure(ProcedureBase):
     #     execution / compilation operations
     # ---------------------------------------------- #
 
-    def c_code_str(self):
-        decls, defns = compile_to_strings("c_code_str", [self._loopir_proc])
+    def c_code_str(
+        self, *, strength_reduce=False, hoist_windows=False, inline_subprocs=False
+    ):
+        decls, defns = compile_to_strings(
+            "c_code_str",
+            [self._loopir_proc],
+            strength_reduce=_proc_names(strength_reduce),
+            hoist_windows=_proc_names(hoist_windows),
+            inline_subprocs=_proc_names(inline_subprocs),
+        )
         return decls + "\n" + defns
 
     def compile_c(self, directory: Path, filename: str):
@@ -368,3 +516,38 @@ class Procedure(ProcedureBase):
 
     def _root(self):
         return IC.Cursor.create(self._loopir_proc)
+
+
+class LazyProcedure(Procedure):
+    """
+    A procedure which is built by `make` (returning a `Procedure`) the first
+    time it is used.
+    """
+
+    def __init__(self, make, *, is_instr=False):
+        self._make = make
+        self._is_instr = is_instr
+
+    def is_instr(self):
+        # answered without building the procedure, e.g. for exocc
+        return self._is_instr
+
+    def _materialize(self, attr):
+        self.__dict__.update(vars(self._make()))
+        return self.__dict__[attr]
+
+    @functools.cached_property
+    def _loopir_proc(self):
+        return self._materialize("_loopir_proc")
+
+    @functools.cached_property
+    def _provenance_eq_Procedure(self):
+        return self._materialize("_provenance_eq_Procedure")
+
+    @functools.cached_property
+    def _forward(self):
+        return self._materialize("_forward")
+
+    @functools.cached_property
+    def _bounds_check_stats(self):
+        return self._materialize("_bounds_check_stats")
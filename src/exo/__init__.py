@@ -2,6 +2,9 @@ from .API import (
     Procedure,
     compile_procs,
     compile_procs_to_strings,
+    interpret,
+    analyze_cost,
+    analyze_footprint,
     proc,
     instr,
     config,
@@ -21,6 +24,9 @@ __all__ = [
     "Procedure",
     "compile_procs",
     "compile_procs_to_strings",
+    "interpret",
+    "analyze_cost",
+    "analyze_footprint",
     "proc",
     "instr",
     "config",
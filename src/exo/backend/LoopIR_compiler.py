@@ -1,15 +1,30 @@
 import functools
 import re
 import textwrap
-from collections import ChainMap
+import warnings
 from collections import defaultdict
 from dataclasses import dataclass
 from pathlib import Path
 
-from ..core.LoopIR import LoopIR, LoopIR_Do, get_writes_of_stmts, T, CIR
+from ..core.LoopIR import (
+    LoopIR,
+    LoopIR_Do,
+    FreeVars,
+    SubstArgs,
+    get_writes_of_stmts,
+    T,
+    CIR,
+)
 from ..core.configs import ConfigError
-from .mem_analysis import MemoryAnalysis
-from ..core.memory import MemGenError, Memory, DRAM, StaticMemory
+from .mem_analysis import MemoryAnalysis, allocate_static_memory, register_pressure
+from ..core.memory import (
+    MemGenError,
+    Memory,
+    DRAM,
+    StaticMemory,
+    RegisterPressureWarning,
+    generate_offset,
+)
 from .parallel_analysis import ParallelAnalysis
 from .prec_analysis import PrecisionAnalysis
 from ..core.prelude import *
@@ -127,6 +142,37 @@ def simplify_cir(e):
         assert False, "bad case!"
 
 
+def affine_coeff(e, sym):
+    """
+    Returns the integer coefficient of `sym` in the index expression `e`,
+    or None if `e` does not depend on `sym` affinely.
+    """
+    if isinstance(e, LoopIR.Read):
+        return 1 if e.name == sym else 0
+    elif isinstance(e, LoopIR.USub):
+        c = affine_coeff(e.arg, sym)
+        return None if c is None else -c
+    elif isinstance(e, LoopIR.BinOp):
+        lhs = affine_coeff(e.lhs, sym)
+        rhs = affine_coeff(e.rhs, sym)
+        if lhs is None or rhs is None:
+            return None
+        elif e.op == "+":
+            return lhs + rhs
+        elif e.op == "-":
+            return lhs - rhs
+        elif lhs == 0 and rhs == 0:
+            return 0
+        elif e.op == "*" and isinstance(e.lhs, LoopIR.Const):
+            return e.lhs.val * rhs
+        elif e.op == "*" and isinstance(e.rhs, LoopIR.Const):
+            return lhs * e.rhs.val
+        else:
+            return None
+    else:
+        return 0
+
+
 class LoopIR_SubProcs(LoopIR_Do):
     def __init__(self, proc):
         self._subprocs = set()
@@ -239,6 +285,97 @@ class LoopIR_FindConfigs(LoopIR_Do):
         pass
 
 
+class LoopIR_FindAccesses(LoopIR_Do):
+    """
+    Collects the index expressions of every buffer access in a block,
+    using the lower corner of window expressions.
+    """
+
+    def __init__(self, stmts):
+        self._accesses = defaultdict(list)
+        self.do_stmts(stmts)
+
+    def result(self):
+        return self._accesses
+
+    def do_s(self, s):
+        if isinstance(s, (LoopIR.Assign, LoopIR.Reduce)) and s.idx:
+            self._accesses[s.name].append(s.idx)
+        super().do_s(s)
+
+    def do_e(self, e):
+        if isinstance(e, LoopIR.Read) and e.idx:
+            self._accesses[e.name].append(e.idx)
+        elif isinstance(e, LoopIR.WindowExpr):
+            self._accesses[e.name].append(
+                [w.lo if isinstance(w, LoopIR.Interval) else w.pt for w in e.idx]
+            )
+        super().do_e(e)
+
+    def do_t(self, t):
+        pass
+
+
+def find_call_sites(proc_list):
+    """
+    Returns the number of calls to each proc (by name) in `proc_list`, and
+    the set of procs called from the body of an innermost loop.
+    """
+    n_calls = defaultdict(int)
+    in_innermost = set()
+
+    def has_loop(stmts):
+        return any(
+            isinstance(s, LoopIR.For)
+            or (isinstance(s, LoopIR.If) and (has_loop(s.body) or has_loop(s.orelse)))
+            for s in stmts
+        )
+
+    def walk(stmts, is_innermost):
+        for s in stmts:
+            if isinstance(s, LoopIR.Call):
+                n_calls[s.f.name] += 1
+                if is_innermost:
+                    in_innermost.add(s.f.name)
+            elif isinstance(s, LoopIR.For):
+                walk(s.body, not has_loop(s.body))
+            elif isinstance(s, LoopIR.If):
+                walk(s.body, is_innermost)
+                walk(s.orelse, is_innermost)
+
+    for p in proc_list:
+        if p.instr is None:
+            walk(p.body, False)
+
+    return n_calls, in_innermost
+
+
+def count_stmts(stmts):
+    n = 0
+    for s in stmts:
+        n += 1
+        if isinstance(s, LoopIR.For):
+            n += count_stmts(s.body)
+        elif isinstance(s, LoopIR.If):
+            n += count_stmts(s.body) + count_stmts(s.orelse)
+    return n
+
+
+# Internal procs with at most this many statements are always inlined, and
+# the ones called from an innermost loop up to the larger limit.  Procs
+# with a single call site are inlined regardless of their size.
+INLINE_MAX_STMTS = 8
+INLINE_MAX_STMTS_INNERMOST = 32
+
+
+def should_inline(n_stmts, n_calls, in_innermost):
+    return (
+        n_calls == 1
+        or n_stmts <= INLINE_MAX_STMTS
+        or (in_innermost and n_stmts <= INLINE_MAX_STMTS_INNERMOST)
+    )
+
+
 def find_all_mems(proc_list):
     mems = set()
     for p in proc_list:
@@ -263,6 +400,42 @@ def find_all_configs(proc_list):
     return list(configs)
 
 
+def known_stride_assert(pred):
+    """
+    Returns `((buffer, dim), stride)` if `pred` asserts `stride(buffer, dim)`
+    to be a constant, and None otherwise.
+    """
+    if (
+        isinstance(pred, LoopIR.BinOp)
+        and pred.op == "=="
+        and isinstance(pred.lhs, LoopIR.StrideExpr)
+        and isinstance(pred.rhs, LoopIR.Const)
+    ):
+        return (pred.lhs.name, pred.lhs.dim), CIR.Const(pred.rhs.val)
+    return None
+
+
+def has_default_window(mem):
+    # windows into these memories are plain C pointers into the buffer
+    return issubclass(mem, DRAM) and mem.window.__func__ is Memory.window.__func__
+
+
+def find_raw_window_args(proc):
+    """
+    The positions of the window arguments of `proc` whose strides are all
+    statically known from its assertions.  An internal proc can take these
+    as a data pointer instead of a window struct.
+    """
+    known = {k for k, _ in filter(None, map(known_stride_assert, proc.preds))}
+    return frozenset(
+        i
+        for i, a in enumerate(proc.args)
+        if a.type.is_win()
+        and has_default_window(a.mem)
+        and all((a.name, d) in known for d in range(len(a.type.shape())))
+    )
+
+
 # --------------------------------------------------------------------------- #
 # --------------------------------------------------------------------------- #
 
@@ -320,10 +493,10 @@ def window_struct(base_type, n_dims, is_const) -> WindowStruct:
 # top level compiler function called by tests!
 
 
-def run_compile(proc_list, h_file_name: str):
+def run_compile(proc_list, h_file_name: str, **kwargs):
     file_stem = str(Path(h_file_name).stem)
     lib_name = sanitize_str(file_stem)
-    fwd_decls, body = compile_to_strings(lib_name, proc_list)
+    fwd_decls, body = compile_to_strings(lib_name, proc_list, **kwargs)
 
     source = f'#include "{h_file_name}"\n\n{body}'
 
@@ -349,6 +522,15 @@ extern "C" {{
 
 
 _static_helpers = {
+    "EXO_ALWAYS_INLINE": textwrap.dedent(
+        """
+        #if defined(__GNUC__) || defined(__clang__)
+        #  define EXO_ALWAYS_INLINE inline __attribute__((always_inline))
+        #else
+        #  define EXO_ALWAYS_INLINE inline
+        #endif
+        """
+    ),
     "exo_floor_div": textwrap.dedent(
         """
         static int exo_floor_div(int num, int quot) {
@@ -360,15 +542,51 @@ _static_helpers = {
 }
 
 
-def compile_to_strings(lib_name, proc_list):
+def compile_to_strings(
+    lib_name,
+    proc_list,
+    *,
+    strength_reduce=frozenset(),
+    hoist_windows=frozenset(),
+    inline_subprocs=frozenset(),
+    strict_registers=frozenset(),
+):
+    """
+    `strength_reduce` is either a bool, or a set of names of the procs
+    for which index arithmetic should be strength-reduced into pointer
+    increments (see `Compiler`).
+
+    `hoist_windows` likewise selects the procs in which loop-invariant
+    windows are constructed before the loop rather than on every
+    iteration.  Selected internal procs also take the windows whose
+    strides they assert to be constant as plain data pointers.
+
+    `inline_subprocs` selects the internal procs which may be marked for
+    inlining into their callers, subject to `should_inline`.
+
+    A `RegisterPressureWarning` is issued for every proc which keeps more
+    registers of a memory live at once than it has (see `register_pressure`).
+    For the procs selected by `strict_registers`, this is a `MemGenError`.
+    """
     # Get transitive closure of call-graph
     orig_procs = [id(p) for p in proc_list]
 
     def from_lines(x):
         return "\n".join(x)
 
+    def is_selected(opt, p):
+        return opt if isinstance(opt, bool) else p.name in opt
+
     proc_list = list(sorted(find_all_subprocs(proc_list), key=lambda x: x.name))
 
+    raw_window_args = {
+        p.name: find_raw_window_args(p)
+        for p in proc_list
+        if p.instr is None and id(p) not in orig_procs and is_selected(hoist_windows, p)
+    }
+
+    n_calls, in_innermost = find_call_sites(proc_list)
+
     # Header contents
     ctxt_name, ctxt_def = _compile_context_struct(find_all_configs(proc_list), lib_name)
     struct_defns = set()
@@ -406,13 +624,37 @@ def compile_to_strings(lib_name, proc_list):
                 instrs_global.append(p.instr.c_global)
         else:
             is_public_decl = id(p) in orig_procs
+            is_inline = (
+                not is_public_decl
+                and is_selected(inline_subprocs, p)
+                and should_inline(
+                    count_stmts(p.body), n_calls[p.name], p.name in in_innermost
+                )
+            )
+            if is_inline:
+                needed_helpers.add("EXO_ALWAYS_INLINE")
 
             p = ParallelAnalysis().run(p)
             p = PrecisionAnalysis().run(p)
             p = WindowAnalysis().apply_proc(p)
             p = MemoryAnalysis().run(p)
 
-            comp = Compiler(p, ctxt_name, is_public_decl=is_public_decl)
+            for pressure in register_pressure(p).values():
+                if pressure.exceeds_budget():
+                    msg = f"{p.name}: {pressure}"
+                    if is_selected(strict_registers, p):
+                        raise MemGenError(msg)
+                    warnings.warn(msg, RegisterPressureWarning)
+
+            comp = Compiler(
+                p,
+                ctxt_name,
+                is_public_decl=is_public_decl,
+                is_inline=is_inline,
+                strength_reduce=is_selected(strength_reduce, p),
+                hoist_windows=is_selected(hoist_windows, p),
+                raw_window_args=raw_window_args,
+            )
             d, b = comp.comp_top()
             struct_defns |= comp.struct_defns()
             needed_helpers |= comp.needed_helpers()
@@ -458,7 +700,7 @@ def compile_to_strings(lib_name, proc_list):
 
     extern_code = _compile_externs(find_all_externs(analyzed_proc_list))
 
-    helper_code = [_static_helpers[v] for v in needed_helpers]
+    helper_code = [_static_helpers[v] for v in sorted(needed_helpers)]
     body_contents = [
         helper_code,
         instrs_global,
@@ -522,14 +764,24 @@ def _compile_context_struct(configs, lib_name):
 
 
 class Compiler:
-    def __init__(self, proc, ctxt_name, *, is_public_decl):
+    def __init__(
+        self,
+        proc,
+        ctxt_name,
+        *,
+        is_public_decl,
+        is_inline=False,
+        strength_reduce=False,
+        hoist_windows=False,
+        raw_window_args=None,
+    ):
         assert isinstance(proc, LoopIR.proc)
 
         self.proc = proc
         self.ctxt_name = ctxt_name
-        self.env = ChainMap()
+        self.env = SymTable()
         self.range_env = IndexRangeEnvironment(proc, fast=False)
-        self.names = ChainMap()
+        self.names = SymTable()
         self.envtyp = dict()
         self.mems = dict()
         self._tab = ""
@@ -538,6 +790,12 @@ class Compiler:
         self._needed_helpers = set()
         self.window_defns = set()
         self._known_strides = {}
+        self._strength_reduce = strength_reduce
+        self._buf_ptrs = SymTable()
+        self._hoist_windows = hoist_windows
+        self._hoisted = SymTable()
+        self._raw_window_args = raw_window_args or dict()
+        self._raw_windows = set()
 
         assert self.proc.name is not None, "expected names for compilation"
         name = self.proc.name
@@ -550,7 +808,8 @@ class Compiler:
 
         self.non_const = set(e for e, _ in get_writes_of_stmts(self.proc.body))
 
-        for a in proc.args:
+        raw_args = self._raw_window_args.get(proc.name, frozenset())
+        for i, a in enumerate(proc.args):
             mem = a.mem if a.type.is_numeric() else None
             name_arg = self.new_varname(a.name, typ=a.type, mem=mem)
             if a.type in (T.size, T.index, T.bool, T.stride):
@@ -562,7 +821,14 @@ class Compiler:
                 assert a.type.basetype() != T.R
                 if a.type.is_real_scalar():
                     self._scalar_refs.add(a.name)
-                if a.type.is_win():
+                if i in raw_args:
+                    # the strides of this window are known, so only its
+                    # data pointer is passed
+                    self._raw_windows.add(a.name)
+                    const_kwd = "const " if a.name not in self.non_const else ""
+                    ctyp = a.type.basetype().ctype()
+                    arg_strs.append(f"{const_kwd}{ctyp}* {name_arg}")
+                elif a.type.is_win():
                     wintyp = self.get_window_type(a)
                     arg_strs.append(f"struct {wintyp} {name_arg}")
                 else:
@@ -578,15 +844,9 @@ class Compiler:
                 # TODO: filter these out earlier?
                 continue
 
-            if (
-                isinstance(pred, LoopIR.BinOp)
-                and pred.op == "=="
-                and isinstance(pred.lhs, LoopIR.StrideExpr)
-                and isinstance(pred.rhs, LoopIR.Const)
-            ):
-                self._known_strides[(pred.lhs.name, pred.lhs.dim)] = CIR.Const(
-                    pred.rhs.val
-                )
+            if stride_assert := known_stride_assert(pred):
+                key, stride = stride_assert
+                self._known_strides[key] = stride
                 self.add_line(f"// assert {pred}")
             else:
                 # Default to just informing the compiler about the constraint
@@ -596,9 +856,19 @@ class Compiler:
         if not self.static_memory_check(self.proc):
             raise MemGenError("Cannot generate static memory in non-leaf procs")
 
+        # chunks of static memory are assigned up front, and handed out in
+        # order as the allocations are compiled
+        self._static_chunks = iter(allocate_static_memory(self.proc))
+        self._chunk_of = dict()
+
         self.comp_stmts(self.proc.body)
 
-        static_kwd = "" if is_public_decl else "static "
+        if is_public_decl:
+            static_kwd = ""
+        elif is_inline:
+            static_kwd = "static EXO_ALWAYS_INLINE "
+        else:
+            static_kwd = "static "
 
         # Generate headers here?
         comment = (
@@ -692,23 +962,29 @@ class Compiler:
 
     def push(self, only=None):
         if only is None:
-            self.env = self.env.new_child()
+            self.env.push()
             self.range_env.enter_scope()
-            self.names = self.names.new_child()
+            self.names.push()
+            self._buf_ptrs.push()
+            self._hoisted.push()
             self._tab = self._tab + "  "
         elif only == "env":
-            self.env = self.env.new_child()
+            self.env.push()
             self.range_env.enter_scope()
-            self.names = self.names.new_child()
+            self.names.push()
+            self._buf_ptrs.push()
+            self._hoisted.push()
         elif only == "tab":
             self._tab = self._tab + "  "
         else:
             assert False, f"BAD only parameter {only}"
 
     def pop(self):
-        self.env = self.env.parents
+        self.env.pop()
         self.range_env.exit_scope()
-        self.names = self.names.parents
+        self.names.pop()
+        self._buf_ptrs.pop()
+        self._hoisted.pop()
         self._tab = self._tab[:-2]
 
     def comp_cir(self, e, env, prec) -> str:
@@ -750,11 +1026,15 @@ class Compiler:
 
     def access_str(self, nm, idx_list) -> str:
         type = self.envtyp[nm]
+        if ptr := self._buf_ptrs.get(nm):
+            idx_list = self.reduced_idx(nm, idx_list)
         cirs = [lift_to_cir(i, self.range_env) for i in idx_list]
         idx_expr = self.get_idx_offset(nm, type, cirs)
         idx_expr_s = self.comp_cir(simplify_cir(idx_expr), self.env, prec=0)
         buf = self.env[nm]
-        if not type.is_win():
+        if ptr:
+            return f"{ptr[0]}[{idx_expr_s}]"
+        elif not type.is_win() or nm in self._raw_windows:
             return f"{buf}[{idx_expr_s}]"
         else:
             return f"{buf}.data[{idx_expr_s}]"
@@ -802,6 +1082,75 @@ class Compiler:
 
         return acc
 
+    def reduced_idx(self, name, idx_list):
+        # Accesses through a strength-reduced pointer are relative to the
+        # iteration the pointer was advanced to, so the iteration variables
+        # it absorbed are zero in the remaining offset.
+        _, iters = self._buf_ptrs[name]
+        zero = {i: LoopIR.Const(0, T.index, idx_list[0].srcinfo) for i in iters}
+        return SubstArgs(idx_list, zero).result()
+
+    def reduce_loop_strides(self, s):
+        """
+        Strength-reduce the offset arithmetic of the buffers accessed in the
+        body of the loop `s`.  For every DRAM buffer whose accesses all
+        advance by the same (affine) step `c` per iteration, declare a
+        pointer to the buffer at `s.lo` which is incremented by `c` after
+        each iteration, so that accesses in the body only need to compute
+        the part of the offset that varies within one iteration.
+
+        Returns a list of (buffer, pointer, absorbed iters, step) tuples,
+        after emitting the pointer declarations.
+        """
+        accesses = LoopIR_FindAccesses(s.body).result()
+
+        ptrs = []
+        for name, idx_lists in sorted(accesses.items(), key=lambda x: x[0]):
+            if name not in self.env or name in self._scalar_refs:
+                continue
+            typ = self.envtyp[name]
+            mem = self.mems[name]
+            if not typ.is_tensor_or_window() or not has_default_window(mem):
+                continue
+
+            coeffs = set()
+            for idx in idx_lists:
+                coeffs.add(tuple(affine_coeff(i, s.iter) for i in idx))
+            if len(coeffs) != 1:
+                continue
+            (coeff,) = coeffs
+            if None in coeff or not any(coeff):
+                continue
+
+            step = self.get_idx_offset(name, typ, [CIR.Const(c) for c in coeff])
+            step = simplify_cir(step)
+            start = simplify_cir(
+                CIR.BinOp("*", lift_to_cir(s.lo, self.range_env), step, True)
+            )
+
+            if parent := self._buf_ptrs.get(name):
+                base, iters = parent
+            else:
+                base = self.data_ptr(name)
+                iters = ()
+            if not (isinstance(start, CIR.Const) and start.val == 0):
+                base = f"{base} + {self.comp_cir(start, self.env, op_prec['+'] + 1)}"
+
+            if isinstance(typ, T.Window):
+                is_const = typ.src_buf not in self.non_const
+            else:
+                is_const = name not in self.non_const
+            const_kwd = "const " if is_const else ""
+            ctype = typ.basetype().ctype()
+
+            # the pointer is declared in the scope enclosing the loop
+            ptr = self.new_varname(Sym(f"{name}_{s.iter}"), None)
+            self.add_line(f"{const_kwd}{ctype} *{ptr} = {base};")
+            step = self.comp_cir(step, self.env, prec=0)
+            ptrs.append((name, ptr, iters + (s.iter,), step))
+
+        return ptrs
+
     def get_window_type(self, typ, is_const=None):
         assert isinstance(typ, T.Window) or (
             isinstance(typ, LoopIR.fnarg) and typ.type.is_win()
@@ -870,6 +1219,8 @@ class Compiler:
             self.add_line(f"ctxt->{nm}.{s.field} = {rhs};")
 
         elif isinstance(s, LoopIR.WindowStmt):
+            if id(s) in self._hoisted:
+                return
             win_struct = self.get_window_type(s.rhs.type)
             rhs = self.comp_e(s.rhs)
             assert isinstance(s.rhs, LoopIR.WindowExpr)
@@ -892,6 +1243,11 @@ class Compiler:
         elif isinstance(s, LoopIR.For):
             lo = self.comp_e(s.lo)
             hi = self.comp_e(s.hi)
+            if self._hoist_windows:
+                self.hoist_loop_invariant_windows(s)
+            ptrs = []
+            if self._strength_reduce and isinstance(s.loop_mode, LoopIR.Seq):
+                ptrs = self.reduce_loop_strides(s)
             self.push(only="env")
             itr = self.new_varname(s.iter, typ=T.index)  # allocate a new string
             self.range_env.add_loop_iter(
@@ -899,9 +1255,15 @@ class Compiler:
                 s.lo,
                 s.hi,
             )
+            incrs = ""
+            for buf, ptr, iters, step in ptrs:
+                self._buf_ptrs[buf] = (ptr, iters)
+                incrs += f", {ptr}++" if step == "1" else f", {ptr} += {step}"
             if isinstance(s.loop_mode, LoopIR.Par):
                 self.add_line(f"#pragma omp parallel for")
-            self.add_line(f"for (int_fast32_t {itr} = {lo}; {itr} < {hi}; {itr}++) {{")
+            self.add_line(
+                f"for (int_fast32_t {itr} = {lo}; {itr} < {hi}; {itr}++{incrs}) {{"
+            )
             self.push(only="tab")
             self.comp_stmts(s.body)
             self.pop()
@@ -913,7 +1275,13 @@ class Compiler:
             assert s.type.basetype() != T.R
             ctype = s.type.basetype().ctype()
             mem = s.mem or DRAM
-            line = mem.alloc(name, ctype, self.shape_strs(s.type.shape()), s.srcinfo)
+            shape = self.shape_strs(s.type.shape())
+            if issubclass(mem, StaticMemory):
+                chunk = next(self._static_chunks)
+                self._chunk_of[s.name] = chunk
+                line = mem.alloc(name, ctype, shape, s.srcinfo, chunk)
+            else:
+                line = mem.alloc(name, ctype, shape, s.srcinfo)
 
             self.add_line(line)
         elif isinstance(s, LoopIR.Free):
@@ -921,7 +1289,12 @@ class Compiler:
             assert s.type.basetype().is_real_scalar()
             ctype = s.type.basetype().ctype()
             mem = s.mem or DRAM
-            line = mem.free(name, ctype, self.shape_strs(s.type.shape()), s.srcinfo)
+            shape = self.shape_strs(s.type.shape())
+            if issubclass(mem, StaticMemory):
+                chunk = self._chunk_of.pop(s.name)
+                line = mem.free(name, ctype, shape, s.srcinfo, chunk)
+            else:
+                line = mem.free(name, ctype, shape, s.srcinfo)
             self.add_line(line)
         elif isinstance(s, LoopIR.Call):
             assert all(
@@ -963,25 +1336,89 @@ class Compiler:
                 return self.env[e.name]
             elif e.name in self._scalar_refs:
                 return self.env[e.name]
+            elif rtyp.is_win() and self.takes_raw_window(fn, i):
+                return self.data_ptr(e.name)
+            elif e.name in self._raw_windows:
+                # rebuild the struct from the known strides
+                win_struct = self.get_window_type(rtyp, self.callee_is_const(fn, i))
+                strides = ", ".join(
+                    self.comp_cir(s, self.env, prec=0)
+                    for s in self.get_strides(e.name, rtyp)
+                )
+                return f"(struct {win_struct}){{ {self.env[e.name]}, {{ {strides} }} }}"
             elif rtyp.is_tensor_or_window():
                 return self.env[e.name]
             else:
                 assert rtyp.is_real_scalar()
                 return f"&{self.env[e.name]}"
         elif isinstance(e, LoopIR.WindowExpr):
-            if isinstance(fn, LoopIR.proc):
-                callee_buf = fn.args[i].name
-                is_const = callee_buf not in set(
-                    x for x, _ in get_writes_of_stmts(fn.body)
-                )
+            if self.takes_raw_window(fn, i):
+                data, _ = self.window_struct_fields(e)
+                return f"&{data}"
+            elif hoisted := self._hoisted.get(id(e)):
+                return hoisted
             else:
-                raise NotImplementedError("Passing windows to externs")
-            win_struct = self.get_window_type(e.type, is_const)
-            data, strides = self.window_struct_fields(e)
-            return f"(struct {win_struct}){{ &{data}, {{ {strides} }} }}"
+                return self.window_arg_struct(e, fn, i)
         else:
             return self.comp_e(e, prec)
 
+    def takes_raw_window(self, fn, i):
+        return i in self._raw_window_args.get(fn.name, ())
+
+    def callee_is_const(self, fn, i):
+        if not isinstance(fn, LoopIR.proc):
+            raise NotImplementedError("Passing windows to externs")
+        callee_buf = fn.args[i].name
+        return callee_buf not in set(x for x, _ in get_writes_of_stmts(fn.body))
+
+    def window_arg_struct(self, e, fn, i):
+        win_struct = self.get_window_type(e.type, self.callee_is_const(fn, i))
+        data, strides = self.window_struct_fields(e)
+        return f"(struct {win_struct}){{ &{data}, {{ {strides} }} }}"
+
+    def data_ptr(self, name):
+        if self.envtyp[name].is_win() and name not in self._raw_windows:
+            return f"{self.env[name]}.data"
+        return self.env[name]
+
+    def hoist_loop_invariant_windows(self, s):
+        """
+        Construct the windows in the body of the loop `s` which do not depend
+        on anything bound inside of it before the loop, instead of on every
+        iteration.  This covers window statements and the window structs
+        passed to internal procs, but not those under a conditional.
+        """
+
+        def is_invariant(e):
+            return all(x in self.env for x in FreeVars([e]).result())
+
+        def hoist(stmts):
+            for b in stmts:
+                if isinstance(b, LoopIR.WindowStmt) and is_invariant(b.rhs):
+                    self.comp_s(b)
+                    self._hoisted[id(b)] = self.env[b.name]
+                elif isinstance(b, LoopIR.Call) and b.f.instr is None:
+                    for i, a in enumerate(b.args):
+                        if (
+                            isinstance(a, LoopIR.WindowExpr)
+                            and not self.takes_raw_window(b.f, i)
+                            and id(a) not in self._hoisted
+                            and is_invariant(a)
+                        ):
+                            win_struct = self.get_window_type(
+                                a.type, self.callee_is_const(b.f, i)
+                            )
+                            rhs = self.window_arg_struct(a, b.f, i)
+                            name = self.new_varname(
+                                Sym(f"{a.name}_win"), typ=a.type, mem=self.mems[a.name]
+                            )
+                            self.add_line(f"struct {win_struct} {name} = {rhs};")
+                            self._hoisted[id(a)] = name
+                elif isinstance(b, LoopIR.For):
+                    hoist(b.body)
+
+        hoist(s.body)
+
     def comp_e(self, e, prec=0):
         if isinstance(e, LoopIR.Read):
             rtyp = self.envtyp[e.name]
@@ -1080,7 +1517,10 @@ class Compiler:
         def w_lo(w):
             return w.lo if isinstance(w, LoopIR.Interval) else w.pt
 
-        cirs = [lift_to_cir(w_lo(w), self.range_env) for w in e.idx]
+        lo_idx = [w_lo(w) for w in e.idx]
+        if ptr := self._buf_ptrs.get(e.name):
+            lo_idx = self.reduced_idx(e.name, lo_idx)
+        cirs = [lift_to_cir(i, self.range_env) for i in lo_idx]
         idxs = [self.comp_cir(simplify_cir(i), self.env, prec=0) for i in cirs]
 
         # compute new window strides
@@ -1089,7 +1529,14 @@ class Compiler:
             self.comp_cir(simplify_cir(i), self.env, prec=0) for i in all_strides
         ]
         assert 0 < len(all_strides_s) == len(e.idx)
-        dataptr = mem.window(basetyp, base, idxs, all_strides_s, e.srcinfo)
+        if ptr:
+            # only buffers using the default `Memory.window` are reduced
+            dataptr = f"{ptr[0]}[{generate_offset(idxs, all_strides_s)}]"
+        else:
+            # raw windows are plain data pointers, but keep their strides
+            if e.name in self._raw_windows:
+                basetyp = basetyp.update(is_window=False)
+            dataptr = mem.window(basetyp, base, idxs, all_strides_s, e.srcinfo)
         strides = ", ".join(
             s for s, w in zip(all_strides_s, e.idx) if isinstance(w, LoopIR.Interval)
         )
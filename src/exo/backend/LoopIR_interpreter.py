@@ -0,0 +1,515 @@
+"""
+A reference interpreter for LoopIR procedures, built on NumPy.
+
+Buffers are NumPy arrays (windows are views into them) and control values
+are Python integers.  Perfect nests of rectangular loops whose body only
+assigns to or reduces into buffers at affine indices are executed at once,
+by evaluating their bodies on arrays of iteration indices; all other code
+is executed one statement at a time.  A loop nest is only vectorized when
+that cannot change its result, i.e. when the writes of different iterations
+go to distinct locations and no iteration reads a location written by a
+different one.  (Reductions over a loop are summed by NumPy, and so may
+round differently than a sequential sum.)
+
+Calls to instructions execute their semantic body, and externs are
+evaluated through `Extern.interpret`.  This module requires NumPy.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from ..core.LoopIR import LoopIR, T
+
+# the largest iteration space that is executed as a single vector operation
+VECTORIZE_MAX_ITERS = 1 << 16
+
+_dtypes = {
+    T.R: np.float32,
+    T.f16: np.float16,
+    T.f32: np.float32,
+    T.f64: np.float64,
+    T.i8: np.int8,
+    T.ui8: np.uint8,
+    T.ui16: np.uint16,
+    T.i32: np.int32,
+}
+
+
+class InterpreterError(Exception):
+    pass
+
+
+def run_interpreter(proc, kwargs):
+    """
+    Runs the LoopIR procedure `proc` on the arguments in `kwargs` (by name),
+    updating the NumPy arrays passed for its numeric arguments in place.
+    """
+    assert isinstance(proc, LoopIR.proc)
+    Interpreter(proc, kwargs).run()
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Static analysis of vectorizable loop nests
+
+
+def _uses(e, syms):
+    if isinstance(e, LoopIR.Read):
+        return e.name in syms or any(_uses(i, syms) for i in e.idx)
+    elif isinstance(e, LoopIR.USub):
+        return _uses(e.arg, syms)
+    elif isinstance(e, LoopIR.BinOp):
+        return _uses(e.lhs, syms) or _uses(e.rhs, syms)
+    elif isinstance(e, LoopIR.Extern):
+        return any(_uses(a, syms) for a in e.args)
+    else:
+        return False
+
+
+def _is_affine(e, iters):
+    """
+    Whether the index expression `e` is affine in the loop variables `iters`
+    (with coefficients that may depend on any other variable).
+    """
+    if not _uses(e, iters):
+        return True
+    elif isinstance(e, LoopIR.Read):
+        return len(e.idx) == 0
+    elif isinstance(e, LoopIR.USub):
+        return _is_affine(e.arg, iters)
+    elif isinstance(e, LoopIR.BinOp):
+        if e.op in ("+", "-"):
+            return _is_affine(e.lhs, iters) and _is_affine(e.rhs, iters)
+        elif e.op == "*":
+            return (_is_affine(e.lhs, iters) and not _uses(e.rhs, iters)) or (
+                _is_affine(e.rhs, iters) and not _uses(e.lhs, iters)
+            )
+    return False
+
+
+def _numeric_reads(e):
+    if isinstance(e, LoopIR.Read):
+        return [e] if e.type.is_numeric() else []
+    elif isinstance(e, LoopIR.USub):
+        return _numeric_reads(e.arg)
+    elif isinstance(e, LoopIR.BinOp):
+        return _numeric_reads(e.lhs) + _numeric_reads(e.rhs)
+    elif isinstance(e, LoopIR.Extern):
+        return [r for a in e.args for r in _numeric_reads(a)]
+    else:
+        return []
+
+
+class _VecNest:
+    """
+    A perfect nest of rectangular loops `loops` around a body of
+    assignments and reductions with affine indices, which may be
+    vectorized depending on the run-time values of its buffers and bounds.
+    """
+
+    def __init__(self, loops, body):
+        self.loops = loops
+        self.iters = [loop.iter for loop in loops]
+        self.body = body
+        # for each statement, whether each of its reads is affine
+        self.reads = [
+            [
+                (r, all(_is_affine(i, self.iters) for i in r.idx))
+                for r in _numeric_reads(s.rhs)
+            ]
+            for s in body
+        ]
+
+    @staticmethod
+    def find(s):
+        loops = [s]
+        while len(loops[-1].body) == 1 and isinstance(loops[-1].body[0], LoopIR.For):
+            loops.append(loops[-1].body[0])
+        body = [b for b in loops[-1].body if not isinstance(b, LoopIR.Pass)]
+
+        iters = {loop.iter for loop in loops}
+        if any(_uses(lp.lo, iters) or _uses(lp.hi, iters) for lp in loops[1:]):
+            return None
+        for b in body:
+            if not isinstance(b, (LoopIR.Assign, LoopIR.Reduce)):
+                return None
+            if not all(_is_affine(i, iters) for i in b.idx):
+                return None
+        return _VecNest(loops, body) if body else None
+
+
+class _Access:
+    """
+    The memory touched by one access of a vectorized loop nest, as an
+    affine function `base + sum(coeffs[j] * i_j)` of the byte addresses of
+    its elements in terms of the (zero-based) iteration indices `i_j`.
+    """
+
+    def __init__(self, buf, idx0, idx_steps, extents):
+        strides = buf.strides
+        self.buf = buf
+        self.base = buf.ctypes.data + sum(i * s for i, s in zip(idx0, strides))
+        self.coeffs = [
+            sum((i - i0) * s for i, i0, s in zip(idx, idx0, strides))
+            for idx in idx_steps
+        ]
+        self.extents = extents
+        self.reduced = [
+            j for j, (c, n) in enumerate(zip(self.coeffs, extents)) if c == 0 and n > 1
+        ]
+
+    def is_injective(self):
+        # the addresses are distinct for different iterations of the loops
+        # that are not reduced if, with the coefficients sorted by magnitude,
+        # each one is larger than the span of all smaller ones
+        span = 0
+        for c, n in sorted((abs(c), n) for c, n in zip(self.coeffs, self.extents)):
+            if c == 0 or n == 1:
+                continue
+            if c <= span:
+                return False
+            span += c * (n - 1)
+        return True
+
+    def bounds(self):
+        lo = self.base + sum(
+            min(0, c * (n - 1)) for c, n in zip(self.coeffs, self.extents)
+        )
+        hi = self.base + sum(
+            max(0, c * (n - 1)) for c, n in zip(self.coeffs, self.extents)
+        )
+        return lo, hi + self.buf.itemsize
+
+    def same_elements(self, other):
+        return self.base == other.base and self.coeffs == other.coeffs
+
+    def is_disjoint(self, other):
+        lo, hi = self.bounds()
+        other_lo, other_hi = other.bounds()
+        return hi <= other_lo or other_hi <= lo
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Interpreter
+
+
+class Interpreter:
+    """
+    Binds the arguments `kwargs` of `proc`; `run()` then executes it.
+    """
+
+    def __init__(self, proc, kwargs, configs=None):
+        self.proc = proc
+        self.env = dict()
+        self.configs = dict() if configs is None else configs
+        self.vec_nests = dict()
+
+        for a in proc.args:
+            nm = str(a.name)
+            if nm not in kwargs:
+                raise InterpreterError(f"{proc.name}: missing argument '{nm}'")
+            self.env[a.name] = self.convert_arg(nm, a.type, kwargs[nm])
+
+        for nm in kwargs:
+            if nm not in {str(a.name) for a in proc.args}:
+                raise InterpreterError(f"{proc.name}: unexpected argument '{nm}'")
+
+        for a in proc.args:
+            if a.type.is_tensor_or_window():
+                self.check_shape(str(a.name), a.type, self.env[a.name])
+
+    def failing_pred(self):
+        """
+        Returns the first assertion of the procedure that does not hold for
+        the bound arguments, or None.
+        """
+        for p in self.proc.preds:
+            if not self.eval_e(p):
+                return p
+        return None
+
+    def run(self):
+        if (p := self.failing_pred()) is not None:
+            raise InterpreterError(
+                f"{self.proc.name}: assertion {p} at {p.srcinfo} does not hold"
+            )
+        self.exec_stmts(self.proc.body)
+
+    def convert_arg(self, nm, typ, val):
+        if typ in (T.size, T.index, T.int, T.stride):
+            if not isinstance(val, (int, np.integer)) or isinstance(val, bool):
+                raise InterpreterError(f"expected an integer for '{nm}'")
+            if typ == T.size and val <= 0:
+                raise InterpreterError(f"expected a positive size for '{nm}'")
+            return int(val)
+        elif typ == T.bool:
+            return bool(val)
+
+        dtype = np.dtype(_dtypes[typ.basetype()])
+        if typ.is_real_scalar():
+            # scalars are passed by reference, so arrays are used as is
+            if isinstance(val, np.ndarray):
+                if val.size != 1:
+                    raise InterpreterError(f"expected a scalar for '{nm}'")
+                val = val.reshape(())
+            else:
+                val = np.array(val, dtype=dtype)
+        elif not isinstance(val, np.ndarray):
+            raise InterpreterError(f"expected a NumPy array for '{nm}'")
+
+        if val.dtype != dtype:
+            raise InterpreterError(
+                f"expected dtype {dtype} for '{nm}', got {val.dtype}"
+            )
+        return val
+
+    def check_shape(self, nm, typ, val):
+        shape = tuple(self.eval_e(hi) for hi in typ.shape())
+        if val.shape != shape:
+            raise InterpreterError(
+                f"expected shape {shape} for '{nm}', got {val.shape}"
+            )
+
+    # ----------------------------------------------------------------------- #
+    # statements
+
+    def exec_stmts(self, stmts):
+        for s in stmts:
+            self.exec_s(s)
+
+    def exec_s(self, s):
+        if isinstance(s, (LoopIR.Assign, LoopIR.Reduce)):
+            buf = self.env[s.name]
+            idx = tuple(self.eval_e(i) for i in s.idx)
+            rhs = self.eval_e(s.rhs)
+            if isinstance(s, LoopIR.Assign):
+                buf[idx] = rhs
+            else:
+                buf[idx] += rhs
+        elif isinstance(s, LoopIR.WriteConfig):
+            self.configs[(s.config, s.field)] = self.eval_e(s.rhs)
+        elif isinstance(s, LoopIR.WindowStmt):
+            self.env[s.name] = self.eval_e(s.rhs)
+        elif isinstance(s, LoopIR.If):
+            if self.eval_e(s.cond):
+                self.exec_stmts(s.body)
+            else:
+                self.exec_stmts(s.orelse)
+        elif isinstance(s, LoopIR.For):
+            if not self.exec_vectorized(s):
+                lo, hi = self.eval_e(s.lo), self.eval_e(s.hi)
+                for i in range(lo, hi):
+                    self.env[s.iter] = i
+                    self.exec_stmts(s.body)
+        elif isinstance(s, LoopIR.Alloc):
+            shape = tuple(self.eval_e(hi) for hi in s.type.shape())
+            self.env[s.name] = np.zeros(shape, dtype=_dtypes[s.type.basetype()])
+        elif isinstance(s, LoopIR.Free):
+            del self.env[s.name]
+        elif isinstance(s, LoopIR.Call):
+            self.exec_call(s)
+        elif isinstance(s, LoopIR.Pass):
+            pass
+        else:
+            assert False, f"bad case: {type(s)}"
+
+    def exec_call(self, s):
+        callee_env = dict()
+        for sig, arg in zip(s.f.args, s.args):
+            if sig.type.is_numeric() and isinstance(arg, LoopIR.Read):
+                buf = self.env[arg.name]
+                if arg.idx:
+                    # a scalar passed by reference into a buffer
+                    idx = tuple(self.eval_e(i) for i in arg.idx)
+                    buf = buf[idx + (Ellipsis,)]
+                callee_env[sig.name] = buf
+            else:
+                callee_env[sig.name] = self.eval_e(arg)
+
+        env = self.env
+        self.env = callee_env
+        try:
+            self.exec_stmts(s.f.body)
+        finally:
+            self.env = env
+
+    # ----------------------------------------------------------------------- #
+    # vectorized loop nests
+
+    def exec_vectorized(self, s):
+        """
+        Tries to execute the loop `s` as a vectorized loop nest, and returns
+        whether it did.
+        """
+        if id(s) not in self.vec_nests:
+            self.vec_nests[id(s)] = (s, _VecNest.find(s))
+        nest = self.vec_nests[id(s)][1]
+        if nest is None:
+            return False
+
+        los = [self.eval_e(lp.lo) for lp in nest.loops]
+        extents = [self.eval_e(lp.hi) - lo for lp, lo in zip(nest.loops, los)]
+        if any(n <= 0 for n in extents):
+            return True
+        if len(extents) > 1 and math.prod(extents) > VECTORIZE_MAX_ITERS:
+            # vectorize an inner part of the nest instead
+            return False
+
+        writes = [self.access(nest, s, los, extents) for s in nest.body]
+        use_add_at = []
+        for s, w in zip(nest.body, writes):
+            if isinstance(s, LoopIR.Assign) and (w.reduced or not w.is_injective()):
+                return False
+            use_add_at.append(not w.is_injective())
+
+        # every location written by the nest may only be accessed in the
+        # iteration that writes it
+        def is_independent(w, uniq, acc):
+            if not np.may_share_memory(w.buf, acc.buf):
+                return True
+            return acc.is_disjoint(w) or (
+                uniq and not w.reduced and acc.same_elements(w)
+            )
+
+        for i, (w, add_at) in enumerate(zip(writes, use_add_at)):
+            uniq = not add_at
+            for j, reads in enumerate(nest.reads):
+                for r, affine in reads:
+                    buf = self.env[r.name]
+                    if not np.may_share_memory(w.buf, buf):
+                        continue
+                    if not affine:
+                        return False
+                    if not is_independent(w, uniq, self.access(nest, r, los, extents)):
+                        return False
+                if j != i and not is_independent(w, uniq, writes[j]):
+                    return False
+
+        shape = tuple(extents)
+        for k, (it, lo, n) in enumerate(zip(nest.iters, los, extents)):
+            axes = [1] * len(shape)
+            axes[k] = n
+            self.env[it] = np.arange(lo, lo + n).reshape(axes)
+
+        for s, w, add_at in zip(nest.body, writes, use_add_at):
+            buf = w.buf.reshape(1) if w.buf.ndim == 0 else w.buf
+            idx = tuple(np.broadcast_to(self.eval_e(i), shape) for i in s.idx) or (
+                np.zeros(shape, dtype=np.intp),
+            )
+            rhs = np.broadcast_to(self.eval_e(s.rhs), shape)
+            if isinstance(s, LoopIR.Assign):
+                buf[idx] = rhs
+            elif add_at:
+                np.add.at(buf, idx, rhs)
+            elif w.reduced:
+                red = tuple(w.reduced)
+                first = tuple(
+                    slice(0, 1) if k in red else slice(None) for k in range(len(shape))
+                )
+                buf[tuple(i[first] for i in idx)] += rhs.sum(axis=red, keepdims=True)
+            else:
+                buf[idx] += rhs
+
+        for it in nest.iters:
+            del self.env[it]
+        return True
+
+    def access(self, nest, node, los, extents):
+        # evaluate the indices at the first iteration, and after one step
+        # of each loop, to find the affine form of the addresses accessed
+        def idx_at(steps):
+            for it, lo, step in zip(nest.iters, los, steps):
+                self.env[it] = lo + step
+            return [self.eval_e(i) for i in node.idx]
+
+        d = len(nest.iters)
+        idx0 = idx_at([0] * d)
+        idx_steps = [idx_at([int(k == j) for k in range(d)]) for j in range(d)]
+        for it in nest.iters:
+            del self.env[it]
+        return _Access(self.env[node.name], idx0, idx_steps, extents)
+
+    # ----------------------------------------------------------------------- #
+    # expressions
+
+    def eval_e(self, e):
+        if isinstance(e, LoopIR.Read):
+            val = self.env[e.name]
+            if e.idx:
+                return val[tuple(self.eval_e(i) for i in e.idx)]
+            elif e.type.is_real_scalar():
+                return val[()]
+            return val
+        elif isinstance(e, LoopIR.Const):
+            return e.val
+        elif isinstance(e, LoopIR.USub):
+            return -self.eval_e(e.arg)
+        elif isinstance(e, LoopIR.BinOp):
+            lhs = self.eval_e(e.lhs)
+            rhs = self.eval_e(e.rhs)
+            return self.eval_binop(e, lhs, rhs)
+        elif isinstance(e, LoopIR.Extern):
+            args = [self.eval_e(a) for a in e.args]
+            try:
+                return e.f.interpret(args)
+            except NotImplementedError:
+                raise InterpreterError(
+                    f"extern {e.f.name()} cannot be interpreted"
+                ) from None
+        elif isinstance(e, LoopIR.WindowExpr):
+            idx = tuple(
+                (
+                    slice(self.eval_e(w.lo), self.eval_e(w.hi))
+                    if isinstance(w, LoopIR.Interval)
+                    else self.eval_e(w.pt)
+                )
+                for w in e.idx
+            )
+            return self.env[e.name][idx + (Ellipsis,)]
+        elif isinstance(e, LoopIR.StrideExpr):
+            buf = self.env[e.name]
+            return buf.strides[e.dim] // buf.itemsize
+        elif isinstance(e, LoopIR.ReadConfig):
+            return self.configs.get((e.config, e.field), 0)
+        else:
+            assert False, f"bad case: {type(e)}"
+
+    def eval_binop(self, e, lhs, rhs):
+        op = e.op
+        if op == "+":
+            return lhs + rhs
+        elif op == "-":
+            return lhs - rhs
+        elif op == "*":
+            return lhs * rhs
+        elif op == "/":
+            if e.type.is_real_scalar() and np.dtype(_dtypes[e.type]).kind == "f":
+                return lhs / rhs
+            elif e.type.is_real_scalar():
+                # C integer division truncates towards zero
+                q = lhs // rhs
+                return q + ((q < 0) & (q * rhs != lhs))
+            # index division is floor division
+            return lhs // rhs
+        elif op == "%":
+            return lhs % rhs
+        elif op == "<":
+            return lhs < rhs
+        elif op == ">":
+            return lhs > rhs
+        elif op == "<=":
+            return lhs <= rhs
+        elif op == ">=":
+            return lhs >= rhs
+        elif op == "==":
+            return lhs == rhs
+        elif op == "and":
+            return np.logical_and(lhs, rhs)
+        elif op == "or":
+            return np.logical_or(lhs, rhs)
+        else:
+            assert False, f"bad case: {op}"
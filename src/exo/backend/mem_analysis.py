@@ -1,7 +1,10 @@
-from collections import ChainMap
+from dataclasses import dataclass
+from heapq import heappop, heappush
+
 from ..core.LoopIR import LoopIR
+from ..core.prelude import SrcInfo, SymTable
 
-from ..core.memory import Memory
+from ..core.memory import Memory, MemGenError, StaticMemory
 
 
 # --------------------------------------------------------------------------- #
@@ -11,13 +14,13 @@ from ..core.memory import Memory
 
 class MemoryAnalysis:
     def __init__(self):
-        self.mem_env = ChainMap()
+        self.mem_env = SymTable()
         self.tofree = []
 
     def run(self, proc):
         assert isinstance(proc, LoopIR.proc)
 
-        self.mem_env = ChainMap()
+        self.mem_env = SymTable()
         self.tofree = []
 
         for a in proc.args:
@@ -41,11 +44,11 @@ class MemoryAnalysis:
         )
 
     def push(self):
-        self.mem_env = self.mem_env.new_child()
+        self.mem_env.push()
         self.tofree.append([])
 
     def pop(self):
-        self.mem_env = self.mem_env.parents
+        self.mem_env.pop()
         assert len(self.tofree[-1]) == 0
         self.tofree.pop()
 
@@ -176,3 +179,142 @@ class MemoryAnalysis:
             assert False, "There should not be frees inserted before mem " "analysis"
         else:
             assert False, f"bad case {styp}"
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Static Memory Allocation
+
+
+def allocate_static_memory(proc):
+    """
+    Assigns a chunk to every allocation of a `StaticMemory` in `proc`, which
+    must already have gone through `MemoryAnalysis`.  Returns the chunks in
+    the order the allocations appear in the proc.
+
+    The live range of an allocation runs from its `Alloc` to its `Free`, and
+    the ranges form an interval graph, which is colored optimally by visiting
+    them in order and always reusing the lowest free chunk.
+    """
+    ranges = []
+    live = dict()
+    pos = 0
+
+    def visit(stmts):
+        nonlocal pos
+        for s in stmts:
+            pos += 1
+            if isinstance(s, LoopIR.Alloc) and issubclass(s.mem, StaticMemory):
+                live[s.name] = len(ranges)
+                ranges.append([pos, None, s])
+            elif isinstance(s, LoopIR.Free) and s.name in live:
+                ranges[live.pop(s.name)][1] = pos
+            elif isinstance(s, LoopIR.If):
+                visit(s.body)
+                visit(s.orelse)
+            elif isinstance(s, LoopIR.For):
+                visit(s.body)
+
+    visit(proc.body)
+
+    chunks = []
+    n_used = dict()
+    free = dict()
+    active = []
+    for i, (start, end, alloc) in enumerate(ranges):
+        while active and active[0][0] < start:
+            _, j = heappop(active)
+            heappush(free[ranges[j][2].mem], chunks[j])
+
+        mem = alloc.mem
+        if free.setdefault(mem, []):
+            chunk = heappop(free[mem])
+        else:
+            chunk = n_used.get(mem, 0)
+            if chunk >= mem.num_chunks():
+                raise MemGenError(
+                    f"{alloc.srcinfo}: Cannot allocate more than "
+                    f"{mem.num_chunks()} chunks at a time in {mem.name()}"
+                )
+            n_used[mem] = chunk + 1
+
+        chunks.append(chunk)
+        heappush(active, (end or pos + 1, i))
+
+    return chunks
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Register Pressure Analysis
+
+
+@dataclass
+class RegisterPressure:
+    """
+    The largest number of registers of `mem` that a proc keeps live at once,
+    first reached at the allocation at `srcinfo`.  `by_type` breaks it down
+    by the element type of the live allocations.
+    """
+
+    mem: type
+    peak: int
+    by_type: dict
+    srcinfo: SrcInfo
+
+    def exceeds_budget(self):
+        return self.peak > self.mem.num_registers()
+
+    def __str__(self):
+        types = ", ".join(f"{n} x {typ}" for typ, n in self.by_type.items())
+        return (
+            f"{self.srcinfo}: {self.peak} {self.mem.name()} registers are live "
+            f"at once ({types}), but only {self.mem.num_registers()} exist"
+        )
+
+
+def register_pressure(proc):
+    """
+    Computes the `RegisterPressure` of every register memory (see
+    `Memory.num_registers`) allocated in `proc`, which must already have
+    gone through `MemoryAnalysis`.  Allocations with a non-constant number
+    of vectors cannot be kept in registers, and are not counted.
+    """
+    live = dict()
+    counts = dict()
+    pressure = dict()
+
+    def n_registers(typ):
+        n = 1
+        for hi in typ.shape()[:-1]:
+            if not isinstance(hi, LoopIR.Const):
+                return None
+            n *= hi.val
+        return n
+
+    def visit(stmts):
+        for s in stmts:
+            if isinstance(s, LoopIR.Alloc) and s.mem.num_registers() is not None:
+                if (n := n_registers(s.type)) is None:
+                    continue
+                typ = str(s.type.basetype())
+                mem_counts = counts.setdefault(s.mem, dict())
+                mem_counts[typ] = mem_counts.get(typ, 0) + n
+                live[s.name] = (typ, n)
+
+                total = sum(mem_counts.values())
+                if s.mem not in pressure or total > pressure[s.mem].peak:
+                    by_type = {t: c for t, c in mem_counts.items() if c}
+                    pressure[s.mem] = RegisterPressure(s.mem, total, by_type, s.srcinfo)
+            elif isinstance(s, LoopIR.Free) and s.name in live:
+                typ, n = live.pop(s.name)
+                counts[s.mem][typ] -= n
+            elif isinstance(s, LoopIR.If):
+                visit(s.body)
+                visit(s.orelse)
+            elif isinstance(s, LoopIR.For):
+                visit(s.body)
+
+    visit(proc.body)
+
+    return pressure
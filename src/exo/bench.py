@@ -0,0 +1,454 @@
+"""
+Microbenchmarks of compiled procedures.
+
+    from exo.bench import benchmark, compare, format_results
+
+    inputs = lambda: {
+        "N": 256,
+        "A": np.random.rand(256, 256).astype(np.float32),
+        "B": np.random.rand(256, 256).astype(np.float32),
+        "C": np.zeros((256, 256), dtype=np.float32),
+    }
+    results = compare([gemm, gemm_tiled], inputs, flops=2 * 256**3)
+    print(format_results(results))
+
+Each procedure is compiled to a shared library with the system C compiler
+and called through `ctypes`.  Inputs are given by argument name: integers
+for size, index and stride arguments, booleans for bool arguments, and
+C-contiguous NumPy arrays (or Python numbers, for scalars) for numeric
+arguments.  Window arguments are not supported.  This module requires
+NumPy.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import os
+import shlex
+import statistics
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .API import Procedure, compile_procs_to_strings
+from .core.LoopIR import T
+
+Inputs = Union[Dict[str, object], Callable[[], Dict[str, object]]]
+
+DEFAULT_CFLAGS = ("-O3", "-march=native")
+
+_dtypes = {
+    T.f16: np.float16,
+    T.f32: np.float32,
+    T.f64: np.float64,
+    T.i8: np.int8,
+    T.ui8: np.uint8,
+    T.ui16: np.uint16,
+    T.i32: np.int32,
+}
+
+
+class BenchError(Exception):
+    pass
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Building and calling procedures
+
+
+@dataclass
+class Library:
+    """
+    A shared library compiled from a list of procedures.  The (public)
+    procedures are available as attributes, taking their arguments in
+    declaration order.
+    """
+
+    path: Path
+    procs: Dict[str, Procedure]
+    dll: ctypes.CDLL = field(repr=False)
+    ctxt_size: int = 0
+
+    def __getattr__(self, name):
+        procs = self.__dict__.get("procs", {})
+        if name not in procs:
+            raise AttributeError(name)
+        return Kernel(procs[name], getattr(self.dll, name), self.ctxt_size)
+
+
+@dataclass
+class Kernel:
+    proc: Procedure
+    fn_ptr: object = field(repr=False)
+    ctxt_size: int = 0
+
+    def bind(self, inputs: Dict[str, object]):
+        """
+        Convert `inputs` (by argument name) to ctypes arguments, returning
+        a function calling this kernel with them.
+        """
+        args = [self._context()]
+        for a in self.proc._loopir_proc.args:
+            nm = str(a.name)
+            if nm not in inputs:
+                raise BenchError(f"{self.proc.name()}: missing input '{nm}'")
+            args.append(_convert(self.proc.name(), a, inputs[nm]))
+
+        fn_ptr = self.fn_ptr
+        return lambda: fn_ptr(*args)
+
+    def __call__(self, **inputs):
+        return self.bind(inputs)()
+
+    def _context(self):
+        if self.ctxt_size == 0:
+            return ctypes.c_void_p()
+        return ctypes.create_string_buffer(self.ctxt_size)
+
+
+def _convert(proc_name, arg, val):
+    typ = arg.type
+    if typ in (T.size, T.index, T.stride, T.int):
+        if not isinstance(val, (int, np.integer)):
+            raise BenchError(f"{proc_name}: expected an integer for '{arg.name}'")
+        return int(val)
+    elif typ == T.bool:
+        return ctypes.c_bool(bool(val))
+    elif typ.is_win():
+        raise BenchError(f"{proc_name}: window argument '{arg.name}' not supported")
+
+    dtype = _dtypes[typ.basetype()]
+    if typ.is_real_scalar() and not isinstance(val, np.ndarray):
+        val = np.array(val, dtype=dtype)
+    if not isinstance(val, np.ndarray):
+        raise BenchError(f"{proc_name}: expected a NumPy array for '{arg.name}'")
+    if val.dtype != dtype:
+        raise BenchError(
+            f"{proc_name}: expected dtype {np.dtype(dtype)} for '{arg.name}', "
+            f"got {val.dtype}"
+        )
+    if not val.flags["C_CONTIGUOUS"]:
+        raise BenchError(f"{proc_name}: '{arg.name}' must be C-contiguous")
+    return val.ctypes.data_as(ctypes.c_void_p)
+
+
+def compile_library(
+    procs: Union[Procedure, List[Procedure]],
+    workdir: Optional[Path] = None,
+    *,
+    name: str = "bench",
+    cc: Optional[str] = None,
+    cflags=DEFAULT_CFLAGS,
+    **kwargs,
+) -> Library:
+    """
+    Compile `procs` to a shared library in `workdir` (a new temporary
+    directory by default) using `cc` (or `$CC`).  The remaining keyword
+    arguments are code generation options (see `compile_procs_to_strings`).
+    """
+    if isinstance(procs, Procedure):
+        procs = [procs]
+    build = LibraryBuild.write(
+        procs, workdir, name=name, cc=cc, cflags=cflags, **kwargs
+    )
+    build.run()
+    return build.load()
+
+
+@dataclass
+class LibraryBuild:
+    """
+    The C sources of a library written by `write`, along with the command
+    compiling them, so that several libraries can be built concurrently
+    (e.g. in a thread pool) before being loaded.
+    """
+
+    procs: List[Procedure]
+    lib_path: Path
+    cmd: List[str]
+
+    @staticmethod
+    def write(
+        procs: List[Procedure],
+        workdir: Optional[Path] = None,
+        *,
+        name: str = "bench",
+        cc: Optional[str] = None,
+        cflags=DEFAULT_CFLAGS,
+        sources: Optional[Tuple[str, str]] = None,
+        **kwargs,
+    ) -> "LibraryBuild":
+        """
+        `sources` are the C source and header (named `{name}.h`) already
+        generated for `procs`, if any, which are written out as they are.
+        """
+        workdir = Path(workdir or tempfile.mkdtemp(prefix="exo_bench_"))
+        workdir.mkdir(parents=True, exist_ok=True)
+
+        if sources is None:
+            sources = compile_procs_to_strings(procs, f"{name}.h", **kwargs)
+        c_src, h_src = sources
+        (workdir / f"{name}.c").write_text(c_src)
+        (workdir / f"{name}.h").write_text(h_src)
+
+        ctxt_struct = f"{name}_Context"
+        has_ctxt = f"typedef struct {ctxt_struct}" in h_src
+        support = workdir / f"{name}_bench.c"
+        support.write_text(
+            f'#include <stddef.h>\n#include "{name}.h"\n'
+            f"size_t exo_bench_ctxt_size(void) {{ "
+            f"return {f'sizeof({ctxt_struct})' if has_ctxt else '0'}; }}\n"
+        )
+
+        cc = cc or os.getenv("CC", "cc")
+        flags = list(cflags)
+        if "#pragma omp" in c_src:
+            flags.append("-fopenmp")
+        lib_path = workdir / f"lib{name}.so"
+        cmd = [
+            *shlex.split(cc),
+            *flags,
+            "-fPIC",
+            "-shared",
+            f"-I{Path(__file__).parent / 'libs'}",
+            "-o",
+            str(lib_path),
+            str(workdir / f"{name}.c"),
+            str(support),
+        ]
+        return LibraryBuild(list(procs), lib_path, cmd)
+
+    def run(self):
+        result = subprocess.run(self.cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise BenchError(
+                f"compilation failed: {' '.join(self.cmd)}\n{result.stderr}"
+            )
+
+    def load(self) -> Library:
+        dll = ctypes.CDLL(str(self.lib_path))
+        dll.exo_bench_ctxt_size.restype = ctypes.c_size_t
+        return Library(
+            self.lib_path,
+            {p.name(): p for p in self.procs},
+            dll,
+            dll.exo_bench_ctxt_size(),
+        )
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Benchmarking
+
+
+@dataclass
+class BenchResult:
+    """
+    Wall-clock times (in seconds) of the calls to one procedure, along with
+    its FLOP count and the bytes moved per call.  Unless given explicitly,
+    the bytes moved are the total size of the buffer arguments, i.e. the
+    compulsory traffic of one call.
+    """
+
+    name: str
+    times: List[float]
+    flops: Optional[float] = None
+    bytes_moved: int = 0
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    def percentile(self, q: float) -> float:
+        return float(np.percentile(self.times, q))
+
+    @property
+    def gflops(self) -> Optional[float]:
+        if self.flops is None:
+            return None
+        return self.flops / self.median / 1e9
+
+    @property
+    def bandwidth(self) -> float:
+        """GB/s, based on the median time"""
+        return self.bytes_moved / self.median / 1e9
+
+    def __str__(self):
+        s = (
+            f"{self.name}: median {_fmt_time(self.median)}, "
+            f"p10 {_fmt_time(self.percentile(10))}, "
+            f"p90 {_fmt_time(self.percentile(90))}"
+        )
+        if self.flops is not None:
+            s += f", {self.gflops:.2f} GFLOP/s"
+        if self.bytes_moved:
+            s += f", {self.bandwidth:.2f} GB/s"
+        return s
+
+
+def _fmt_time(t):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if t >= scale:
+            return f"{t / scale:.3f} {unit}"
+    return f"{t / 1e-9:.1f} ns"
+
+
+def _make_inputs(inputs: Inputs) -> Dict[str, object]:
+    inputs = inputs() if callable(inputs) else inputs
+    # copy arrays so that runs of different procs do not see each other's
+    # outputs
+    return {k: v.copy() if isinstance(v, np.ndarray) else v for k, v in inputs.items()}
+
+
+def _bytes_moved(proc: Procedure, inputs):
+    return sum(
+        inputs[str(a.name)].nbytes
+        for a in proc._loopir_proc.args
+        if a.type.is_numeric() and isinstance(inputs[str(a.name)], np.ndarray)
+    )
+
+
+def run_benchmark(
+    kernel: Kernel,
+    inputs: Inputs,
+    *,
+    flops: Optional[float] = None,
+    bytes_moved: Optional[int] = None,
+    n_runs: int = 100,
+    n_warmup: int = 10,
+) -> BenchResult:
+    """
+    Call an already compiled `kernel` `n_warmup` times and then time `n_runs`
+    calls.  The inputs are reused (and may be overwritten) across calls.
+    """
+    inputs = _make_inputs(inputs)
+    fn = kernel.bind(inputs)
+
+    for _ in range(n_warmup):
+        fn()
+
+    times = []
+    for _ in range(n_runs):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    if bytes_moved is None:
+        bytes_moved = _bytes_moved(kernel.proc, inputs)
+    return BenchResult(kernel.proc.name(), times, flops, bytes_moved)
+
+
+def benchmark(
+    proc: Procedure,
+    inputs: Inputs,
+    *,
+    flops: Optional[float] = None,
+    bytes_moved: Optional[int] = None,
+    n_runs: int = 100,
+    n_warmup: int = 10,
+    workdir: Optional[Path] = None,
+    **kwargs,
+) -> BenchResult:
+    """
+    Compile `proc` and time it on `inputs`: a dict from argument names to
+    values, or a function returning such a dict.  `flops` is the number of
+    floating-point operations per call, used to report GFLOP/s.  Other
+    keyword arguments are passed to `compile_library`.
+    """
+    lib = compile_library(proc, workdir, **kwargs)
+    return run_benchmark(
+        getattr(lib, proc.name()),
+        inputs,
+        flops=flops,
+        bytes_moved=bytes_moved,
+        n_runs=n_runs,
+        n_warmup=n_warmup,
+    )
+
+
+def compare(
+    procs: List[Procedure],
+    inputs: Inputs,
+    *,
+    flops: Optional[float] = None,
+    bytes_moved: Optional[int] = None,
+    n_runs: int = 100,
+    n_warmup: int = 10,
+    check: bool = True,
+    rtol: float = 1e-5,
+    atol: float = 1e-5,
+    workdir: Optional[Path] = None,
+    **kwargs,
+) -> List[BenchResult]:
+    """
+    Benchmark several variants of the same procedure on the same inputs,
+    which are generated once.  Each variant is compiled into its own
+    library, so variants may share a name.  If `check` is set, the outputs
+    of a single call of each variant are first compared against those of
+    the first variant.  Other keyword arguments are passed to
+    `compile_library`.
+    """
+    if not procs:
+        raise TypeError("expected a non-empty list of procedures")
+
+    workdir = Path(workdir or tempfile.mkdtemp(prefix="exo_bench_"))
+    inputs = inputs() if callable(inputs) else inputs
+
+    kernels = []
+    for i, p in enumerate(procs):
+        lib = compile_library(p, workdir / f"v{i}", **kwargs)
+        kernels.append(getattr(lib, p.name()))
+
+    if check:
+        expected = _make_inputs(inputs)
+        kernels[0](**expected)
+        for i, k in enumerate(kernels[1:], 1):
+            outputs = _make_inputs(inputs)
+            k(**outputs)
+            for nm, val in outputs.items():
+                if isinstance(val, np.ndarray) and not np.allclose(
+                    val, expected[nm], rtol=rtol, atol=atol
+                ):
+                    raise BenchError(
+                        f"variant {i} ({k.proc.name()}) computes a different "
+                        f"'{nm}' than variant 0"
+                    )
+
+    return [
+        run_benchmark(
+            k,
+            inputs,
+            flops=flops,
+            bytes_moved=bytes_moved,
+            n_runs=n_runs,
+            n_warmup=n_warmup,
+        )
+        for k in kernels
+    ]
+
+
+def format_results(results: List[BenchResult]) -> str:
+    """
+    A markdown table of `results`, with the speedup of each result over the
+    first one.
+    """
+    lines = [
+        "| # | proc | median | p10 | p90 | GFLOP/s | GB/s | speedup |",
+        "|---|------|--------|-----|-----|---------|------|---------|",
+    ]
+    base = results[0].median if results else None
+    for i, r in enumerate(results):
+        gflops = f"{r.gflops:.2f}" if r.flops is not None else "-"
+        bandwidth = f"{r.bandwidth:.2f}" if r.bytes_moved else "-"
+        lines.append(
+            f"| {i} | {r.name} | {_fmt_time(r.median)} "
+            f"| {_fmt_time(r.percentile(10))} | {_fmt_time(r.percentile(90))} "
+            f"| {gflops} | {bandwidth} | {base / r.median:.2f}x |"
+        )
+    return "\n".join(lines)
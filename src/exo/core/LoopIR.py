@@ -2,8 +2,9 @@ import re
 from collections import ChainMap, defaultdict
 from typing import Type
 
-from asdl_adt import ADT, validators
+from asdl_adt import validators
 
+from .adt import ADT
 from .extern import Extern
 from .configs import Config
 from .memory import Memory
@@ -0,0 +1,74 @@
+import sys
+import textwrap
+from abc import ABC, abstractmethod
+
+import asdl
+import attrs
+from asdl_adt.adt import _AsdlAdtBase, _BuildClasses
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Slotted ASDL classes
+
+# The classes generated by asdl_adt are slotted, but their common base class
+# is not, so every node still carries a per-instance __dict__ that is never
+# used.  Here we generate the same classes on top of a slotted base instead,
+# which makes every node about 30% smaller.  Nodes stay weak-referenceable.
+#
+# This relies on the private `_AsdlAdtBase` and `_BuildClasses` of asdl_adt,
+# which is why setup.cfg pins asdl-adt to 0.1.x.
+
+
+class _SlottedAdtBase(ABC):
+    __slots__ = ("__weakref__",)
+
+    @abstractmethod
+    def __init__(self):  # pragma: no cover (unreachable)
+        assert False, "Should be unreachable."
+
+    def update(self, **kwargs):
+        """
+        Useful wrapper for creating a copy of an instance of a generated class,
+        with only certain fields changed.
+        """
+        return attrs.evolve(self, **kwargs)
+
+
+_AsdlAdtBase.register(_SlottedAdtBase)
+
+
+class _BuildSlottedClasses(_BuildClasses):
+    def _adt_class(self, *, name, base, fields):
+        if base is _AsdlAdtBase:
+            base = _SlottedAdtBase
+        return super()._adt_class(name=name, base=base, fields=fields)
+
+
+def ADT(asdl_str, ext_types=None, memoize=None):
+    """
+    Drop-in replacement for `asdl_adt.ADT`, which converts an ASDL grammar
+    into a Python module with one slotted class per type and constructor.
+    """
+    asdl_ast = asdl.ASDLParser().parse(asdl_str)
+    assert isinstance(asdl_ast, asdl.Module)
+
+    if mod := sys.modules.get(asdl_ast.name):
+        return mod
+
+    builder = _BuildSlottedClasses(ext_types, memoize)
+    builder.visit(asdl_ast)
+
+    mod = builder.module
+    mod.__doc__ = (
+        textwrap.dedent(
+            """
+            ASDL Module generated by asdl_adt
+            Original ASDL description:
+            """
+        )
+        + textwrap.dedent(asdl_str)
+    )
+
+    sys.modules[asdl_ast.name] = mod
+
+    return mod
@@ -847,3 +847,267 @@ class Gap(Cursor):
             return i + 1
         else:
             assert False, f"case {self.type} not implemented"
+
+
+class BatchEdit:
+    """
+    Collects many local edits against one tree and applies them together.
+    Every node on a path from an edit up to the root is rebuilt exactly once,
+    and cursors are forwarded by a single function rather than a chain of
+    per-edit forwarding functions.
+
+    Edits are always given as cursors into the original tree. An edit that
+    lies inside the target of another edit is applied first, and the outer
+    edit sees its result. Edits of the same block must not overlap.
+
+    Like the mutation methods on cursors, this is an UNSAFE internal
+    interface. It is meant to be package-private, so it may be used from
+    other internal modules, but not from end-user code.
+    """
+
+    def __init__(self, root):
+        self._root = root
+        # path -> functions applied to the (rebuilt) node at that path
+        self._node_edits = {}
+        # path -> attributes whose children do not survive the edit
+        self._dropped = {}
+        # (path, attr) -> [(range, fn, empty_default, lift_attr)]
+        self._block_edits = {}
+        # path -> {attr: child indices on the way to some edit}
+        self._spine = {}
+        # (path, attr) -> [(range, number of new nodes, lift_attr)]
+        self._applied = None
+
+    def __bool__(self):
+        return bool(self._node_edits or self._block_edits)
+
+    # ------------------------------------------------------------------------ #
+    # Recording edits
+    # ------------------------------------------------------------------------ #
+
+    def replace(self, cursor, ast, *, empty_default=None):
+        """Record `cursor._replace(ast)`"""
+        if isinstance(cursor, Node):
+            _, idx = cursor._path[-1]
+            if idx is None or not isinstance(ast, list):
+                assert not isinstance(ast, list), "replaced node is not in a block"
+                self._edit_node(cursor, lambda _: ast)
+                return
+            cursor = cursor.as_block()
+
+        assert isinstance(cursor, Block) and isinstance(ast, list)
+        self._edit_block(cursor, lambda _: ast, empty_default)
+
+    def update(self, cursor: Node, **kwargs):
+        """
+        Record replacing some attributes of the node at `cursor`. Cursors
+        into replaced blocks (e.g. `body` or `idx`) can no longer be forwarded.
+        """
+        self._edit_node(cursor, lambda n: n.update(**kwargs))
+        dropped = self._dropped.setdefault(tuple(cursor._path), set())
+        dropped.update(a for a, v in kwargs.items() if isinstance(v, list))
+
+    def delete(self, cursor):
+        """Record `cursor._delete()`"""
+        block = cursor.as_block() if isinstance(cursor, Node) else cursor
+        self._edit_block(block, lambda _: [], self._pass_stmt(block))
+
+    def insert(self, gap: Gap, stmts: list):
+        """Record `gap._insert(stmts)`"""
+        if gap.is_edge():
+            raise NotImplementedError()
+        i = gap._insertion_index()
+        block = Block(gap._root, gap.parent(), gap.anchor()._path[-1][0], range(i, i))
+        self._edit_block(block, lambda _: stmts, None)
+
+    def lift(self, cursor: Node, attr: str):
+        """
+        Record replacing the node at `cursor` with the statements in its
+        `attr` block, after any edits inside that block. Cursors into the
+        block are forwarded to the lifted statements.
+        """
+        block = cursor.as_block()
+        lift = lambda ns: getattr(ns[0], attr)
+        self._edit_block(block, lift, self._pass_stmt(block), attr)
+
+    @staticmethod
+    def _pass_stmt(block):
+        # TODO: refactor this; LoopIR should not be imported here
+        from exo.core.LoopIR import LoopIR
+
+        return [LoopIR.Pass(block.parent()._node.srcinfo)]
+
+    def _check_root(self, cursor):
+        if cursor._root is not self._root:
+            raise InvalidCursorError("cannot edit from unknown root")
+        if self._applied is not None:
+            raise InvalidCursorError("edits were already committed")
+
+    def _mark(self, path):
+        for d, (attr, i) in enumerate(path):
+            idxs = self._spine.setdefault(path[:d], {}).setdefault(attr, set())
+            if i is not None:
+                idxs.add(i)
+
+    def _edit_node(self, cursor: Node, fn):
+        self._check_root(cursor)
+        path = tuple(cursor._path)
+        self._mark(path)
+        self._node_edits.setdefault(path, []).append(fn)
+
+    def _edit_block(self, block: Block, fn, empty_default, lift_attr=None):
+        self._check_root(block)
+        path = tuple(block._anchor._path)
+        self._mark(path)
+        self._spine.setdefault(path, {}).setdefault(block._attr, set())
+        edits = self._block_edits.setdefault((path, block._attr), [])
+        edits.append((block._range, fn, empty_default, lift_attr))
+
+    # ------------------------------------------------------------------------ #
+    # Applying edits
+    # ------------------------------------------------------------------------ #
+
+    def commit(self):
+        """
+        Applies all recorded edits, and returns the new root together with
+        a forwarding function from the old root, just like the individual
+        mutation methods.
+        """
+        assert self._applied is None, "edits were already committed"
+        self._applied = {}
+        new_root = self._rebuild(self._root, ())
+        return new_root, self._forward(new_root)
+
+    def _rebuild(self, node, path):
+        updates = {}
+        for attr, idxs in self._spine.get(path, {}).items():
+            children = getattr(node, attr)
+            if isinstance(children, list):
+                new_children = list(children)
+                for i in idxs:
+                    new_children[i] = self._rebuild(children[i], path + ((attr, i),))
+                if (path, attr) in self._block_edits:
+                    new_children = self._splice(path, attr, new_children)
+                updates[attr] = new_children
+            else:
+                updates[attr] = self._rebuild(children, path + ((attr, None),))
+
+        if updates:
+            node = node.update(**updates)
+        for fn in self._node_edits.get(path, []):
+            node = fn(node)
+        return node
+
+    def _splice(self, path, attr, children):
+        edits = sorted(
+            self._block_edits[(path, attr)], key=lambda e: (e[0].start, e[0].stop)
+        )
+        applied = []
+        new_children = []
+        pos = 0
+        default = None
+        for rng, fn, empty_default, lift_attr in edits:
+            if rng.start < pos:
+                raise InvalidCursorError("cannot apply overlapping edits")
+            new_nodes = fn(children[rng.start : rng.stop])
+            new_children += children[pos : rng.start] + new_nodes
+            applied.append((rng, len(new_nodes), lift_attr))
+            pos = rng.stop
+            default = default or empty_default
+        new_children += children[pos:]
+
+        self._applied[(path, attr)] = applied
+        return new_children or default or []
+
+    # ------------------------------------------------------------------------ #
+    # Forwarding
+    # ------------------------------------------------------------------------ #
+
+    def _forward(self, new_root):
+        orig_root = self._root
+
+        def forward(cursor: Cursor) -> Cursor:
+            if cursor._root is not orig_root:
+                raise InvalidCursorError("cannot forward from unknown root")
+
+            if isinstance(cursor, Gap):
+                return Gap(new_root, forward(cursor.anchor()), cursor.type())
+
+            if isinstance(cursor, Node):
+                path = self._forward_path(cursor._path)
+                return dataclasses.replace(cursor, _root=new_root, _path=path)
+
+            assert isinstance(cursor, Block)
+            anchor_path = cursor._anchor._path
+            if self._is_lifted(anchor_path, cursor._attr):
+                # the block was lifted along with its parent, so forward its
+                # ends into their new location
+                rng = cursor._range
+                first = forward(cursor._anchor._child_node(cursor._attr, rng.start))
+                last = forward(cursor._anchor._child_node(cursor._attr, rng.stop - 1))
+                attr, start = first._path[-1]
+                _, end = last._path[-1]
+                return Block(new_root, first.parent(), attr, range(start, end + 1))
+
+            new_anchor = dataclasses.replace(
+                cursor._anchor,
+                _root=new_root,
+                _path=self._forward_path(anchor_path),
+            )
+            rng = self._forward_range(anchor_path, cursor._attr, cursor._range)
+            return Block(new_root, new_anchor, cursor._attr, rng)
+
+        return forward
+
+    def _is_lifted(self, path, attr):
+        if not path:
+            return False
+        parent_attr, i = path[-1]
+        for rng, _, lift_attr in self._applied.get((tuple(path[:-1]), parent_attr), []):
+            if i in rng and lift_attr == attr:
+                return True
+        return False
+
+    def _forward_path(self, path):
+        # Edits are keyed by paths in the original tree, so rewrite the path
+        # from the bottom up, while its prefix is still in the old coordinates
+        path = list(path)
+        for d in reversed(range(len(path))):
+            prefix = tuple(path[:d])
+            attr, i = path[d]
+            if i is not None and attr in self._dropped.get(prefix, ()):
+                raise InvalidCursorError("node no longer exists")
+
+            edits = self._applied.get((prefix, attr))
+            if i is None or edits is None:
+                continue
+
+            shift, lifted = 0, None
+            for rng, n_new, lift_attr in edits:
+                if i >= rng.stop:
+                    shift += n_new - len(rng)
+                elif i >= rng.start:
+                    if d + 1 == len(path) or path[d + 1][0] != lift_attr:
+                        raise InvalidCursorError("node no longer exists")
+                    lifted = path[d + 1][1]
+
+            if lifted is None:
+                path[d] = (attr, i + shift)
+            else:
+                path[d : d + 2] = [(attr, i + shift + lifted)]
+
+        return path
+
+    def _forward_range(self, path, attr, rng):
+        start, stop = rng.start, rng.stop
+        for e_rng, n_new, _ in self._applied.get((tuple(path), attr), []):
+            n_diff = n_new - len(e_rng)
+            if e_rng.stop <= rng.start:
+                start, stop = start + n_diff, stop + n_diff
+            elif e_rng.start >= rng.stop:
+                pass
+            elif rng.start <= e_rng.start and e_rng.stop <= rng.stop:
+                stop += n_diff
+            else:
+                raise InvalidCursorError("block no longer exists")
+        return range(start, stop)
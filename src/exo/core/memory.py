@@ -58,6 +58,10 @@ class MemGenError(Exception):
     pass
 
 
+class RegisterPressureWarning(UserWarning):
+    pass
+
+
 def generate_offset(indices, strides):
     def index_expr(i, s):
         if s == "0" or i == "0":
@@ -117,6 +121,15 @@ class Memory(ABC):
     def can_read(cls):
         raise NotImplementedError()
 
+    @classmethod
+    def num_registers(cls):
+        """
+        The number of registers in the register file that this memory models,
+        or None if it is not a register file.  Each allocation occupies one
+        register per vector, i.e. per index into all but its last dimension.
+        """
+        return None
+
     @classmethod
     def write(cls, s, lhs, rhs):
         raise MemGenError(
@@ -174,30 +187,25 @@ class DRAM(Memory):
 
 class StaticMemory(Memory):
     """
-    A free list implementation of register allocation for static
-    memory.
-    """
-
-    is_chunk_allocated = []
+    A memory made of a fixed number of chunks, e.g. tile registers.
 
-    @classmethod
-    def init_state(cls, size):
-        cls.is_chunk_allocated = [False] * size
+    When a proc is compiled, every allocation in a static memory is assigned
+    one of its `num_chunks()` chunks, such that allocations which are live
+    at the same time never share a chunk (see `allocate_static_memory`).
+    The assigned chunk is passed to `alloc` and `free`.
+    """
 
     @classmethod
-    def find_free_chunk(cls):
-        try:
-            idx = cls.is_chunk_allocated.index(False)
-        except ValueError as e:
-            raise MemGenError(
-                f"Cannot allocate more than {len(cls.is_chunk_allocated)} chunks at a time."
-            ) from e
-        return idx
+    @abstractmethod
+    def num_chunks(cls):
+        raise NotImplementedError()
 
     @classmethod
-    def mark(cls, idx):
-        cls.is_chunk_allocated[idx] = True
+    @abstractmethod
+    def alloc(cls, new_name, prim_type, shape, srcinfo, chunk):
+        raise NotImplementedError()
 
     @classmethod
-    def unmark(cls, idx):
-        cls.is_chunk_allocated[idx] = False
+    @abstractmethod
+    def free(cls, new_name, prim_type, shape, srcinfo, chunk):
+        raise NotImplementedError()
@@ -1,5 +1,7 @@
+from collections.abc import MutableMapping
 from inspect import currentframe as _curr_frame, getframeinfo as _get_frame_info
 from re import compile as _re_compile
+from weakref import WeakValueDictionary
 
 
 def is_pos_int(obj):
@@ -19,6 +21,9 @@ def is_valid_name(obj):
 
 
 class Sym:
+    # Symbols compare and hash by identity
+    __slots__ = ("_nm", "_id", "__weakref__")
+
     _unq_count = 1
 
     def __init__(self, nm):
@@ -34,21 +39,10 @@ class Sym:
     def __repr__(self):
         return f"{self._nm}_{self._id}"
 
-    def __hash__(self):
-        return id(self)
-
     def __lt__(self, rhs):
         assert isinstance(rhs, Sym)
         return (self._nm, self._id) < (rhs._nm, rhs._id)
 
-    def __eq__(self, rhs):
-        if not isinstance(rhs, Sym):
-            return False
-        return self._nm == rhs._nm and self._id == rhs._id
-
-    def __ne__(self, rhs):
-        return not (self == rhs)
-
     def name(self):
         return self._nm
 
@@ -56,14 +50,90 @@ class Sym:
         return Sym(self._nm)
 
 
+_MISSING = object()
+
+
+class SymTable(MutableMapping):
+    """
+    A scoped symbol table. It behaves like a `ChainMap` that is extended
+    with `push()` and shrunk with `pop()`, but all bindings live in a single
+    flat dictionary, and `pop()` undoes the writes made since the matching
+    `push()`. Lookups therefore cost the same at any scope depth.
+    """
+
+    __slots__ = ("_vals", "_undo", "_marks")
+
+    def __init__(self):
+        self._vals = dict()
+        self._undo = []
+        self._marks = []
+
+    def push(self):
+        self._marks.append(len(self._undo))
+
+    def pop(self):
+        vals, undo = self._vals, self._undo
+        for _ in range(len(undo) - self._marks.pop()):
+            key, old = undo.pop()
+            if old is _MISSING:
+                del vals[key]
+            else:
+                vals[key] = old
+
+    def __getitem__(self, key):
+        return self._vals[key]
+
+    def get(self, key, default=None):
+        return self._vals.get(key, default)
+
+    def __contains__(self, key):
+        return key in self._vals
+
+    def __setitem__(self, key, val):
+        if self._marks:
+            self._undo.append((key, self._vals.get(key, _MISSING)))
+        self._vals[key] = val
+
+    def __delitem__(self, key):
+        old = self._vals.pop(key)
+        if self._marks:
+            self._undo.append((key, old))
+
+    def __iter__(self):
+        return iter(self._vals)
+
+    def __len__(self):
+        return len(self._vals)
+
+    def items(self):
+        return self._vals.items()
+
+    def __repr__(self):
+        return f"SymTable({self._vals!r})"
+
+
 # from a github gist by victorlei
 def extclass(cls):
     return lambda f: (setattr(cls, f.__name__, f) or f)
 
 
 class SrcInfo:
-    def __init__(
-        self,
+    __slots__ = (
+        "filename",
+        "lineno",
+        "col_offset",
+        "end_lineno",
+        "end_col_offset",
+        "function",
+        "__weakref__",
+    )
+
+    # SrcInfo objects are immutable, so we intern them: every node built from
+    # the same source location shares one object
+    _interned = WeakValueDictionary()
+
+    def __new__(
+        cls,
         filename,
         lineno,
         col_offset=None,
@@ -71,12 +141,29 @@ class SrcInfo:
         end_col_offset=None,
         function=None,
     ):
-        self.filename = filename
-        self.lineno = lineno
-        self.col_offset = col_offset
-        self.end_lineno = end_lineno
-        self.end_col_offset = end_col_offset
-        self.function = function
+        key = (filename, lineno, col_offset, end_lineno, end_col_offset, function)
+        if (info := cls._interned.get(key)) is not None:
+            return info
+
+        info = super().__new__(cls)
+        info.filename = filename
+        info.lineno = lineno
+        info.col_offset = col_offset
+        info.end_lineno = end_lineno
+        info.end_col_offset = end_col_offset
+        info.function = function
+        cls._interned[key] = info
+        return info
+
+    def __getnewargs__(self):
+        return (
+            self.filename,
+            self.lineno,
+            self.col_offset,
+            self.end_lineno,
+            self.end_col_offset,
+            self.function,
+        )
 
     def __str__(self):
         colstr = "" if self.col_offset is None else f":{self.col_offset}"
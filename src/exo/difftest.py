@@ -0,0 +1,305 @@
+"""
+Randomized differential testing of procedures.
+
+    from exo.difftest import check_equivalent
+
+    mismatch = check_equivalent(sgemm, sgemm_scheduled, n_trials=200)
+    assert mismatch is None, mismatch
+
+Scheduling operations are checked to preserve the meaning of a procedure,
+but unsafe operations (such as `unsafe_assert_eq`) and hand-written
+instruction semantics are not.  `check_equivalent` runs two procedures with
+the same signature on random inputs satisfying their assertions, and
+reports the first input on which the buffers they modify differ.
+
+The procedures are either run by the NumPy interpreter (see
+`exo.interpret`), or compiled with the system C compiler (see
+`exo.bench`).  Trials are distributed over a pool of worker processes.
+This module requires NumPy.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from .API import Procedure
+from .backend.LoopIR_interpreter import Interpreter, run_interpreter, _dtypes
+from .core.LoopIR import LoopIR, T
+
+
+class DiffTestError(Exception):
+    pass
+
+
+@dataclass
+class Mismatch:
+    """
+    An input on which two procedures disagree: `inputs` are the arguments
+    passed to both of them, and `outputs` maps the name of every buffer
+    that differs afterwards to the values computed by each procedure.
+    """
+
+    trial: int
+    inputs: Dict[str, object]
+    outputs: Dict[str, tuple]
+
+    def __str__(self):
+        ctrl = ", ".join(
+            f"{nm} = {v}" for nm, v in self.inputs.items() if not _is_array(v)
+        )
+        lines = [f"trial {self.trial}: procedures differ for {ctrl or 'input'}"]
+        for nm, (a, b) in self.outputs.items():
+            if np.shape(a) == ():
+                lines.append(f"  '{nm}': {a} vs. {b}")
+                continue
+            diff = np.argwhere(~_close_mask(a, b, 0, 0))
+            first = tuple(int(i) for i in diff[0])
+            lines.append(
+                f"  '{nm}' differs at {len(diff)} of {a.size} elements, "
+                f"e.g. at {first}: {a[first]} vs. {b[first]}"
+            )
+        return "\n".join(lines)
+
+
+def _is_array(v):
+    return isinstance(v, np.ndarray)
+
+
+def _close_mask(a, b, rtol, atol):
+    if np.issubdtype(a.dtype, np.floating):
+        return np.isclose(a, b, rtol=rtol, atol=atol, equal_nan=True)
+    return a == b
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Random inputs
+
+
+def _eval_ctrl(e, env):
+    # evaluate a control expression (e.g. a shape) over integer arguments
+    if isinstance(e, LoopIR.Const):
+        return e.val
+    elif isinstance(e, LoopIR.Read):
+        return env[e.name]
+    elif isinstance(e, LoopIR.USub):
+        return -_eval_ctrl(e.arg, env)
+    elif isinstance(e, LoopIR.BinOp):
+        lhs, rhs = _eval_ctrl(e.lhs, env), _eval_ctrl(e.rhs, env)
+        return {
+            "+": lambda: lhs + rhs,
+            "-": lambda: lhs - rhs,
+            "*": lambda: lhs * rhs,
+            "/": lambda: lhs // rhs,
+            "%": lambda: lhs % rhs,
+        }[e.op]()
+    else:
+        raise DiffTestError(f"cannot evaluate shape {e}")
+
+
+def _pred_constants(proc):
+    consts = set()
+
+    def visit(e):
+        if isinstance(e, LoopIR.Const) and type(e.val) is int and e.val > 0:
+            consts.add(e.val)
+        elif isinstance(e, LoopIR.BinOp):
+            visit(e.lhs)
+            visit(e.rhs)
+        elif isinstance(e, LoopIR.USub):
+            visit(e.arg)
+
+    for p in proc.preds:
+        visit(p)
+    return sorted(consts)
+
+
+def _random_array(rng, shape, dtype):
+    dtype = np.dtype(dtype)
+    if dtype.kind == "f":
+        return rng.uniform(-1, 1, size=shape).astype(dtype)
+    lo = -8 if dtype.kind == "i" else 0
+    return rng.integers(lo, 8, size=shape).astype(dtype)
+
+
+def random_inputs(proc, rng, *, max_size=32, sizes=None, max_tries=1000):
+    """
+    Returns random arguments for `proc` (by name) which satisfy its
+    assertions.  `proc` may also be a list of procedures with the same
+    signature, in which case the arguments satisfy the assertions of all
+    of them.  Control arguments are taken from `sizes` if given there,
+    and otherwise drawn at random up to `max_size`, preferring multiples of
+    the constants occuring in the assertions.  Numeric arguments are random
+    C-contiguous arrays.
+    """
+    procs = proc if isinstance(proc, (list, tuple)) else [proc]
+    procs = [p._loopir_proc if isinstance(p, Procedure) else p for p in procs]
+    proc = procs[0]
+    sizes = sizes or {}
+    consts = sorted(set().union(*map(_pred_constants, procs)))
+
+    def random_int(lo):
+        if consts and rng.random() < 0.5:
+            c = int(rng.choice(consts))
+            return c * int(rng.integers(1, max(2, max_size // c + 1)))
+        return int(rng.integers(lo, max_size + 1))
+
+    for _ in range(max_tries):
+        env = dict()
+        inputs = dict()
+        for a in proc.args:
+            nm = str(a.name)
+            if nm in sizes:
+                val = sizes[nm]
+            elif a.type == T.size:
+                val = random_int(1)
+            elif a.type in (T.index, T.int, T.stride):
+                val = random_int(0)
+            elif a.type == T.bool:
+                val = bool(rng.integers(0, 2))
+            else:
+                shape = tuple(_eval_ctrl(hi, env) for hi in a.type.shape())
+                if any(n <= 0 for n in shape):
+                    break
+                val = _random_array(rng, shape, _dtypes[a.type.basetype()])
+            env[a.name] = val
+            inputs[nm] = val
+        else:
+            if all(Interpreter(p, inputs).failing_pred() is None for p in procs):
+                return inputs
+
+    raise DiffTestError(
+        f"{', '.join(p.name for p in procs)}: could not generate arguments satisfying its assertions "
+        f"in {max_tries} tries"
+    )
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Running trials
+
+# The procedures and options of the test a worker process runs trials of,
+# set by the pool initializer (in forked workers, so that they need not be
+# pickled)
+_worker_state = None
+
+
+def _init_worker(state):
+    global _worker_state
+    _worker_state = state
+
+
+def _worker_trial(trial):
+    return _trial(_worker_state, trial)
+
+
+def _run(state, which, inputs):
+    proc = state["procs"][which]
+    if state["libs"] is None:
+        run_interpreter(proc._loopir_proc, inputs)
+    else:
+        getattr(state["libs"][which], proc.name())(**inputs)
+
+
+def _trial(opts, trial):
+    rng = np.random.default_rng([opts["seed"], trial])
+    inputs = random_inputs(
+        opts["procs"], rng, max_size=opts["max_size"], sizes=opts["sizes"]
+    )
+
+    outputs = []
+    for which in (0, 1):
+        args = {nm: v.copy() if _is_array(v) else v for nm, v in inputs.items()}
+        _run(opts, which, args)
+        outputs.append(args)
+
+    diffs = dict()
+    for nm, v in inputs.items():
+        if _is_array(v):
+            a, b = outputs[0][nm], outputs[1][nm]
+            if not _close_mask(a, b, opts["rtol"], opts["atol"]).all():
+                diffs[nm] = (a, b)
+
+    return Mismatch(trial, inputs, diffs) if diffs else None
+
+
+def check_equivalent(
+    proc1: Procedure,
+    proc2: Procedure,
+    *,
+    n_trials: int = 100,
+    max_size: int = 32,
+    sizes: Optional[Dict[str, int]] = None,
+    backend: str = "interpret",
+    n_workers: Optional[int] = None,
+    seed: int = 0,
+    rtol: float = 1e-4,
+    atol: float = 1e-5,
+    workdir: Optional[Path] = None,
+    **kwargs,
+) -> Optional[Mismatch]:
+    """
+    Runs `proc1` and `proc2` on `n_trials` random inputs satisfying the
+    assertions of both (see `random_inputs`), and returns the first
+    `Mismatch` found, or None.  Floating-point buffers are compared with
+    the tolerances `rtol` and `atol`, and all other buffers exactly.
+
+    `backend` is either "interpret", to run the procedures with the NumPy
+    interpreter, or "compile", to compile them to shared libraries in
+    `workdir` (with the remaining keyword arguments passed on to
+    `exo.bench.compile_library`).  Trials run in `n_workers` processes
+    (by default, one per CPU).
+    """
+    # compared as strings, since independently defined procedures have
+    # distinct symbols in their shapes
+    sig1 = [(str(a.name), str(a.type)) for a in proc1._loopir_proc.args]
+    sig2 = [(str(a.name), str(a.type)) for a in proc2._loopir_proc.args]
+    if sig1 != sig2:
+        raise DiffTestError(
+            f"{proc1.name()} and {proc2.name()} have different signatures"
+        )
+
+    libs = None
+    if backend == "compile":
+        from .bench import compile_library
+
+        workdir = Path(workdir or tempfile.mkdtemp(prefix="exo_difftest_"))
+        libs = [
+            compile_library(p, workdir / f"proc{i}", **kwargs)
+            for i, p in enumerate((proc1, proc2))
+        ]
+    elif backend != "interpret":
+        raise ValueError(f"unknown backend '{backend}'")
+
+    state = dict(
+        procs=(proc1, proc2),
+        libs=libs,
+        seed=seed,
+        max_size=max_size,
+        sizes=sizes,
+        rtol=rtol,
+        atol=atol,
+    )
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1 or "fork" not in multiprocessing.get_all_start_methods():
+        results = (_trial(state, trial) for trial in range(n_trials))
+        return next((m for m in results if m is not None), None)
+
+    ctx = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(
+        n_workers, mp_context=ctx, initializer=_init_worker, initargs=(state,)
+    ) as pool:
+        results = pool.map(_worker_trial, range(n_trials), chunksize=4)
+        for m in results:
+            if m is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+                return m
+    return None
@@ -1,9 +1,11 @@
-from collections import ChainMap
-from asdl_adt import ADT, validators
+import time
+from asdl_adt import validators
 
-import pysmt
-from pysmt import shortcuts as SMT
+import z3 as z3lib
 
+Z3 = z3lib.z3
+
+from ..core.adt import ADT
 from ..core.LoopIR import LoopIR, T, Operator, Config
 from ..core.prelude import *
 
@@ -473,14 +475,6 @@ def eff_bind(bind_name, e, pred=None, config_pred=None):
     )
 
 
-def _get_smt_solver():
-    factory = pysmt.factory.Factory(pysmt.shortcuts.get_env())
-    slvs = factory.all_solvers()
-    if len(slvs) == 0:
-        raise OSError("Could not find any SMT solvers")
-    return pysmt.shortcuts.Solver(name=next(iter(slvs)))
-
-
 # --------------------------------------------------------------------------- #
 # --------------------------------------------------------------------------- #
 # Helper Functions
@@ -529,38 +523,50 @@ def loopir_subst(e, subst):
 
 
 class CheckBounds:
+    """
+    Checks that every buffer access and allocation in `proc` is in bounds,
+    and that sizes and call arguments satisfy their callee's signatures.
+
+    All obligations are discharged incrementally by a single z3 solver,
+    whose assertion stack follows the loops and branches of `proc`.  The
+    time spent checking is recorded in `elapsed` (in seconds) together with
+    the number of solver queries in `n_queries`, for callers to report.
+    """
+
     def __init__(self, proc):
         self.orig_proc = proc
 
         # Map sym to z3 variable
-        self.env = ChainMap()
-        self.config_env = ChainMap()
+        self.env = SymTable()
+        self.config_env = SymTable()
         self.errors = []
 
         self.stride_sym = dict()
 
-        self.solver = _get_smt_solver()
+        self.solver = z3lib.Solver()
+        self.n_queries = 0
+        start = time.perf_counter()
 
         self.push()
 
         # Add assertions
         for arg in proc.args:
             if isinstance(arg.type, T.Size):
-                pos_sz = SMT.LT(SMT.Int(0), self.sym_to_smt(arg.name))
-                self.solver.add_assertion(pos_sz)
+                pos_sz = Z3.IntVal(0) < self.sym_to_smt(arg.name)
+                self.solver.add(pos_sz)
             elif arg.type.is_tensor_or_window() and not arg.type.is_win():
                 self.assume_tensor_strides(arg, arg.name, arg.type.shape())
 
         for p in proc.preds:
             # Check whether the assert is even potentially correct
             smt_p = self.expr_to_smt(lift_expr(p))
-            if not self.solver.is_sat(smt_p):
+            if self.check(smt_p) == Z3.unsat:
                 self.err(
                     p, f"The assertion {p} at {p.srcinfo} is always unsatisfiable."
                 )
             # independently, we will assume the assertion is
             # true while checking the rest of this procedure body
-            self.solver.add_assertion(smt_p)
+            self.solver.add(smt_p)
 
         self.preprocess_stmts(proc.body)
 
@@ -577,6 +583,8 @@ class CheckBounds:
 
         self.pop()
 
+        self.elapsed = time.perf_counter() - start
+
         # do error checking here
         if len(self.errors) > 0:
             raise TypeError(
@@ -610,25 +618,42 @@ class CheckBounds:
         else:
             pass
 
+    def check(self, *assumptions):
+        self.n_queries += 1
+        result = self.solver.check(*assumptions)
+        if result == Z3.unknown:
+            raise TypeError(f"unknown result from z3: {self.solver.reason_unknown()}")
+        return result
+
+    def is_valid(self, smt_e):
+        """
+        Checks that `smt_e` holds under the current assertions.  If it does
+        not, returns a counter-example string; otherwise returns None.
+        """
+        self.solver.push()
+        self.solver.add(Z3.Not(smt_e))
+        eg = self.counter_example() if self.check() == Z3.sat else None
+        self.solver.pop()
+        return eg
+
     def counter_example(self):
-        smt_syms = [smt for sym, smt in self.env.items() if smt.get_type() == SMT.INT]
-        val_map = self.solver.get_py_values(smt_syms)
+        model = self.solver.model()
 
         mapping = []
         for sym, smt in self.env.items():
-            if smt.get_type() == SMT.INT:
-                mapping.append(f" {sym} = {val_map[smt]}")
+            if Z3.is_int(smt):
+                mapping.append(f" {sym} = {model.eval(smt, model_completion=True)}")
 
         return ",".join(mapping)
 
     def push(self):
         self.solver.push()
-        self.env = self.env.new_child()
-        self.config_env = self.config_env.new_child()
+        self.env.push()
+        self.config_env.push()
 
     def pop(self):
-        self.env = self.env.parents
-        self.config_env = self.config_env.parents
+        self.env.pop()
+        self.config_env.pop()
         self.solver.pop()
 
     def err(self, node, msg):
@@ -639,20 +664,20 @@ class CheckBounds:
     def sym_to_smt(self, sym, typ=T.index):
         if sym not in self.env:
             if typ.is_indexable() or typ.is_stridable():
-                self.env[sym] = SMT.Symbol(repr(sym), SMT.INT)
+                self.env[sym] = Z3.Int(repr(sym))
             elif typ is T.bool:
-                self.env[sym] = SMT.Symbol(repr(sym), SMT.BOOL)
+                self.env[sym] = Z3.Bool(repr(sym))
         return self.env[sym]
 
     def config_to_smt(self, config, field, typ):
         c = (config, field)
         if c not in self.config_env:
             if typ.is_indexable() or typ.is_stridable():
-                self.config_env[c] = SMT.Symbol(f"{config.name()}_{field}", SMT.INT)
+                self.config_env[c] = Z3.Int(f"{config.name()}_{field}")
             elif typ is T.bool:
-                self.config_env[c] = SMT.Symbol(f"{config.name()}_{field}", SMT.BOOL)
+                self.config_env[c] = Z3.Bool(f"{config.name()}_{field}")
             elif typ.is_scalar():
-                self.config_env[c] = SMT.Symbol(f"{config.name()}_{field}", SMT.REAL)
+                self.config_env[c] = Z3.Real(f"{config.name()}_{field}")
             else:
                 assert False, "bad case!"
         return self.config_env[c]
@@ -661,16 +686,16 @@ class CheckBounds:
         assert isinstance(expr, E.expr), "expected Effects.expr"
         if isinstance(expr, E.Const):
             if expr.type == T.bool:
-                return SMT.Bool(expr.val)
+                return Z3.BoolVal(expr.val)
             elif expr.type.is_indexable():
-                return SMT.Int(expr.val)
+                return Z3.IntVal(expr.val)
             else:
                 assert False, f"unrecognized const type: {type(expr.val)}"
         elif isinstance(expr, E.Var):
             return self.sym_to_smt(expr.name, expr.type)
         elif isinstance(expr, E.Not):
             arg = self.expr_to_smt(expr.arg)
-            return SMT.Not(arg)
+            return Z3.Not(arg)
         elif isinstance(expr, E.Stride):
             key = (expr.name, expr.dim)
             if key in self.stride_sym:
@@ -683,18 +708,18 @@ class CheckBounds:
             cond = self.expr_to_smt(expr.cond)
             tcase = self.expr_to_smt(expr.tcase)
             fcase = self.expr_to_smt(expr.fcase)
-            return SMT.Ite(cond, tcase, fcase)
+            return Z3.If(cond, tcase, fcase)
         elif isinstance(expr, E.ConfigField):
             return self.config_to_smt(expr.config, expr.field, expr.type)
         elif isinstance(expr, E.BinOp):
             lhs = self.expr_to_smt(expr.lhs)
             rhs = self.expr_to_smt(expr.rhs)
             if expr.op == "+":
-                return SMT.Plus(lhs, rhs)
+                return lhs + rhs
             elif expr.op == "-":
-                return SMT.Minus(lhs, rhs)
+                return lhs - rhs
             elif expr.op == "*":
-                return SMT.Times(lhs, rhs)
+                return lhs * rhs
             elif expr.op == "/":
                 assert isinstance(expr.rhs, E.Const)
                 assert expr.rhs.val > 0
@@ -754,9 +779,9 @@ class CheckBounds:
                 # Introduce new Sym (z in formula below)
                 div_tmp = self.sym_to_smt(Sym("div_tmp"))
                 # rhs*z <= lhs < rhs*(z+1)
-                rhs_eq = SMT.LE(SMT.Times(rhs, div_tmp), lhs)
-                lhs_eq = SMT.LT(lhs, SMT.Times(rhs, SMT.Plus(div_tmp, SMT.Int(1))))
-                self.solver.add_assertion(SMT.And(rhs_eq, lhs_eq))
+                rhs_eq = rhs * div_tmp <= lhs
+                lhs_eq = lhs < rhs * (div_tmp + 1)
+                self.solver.add(Z3.And(rhs_eq, lhs_eq))
                 return div_tmp
             elif expr.op == "%":
                 assert isinstance(expr.rhs, E.Const)
@@ -767,32 +792,32 @@ class CheckBounds:
                 # Then,
                 #   lhs % rhs = lhs - rhs * mod_tmp
                 mod_tmp = self.sym_to_smt(Sym("mod_tmp"))
-                rhs_eq = SMT.LE(SMT.Times(rhs, mod_tmp), lhs)
-                lhs_eq = SMT.LT(lhs, SMT.Times(rhs, SMT.Plus(mod_tmp, SMT.Int(1))))
-                self.solver.add_assertion(SMT.And(rhs_eq, lhs_eq))
-                return SMT.Minus(lhs, SMT.Times(rhs, mod_tmp))
+                rhs_eq = rhs * mod_tmp <= lhs
+                lhs_eq = lhs < rhs * (mod_tmp + 1)
+                self.solver.add(Z3.And(rhs_eq, lhs_eq))
+                return lhs - rhs * mod_tmp
 
             elif expr.op == "<":
-                return SMT.LT(lhs, rhs)
+                return lhs < rhs
             elif expr.op == ">":
-                return SMT.GT(lhs, rhs)
+                return lhs > rhs
             elif expr.op == "<=":
-                return SMT.LE(lhs, rhs)
+                return lhs <= rhs
             elif expr.op == ">=":
-                return SMT.GE(lhs, rhs)
+                return lhs >= rhs
             elif expr.op == "==":
                 if expr.lhs.type == T.bool and expr.rhs.type == T.bool:
-                    return SMT.Iff(lhs, rhs)
+                    return lhs == rhs
                 elif expr.lhs.type.is_indexable() and expr.rhs.type.is_indexable():
-                    return SMT.Equals(lhs, rhs)
+                    return lhs == rhs
                 elif expr.lhs.type.is_stridable() and expr.rhs.type.is_stridable():
-                    return SMT.Equals(lhs, rhs)
+                    return lhs == rhs
                 else:
                     assert False, "bad case"
             elif expr.op == "and":
-                return SMT.And(lhs, rhs)
+                return Z3.And(lhs, rhs)
             elif expr.op == "or":
-                return SMT.Or(lhs, rhs)
+                return Z3.Or(lhs, rhs)
         else:
             assert False, f"bad case: {type(expr)}"
 
@@ -813,45 +838,66 @@ class CheckBounds:
                 s_expr = LoopIR.StrideExpr(name, dim, T.stride, node.srcinfo)
                 s_const = LoopIR.Const(s, T.int, node.srcinfo)
                 eq = LoopIR.BinOp("==", s_expr, s_const, T.bool, node.srcinfo)
-                self.solver.add_assertion(self.expr_to_smt(lift_expr(eq)))
-
-    def check_in_bounds(self, sym, shape, eff, eff_str):
-        assert isinstance(eff, E.effset), "effset should be passed to in_bounds"
-
-        if sym == eff.buffer:
-            #       IN_BOUNDS( x, T, (x, (i,j), nms, pred ) ) =
-            #           forall nms in Z, pred ==> in_bounds(T, (i,j))
-
-            self.push()
-            if eff.pred is not None:
-                self.solver.add_assertion(self.expr_to_smt(eff.pred))
-            in_bds = SMT.Bool(True)
-
-            assert len(eff.loc) == len(shape)
-            for e, hi in zip(eff.loc, shape):
-                # 1 <= loc[i] < shape[i]
-                e = self.expr_to_smt(e)
-                lhs = SMT.LE(SMT.Int(0), e)
-                rhs = SMT.LT(e, self.expr_to_smt(hi))
-                in_bds = SMT.And(in_bds, SMT.And(lhs, rhs))
-
-            if not self.solver.is_valid(in_bds):
-                eg = self.counter_example()
-                self.err(eff, f"{sym} is {eff_str} out-of-bounds when:\n  {eg}.")
-
-            self.pop()
+                self.solver.add(self.expr_to_smt(lift_expr(eq)))
 
     def check_bounds(self, sym, shape, eff):
+        #       IN_BOUNDS( x, T, (x, (i,j), nms, pred ) ) =
+        #           forall nms in Z, pred ==> in_bounds(T, (i,j))
+        #
+        # Rather than asking one query per access and dimension, we guard
+        # every possible violation `pred /\ ~(0 <= loc[d] < shape[d])` of
+        # the accesses to `sym` by a fresh literal, and ask the solver for
+        # any violation at once.  In the common case that is unsat, and all
+        # accesses are proven in bounds by a single query.  Otherwise, the
+        # literals that are true in the model identify the failing accesses
+        # and dimensions, which are then excluded via assumptions until
+        # no violation remains.
         effs = [(eff.reads, "read"), (eff.writes, "written"), (eff.reduces, "reduced")]
 
-        for es, y in effs:
-            for e in es:
-                self.check_in_bounds(sym, shape, e, y)
+        self.push()
+        hi = [self.expr_to_smt(s) for s in shape]
+        accesses = [(e, y) for es, y in effs for e in es if e.buffer == sym]
+        obligations = []
+        for acc, (e, _) in enumerate(accesses):
+            assert len(e.loc) == len(shape)
+            pred = Z3.BoolVal(True)
+            if e.pred is not None:
+                pred = self.expr_to_smt(e.pred)
+            for dim, loc in enumerate(e.loc):
+                loc = self.expr_to_smt(loc)
+                out_of_bds = Z3.Or(loc < 0, loc >= hi[dim])
+                lit = Z3.Bool(f"oob_{len(obligations)}")
+                self.solver.add(Z3.Implies(lit, Z3.And(pred, out_of_bds)))
+                obligations.append((lit, acc, dim))
+
+        # maps the index of each failing access to its dimension and
+        # a counter-example
+        failed = dict()
+        if len(obligations) > 0:
+            self.solver.add(Z3.Or([lit for lit, *_ in obligations]))
+            blocked = []
+            while len(blocked) < len(obligations) and self.check(*blocked) == Z3.sat:
+                model = self.solver.model()
+                eg = self.counter_example()
+                for lit, acc, dim in obligations:
+                    if acc not in failed and Z3.is_true(model.eval(lit)):
+                        failed[acc] = (dim, eg)
+                # report each access only once
+                blocked = [Z3.Not(lit) for lit, acc, _ in obligations if acc in failed]
+        self.pop()
+
+        for acc in sorted(failed):
+            e, eff_str = accesses[acc]
+            dim, eg = failed[acc]
+            self.err(
+                e,
+                f"{sym} is {eff_str} out-of-bounds (in dimension {dim}) "
+                f"when:\n  {eg}.",
+            )
 
     def check_pos_size(self, expr):
-        e_pos = SMT.LT(SMT.Int(0), self.expr_to_smt(expr))
-        if not self.solver.is_valid(e_pos):
-            eg = self.counter_example()
+        e_pos = Z3.IntVal(0) < self.expr_to_smt(expr)
+        if (eg := self.is_valid(e_pos)) is not None:
             self.err(
                 expr,
                 f"expected expression {expr} to always be positive. "
@@ -859,9 +905,8 @@ class CheckBounds:
             )
 
     def check_non_negative(self, expr):
-        e_nn = SMT.LE(SMT.Int(0), self.expr_to_smt(expr))
-        if not self.solver.is_valid(e_nn):
-            eg = self.counter_example()
+        e_nn = Z3.IntVal(0) <= self.expr_to_smt(expr)
+        if (eg := self.is_valid(e_nn)) is not None:
             self.err(
                 expr,
                 f"expected expression {expr} to always be non-negative. "
@@ -870,12 +915,10 @@ class CheckBounds:
 
     def check_call_shape_eqv(self, argshp, sigshp, node):
         assert len(argshp) == len(sigshp)
-        eqv_dim = SMT.Bool(True)
-        for a, s in zip(argshp, sigshp):
-            eq_here = SMT.Equals(self.expr_to_smt(a), self.expr_to_smt(s))
-            eqv_dim = SMT.And(eqv_dim, eq_here)
-        if not self.solver.is_valid(eqv_dim):
-            eg = self.counter_example()
+        eqv_dim = Z3.And(
+            [self.expr_to_smt(a) == self.expr_to_smt(s) for a, s in zip(argshp, sigshp)]
+        )
+        if (eg := self.is_valid(eqv_dim)) is not None:
             self.err(
                 node,
                 "type-shape of calling argument may not equal "
@@ -908,7 +951,7 @@ class CheckBounds:
                     src = LoopIR.StrideExpr(src_buf, src_dim, T.stride, stmt.srcinfo)
                     dst = LoopIR.StrideExpr(dst_buf, dst_dim, T.stride, stmt.srcinfo)
                     eq = LoopIR.BinOp("==", src, dst, T.bool, stmt.srcinfo)
-                    self.solver.add_assertion(self.expr_to_smt(lift_expr(eq)))
+                    self.solver.add(self.expr_to_smt(lift_expr(eq)))
             else:
                 pass
 
@@ -964,7 +1007,7 @@ class CheckBounds:
                 self.check_non_negative(lift_expr(iters))
 
                 pred, config_pred = bd_pred(stmt.iter, stmt.lo, stmt.hi, stmt.srcinfo)
-                self.solver.add_assertion(self.expr_to_smt(pred))
+                self.solver.add(self.expr_to_smt(pred))
 
                 child_eff = self.map_stmts(stmt.body, type_env)
 
@@ -980,7 +1023,7 @@ class CheckBounds:
                 # first, do the if-branch
                 self.push()
                 cond = lift_expr(stmt.cond)
-                self.solver.add_assertion(self.expr_to_smt(cond))
+                self.solver.add(self.expr_to_smt(cond))
                 body_effects = self.map_stmts(stmt.body, type_env)
                 self.pop()
 
@@ -992,7 +1035,7 @@ class CheckBounds:
                 if len(stmt.orelse) > 0:
                     self.push()
                     neg_cond = cond.negate()
-                    self.solver.add_assertion(self.expr_to_smt(neg_cond))
+                    self.solver.add(self.expr_to_smt(neg_cond))
                     orelse_effects = self.map_stmts(stmt.orelse, type_env)
                     orelse_effects = eff_filter(cond.negate(), orelse_effects)
                     self.pop()
@@ -1019,8 +1062,8 @@ class CheckBounds:
                 for sig, arg in zip(stmt.f.args, stmt.args):
                     # Add type assertion from the size signature
                     if isinstance(sig.type, T.Size):
-                        pos_sz = SMT.LT(SMT.Int(0), self.sym_to_smt(sig.name))
-                        self.solver.add_assertion(pos_sz)
+                        pos_sz = Z3.IntVal(0) < self.sym_to_smt(sig.name)
+                        self.solver.add(pos_sz)
 
                         # check the caller argument always be positive for sizes
                         e_arg = lift_expr(arg)
@@ -1067,8 +1110,7 @@ class CheckBounds:
                 for p in stmt.f.preds:
                     p_subst = loopir_subst(p, subst)
                     smt_pred = self.expr_to_smt(lift_expr(p_subst))
-                    if not self.solver.is_valid(smt_pred):
-                        eg = self.counter_example()
+                    if (eg := self.is_valid(smt_pred)) is not None:
                         self.err(
                             stmt,
                             f"Could not verify assertion {p} in "
@@ -0,0 +1,145 @@
+"""
+An on-disk cache of the checked LoopIR of `@instr` procedures.
+
+Instruction libraries define many instructions at import time, and each
+one is parsed, type checked and bounds checked.  Since an instruction's
+LoopIR only depends on its source, the C code strings and the global names
+the source refers to, it is cached under a hash of those (and of Exo
+itself), so that re-importing an unchanged library only unpickles it.
+
+The cache lives in `$EXO_CACHE_DIR`, or `$XDG_CACHE_HOME/exo` (by default
+`~/.cache/exo`), and can be disabled by setting `EXO_CACHE_DIR` to an
+empty string.
+"""
+
+import functools
+import hashlib
+import inspect
+import io
+import os
+import pickle
+import re
+import types
+from pathlib import Path
+
+from ..core.LoopIR import LoopIR
+from ..core.prelude import Sym
+
+_CACHE_FORMAT = 1
+
+
+def cache_dir():
+    if (path := os.getenv("EXO_CACHE_DIR")) is not None:
+        return Path(path) if path else None
+    xdg = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(xdg) / "exo"
+
+
+@functools.cache
+def _exo_fingerprint():
+    import exo
+
+    h = hashlib.sha256(f"{exo.__version__}:{_CACHE_FORMAT}".encode())
+    root = Path(__file__).parent.parent
+    for sub in ("core", "frontend", "rewrite"):
+        for path in sorted((root / sub).glob("*.py")):
+            h.update(path.name.encode())
+            h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def _global_fingerprint(val):
+    # returns None if `val` cannot be identified across runs by its name
+    if isinstance(val, (bool, int, float, str, type(None))):
+        return repr(val)
+    elif isinstance(val, types.ModuleType):
+        return val.__name__
+    elif isinstance(val, (type, types.FunctionType)):
+        return f"{val.__module__}.{val.__qualname__}"
+    return None
+
+
+def cache_key(f, c_instr, c_global):
+    """
+    The cache key of the instruction defined by `f`, or None if it cannot
+    be cached, e.g. because it closes over local variables or refers to a
+    global object (such as a config or an extern) that is not identified by
+    its name.
+    """
+    if cache_dir() is None or f.__code__.co_freevars or "<locals>" in f.__qualname__:
+        return None
+
+    try:
+        src = inspect.getsource(f)
+        _, lineno = inspect.getsourcelines(f)
+        filename = inspect.getsourcefile(f)
+    except (OSError, TypeError):
+        return None
+
+    h = hashlib.sha256()
+    for part in (_exo_fingerprint(), filename, str(lineno), src, c_instr, c_global):
+        h.update(part.encode())
+        h.update(b"\0")
+
+    for nm in sorted(set(re.findall(r"[A-Za-z_]\w*", src))):
+        if nm in f.__globals__:
+            if (fp := _global_fingerprint(f.__globals__[nm])) is None:
+                return None
+            h.update(f"{nm}={fp}\0".encode())
+
+    return h.hexdigest()
+
+
+def _make_node(ctor, args):
+    return getattr(LoopIR, ctor)(*args)
+
+
+class _Pickler(pickle.Pickler):
+    def reducer_override(self, obj):
+        if isinstance(obj, Sym):
+            # symbols are freshly numbered when loaded, so that they can't
+            # collide with the symbols of the current process
+            return Sym, (obj.name(),)
+        elif type(obj).__qualname__.startswith("LoopIR."):
+            ctor = type(obj).__qualname__[len("LoopIR.") :]
+            args = tuple(getattr(obj, f) for f in type(obj).__match_args__)
+            return _make_node, (ctor, args)
+        return NotImplemented
+
+
+def _path(key):
+    return cache_dir() / "instr" / key[:2] / f"{key}.pkl"
+
+
+def load(key):
+    """
+    Returns the cached LoopIR proc for `key`, or None.
+    """
+    if key is None:
+        return None
+    try:
+        with open(_path(key), "rb") as f:
+            proc = pickle.load(f)
+    except Exception:
+        return None
+    return proc if isinstance(proc, LoopIR.proc) else None
+
+
+def store(key, proc):
+    if key is None:
+        return
+    buf = io.BytesIO()
+    try:
+        _Pickler(buf, protocol=pickle.HIGHEST_PROTOCOL).dump(proc)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        # e.g. procs using memories defined in a local scope
+        return
+
+    path = _path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(buf.getvalue())
+        os.replace(tmp, path)
+    except OSError:
+        pass
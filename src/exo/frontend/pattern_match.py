@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import inspect
 import re
 from typing import Optional, Iterable
 from collections import ChainMap
@@ -79,17 +78,16 @@ def match_pattern(
     else:
         match_no = default_match_no  # None means match-all
 
-    stack_frames: [inspect.FrameInfo] = inspect.stack()
     # get source location where this is getting called from
-    caller = inspect.getframeinfo(stack_frames[call_depth][0])
-    func_locals = ChainMap(stack_frames[call_depth].frame.f_locals)
-    func_globals = ChainMap(stack_frames[call_depth].frame.f_globals)
+    caller = pyparser.get_caller_frame(call_depth)
+    func_locals = ChainMap(caller.f_locals)
+    func_globals = ChainMap(caller.f_globals)
 
     # parse the pattern we're going to use to match
     p_ast = pyparser.pattern(
         pattern_str,
-        filename=caller.filename,
-        lineno=caller.lineno,
+        filename=caller.f_code.co_filename,
+        lineno=caller.f_lineno,
         srclocals=func_locals,
         srcglobals=func_globals,
     )
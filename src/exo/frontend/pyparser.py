@@ -74,13 +74,24 @@ def get_ast_from_python(f):
     return module.body[0], getsrcinfo
 
 
+def get_caller_frame(depth):
+    """
+    The frame `depth` levels up from the caller of this function, i.e.
+    `inspect.stack()[depth].frame` there, without reading the source of
+    every frame on the stack.
+    """
+    frame = inspect.currentframe().f_back
+    for _ in range(depth):
+        frame = frame.f_back
+        assert frame is not None
+    return frame
+
+
 def get_src_locals(*, depth):
     """
     Get global and local environments for context capture purposes
     """
-    stack_frames: [inspect.FrameInfo] = inspect.stack()
-    assert len(stack_frames) >= depth
-    func_locals = stack_frames[depth].frame.f_locals
+    func_locals = get_caller_frame(depth).f_locals
     assert isinstance(func_locals, dict)
     return ChainMap(func_locals)
 
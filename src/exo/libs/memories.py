@@ -1,4 +1,11 @@
-from exo.core.memory import Memory, DRAM, StaticMemory, MemGenError, generate_offset
+from exo.core.memory import (
+    Memory,
+    DRAM,
+    StaticMemory,
+    MemGenError,
+    RegisterPressureWarning,
+    generate_offset,
+)
 
 
 def _is_const_size(sz, c):
@@ -192,6 +199,10 @@ class AVX2(Memory):
     def global_(cls):
         return "#include <immintrin.h>"
 
+    @classmethod
+    def num_registers(cls):
+        return 16
+
     @classmethod
     def alloc(cls, new_name, prim_type, shape, srcinfo):
         if not shape:
@@ -245,6 +256,10 @@ class AVX512(Memory):
     def global_(cls):
         return "#include <immintrin.h>"
 
+    @classmethod
+    def num_registers(cls):
+        return 32
+
     @classmethod
     def can_read(cls):
         return False
@@ -282,15 +297,10 @@ class AVX512(Memory):
 
 class AMX_TILE(StaticMemory):
     NUM_AMX_TILES = 8
-    StaticMemory.init_state(NUM_AMX_TILES)
-    tile_dict = {}
 
-    # TODO: have a better way of doing this rather than manually
-    # calling this after each test that fails to compile.
     @classmethod
-    def reset_allocations(cls):
-        cls.init_state(cls.NUM_AMX_TILES)
-        cls.tile_dict = {}
+    def num_chunks(cls):
+        return cls.NUM_AMX_TILES
 
     @classmethod
     def global_(cls):
@@ -301,7 +311,7 @@ class AMX_TILE(StaticMemory):
         return False
 
     @classmethod
-    def alloc(cls, new_name, prim_type, shape, srcinfo):
+    def alloc(cls, new_name, prim_type, shape, srcinfo, chunk):
         if not (shape[0].isdecimal() and int(shape[0]) <= 16):
             raise MemGenError("Number of tile rows must be a constant and <= 16.")
 
@@ -318,14 +328,8 @@ class AMX_TILE(StaticMemory):
                 f"Number of bytes per row must be a constant and <= 64, currently trying to allocate {int(shape[1]) * ctype_size[prim_type]} bytes per row."
             )
 
-        tile_num = cls.find_free_chunk()
-        cls.mark(tile_num)
-        cls.tile_dict[new_name] = tile_num
-        return f"#define {new_name} {tile_num}"
+        return f"#define {new_name} {chunk}"
 
     @classmethod
-    def free(cls, new_name, prim_type, shape, srcinfo):
-        tile_num = cls.tile_dict[new_name]
-        del cls.tile_dict[new_name]
-        cls.unmark(tile_num)
+    def free(cls, new_name, prim_type, shape, srcinfo, chunk):
         return f"#undef {new_name}"
@@ -3,6 +3,7 @@ import importlib
 import importlib.machinery
 import importlib.util
 import inspect
+import json
 import sys
 
 sys.setrecursionlimit(10000)
@@ -24,6 +25,12 @@ def main():
     )
     parser.add_argument("--stem", help="base name for .c and .h files")
     parser.add_argument("source", type=str, nargs="+", help="source file to compile")
+    parser.add_argument(
+        "--perf-summary",
+        metavar="CONFIG",
+        help="also write a roofline report of the library, as configured by the "
+        "JSON file CONFIG (see exo.roofline)",
+    )
     parser.add_argument(
         "--version",
         action="version",
@@ -61,6 +68,12 @@ def main():
     exo.compile_procs(library, outdir, f"{stem}.c", f"{stem}.h")
     write_depfile(outdir, stem)
 
+    if args.perf_summary:
+        from exo.roofline import write_summary
+
+        config = json.loads(Path(args.perf_summary).read_text())
+        write_summary(library, config, outdir, stem)
+
 
 def write_depfile(outdir, stem):
     modules = set()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from exo import proc, instr, DRAM, config
+from exo import proc, DRAM, config
+from exo.API import lazy_instr
 from exo.libs.memories import GEMM_SCRATCH, GEMM_ACCUM
 from exo.libs.externs import select, relu
 from exo.stdlib.scheduling import *
@@ -276,7 +277,7 @@ def inline_st(conv):
 # --------------------------------------------------------------------------- #
 
 
-@instr("{dst}[0] = ACC_SCALE({src}[0], {scale}[0]);")
+@lazy_instr("{dst}[0] = ACC_SCALE({src}[0], {scale}[0]);")
 def acc_scale(src: i32, dst: f32, scale: f32):
     dst = scale * src
 
@@ -296,17 +297,17 @@ class ConfigLoad_id2:
     src_stride: stride
 
 
-@instr("gemmini_extended3_config_ld({src_stride}, 1.0f, 0, 0);\n")
+@lazy_instr("gemmini_extended3_config_ld({src_stride}, 1.0f, 0, 0);\n")
 def config_ld_i8(src_stride: stride):
     ConfigLoad.src_stride = src_stride
 
 
-@instr("gemmini_extended3_config_ld({src_stride}, 1.0f, 0, 1);\n")
+@lazy_instr("gemmini_extended3_config_ld({src_stride}, 1.0f, 0, 1);\n")
 def config_ld_i8_id1(src_stride: stride):
     ConfigLoad_id1.src_stride = src_stride
 
 
-@instr("gemmini_extended3_config_ld({src_stride}, 1.0f, 0, 2);\n")
+@lazy_instr("gemmini_extended3_config_ld({src_stride}, 1.0f, 0, 2);\n")
 def config_ld_i8_id2(src_stride: stride):
     ConfigLoad_id2.src_stride = src_stride
 
@@ -376,7 +377,7 @@ _gemm_ld_i8_block = (
 )
 
 
-@instr(_gemm_ld_i8_block)
+@lazy_instr(_gemm_ld_i8_block)
 def ld_i8_block(
     n: size,
     m: size,
@@ -473,7 +474,7 @@ _gemm_zero_block_id2 = (
 )
 
 
-@instr(_gemm_zero_block_id2)
+@lazy_instr(_gemm_zero_block_id2)
 def zero_block_id2(
     n: size,
     m: size,
@@ -557,7 +558,7 @@ _gemm_ld_i8_stride_2 = (
 )
 
 
-@instr(_gemm_ld_i8_stride_2)
+@lazy_instr(_gemm_ld_i8_stride_2)
 def ld_i8_s2(
     n: size,
     m: size,
@@ -580,7 +581,7 @@ _gemm_config_ld_i8_id1 = (
 )
 
 
-@instr(_gemm_config_ld_i8_id1)
+@lazy_instr(_gemm_config_ld_i8_id1)
 def config_ld_i8_s2_id1(src_stride: stride):
     ConfigLoad_id1.src_stride = src_stride
 
@@ -590,7 +591,7 @@ _do_gemm_ld_i8_stride_2 = (
 )
 
 
-@instr(_do_gemm_ld_i8_stride_2)
+@lazy_instr(_do_gemm_ld_i8_stride_2)
 def do_ld_i8_s2_id1(
     n: size,
     m: size,
@@ -615,7 +616,7 @@ _gemm_ld_i8_vec = (
 )
 
 
-@instr(_gemm_ld_i8_vec)
+@lazy_instr(_gemm_ld_i8_vec)
 def ld_i8_vector(
     src: [i8][16] @ DRAM,
     dst: [i8][16] @ GEMM_SCRATCH,
@@ -631,7 +632,7 @@ _do_gemm_ld_i8_vec = (
 )
 
 
-@instr(_do_gemm_ld_i8_vec)
+@lazy_instr(_do_gemm_ld_i8_vec)
 def do_ld_i8_vector(
     src: [i8][16] @ DRAM,
     dst: [i8][16] @ GEMM_SCRATCH,
@@ -673,7 +674,7 @@ _gemm_ld_acc_i32 = (
 )
 
 
-@instr(_gemm_ld_acc_i32)
+@lazy_instr(_gemm_ld_acc_i32)
 def ld_acc_i32(
     n: size,
     m: size,
@@ -697,7 +698,7 @@ _gemm_do_ld_acc_i32 = (
 )
 
 
-@instr(_gemm_do_ld_acc_i32)
+@lazy_instr(_gemm_do_ld_acc_i32)
 def do_ld_acc_i32(
     n: size,
     m: size,
@@ -718,7 +719,7 @@ def do_ld_acc_i32(
 _gemm_config_ld_acc_i32_vector = "gemmini_extended3_config_ld(0, 1.0f, 0, 0);\n"
 
 
-@instr(_gemm_config_ld_acc_i32_vector)
+@lazy_instr(_gemm_config_ld_acc_i32_vector)
 def config_ld_acc_i32_vector(stride_set: bool):
     ConfigLoadAcc.stride_set = stride_set
 
@@ -729,7 +730,7 @@ _gemm_ld_acc_i32_vec = (
 )
 
 
-@instr(_gemm_ld_acc_i32_vec)
+@lazy_instr(_gemm_ld_acc_i32_vec)
 def ld_acc_i32_vector(
     n: size,
     src: [i32][1, 16] @ DRAM,
@@ -747,7 +748,7 @@ def ld_acc_i32_vector(
 _do_gemm_ld_acc_i32_vec = "gemmini_extended_mvin( ((uint64_t) &{src_data}), ((uint32_t) &{dst_data}), 16, {n} );"
 
 
-@instr(_do_gemm_ld_acc_i32_vec)
+@lazy_instr(_do_gemm_ld_acc_i32_vec)
 def do_ld_acc_i32_vector(
     n: size,
     src: [i32][1, 16] @ DRAM,
@@ -782,7 +783,7 @@ _gemm_st_i8 = (
 )
 
 
-@instr(_gemm_st_i8)
+@lazy_instr(_gemm_st_i8)
 def st_i8(n: size, m: size, src: [i8][n, 16] @ GEMM_SCRATCH, dst: [i8][n, m] @ DRAM):
     assert n <= 16
     assert m <= 16
@@ -825,7 +826,7 @@ _gemm_st_acc_i8 = (
 )
 
 
-@instr(_gemm_st_acc_i8)
+@lazy_instr(_gemm_st_acc_i8)
 def st_acc_i8(
     n: size,
     m: size,
@@ -858,7 +859,7 @@ _gemm_config_st_acc_i8 = (
 )
 
 
-@instr(_gemm_config_st_acc_i8)
+@lazy_instr(_gemm_config_st_acc_i8)
 def config_st_acc_i8(scale: f32, dst_stride: stride, act: bool):
     ConfigStore.scale = scale
     ConfigStore.dst_stride = dst_stride
@@ -868,7 +869,7 @@ def config_st_acc_i8(scale: f32, dst_stride: stride, act: bool):
 _gemm_st_acc_i8 = "gemmini_extended_mvout( ((uint64_t) &{dst_data}), (uint32_t) &{src_data}, {m}, {n} );"
 
 
-@instr(_gemm_st_acc_i8)
+@lazy_instr(_gemm_st_acc_i8)
 def do_st_acc_i8(
     n: size, m: size, src: [i32][n, 16] @ GEMM_ACCUM, dst: [i8][n, m] @ DRAM
 ):
@@ -967,7 +968,7 @@ _gemm_st_acc_i32 = (
 )
 
 
-@instr(_gemm_st_acc_i32)
+@lazy_instr(_gemm_st_acc_i32)
 def st_acc_i32(
     n: size, m: size, src: [i32][n, 16] @ GEMM_ACCUM, dst: [i32][n, m] @ DRAM
 ):
@@ -985,7 +986,7 @@ def st_acc_i32(
 _gemm_config_zero = "gemmini_extended3_config_ld(0, 1.0f, 0, 0);\n"
 
 
-@instr(_gemm_config_zero)
+@lazy_instr(_gemm_config_zero)
 def config_zero():
     ConfigLoad.src_stride = 0
 
@@ -993,7 +994,7 @@ def config_zero():
 _gemm_do_zero = "gemmini_extended_mvin( 0, ((uint64_t) &{dst_data})," + "{m}, {n} );"
 
 
-@instr(_gemm_do_zero)
+@lazy_instr(_gemm_do_zero)
 def do_zero_i8(
     n: size,
     m: size,
@@ -1016,7 +1017,7 @@ _gemm_zero = (
 )
 
 
-@instr(_gemm_zero)
+@lazy_instr(_gemm_zero)
 def zero_i8(
     n: size,
     m: size,
@@ -1084,7 +1085,7 @@ _gemm_zero_vec = (
 )
 
 
-@instr(_gemm_zero_vec)
+@lazy_instr(_gemm_zero_vec)
 def zero_i8_vector(
     dst: [i8][16] @ GEMM_SCRATCH,
 ):
@@ -1098,7 +1099,7 @@ def zero_i8_vector(
 _do_gemm_zero_vec = "gemmini_extended_mvin( 0, ((uint64_t) &{dst_data})," + "16, 1 );"
 
 
-@instr(_do_gemm_zero_vec)
+@lazy_instr(_do_gemm_zero_vec)
 def do_zero_i8_vector(
     dst: [i8][16] @ GEMM_SCRATCH,
 ):
@@ -1138,7 +1139,7 @@ ConfigMatmul = new_config_matmul()
 _gemm_config_matmul = "gemmini_extended_config_ex(WS, 0, 0, 1, 0, 0);\n"
 
 
-@instr(_gemm_config_matmul)
+@lazy_instr(_gemm_config_matmul)
 def config_matmul():
     ConfigMatmul.done = True
 
@@ -1157,7 +1158,7 @@ _gemm_matmul = (
 )
 
 
-@instr(_gemm_config_matmul + _gemm_matmul)
+@lazy_instr(_gemm_config_matmul + _gemm_matmul)
 def matmul_i8(
     N: size,
     M: size,
@@ -1184,7 +1185,7 @@ def matmul_i8(
                 C[i, j] += a * b
 
 
-@instr(_gemm_matmul)
+@lazy_instr(_gemm_matmul)
 def do_matmul_i8(
     N: size,
     M: size,
@@ -1241,7 +1242,7 @@ _gemm_matmul_acc = (
 )
 
 
-@instr(_gemm_matmul_acc)
+@lazy_instr(_gemm_matmul_acc)
 def matmul_acc_i8(
     N: size,
     M: size,
@@ -1267,7 +1268,7 @@ def matmul_acc_i8(
                 C[i, j] += a * b
 
 
-@instr(_gemm_matmul_acc)
+@lazy_instr(_gemm_matmul_acc)
 def do_matmul_acc_i8(
     N: size,
     M: size,
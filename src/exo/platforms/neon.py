@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from exo import Memory, DRAM, instr
+from exo import Memory, DRAM
+from exo.API import lazy_instr
 
 
 def _is_const_size(sz, c):
@@ -21,6 +22,10 @@ class Neon(Memory):
     def global_(cls):
         return "#include <arm_neon.h>"
 
+    @classmethod
+    def num_registers(cls):
+        return 32
+
     @classmethod
     def can_read(cls):
         return False
@@ -80,13 +85,13 @@ class Neon(Memory):
 # float32
 
 
-@instr("*{result} += vaddvq_f32({x_data});")
+@lazy_instr("*{result} += vaddvq_f32({x_data});")
 def neon_assoc_reduce_add_instr_4xf32(result: f32 @ DRAM, x: [f32][4] @ Neon):
     for i in seq(0, 4):
         result += x[i]
 
 
-@instr("{dst_data} = vld1q_f32(&{src_data});")
+@lazy_instr("{dst_data} = vld1q_f32(&{src_data});")
 def neon_vld_4xf32(dst: [f32][4] @ Neon, src: [f32][4] @ DRAM):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -95,7 +100,7 @@ def neon_vld_4xf32(dst: [f32][4] @ Neon, src: [f32][4] @ DRAM):
         dst[i] = src[i]
 
 
-@instr("vst1q_f32(&{dst_data}, {src_data});")
+@lazy_instr("vst1q_f32(&{dst_data}, {src_data});")
 def neon_vst_4xf32(dst: [f32][4] @ DRAM, src: [f32][4] @ Neon):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -104,7 +109,7 @@ def neon_vst_4xf32(dst: [f32][4] @ DRAM, src: [f32][4] @ Neon):
         dst[i] = src[i]
 
 
-@instr("{dst_data} = vld1q_dup_f32(&{src_data});")
+@lazy_instr("{dst_data} = vld1q_dup_f32(&{src_data});")
 def neon_broadcast_4xf32(dst: [f32][4] @ Neon, src: [f32][1] @ DRAM):
     assert stride(dst, 0) == 1
 
@@ -112,7 +117,7 @@ def neon_broadcast_4xf32(dst: [f32][4] @ Neon, src: [f32][1] @ DRAM):
         dst[i] = src[0]
 
 
-@instr("{dst_data} = vld1q_dup_f32({src_data});")
+@lazy_instr("{dst_data} = vld1q_dup_f32({src_data});")
 def neon_broadcast_4xf32_scalar(dst: [f32][4] @ Neon, src: f32 @ DRAM):
     assert stride(dst, 0) == 1
 
@@ -120,7 +125,7 @@ def neon_broadcast_4xf32_scalar(dst: [f32][4] @ Neon, src: f32 @ DRAM):
         dst[i] = src
 
 
-@instr("{dst_data} = vmovq_n_f32(0.0f);")
+@lazy_instr("{dst_data} = vmovq_n_f32(0.0f);")
 def neon_zero_4xf32(dst: [f32][4] @ Neon):
     assert stride(dst, 0) == 1
 
@@ -128,7 +133,7 @@ def neon_zero_4xf32(dst: [f32][4] @ Neon):
         dst[i] = 0.0
 
 
-@instr("{dst_data} = vaddq_f32({lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vaddq_f32({lhs_data}, {rhs_data});")
 def neon_vadd_4xf32(dst: [f32][4] @ Neon, lhs: [f32][4] @ Neon, rhs: [f32][4] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(lhs, 0) == 1
@@ -138,7 +143,7 @@ def neon_vadd_4xf32(dst: [f32][4] @ Neon, lhs: [f32][4] @ Neon, rhs: [f32][4] @
         dst[i] = lhs[i] + rhs[i]
 
 
-@instr("{dst_data} = vaddq_f32({src_data}, {dst_data});")
+@lazy_instr("{dst_data} = vaddq_f32({src_data}, {dst_data});")
 def neon_reduce_vadd_4xf32(dst: [f32][4] @ Neon, src: [f32][4] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -147,7 +152,7 @@ def neon_reduce_vadd_4xf32(dst: [f32][4] @ Neon, src: [f32][4] @ Neon):
         dst[i] += src[i]
 
 
-@instr("{dst_data} = vmulq_f32({lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vmulq_f32({lhs_data}, {rhs_data});")
 def neon_vmul_4xf32(dst: [f32][4] @ Neon, lhs: [f32][4] @ Neon, rhs: [f32][4] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(lhs, 0) == 1
@@ -157,7 +162,7 @@ def neon_vmul_4xf32(dst: [f32][4] @ Neon, lhs: [f32][4] @ Neon, rhs: [f32][4] @
         dst[i] = lhs[i] * rhs[i]
 
 
-@instr("{dst_data} = vmulq_f32({dst_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vmulq_f32({dst_data}, {rhs_data});")
 def neon_vmul2_4xf32(dst: [f32][4] @ Neon, lhs: [f32][4] @ Neon, rhs: [f32][4] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(lhs, 0) == 1
@@ -167,7 +172,7 @@ def neon_vmul2_4xf32(dst: [f32][4] @ Neon, lhs: [f32][4] @ Neon, rhs: [f32][4] @
         dst[i] = lhs[i] * rhs[i]
 
 
-@instr("{dst_data} = vfmaq_laneq_f32({dst_data}, {lhs_data}, {rhs_data}, {lane});")
+@lazy_instr("{dst_data} = vfmaq_laneq_f32({dst_data}, {lhs_data}, {rhs_data}, {lane});")
 def neon_vfmla_4xf32_4xf32(
     dst: [f32][4] @ Neon, lhs: [f32][4] @ Neon, rhs: [f32][4] @ Neon, lane: index
 ):
@@ -181,7 +186,7 @@ def neon_vfmla_4xf32_4xf32(
 
 
 # This function uses an extra buffer for a beta=0 approach
-@instr("{dst_data} = vfmaq_laneq_f32({b_data}, {lhs_data}, {rhs_data}, {lane});")
+@lazy_instr("{dst_data} = vfmaq_laneq_f32({b_data}, {lhs_data}, {rhs_data}, {lane});")
 def neon_vfmla2_4xf32_4xf32(
     dst: [f32][4] @ Neon,
     b: [f32][4] @ Neon,
@@ -199,7 +204,7 @@ def neon_vfmla2_4xf32_4xf32(
         dst[i] = b[i] + lhs[i] * rhs[lane]
 
 
-@instr("{dst_data} = vmlaq_f32({dst_data}, {lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vmlaq_f32({dst_data}, {lhs_data}, {rhs_data});")
 def neon_vfmadd_4xf32_4xf32(
     dst: [f32][4] @ Neon, lhs: [f32][4] @ Neon, rhs: [f32][4] @ Neon
 ):
@@ -211,7 +216,7 @@ def neon_vfmadd_4xf32_4xf32(
         dst[i] += lhs[i] * rhs[i]
 
 
-@instr("{dst_data} = vmlaq_f32({res_data}, {lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vmlaq_f32({res_data}, {lhs_data}, {rhs_data});")
 def neon_vfmadd_ex_4xf32_4xf32(
     dst: [f32][4] @ Neon,
     res: [f32][4] @ Neon,
@@ -227,7 +232,7 @@ def neon_vfmadd_ex_4xf32_4xf32(
         dst[i] = res[i] + lhs[i] * rhs[i]
 
 
-@instr("{dst_data} = vmlaq_n_f32({dst_data}, {lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vmlaq_n_f32({dst_data}, {lhs_data}, {rhs_data});")
 def neon_vfmadd_4xf32_1xf32(
     dst: [f32][4] @ Neon, lhs: [f32][4] @ Neon, rhs: [f32][1] @ DRAM
 ):
@@ -238,7 +243,7 @@ def neon_vfmadd_4xf32_1xf32(
         dst[i] += lhs[i] * rhs[0]
 
 
-@instr("{dst_data} = vmlaq_n_f32({dst_data}, {rhs_data}, {lhs_data});")
+@lazy_instr("{dst_data} = vmlaq_n_f32({dst_data}, {rhs_data}, {lhs_data});")
 def neon_vfmadd_1xf32_4xf32(
     dst: [f32][4] @ Neon, lhs: [f32][1] @ DRAM, rhs: [f32][4] @ Neon
 ):
@@ -255,7 +260,7 @@ def neon_vfmadd_1xf32_4xf32(
 # float16
 
 
-@instr("{dst_data} = vld1q_f16((float16_t *)&{src_data});")
+@lazy_instr("{dst_data} = vld1q_f16((float16_t *)&{src_data});")
 def neon_vld_8xf16(dst: [f16][8] @ Neon, src: [f16][8] @ DRAM):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -264,7 +269,7 @@ def neon_vld_8xf16(dst: [f16][8] @ Neon, src: [f16][8] @ DRAM):
         dst[i] = src[i]
 
 
-@instr("vst1q_f16((float16_t *)&{dst_data}, {src_data});")
+@lazy_instr("vst1q_f16((float16_t *)&{dst_data}, {src_data});")
 def neon_vst_8xf16(dst: [f16][8] @ DRAM, src: [f16][8] @ Neon):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -273,7 +278,7 @@ def neon_vst_8xf16(dst: [f16][8] @ DRAM, src: [f16][8] @ Neon):
         dst[i] = src[i]
 
 
-@instr("{dst_data} = vld1q_dup_f16((float16_t *)&{src_data});")
+@lazy_instr("{dst_data} = vld1q_dup_f16((float16_t *)&{src_data});")
 def neon_broadcast_8xf16(dst: [f16][8] @ Neon, src: [f16][1] @ DRAM):
     assert stride(dst, 0) == 1
 
@@ -281,7 +286,7 @@ def neon_broadcast_8xf16(dst: [f16][8] @ Neon, src: [f16][1] @ DRAM):
         dst[i] = src[0]
 
 
-@instr("{dst_data} = vmovq_n_f16(0.0f);")
+@lazy_instr("{dst_data} = vmovq_n_f16(0.0f);")
 def neon_zero_8xf16(dst: [f16][8] @ Neon):
     assert stride(dst, 0) == 1
 
@@ -289,7 +294,7 @@ def neon_zero_8xf16(dst: [f16][8] @ Neon):
         dst[i] = 0.0
 
 
-@instr("{dst_data} = vaddq_f16({lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vaddq_f16({lhs_data}, {rhs_data});")
 def neon_vadd_8xf16(dst: [f16][8] @ Neon, lhs: [f16][8] @ Neon, rhs: [f16][8] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(lhs, 0) == 1
@@ -299,7 +304,7 @@ def neon_vadd_8xf16(dst: [f16][8] @ Neon, lhs: [f16][8] @ Neon, rhs: [f16][8] @
         dst[i] = lhs[i] + rhs[i]
 
 
-@instr("{dst_data} = vmulq_f16({lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vmulq_f16({lhs_data}, {rhs_data});")
 def neon_vmul_8xf16(dst: [f16][8] @ Neon, lhs: [f16][8] @ Neon, rhs: [f16][8] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(lhs, 0) == 1
@@ -309,7 +314,7 @@ def neon_vmul_8xf16(dst: [f16][8] @ Neon, lhs: [f16][8] @ Neon, rhs: [f16][8] @
         dst[i] = lhs[i] * rhs[i]
 
 
-@instr("{dst_data} = vfmaq_laneq_f16({dst_data}, {lhs_data}, {rhs_data}, {lane});")
+@lazy_instr("{dst_data} = vfmaq_laneq_f16({dst_data}, {lhs_data}, {rhs_data}, {lane});")
 def neon_vfmla_8xf16_8xf16(
     dst: [f16][8] @ Neon, lhs: [f16][8] @ Neon, rhs: [f16][8] @ Neon, lane: index
 ):
@@ -322,7 +327,7 @@ def neon_vfmla_8xf16_8xf16(
         dst[i] += lhs[i] * rhs[lane]
 
 
-@instr("{dst_data} = vfmaq_f16({dst_data}, {lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vfmaq_f16({dst_data}, {lhs_data}, {rhs_data});")
 def neon_vfmadd_8xf16_8xf16(
     dst: [f16][8] @ Neon, lhs: [f16][8] @ Neon, rhs: [f16][8] @ Neon
 ):
@@ -334,7 +339,7 @@ def neon_vfmadd_8xf16_8xf16(
         dst[i] += lhs[i] * rhs[i]
 
 
-@instr("{dst_data} = vfmaq_f16({res_data}, {lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vfmaq_f16({res_data}, {lhs_data}, {rhs_data});")
 def neon_vfmadd_ex_8xf16_8xf16(
     dst: [f16][8] @ Neon,
     res: [f16][8] @ Neon,
@@ -350,7 +355,7 @@ def neon_vfmadd_ex_8xf16_8xf16(
         dst[i] = res[i] + lhs[i] * rhs[i]
 
 
-@instr("{dst_data} = vfmaq_n_f16({dst_data}, {lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vfmaq_n_f16({dst_data}, {lhs_data}, {rhs_data});")
 def neon_vfmadd_8xf16_1xf16(
     dst: [f16][8] @ Neon, lhs: [f16][8] @ Neon, rhs: [f16][1] @ DRAM
 ):
@@ -361,7 +366,7 @@ def neon_vfmadd_8xf16_1xf16(
         dst[i] += lhs[i] * rhs[0]
 
 
-@instr("{dst_data} = vfmaq_n_f16({dst_data}, {rhs_data}, {lhs_data});")
+@lazy_instr("{dst_data} = vfmaq_n_f16({dst_data}, {rhs_data}, {lhs_data});")
 def neon_vfmadd_1xf16_8xf16(
     dst: [f16][8] @ Neon, lhs: [f16][1] @ DRAM, rhs: [f16][8] @ Neon
 ):
@@ -374,7 +379,7 @@ def neon_vfmadd_1xf16_8xf16(
 
 # TODO: Hack for procedure aliasing issue, can be deleted once we have
 #      better way of handling aliasing
-@instr("{dst_data} = {src_data};")
+@lazy_instr("{dst_data} = {src_data};")
 def neon_reg_copy_4xf32(dst: [f32][4] @ Neon, src: [f32][4] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -383,7 +388,7 @@ def neon_reg_copy_4xf32(dst: [f32][4] @ Neon, src: [f32][4] @ Neon):
         dst[i] = src[i]
 
 
-@instr("{dst_data} = vnegq_f32({src_data});")
+@lazy_instr("{dst_data} = vnegq_f32({src_data});")
 def neon_vneg_4xf32(dst: [f32][4] @ Neon, src: [f32][4] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -397,7 +402,7 @@ def neon_vneg_4xf32(dst: [f32][4] @ Neon, src: [f32][4] @ Neon):
 # --------------------------------------------------------------------------- #
 
 
-@instr("{dst_data} = vld1q_f64(&{src_data});")
+@lazy_instr("{dst_data} = vld1q_f64(&{src_data});")
 def neon_vld_2xf64(dst: [f64][2] @ Neon, src: [f64][2] @ DRAM):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -406,7 +411,7 @@ def neon_vld_2xf64(dst: [f64][2] @ Neon, src: [f64][2] @ DRAM):
         dst[i] = src[i]
 
 
-@instr("vst1q_f64(&{dst_data}, {src_data});")
+@lazy_instr("vst1q_f64(&{dst_data}, {src_data});")
 def neon_vst_2xf64(dst: [f64][2] @ DRAM, src: [f64][2] @ Neon):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -415,7 +420,7 @@ def neon_vst_2xf64(dst: [f64][2] @ DRAM, src: [f64][2] @ Neon):
         dst[i] = src[i]
 
 
-@instr("{dst_data} = vld1q_dup_f64(&{src_data});")
+@lazy_instr("{dst_data} = vld1q_dup_f64(&{src_data});")
 def neon_broadcast_2xf64(dst: [f64][2] @ Neon, src: [f64][1] @ DRAM):
     assert stride(dst, 0) == 1
 
@@ -423,7 +428,7 @@ def neon_broadcast_2xf64(dst: [f64][2] @ Neon, src: [f64][1] @ DRAM):
         dst[i] = src[0]
 
 
-@instr("{dst_data} = vld1q_dup_f64({src_data});")
+@lazy_instr("{dst_data} = vld1q_dup_f64({src_data});")
 def neon_broadcast_2xf64_scalar(dst: [f64][2] @ Neon, src: f64 @ DRAM):
     assert stride(dst, 0) == 1
 
@@ -431,7 +436,7 @@ def neon_broadcast_2xf64_scalar(dst: [f64][2] @ Neon, src: f64 @ DRAM):
         dst[i] = src
 
 
-@instr("{dst_data} = vmlaq_f64({dst_data}, {lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vmlaq_f64({dst_data}, {lhs_data}, {rhs_data});")
 def neon_vfmadd_2xf64_2xf64(
     dst: [f64][2] @ Neon, lhs: [f64][2] @ Neon, rhs: [f64][2] @ Neon
 ):
@@ -443,7 +448,7 @@ def neon_vfmadd_2xf64_2xf64(
         dst[i] += lhs[i] * rhs[i]
 
 
-@instr("{dst_data} = vmovq_n_f64(0.0f);")
+@lazy_instr("{dst_data} = vmovq_n_f64(0.0f);")
 def neon_zero_2xf64(dst: [f64][2] @ Neon):
     assert stride(dst, 0) == 1
 
@@ -451,13 +456,13 @@ def neon_zero_2xf64(dst: [f64][2] @ Neon):
         dst[i] = 0.0
 
 
-@instr("*{result} += vaddvq_f64({x_data});")
+@lazy_instr("*{result} += vaddvq_f64({x_data});")
 def neon_assoc_reduce_add_instr_2xf64(result: f64 @ DRAM, x: [f64][2] @ Neon):
     for i in seq(0, 2):
         result += x[i]
 
 
-@instr("{dst_data} = vmulq_f64({lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vmulq_f64({lhs_data}, {rhs_data});")
 def neon_vmul_2xf64(dst: [f64][2] @ Neon, lhs: [f64][2] @ Neon, rhs: [f64][2] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(lhs, 0) == 1
@@ -467,7 +472,7 @@ def neon_vmul_2xf64(dst: [f64][2] @ Neon, lhs: [f64][2] @ Neon, rhs: [f64][2] @
         dst[i] = lhs[i] * rhs[i]
 
 
-@instr("{dst_data} = vaddq_f64({lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = vaddq_f64({lhs_data}, {rhs_data});")
 def neon_vadd_2xf64(dst: [f64][2] @ Neon, lhs: [f64][2] @ Neon, rhs: [f64][2] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(lhs, 0) == 1
@@ -477,7 +482,7 @@ def neon_vadd_2xf64(dst: [f64][2] @ Neon, lhs: [f64][2] @ Neon, rhs: [f64][2] @
         dst[i] = lhs[i] + rhs[i]
 
 
-@instr("{dst_data} = vaddq_f64({src_data}, {dst_data});")
+@lazy_instr("{dst_data} = vaddq_f64({src_data}, {dst_data});")
 def neon_reduce_vadd_2xf64(dst: [f64][2] @ Neon, src: [f64][2] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -487,7 +492,7 @@ def neon_reduce_vadd_2xf64(dst: [f64][2] @ Neon, src: [f64][2] @ Neon):
 
 
 # TODO: Also a hack
-@instr("{dst_data} = {src_data};")
+@lazy_instr("{dst_data} = {src_data};")
 def neon_reg_copy_2xf64(dst: [f64][2] @ Neon, src: [f64][2] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -496,7 +501,7 @@ def neon_reg_copy_2xf64(dst: [f64][2] @ Neon, src: [f64][2] @ Neon):
         dst[i] = src[i]
 
 
-@instr("{dst_data} = vnegq_f64({src_data});")
+@lazy_instr("{dst_data} = vnegq_f64({src_data});")
 def neon_vneg_2xf64(dst: [f64][2] @ Neon, src: [f64][2] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -510,7 +515,7 @@ def neon_vneg_2xf64(dst: [f64][2] @ Neon, src: [f64][2] @ Neon):
 # --------------------------------------------------------------------------- #
 
 
-@instr("{dst_data} = vcvt_f64_f32(vget_low_f32({src_data}));")
+@lazy_instr("{dst_data} = vcvt_f64_f32(vget_low_f32({src_data}));")
 def neon_convert_f32_lower_to_f64(dst: [f64][2] @ Neon, src: [f32][4] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -519,7 +524,7 @@ def neon_convert_f32_lower_to_f64(dst: [f64][2] @ Neon, src: [f32][4] @ Neon):
         dst[i] = src[i]
 
 
-@instr("{dst_data} = vcvt_f64_f32(vget_high_f32({src_data}));")
+@lazy_instr("{dst_data} = vcvt_f64_f32(vget_high_f32({src_data}));")
 def neon_convert_f32_upper_to_f64(dst: [f64][2] @ Neon, src: [f32][4] @ Neon):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from exo import Memory, DRAM, instr
+from exo import Memory, DRAM
+from exo.API import lazy_instr
 
 
 def _is_const_size(sz, c):
@@ -81,7 +82,7 @@ class RVV(Memory):
 # float32
 
 
-@instr("{dst_data} = __riscv_vle32_v_f32m1(&{src_data},{vl});")
+@lazy_instr("{dst_data} = __riscv_vle32_v_f32m1(&{src_data},{vl});")
 def rvv_vld_4xf32(dst: [f32][4] @ RVV, src: [f32][4] @ DRAM, vl: size):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -92,7 +93,7 @@ def rvv_vld_4xf32(dst: [f32][4] @ RVV, src: [f32][4] @ DRAM, vl: size):
         dst[i] = src[i]
 
 
-@instr("__riscv_vse32_v_f32m1(&{dst_data}, {src_data},{vl});")
+@lazy_instr("__riscv_vse32_v_f32m1(&{dst_data}, {src_data},{vl});")
 def rvv_vst_4xf32(dst: [f32][4] @ DRAM, src: [f32][4] @ RVV, vl: size):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -103,7 +104,7 @@ def rvv_vst_4xf32(dst: [f32][4] @ DRAM, src: [f32][4] @ RVV, vl: size):
         dst[i] = src[i]
 
 
-@instr("{dst_data} = __riscv_vfmv_v_f_f32m1({src_data},{vl});")
+@lazy_instr("{dst_data} = __riscv_vfmv_v_f_f32m1({src_data},{vl});")
 def rvv_broadcast_4xf32(dst: [f32][4] @ RVV, src: [f32][1] @ DRAM, vl: size):
     assert stride(dst, 0) == 1
     assert vl >= 0
@@ -113,7 +114,7 @@ def rvv_broadcast_4xf32(dst: [f32][4] @ RVV, src: [f32][1] @ DRAM, vl: size):
         dst[i] = src[0]
 
 
-@instr("{dst_data} = __riscv_vfmv_v_f_f32m1({src_data},{vl});")
+@lazy_instr("{dst_data} = __riscv_vfmv_v_f_f32m1({src_data},{vl});")
 def rvv_broadcast_4xf32_scalar(dst: [f32][4] @ RVV, src: f32 @ DRAM, vl: size):
     assert stride(dst, 0) == 1
     assert vl >= 0
@@ -123,7 +124,7 @@ def rvv_broadcast_4xf32_scalar(dst: [f32][4] @ RVV, src: f32 @ DRAM, vl: size):
         dst[i] = src
 
 
-@instr("{dst_data} = __riscv_vfmv_v_f_f32m1(0.0f,{vl});")
+@lazy_instr("{dst_data} = __riscv_vfmv_v_f_f32m1(0.0f,{vl});")
 def rvv_broadcast_4xf32_0(dst: [f32][4] @ RVV, vl: size):
     assert stride(dst, 0) == 1
     assert vl >= 0
@@ -133,7 +134,9 @@ def rvv_broadcast_4xf32_0(dst: [f32][4] @ RVV, vl: size):
         dst[i] = 0.0
 
 
-@instr("{dst_data} = __riscv_vfmacc_vv_f32m1({dst_data}, {lhs_data}, {rhs_data},{vl});")
+@lazy_instr(
+    "{dst_data} = __riscv_vfmacc_vv_f32m1({dst_data}, {lhs_data}, {rhs_data},{vl});"
+)
 def rvv_vfmacc_4xf32_4xf32(
     dst: [f32][4] @ RVV, lhs: [f32][4] @ RVV, rhs: [f32][4] @ RVV, vl: size
 ):
@@ -147,7 +150,9 @@ def rvv_vfmacc_4xf32_4xf32(
         dst[i] += lhs[i] * rhs[i]
 
 
-@instr("{dst_data} = __riscv_vfmacc_vf_f32m1{dst_data}, {rhs_data}, {lhs_data},{vl});")
+@lazy_instr(
+    "{dst_data} = __riscv_vfmacc_vf_f32m1{dst_data}, {rhs_data}, {lhs_data},{vl});"
+)
 def rvv_vfmacc_4xf32_1xf32(
     dst: [f32][4] @ RVV, lhs: [f32][4] @ RVV, rhs: [f32][1] @ DRAM, vl: size
 ):
@@ -161,7 +166,9 @@ def rvv_vfmacc_4xf32_1xf32(
         dst[i] += lhs[i] * rhs[0]
 
 
-@instr("{dst_data} = __riscv_vfmacc_vf_f32m1{dst_data}, {lhs_data}, {rhs_data},{vl});")
+@lazy_instr(
+    "{dst_data} = __riscv_vfmacc_vf_f32m1{dst_data}, {lhs_data}, {rhs_data},{vl});"
+)
 def rvv_vfmacc_1xf32_4xf32(
     dst: [f32][4] @ RVV, lhs: [f32][1] @ DRAM, rhs: [f32][4] @ RVV, vl: size
 ):
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
-from .. import instr, DRAM
+from .. import DRAM
+from ..API import lazy_instr
 from ..libs.memories import AVX2, AVX512
 from ..libs.externs import relu, select
 
+
 # --------------------------------------------------------------------------- #
 #   Prefetching
 # --------------------------------------------------------------------------- #
 
 
-@instr("_mm_prefetch(&{A_data}, {locality_hint});")
+@lazy_instr("_mm_prefetch(&{A_data}, {locality_hint});")
 def prefetch(A: [R][1] @ DRAM, locality_hint: size):
     assert 0 <= locality_hint
     assert locality_hint < 8
@@ -21,7 +23,7 @@ def prefetch(A: [R][1] @ DRAM, locality_hint: size):
 # --------------------------------------------------------------------------- #
 
 
-@instr("{dst_data} = _mm256_setzero_ps();")
+@lazy_instr("{dst_data} = _mm256_setzero_ps();")
 def mm256_setzero_ps(dst: [f32][8] @ AVX2):
     assert stride(dst, 0) == 1
 
@@ -29,7 +31,7 @@ def mm256_setzero_ps(dst: [f32][8] @ AVX2):
         dst[i] = 0.0
 
 
-@instr("{dst_data} = _mm256_setzero_pd();")
+@lazy_instr("{dst_data} = _mm256_setzero_pd();")
 def mm256_setzero_pd(dst: [f64][4] @ AVX2):
     assert stride(dst, 0) == 1
 
@@ -37,7 +39,7 @@ def mm256_setzero_pd(dst: [f64][4] @ AVX2):
         dst[i] = 0.0
 
 
-@instr("{dst_data} = _mm256_loadu_ps(&{src_data});")
+@lazy_instr("{dst_data} = _mm256_loadu_ps(&{src_data});")
 def mm256_loadu_ps(dst: [f32][8] @ AVX2, src: [f32][8] @ DRAM):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -46,7 +48,7 @@ def mm256_loadu_ps(dst: [f32][8] @ AVX2, src: [f32][8] @ DRAM):
         dst[i] = src[i]
 
 
-@instr("{dst_data} = _mm256_loadu_pd(&{src_data});")
+@lazy_instr("{dst_data} = _mm256_loadu_pd(&{src_data});")
 def mm256_loadu_pd(dst: [f64][4] @ AVX2, src: [f64][4] @ DRAM):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -55,7 +57,7 @@ def mm256_loadu_pd(dst: [f64][4] @ AVX2, src: [f64][4] @ DRAM):
         dst[i] = src[i]
 
 
-@instr("_mm256_storeu_ps(&{dst_data}, {src_data});")
+@lazy_instr("_mm256_storeu_ps(&{dst_data}, {src_data});")
 def mm256_storeu_ps(dst: [f32][8] @ DRAM, src: [f32][8] @ AVX2):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -64,7 +66,7 @@ def mm256_storeu_ps(dst: [f32][8] @ DRAM, src: [f32][8] @ AVX2):
         dst[i] = src[i]
 
 
-@instr("_mm256_storeu_pd(&{dst_data}, {src_data});")
+@lazy_instr("_mm256_storeu_pd(&{dst_data}, {src_data});")
 def mm256_storeu_pd(dst: [f64][4] @ DRAM, src: [f64][4] @ AVX2):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -73,7 +75,7 @@ def mm256_storeu_pd(dst: [f64][4] @ DRAM, src: [f64][4] @ AVX2):
         dst[i] = src[i]
 
 
-@instr("{dst_data} = _mm256_fmadd_ps({src1_data}, {src2_data}, {dst_data});")
+@lazy_instr("{dst_data} = _mm256_fmadd_ps({src1_data}, {src2_data}, {dst_data});")
 def mm256_fmadd_ps(
     dst: [f32][8] @ AVX2,
     src1: [f32][8] @ AVX2,
@@ -87,7 +89,7 @@ def mm256_fmadd_ps(
         dst[i] += src1[i] * src2[i]
 
 
-@instr("{dst_data} = _mm256_fmadd_pd({src1_data}, {src2_data}, {dst_data});")
+@lazy_instr("{dst_data} = _mm256_fmadd_pd({src1_data}, {src2_data}, {dst_data});")
 def mm256_fmadd_pd(
     dst: [f64][4] @ AVX2,
     src1: [f64][4] @ AVX2,
@@ -101,7 +103,7 @@ def mm256_fmadd_pd(
         dst[i] += src1[i] * src2[i]
 
 
-@instr("{out_data} = _mm256_broadcast_ss(&{val_data});")
+@lazy_instr("{out_data} = _mm256_broadcast_ss(&{val_data});")
 def mm256_broadcast_ss(
     out: [f32][8] @ AVX2,
     val: [f32][1],
@@ -112,7 +114,7 @@ def mm256_broadcast_ss(
         out[i] = val[0]
 
 
-@instr("{out_data} = _mm256_broadcast_sd(&{val_data});")
+@lazy_instr("{out_data} = _mm256_broadcast_sd(&{val_data});")
 def mm256_broadcast_sd(
     out: [f64][4] @ AVX2,
     val: [f64][1],
@@ -123,7 +125,7 @@ def mm256_broadcast_sd(
         out[i] = val[0]
 
 
-@instr("{out_data} = _mm256_broadcast_ss({val_data});")
+@lazy_instr("{out_data} = _mm256_broadcast_ss({val_data});")
 def mm256_broadcast_ss_scalar(out: [f32][8] @ AVX2, val: f32):
     assert stride(out, 0) == 1
 
@@ -131,7 +133,7 @@ def mm256_broadcast_ss_scalar(out: [f32][8] @ AVX2, val: f32):
         out[i] = val
 
 
-@instr("{out_data} = _mm256_broadcast_sd({val_data});")
+@lazy_instr("{out_data} = _mm256_broadcast_sd({val_data});")
 def mm256_broadcast_sd_scalar(out: [f64][4] @ AVX2, val: f64):
     assert stride(out, 0) == 1
 
@@ -139,7 +141,7 @@ def mm256_broadcast_sd_scalar(out: [f64][4] @ AVX2, val: f64):
         out[i] = val
 
 
-@instr("{dst_data} = _mm256_fmadd_ps({dst_data}, {lhs_data}, {rhs_data});")
+@lazy_instr("{dst_data} = _mm256_fmadd_ps({dst_data}, {lhs_data}, {rhs_data});")
 def mm256_fmadd_ps_broadcast(
     dst: [f32][8] @ AVX2, lhs: [f32][8] @ AVX2, rhs: [f32][1] @ DRAM
 ):
@@ -150,7 +152,7 @@ def mm256_fmadd_ps_broadcast(
         dst[i] += lhs[i] * rhs[0]
 
 
-@instr("{out_data} = _mm256_mul_ps({x_data}, {y_data});")
+@lazy_instr("{out_data} = _mm256_mul_ps({x_data}, {y_data});")
 def mm256_mul_ps(out: [f32][8] @ AVX2, x: [f32][8] @ AVX2, y: [f32][8] @ AVX2):
     assert stride(out, 0) == 1
     assert stride(x, 0) == 1
@@ -160,7 +162,7 @@ def mm256_mul_ps(out: [f32][8] @ AVX2, x: [f32][8] @ AVX2, y: [f32][8] @ AVX2):
         out[i] = x[i] * y[i]
 
 
-@instr("{out_data} = _mm256_mul_pd({x_data}, {y_data});")
+@lazy_instr("{out_data} = _mm256_mul_pd({x_data}, {y_data});")
 def mm256_mul_pd(out: [f64][4] @ AVX2, x: [f64][4] @ AVX2, y: [f64][4] @ AVX2):
     assert stride(out, 0) == 1
     assert stride(x, 0) == 1
@@ -170,7 +172,7 @@ def mm256_mul_pd(out: [f64][4] @ AVX2, x: [f64][4] @ AVX2, y: [f64][4] @ AVX2):
         out[i] = x[i] * y[i]
 
 
-@instr("{out_data} = _mm256_div_ps({x_data}, {y_data});")
+@lazy_instr("{out_data} = _mm256_div_ps({x_data}, {y_data});")
 def mm256_div_ps(out: [f32][8] @ AVX2, x: [f32][8] @ AVX2, y: [f32][8] @ AVX2):
     assert stride(out, 0) == 1
     assert stride(x, 0) == 1
@@ -180,7 +182,7 @@ def mm256_div_ps(out: [f32][8] @ AVX2, x: [f32][8] @ AVX2, y: [f32][8] @ AVX2):
         out[i] = x[i] / y[i]
 
 
-@instr("{out_data} = _mm256_div_pd({x_data}, {y_data});")
+@lazy_instr("{out_data} = _mm256_div_pd({x_data}, {y_data});")
 def mm256_div_pd(out: [f64][4] @ AVX2, x: [f64][4] @ AVX2, y: [f64][4] @ AVX2):
     assert stride(out, 0) == 1
     assert stride(x, 0) == 1
@@ -190,7 +192,7 @@ def mm256_div_pd(out: [f64][4] @ AVX2, x: [f64][4] @ AVX2, y: [f64][4] @ AVX2):
         out[i] = x[i] / y[i]
 
 
-@instr("{out_data} = _mm256_add_ps({x_data}, {y_data});")
+@lazy_instr("{out_data} = _mm256_add_ps({x_data}, {y_data});")
 def mm256_add_ps(out: [f32][8] @ AVX2, x: [f32][8] @ AVX2, y: [f32][8] @ AVX2):
     assert stride(out, 0) == 1
     assert stride(x, 0) == 1
@@ -200,7 +202,7 @@ def mm256_add_ps(out: [f32][8] @ AVX2, x: [f32][8] @ AVX2, y: [f32][8] @ AVX2):
         out[i] = x[i] + y[i]
 
 
-@instr("{out_data} = _mm256_add_pd({x_data}, {y_data});")
+@lazy_instr("{out_data} = _mm256_add_pd({x_data}, {y_data});")
 def mm256_add_pd(out: [f64][4] @ AVX2, x: [f64][4] @ AVX2, y: [f64][4] @ AVX2):
     assert stride(out, 0) == 1
     assert stride(x, 0) == 1
@@ -210,7 +212,7 @@ def mm256_add_pd(out: [f64][4] @ AVX2, x: [f64][4] @ AVX2, y: [f64][4] @ AVX2):
         out[i] = x[i] + y[i]
 
 
-@instr("{out_data} = _mm256_sub_ps({x_data}, {y_data});")
+@lazy_instr("{out_data} = _mm256_sub_ps({x_data}, {y_data});")
 def mm256_sub_ps(out: [f32][8] @ AVX2, x: [f32][8] @ AVX2, y: [f32][8] @ AVX2):
     assert stride(out, 0) == 1
     assert stride(x, 0) == 1
@@ -220,7 +222,7 @@ def mm256_sub_ps(out: [f32][8] @ AVX2, x: [f32][8] @ AVX2, y: [f32][8] @ AVX2):
         out[i] = x[i] - y[i]
 
 
-@instr("{out_data} = _mm256_sub_pd({x_data}, {y_data});")
+@lazy_instr("{out_data} = _mm256_sub_pd({x_data}, {y_data});")
 def mm256_sub_pd(out: [f64][4] @ AVX2, x: [f64][4] @ AVX2, y: [f64][4] @ AVX2):
     assert stride(out, 0) == 1
     assert stride(x, 0) == 1
@@ -230,7 +232,7 @@ def mm256_sub_pd(out: [f64][4] @ AVX2, x: [f64][4] @ AVX2, y: [f64][4] @ AVX2):
         out[i] = x[i] - y[i]
 
 
-@instr("{dst_data} = _mm256_loadu_si256((const __m256i *) &{src_data});")
+@lazy_instr("{dst_data} = _mm256_loadu_si256((const __m256i *) &{src_data});")
 def mm256_loadu_si256(dst: [ui16][16] @ AVX2, src: [ui16][16] @ DRAM):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -239,7 +241,7 @@ def mm256_loadu_si256(dst: [ui16][16] @ AVX2, src: [ui16][16] @ DRAM):
         dst[i] = src[i]
 
 
-@instr("_mm256_storeu_si256((__m256i *) &{dst_data}, {src_data});")
+@lazy_instr("_mm256_storeu_si256((__m256i *) &{dst_data}, {src_data});")
 def mm256_storeu_si256(dst: [ui16][16] @ DRAM, src: [ui16][16] @ AVX2):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -248,7 +250,7 @@ def mm256_storeu_si256(dst: [ui16][16] @ DRAM, src: [ui16][16] @ AVX2):
         dst[i] = src[i]
 
 
-@instr("{out_data} = _mm256_adds_epu16({x_data}, {y_data});")
+@lazy_instr("{out_data} = _mm256_adds_epu16({x_data}, {y_data});")
 def mm256_add_epi16(out: [ui16][16] @ AVX2, x: [ui16][16] @ AVX2, y: [ui16][16] @ AVX2):
     assert stride(out, 0) == 1
     assert stride(x, 0) == 1
@@ -263,7 +265,7 @@ def mm256_add_epi16(out: [ui16][16] @ AVX2, x: [ui16][16] @ AVX2, y: [ui16][16]
 # --------------------------------------------------------------------------- #
 
 
-@instr("{dst_data} = _mm512_setzero_ps();")
+@lazy_instr("{dst_data} = _mm512_setzero_ps();")
 def mm512_setzero_ps(dst: [f32][16] @ AVX512):
     assert stride(dst, 0) == 1
 
@@ -271,7 +273,7 @@ def mm512_setzero_ps(dst: [f32][16] @ AVX512):
         dst[i] = 0.0
 
 
-@instr("{out_data} = _mm512_add_ps({x_data}, {y_data});")
+@lazy_instr("{out_data} = _mm512_add_ps({x_data}, {y_data});")
 def mm512_add_ps(out: [f32][16] @ AVX512, x: [f32][16] @ AVX512, y: [f32][16] @ AVX512):
     assert stride(out, 0) == 1
     assert stride(x, 0) == 1
@@ -281,7 +283,17 @@ def mm512_add_ps(out: [f32][16] @ AVX512, x: [f32][16] @ AVX512, y: [f32][16] @
         out[i] = x[i] + y[i]
 
 
-@instr(
+@lazy_instr("{out_data} = _mm512_mul_ps({x_data}, {y_data});")
+def mm512_mul_ps(out: [f32][16] @ AVX512, x: [f32][16] @ AVX512, y: [f32][16] @ AVX512):
+    assert stride(out, 0) == 1
+    assert stride(x, 0) == 1
+    assert stride(y, 0) == 1
+
+    for i in seq(0, 16):
+        out[i] = x[i] * y[i]
+
+
+@lazy_instr(
     "{out_data} = _mm512_mask_add_ps({out_data}, ((1 << {N}) - 1), {x_data}, {y_data});"
 )
 def mm512_mask_add_ps(
@@ -296,7 +308,7 @@ def mm512_mask_add_ps(
             out[i] = x[i] + y[i]
 
 
-@instr("{dst_data} = _mm512_loadu_ps(&{src_data});")
+@lazy_instr("{dst_data} = _mm512_loadu_ps(&{src_data});")
 def mm512_loadu_ps(dst: [f32][16] @ AVX512, src: [f32][16] @ DRAM):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -305,7 +317,7 @@ def mm512_loadu_ps(dst: [f32][16] @ AVX512, src: [f32][16] @ DRAM):
         dst[i] = src[i]
 
 
-@instr("_mm512_storeu_ps(&{dst_data}, {src_data});")
+@lazy_instr("_mm512_storeu_ps(&{dst_data}, {src_data});")
 def mm512_storeu_ps(dst: [f32][16] @ DRAM, src: [f32][16] @ AVX512):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -314,7 +326,7 @@ def mm512_storeu_ps(dst: [f32][16] @ DRAM, src: [f32][16] @ AVX512):
         dst[i] = src[i]
 
 
-@instr("{dst_data} = _mm512_maskz_loadu_ps(((1 << {N}) - 1), &{src_data});")
+@lazy_instr("{dst_data} = _mm512_maskz_loadu_ps(((1 << {N}) - 1), &{src_data});")
 def mm512_maskz_loadu_ps(
     N: size,
     dst: [f32][16] @ AVX512,
@@ -329,7 +341,7 @@ def mm512_maskz_loadu_ps(
             dst[i] = src[i]
 
 
-@instr("_mm512_mask_storeu_ps(&{dst_data}, ((1 << {N}) - 1), {src_data});")
+@lazy_instr("_mm512_mask_storeu_ps(&{dst_data}, ((1 << {N}) - 1), {src_data});")
 def mm512_mask_storeu_ps(N: size, dst: [f32][N] @ DRAM, src: [f32][16] @ AVX512):
     assert stride(src, 0) == 1
     assert stride(dst, 0) == 1
@@ -340,7 +352,7 @@ def mm512_mask_storeu_ps(N: size, dst: [f32][N] @ DRAM, src: [f32][16] @ AVX512)
             dst[i] = src[i]
 
 
-@instr("{C_data} = _mm512_fmadd_ps({A_data}, {B_data}, {C_data});")
+@lazy_instr("{C_data} = _mm512_fmadd_ps({A_data}, {B_data}, {C_data});")
 def mm512_fmadd_ps(
     A: [f32][16] @ AVX512,
     B: [f32][16] @ AVX512,
@@ -354,7 +366,7 @@ def mm512_fmadd_ps(
         C[i] += A[i] * B[i]
 
 
-@instr(
+@lazy_instr(
     "{C_data} = _mm512_mask_fmadd_ps({A_data}, ((1 << {N}) - 1), {B_data}, {C_data});"
 )
 def mm512_mask_fmadd_ps(
@@ -374,7 +386,7 @@ def mm512_mask_fmadd_ps(
             C[i] += A[i] * B[i]
 
 
-@instr("{dst_data} = _mm512_max_ps({src_data}, (__m512){{0}});")
+@lazy_instr("{dst_data} = _mm512_max_ps({src_data}, (__m512){{0}});")
 def mm512_relu_ps(dst: [f32][16] @ AVX512, src: [f32][16] @ AVX512):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -390,7 +402,7 @@ def mm512_relu_ps(dst: [f32][16] @ AVX512, src: [f32][16] @ AVX512):
 #  overcompute. We'll revisit the proper way of doing this post-deadline.
 
 
-@instr("{dst_data} = _mm512_set1_ps({src_data});")
+@lazy_instr("{dst_data} = _mm512_set1_ps({src_data});")
 def mm512_mask_set1_ps(
     N: size,
     dst: [f32][16] @ AVX512,
@@ -408,7 +420,7 @@ def mm512_mask_set1_ps(
 # ---------------------------------------------------------------------------- #
 
 
-@instr("{dst_data} = _mm512_set1_ps({src_data});")
+@lazy_instr("{dst_data} = _mm512_set1_ps({src_data});")
 def mm512_set1_ps(
     dst: [f32][16] @ AVX512,
     src: [f32][1],
@@ -419,12 +431,20 @@ def mm512_set1_ps(
         dst[i] = src[0]
 
 
+@lazy_instr("{dst_data} = _mm512_set1_ps({src_data});")
+def mm512_set1_ps_scalar(dst: [f32][16] @ AVX512, src: f32):
+    assert stride(dst, 0) == 1
+
+    for i in seq(0, 16):
+        dst[i] = src
+
+
 # --------------------------------------------------------------------------- #
 #   Complex AVX2 operations
 # --------------------------------------------------------------------------- #
 
 
-@instr("{out_data} = _mm256_xor_ps({out_data}, {out_data});")
+@lazy_instr("{out_data} = _mm256_xor_ps({out_data}, {out_data});")
 def avx2_set0_ps(out: [f32][8] @ AVX2):
     assert stride(out, 0) == 1
 
@@ -432,7 +452,7 @@ def avx2_set0_ps(out: [f32][8] @ AVX2):
         out[i] = 0.0
 
 
-@instr(
+@lazy_instr(
     """
 {{
   __m256 ones = {{ 1.0f, 1.0f, 1.0f, 1.0f, 1.0f, 1.0f, 1.0f, 1.0f }};
@@ -449,7 +469,7 @@ def avx2_fmadd_memu_ps(dst: [f32][8] @ DRAM, val: [f32][8] @ AVX2):
         dst[i] += val[i]
 
 
-@instr(
+@lazy_instr(
     """
 {out_data} = _mm256_blendv_ps ({z_data}, {y_data}, 
 _mm256_cmp_ps ({x_data}, {v_data}, _CMP_LT_OQ));
@@ -475,7 +495,7 @@ def avx2_select_ps(
         out[i] = select(x[i], v[i], y[i], z[i])
 
 
-@instr(
+@lazy_instr(
     """
 {out_data} = _mm256_blendv_pd ({z_data}, {y_data},
 _mm256_cmp_pd ({x_data}, {v_data}, _CMP_LT_OQ));
@@ -498,7 +518,7 @@ def avx2_select_pd(
         out[i] = select(x[i], v[i], y[i], z[i])
 
 
-@instr(
+@lazy_instr(
     """
     {{
         __m256 tmp = _mm256_hadd_ps({x_data}, {x_data});
@@ -516,7 +536,7 @@ def avx2_assoc_reduce_add_ps(x: [f32][8] @ AVX2, result: f32):
         result += x[i]
 
 
-@instr(
+@lazy_instr(
     """
     {{
         __m256d tmp = _mm256_hadd_pd({x_data}, {x_data});
@@ -533,7 +553,7 @@ def avx2_assoc_reduce_add_pd(x: [f64][4] @ AVX2, result: f64):
         result += x[i]
 
 
-@instr("{dst_data} = _mm256_mul_ps({src_data}, _mm256_set1_ps(-1.0f));")
+@lazy_instr("{dst_data} = _mm256_mul_ps({src_data}, _mm256_set1_ps(-1.0f));")
 def avx2_sign_ps(dst: [f32][8] @ AVX2, src: [f32][8] @ AVX2):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -542,7 +562,7 @@ def avx2_sign_ps(dst: [f32][8] @ AVX2, src: [f32][8] @ AVX2):
         dst[i] = -src[i]
 
 
-@instr("{dst_data} = _mm256_mul_pd({src_data}, _mm256_set1_pd(-1.0f));")
+@lazy_instr("{dst_data} = _mm256_mul_pd({src_data}, _mm256_set1_pd(-1.0f));")
 def avx2_sign_pd(dst: [f64][4] @ AVX2, src: [f64][4] @ AVX2):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -551,7 +571,7 @@ def avx2_sign_pd(dst: [f64][4] @ AVX2, src: [f64][4] @ AVX2):
         dst[i] = -src[i]
 
 
-@instr("{dst_data} = _mm256_add_ps({src_data}, {dst_data});")
+@lazy_instr("{dst_data} = _mm256_add_ps({src_data}, {dst_data});")
 def avx2_reduce_add_wide_ps(dst: [f32][8] @ AVX2, src: [f32][8] @ AVX2):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -560,7 +580,7 @@ def avx2_reduce_add_wide_ps(dst: [f32][8] @ AVX2, src: [f32][8] @ AVX2):
         dst[i] += src[i]
 
 
-@instr("{dst_data} = _mm256_add_pd({src_data}, {dst_data});")
+@lazy_instr("{dst_data} = _mm256_add_pd({src_data}, {dst_data});")
 def avx2_reduce_add_wide_pd(dst: [f64][4] @ AVX2, src: [f64][4] @ AVX2):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -571,7 +591,7 @@ def avx2_reduce_add_wide_pd(dst: [f64][4] @ AVX2, src: [f64][4] @ AVX2):
 
 # TODO: Hack for procedure aliasing issue, can be deleted once we have
 #      better way of handling aliasing
-@instr("{dst_data} = {src_data};")
+@lazy_instr("{dst_data} = {src_data};")
 def avx2_reg_copy_ps(dst: [f32][8] @ AVX2, src: [f32][8] @ AVX2):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -580,7 +600,7 @@ def avx2_reg_copy_ps(dst: [f32][8] @ AVX2, src: [f32][8] @ AVX2):
         dst[i] = src[i]
 
 
-@instr("{dst_data} = {src_data};")
+@lazy_instr("{dst_data} = {src_data};")
 def avx2_reg_copy_pd(dst: [f64][4] @ AVX2, src: [f64][4] @ AVX2):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -589,7 +609,7 @@ def avx2_reg_copy_pd(dst: [f64][4] @ AVX2, src: [f64][4] @ AVX2):
         dst[i] = src[i]
 
 
-@instr(
+@lazy_instr(
     "__m256i opaque = _mm256_set1_epi8((1<<{N}) - 1);\n"
     + "_mm256_maskstore_ps(&{dst_data}, opaque, {src_data});"
 )
@@ -605,7 +625,7 @@ def avx2_mask_storeu_ps(N: size, dst: [f32][N] @ DRAM, src: [f32][8] @ AVX2):
 
 # TODO: This is hacked specifically for the 2D blur with kernel size 3. We should
 # be able to support fast integer division instruction selection in a better way.
-@instr(
+@lazy_instr(
     """
     {{
         {out_data} = _mm256_mulhi_epu16({x_data}, _mm256_set1_epi16(43691));
@@ -626,7 +646,7 @@ def avx2_ui16_divide_by_3(out: [ui16][16] @ AVX2, x: [ui16][16] @ AVX2):
 # --------------------------------------------------------------------------- #
 
 
-@instr(
+@lazy_instr(
     """
 {{
 __m256i indices = _mm256_set_epi32(7, 6, 5, 4, 3, 2, 1, 0);
@@ -645,7 +665,7 @@ def mm256_prefix_load_ps(dst: [f32][8] @ AVX2, src: [f32][8] @ DRAM, bound: size
             dst[i] = src[i]
 
 
-@instr(
+@lazy_instr(
     """
 {{
 __m256i indices = _mm256_set_epi32(7, 6, 5, 4, 3, 2, 1, 0);
@@ -664,7 +684,7 @@ def mm256_prefix_store_ps(dst: [f32][8] @ DRAM, src: [f32][8] @ AVX2, bound: siz
             dst[i] = src[i]
 
 
-@instr(
+@lazy_instr(
     """
 {{
 __m256i indices = _mm256_set_epi32(7, 6, 5, 4, 3, 2, 1, 0);
@@ -688,7 +708,7 @@ def mm256_prefix_add_ps(
             out[i] = x[i] + y[i]
 
 
-@instr(
+@lazy_instr(
     """
 {{
 __m256i indices = _mm256_set_epi32(7, 6, 5, 4, 3, 2, 1, 0);
@@ -712,7 +732,7 @@ def mm256_prefix_mul_ps(
             out[i] = x[i] * y[i]
 
 
-@instr(
+@lazy_instr(
     """
 {{
 __m256i indices = _mm256_set_epi32(7, 6, 5, 4, 3, 2, 1, 0);
@@ -736,7 +756,7 @@ def mm256_prefix_sub_ps(
             out[i] = x[i] - y[i]
 
 
-@instr(
+@lazy_instr(
     """
 {{
 __m256i indices = _mm256_set_epi32(7, 6, 5, 4, 3, 2, 1, 0);
@@ -760,7 +780,7 @@ def mm256_prefix_div_ps(
             out[i] = x[i] / y[i]
 
 
-@instr(
+@lazy_instr(
     """
 {{
 __m256i indices = _mm256_set_epi32(7, 6, 5, 4, 3, 2, 1, 0);
@@ -785,7 +805,7 @@ def mm256_prefix_broadcast_ss(out: [f32][8] @ AVX2, val: [f32][1], bound: size):
 # --------------------------------------------------------------------------- #
 
 
-@instr("{dst_data} = _mm256_cvtps_pd(_mm256_extractf128_ps({src_data}, 0));")
+@lazy_instr("{dst_data} = _mm256_cvtps_pd(_mm256_extractf128_ps({src_data}, 0));")
 def avx2_convert_f32_lower_to_f64(dst: [f64][4] @ AVX2, src: [f32][8] @ AVX2):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
@@ -794,10 +814,57 @@ def avx2_convert_f32_lower_to_f64(dst: [f64][4] @ AVX2, src: [f32][8] @ AVX2):
         dst[i] = src[i]
 
 
-@instr("{dst_data} = _mm256_cvtps_pd(_mm256_extractf128_ps({src_data}, 1));")
+@lazy_instr("{dst_data} = _mm256_cvtps_pd(_mm256_extractf128_ps({src_data}, 1));")
 def avx2_convert_f32_upper_to_f64(dst: [f64][4] @ AVX2, src: [f32][8] @ AVX2):
     assert stride(dst, 0) == 1
     assert stride(src, 0) == 1
 
     for i in seq(0, 4):
         dst[i] = src[4 + i]
+
+
+# --------------------------------------------------------------------------- #
+#   Instruction sets, by precision
+# --------------------------------------------------------------------------- #
+
+# e.g. for `replace_all` and `exo.stdlib.auto_schedule`; the masked and
+# prefix variants, which are selected explicitly, are left out
+avx2_instrs = {
+    "f32": [
+        mm256_loadu_ps,
+        mm256_storeu_ps,
+        mm256_fmadd_ps,
+        mm256_broadcast_ss,
+        mm256_broadcast_ss_scalar,
+        mm256_mul_ps,
+        mm256_add_ps,
+        mm256_sub_ps,
+        mm256_div_ps,
+        avx2_set0_ps,
+    ],
+    "f64": [
+        mm256_loadu_pd,
+        mm256_storeu_pd,
+        mm256_fmadd_pd,
+        mm256_broadcast_sd,
+        mm256_broadcast_sd_scalar,
+        mm256_mul_pd,
+        mm256_add_pd,
+        mm256_sub_pd,
+        mm256_div_pd,
+    ],
+}
+
+avx512_instrs = {
+    "f32": [
+        mm512_loadu_ps,
+        mm512_storeu_ps,
+        mm512_fmadd_ps,
+        mm512_set1_ps,
+        mm512_set1_ps_scalar,
+        mm512_mul_ps,
+        mm512_add_ps,
+        mm512_relu_ps,
+        mm512_setzero_ps,
+    ],
+}
@@ -173,17 +173,10 @@ def _compose(f, g):
     return lambda x: f(g(x))
 
 
-def _replace_helper(c, c_repl, only_replace_attrs):
+def _replace_helper(edits, c, c_repl, only_replace_attrs):
     if only_replace_attrs:
-        ir, fwd_s = c.get_root(), lambda x: x
         assert isinstance(c_repl, dict)
-        for attr in c_repl.keys():
-            if attr in ["body", "orelse", "idx"]:
-                ir, fwd_attr = fwd_s(c)._child_block(attr)._replace(c_repl[attr])
-            else:
-                ir, fwd_attr = fwd_s(c)._child_node(attr)._replace(c_repl[attr])
-            fwd_s = _compose(fwd_attr, fwd_s)
-        return ir, fwd_s
+        edits.update(c, **c_repl)
     else:
         if (
             isinstance(c, ic.Block)
@@ -192,41 +185,34 @@ def _replace_helper(c, c_repl, only_replace_attrs):
             and c.get_index() is not None
         ):
             c_repl = [c_repl]
-        return c._replace(c_repl)
+        edits.replace(c, c_repl)
 
 
 def _replace_pats(ir, fwd, c, pat, repl, only_replace_attrs=True, use_sym_id=True):
-    # TODO: consider the implications of composing O(n) forwarding functions.
-    #   will we need a special data structure? A chunkier operation for
-    #   multi-way replacement?
     c = fwd(c)
-    todos = []
+    edits = ic.BatchEdit(c._root)
     for rd in match_pattern(c, pat, use_sym_id=use_sym_id):
         if c_repl := repl(rd):
-            todos.append((rd, c_repl))
+            _replace_helper(edits, rd, c_repl, only_replace_attrs)
 
-    cur_fwd = lambda x: x
-    for (rd, c_repl) in todos:
-        rd = cur_fwd(rd)
-        ir, fwd_rd = _replace_helper(rd, c_repl, only_replace_attrs)
-        cur_fwd = _compose(fwd_rd, cur_fwd)
-    return ir, _compose(cur_fwd, fwd)
+    if not edits:
+        return ir, fwd
+    ir, fwd_repl = edits.commit()
+    return ir, _compose(fwd_repl, fwd)
 
 
 def _replace_reads(ir, fwd, c, sym, repl, only_replace_attrs=True):
     c = fwd(c)
-    todos = []
+    edits = ic.BatchEdit(c._root)
     for rd in match_pattern(c, f"{repr(sym)}[_]", use_sym_id=True):
         # Need [_] to pattern match against window expressions
         if c_repl := repl(rd):
-            todos.append((rd, c_repl))
+            _replace_helper(edits, rd, c_repl, only_replace_attrs)
 
-    cur_fwd = lambda x: x
-    for (rd, c_repl) in todos:
-        rd = cur_fwd(rd)
-        ir, fwd_rd = _replace_helper(rd, c_repl, only_replace_attrs)
-        cur_fwd = _compose(fwd_rd, cur_fwd)
-    return ir, _compose(cur_fwd, fwd)
+    if not edits:
+        return ir, fwd
+    ir, fwd_repl = edits.commit()
+    return ir, _compose(fwd_repl, fwd)
 
 
 def _replace_writes(
@@ -241,20 +227,17 @@ def _replace_writes(
     if match_reduce:
         matches = matches + match_pattern(c, f"{repr(sym)} += _", use_sym_id=True)
 
-    todos = []
+    edits = ic.BatchEdit(c._root)
     for block in matches:
         assert len(block) == 1  # match_pattern on stmts return blocks
         s = block[0]
         if c_repl := repl(s):
-            todos.append((s, c_repl))
-
-    cur_fwd = lambda x: x
-    for (s, c_repl) in todos:
-        s = cur_fwd(s)
-        ir, fwd_s = _replace_helper(s, c_repl, only_replace_attrs)
-        cur_fwd = _compose(fwd_s, cur_fwd)
+            _replace_helper(edits, s, c_repl, only_replace_attrs)
 
-    return ir, _compose(cur_fwd, fwd)
+    if not edits:
+        return ir, fwd
+    ir, fwd_repl = edits.commit()
+    return ir, _compose(fwd_repl, fwd)
 
 
 def get_rest_of_block(c, inclusive=False):
@@ -1263,6 +1246,7 @@ def DoBindExpr(new_name, expr_cursors):
     ir, fwd = init_s.before()._insert([alloc_s, assign_s])
 
     new_read = LoopIR.Read(new_name, [], expr.type, expr.srcinfo)
+    edits = ic.BatchEdit(ir)
     first_write_c = None
     for c in get_rest_of_block(init_s, inclusive=True):
         for block in match_pattern(c, "_ = _") + match_pattern(c, "_ += _"):
@@ -1277,10 +1261,9 @@ def DoBindExpr(new_name, expr_cursors):
             break
 
         while expr_cursors and c.is_ancestor_of(expr_cursors[0]):
-            ir, fwd_repl = _replace_helper(
-                fwd(expr_cursors[0]), new_read, only_replace_attrs=False
+            _replace_helper(
+                edits, fwd(expr_cursors[0]), new_read, only_replace_attrs=False
             )
-            fwd = _compose(fwd_repl, fwd)
             expr_cursors.pop(0)
 
         if first_write_c:
@@ -1289,6 +1272,9 @@ def DoBindExpr(new_name, expr_cursors):
     if len(expr_cursors) > 0:
         raise SchedulingError("Unsafe to bind all of the provided exprs.")
 
+    ir, fwd_repl = edits.commit()
+    fwd = _compose(fwd_repl, fwd)
+
     Check_Aliasing(ir)
     return ir, fwd
 
@@ -2891,18 +2877,17 @@ class _DoNormalize(Cursor_Rewrite):
         self.C = Sym("temporary_constant_symbol")
         self.env = IndexRangeEnvironment(proc._loopir_proc)
 
-        self.ir = proc._loopir_proc
-        self.fwd = lambda x: x
+        self.edits = ic.BatchEdit(proc._loopir_proc)
 
         super().__init__(proc)
 
-        # need to update self.ir with pred changes
-        new_preds = self.map_exprs(self.ir.preds)
+        # need to update the predicates as well
+        root = ic.Cursor.create(proc._loopir_proc)
+        new_preds = self.map_exprs(root._node.preds)
         if new_preds:
-            self.ir, fwd = (
-                ic.Cursor.create(self.ir)._child_block("preds")._replace(new_preds)
-            )
-            self.fwd = _compose(fwd, self.fwd)
+            self.edits.replace(root._child_block("preds"), new_preds)
+
+        self.ir, self.fwd = self.edits.commit()
 
     def result(self, **kwargs):
         return api.Procedure(
@@ -3216,20 +3201,17 @@ class _DoNormalize(Cursor_Rewrite):
             self.env.exit_scope()
 
             if new_cond:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("cond")._replace(new_cond)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("cond"), new_cond)
         elif isinstance(s, LoopIR.For):
             new_lo = self.map_e(s.lo)
             new_hi = self.map_e(s.hi)
 
             if new_lo:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("lo")._replace(new_lo)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("lo"), new_lo)
             else:
                 new_lo = s.lo
             if new_hi:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("hi")._replace(new_hi)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("hi"), new_hi)
             else:
                 new_hi = s.hi
 
@@ -3246,29 +3228,23 @@ class _DoNormalize(Cursor_Rewrite):
             new_idx = self.map_exprs(s.idx)
             new_rhs = self.map_e(s.rhs)
             if new_type:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("type")._replace(new_type)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("type"), new_type)
             if new_idx:
-                self.ir, fwd_repl = self.fwd(sc)._child_block("idx")._replace(new_idx)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_block("idx"), new_idx)
             if new_rhs:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("rhs")._replace(new_rhs)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("rhs"), new_rhs)
         elif isinstance(s, (LoopIR.WriteConfig, LoopIR.WindowStmt)):
             new_rhs = self.map_e(s.rhs)
             if new_rhs:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("rhs")._replace(new_rhs)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("rhs"), new_rhs)
         elif isinstance(s, LoopIR.Call):
             new_args = self.map_exprs(s.args)
             if new_args:
-                self.ir, fwd_repl = self.fwd(sc)._child_block("args")._replace(new_args)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_block("args"), new_args)
         elif isinstance(s, LoopIR.Alloc):
             new_type = self.map_t(s.type)
             if new_type:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("type")._replace(new_type)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("type"), new_type)
         elif isinstance(s, LoopIR.Pass):
             pass
         else:
@@ -3283,17 +3259,16 @@ class DoSimplify(Cursor_Rewrite):
 
         self.facts = ChainMap()
 
-        self.ir = proc._loopir_proc
-        self.fwd = lambda x: x
+        self.edits = ic.BatchEdit(proc._loopir_proc)
 
         super().__init__(proc)
 
         # might need to update IR with predicate changes
-        if new_preds := self.map_exprs(self.ir.preds):
-            self.ir, fwd = (
-                ic.Cursor.create(self.ir)._child_block("preds")._replace(new_preds)
-            )
-            self.fwd = _compose(fwd, self.fwd)
+        root = ic.Cursor.create(proc._loopir_proc)
+        if new_preds := self.map_exprs(root._node.preds):
+            self.edits.replace(root._child_block("preds"), new_preds)
+
+        self.ir, self.fwd = self.edits.commit()
 
     def cfold(self, op, lhs, rhs):
         if op == "+":
@@ -3495,19 +3470,11 @@ class DoSimplify(Cursor_Rewrite):
             # If constant true or false, then drop the branch
             if isinstance(safe_cond, LoopIR.Const):
                 if safe_cond.val:
-                    self.ir, fwd_move = self.fwd(sc).body()._move(self.fwd(sc).before())
-                    self.fwd = _compose(fwd_move, self.fwd)
-                    self.ir, fwd_del = self.fwd(sc)._delete()
-                    self.fwd = _compose(fwd_del, self.fwd)
+                    self.edits.lift(sc, "body")
                     self.map_stmts(sc.body())
                     return
                 else:
-                    self.ir, fwd_move = (
-                        self.fwd(sc).orelse()._move(self.fwd(sc).before())
-                    )
-                    self.fwd = _compose(fwd_move, self.fwd)
-                    self.ir, fwd_del = self.fwd(sc)._delete()
-                    self.fwd = _compose(fwd_del, self.fwd)
+                    self.edits.lift(sc, "orelse")
                     self.map_stmts(sc.orelse())
                     return
 
@@ -3524,8 +3491,7 @@ class DoSimplify(Cursor_Rewrite):
             self.facts = self.facts.parents
 
             if cond:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("cond")._replace(cond)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("cond"), cond)
         elif isinstance(s, LoopIR.For):
             lo = self.map_e(s.lo)
             hi = self.map_e(s.hi)
@@ -3536,51 +3502,37 @@ class DoSimplify(Cursor_Rewrite):
                 and isinstance(lo, LoopIR.Const)
                 and hi.val == lo.val
             ):
-                self.ir, fwd_del = self.fwd(sc)._delete()
-                self.fwd = _compose(fwd_del, self.fwd)
+                self.edits.delete(sc)
                 return
 
-            # Delete the loop if it would have an empty body
             self.map_stmts(sc.body())
-            if self.fwd(sc).body() == []:
-                self.ir, fwd_del = self.fwd(sc)._delete()
-                self.fwd = _compose(fwd_del, self.fwd)
-                return
 
             if lo:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("lo")._replace(lo)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("lo"), lo)
             if hi:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("hi")._replace(hi)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("hi"), hi)
         elif isinstance(s, (LoopIR.Assign, LoopIR.Reduce)):
             new_type = self.map_t(s.type)
             new_idx = self.map_exprs(s.idx)
             new_rhs = self.map_e(s.rhs)
             if new_type:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("type")._replace(new_type)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("type"), new_type)
             if new_idx:
-                self.ir, fwd_repl = self.fwd(sc)._child_block("idx")._replace(new_idx)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_block("idx"), new_idx)
             if new_rhs:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("rhs")._replace(new_rhs)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("rhs"), new_rhs)
         elif isinstance(s, (LoopIR.WriteConfig, LoopIR.WindowStmt)):
             new_rhs = self.map_e(s.rhs)
             if new_rhs:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("rhs")._replace(new_rhs)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("rhs"), new_rhs)
         elif isinstance(s, LoopIR.Call):
             new_args = self.map_exprs(s.args)
             if new_args:
-                self.ir, fwd_repl = self.fwd(sc)._child_block("args")._replace(new_args)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_block("args"), new_args)
         elif isinstance(s, LoopIR.Alloc):
             new_type = self.map_t(s.type)
             if new_type:
-                self.ir, fwd_repl = self.fwd(sc)._child_node("type")._replace(new_type)
-                self.fwd = _compose(fwd_repl, self.fwd)
+                self.edits.replace(sc._child_node("type"), new_type)
         elif isinstance(s, LoopIR.Pass):
             return None
         else:
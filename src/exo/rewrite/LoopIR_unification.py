@@ -1,12 +1,14 @@
 import functools
 import itertools
+import math
 import re
 from collections import ChainMap
+from weakref import WeakKeyDictionary
 
 import pysmt
-from asdl_adt import ADT
 from pysmt import shortcuts as SMT
 
+from ..core.adt import ADT
 from ..core.LoopIR import (
     LoopIR,
     T,
@@ -22,12 +24,20 @@ from .new_eff import Check_Aliasing
 import exo.core.internal_cursors as ic
 
 
+_smt_solver = None
+
+
 def _get_smt_solver():
-    factory = pysmt.factory.Factory(pysmt.shortcuts.get_env())
-    slvs = factory.all_solvers()
-    if len(slvs) == 0:
-        raise OSError("Could not find any SMT solvers")
-    return pysmt.shortcuts.Solver(name=next(iter(slvs)))
+    # creating a solver is expensive, and each query is pushed and popped
+    # from its assertion stack, so the solver is shared between problems
+    global _smt_solver
+    if _smt_solver is None:
+        factory = pysmt.factory.Factory(pysmt.shortcuts.get_env())
+        slvs = factory.all_solvers()
+        if len(slvs) == 0:
+            raise OSError("Could not find any SMT solvers")
+        _smt_solver = pysmt.shortcuts.Solver(name=next(iter(slvs)))
+    return _smt_solver
 
 
 def sanitize_str(s):
@@ -78,14 +88,29 @@ def Get_Live_Variables(stmt_cursor):
     return live_vars
 
 
+_renamed_subprocs = WeakKeyDictionary()
+
+
+def _renamed_subproc(subproc):
+    # the renamed copy of a sub-procedure only has to be distinct from the
+    # statement blocks it is unified with, so it can be reused between them
+    if subproc not in _renamed_subprocs:
+        _renamed_subprocs[subproc] = Alpha_Rename(subproc).result()
+    return _renamed_subprocs[subproc]
+
+
 def DoReplace(subproc, block_cursor):
     n_stmts = len(subproc.body)
     if len(block_cursor) < n_stmts:
         raise SchedulingError("Not enough statements to match")
 
-    # prevent name clashes between the statement block and sub-proc
-    temp_subproc = Alpha_Rename(subproc).result()
     stmts = [c._node for c in block_cursor[:n_stmts]]
+    # reject blocks that obviously differ before doing any real work
+    if not any(fa.type == T.stride for fa in subproc.args):
+        check_structure(subproc.body, stmts)
+
+    # prevent name clashes between the statement block and sub-proc
+    temp_subproc = _renamed_subproc(subproc)
     live_vars = Get_Live_Variables(block_cursor[0])
     new_args = Unification(temp_subproc, stmts, live_vars).result()
 
@@ -274,8 +299,327 @@ def sub(x, y):
     return UEq.Add(x, UEq.Scale(-1, y))
 
 
+# Solutions of problems that only differ in the names of their variables,
+# which is common when unifying with the unrolled copies of a block, are
+# shared by keying them on the problem with its variables numbered in
+# order of appearance.
+_solution_cache = dict()
+_SOLUTION_CACHE_SIZE = 4096
+
+
+def _canonical_problem(prob):
+    holes, knowns = set(prob.holes), set(prob.knowns)
+    numbering = {x: i for i, x in enumerate(prob.holes)}
+    kinds = []
+
+    def num(x, kind):
+        if x not in numbering:
+            numbering[x] = len(numbering)
+            kinds.append(kind)
+        return numbering[x]
+
+    def canon_e(e):
+        if isinstance(e, UEq.Const):
+            return e.val
+        elif isinstance(e, UEq.Var):
+            x = e.name
+            return ("v", num(x, "k" if x in knowns else "h" if x in holes else "u"))
+        elif isinstance(e, UEq.Add):
+            return ("+", canon_e(e.lhs), canon_e(e.rhs))
+        elif isinstance(e, UEq.Scale):
+            return ("*", e.coeff, canon_e(e.e))
+        else:
+            assert False, "bad case"
+
+    def canon_p(p):
+        if isinstance(p, UEq.Eq):
+            return ("=", canon_e(p.lhs), canon_e(p.rhs))
+        elif isinstance(p, UEq.Conj):
+            return ("and",) + tuple(canon_p(pp) for pp in p.preds)
+        elif isinstance(p, UEq.Disj):
+            return ("or",) + tuple(canon_p(pp) for pp in p.preds)
+        elif isinstance(p, UEq.Cases):
+            case_var = num(p.case_var, "c")
+            return ("cases", case_var) + tuple(canon_p(pp) for pp in p.cases)
+        else:
+            assert False, "bad case"
+
+    preds = tuple(canon_p(p) for p in prob.preds)
+    key = (len(prob.holes), tuple(kinds), preds)
+    return key, numbering
+
+
+def _to_canonical(solutions, numbering):
+    # returns None if a solution uses a variable absent from the problem
+    def canon_e(e):
+        if isinstance(e, UEq.Const):
+            return ("c", e.val)
+        elif isinstance(e, UEq.Var):
+            if e.name not in numbering:
+                raise KeyError(e.name)
+            return ("v", numbering[e.name])
+        elif isinstance(e, UEq.Add):
+            return ("+", canon_e(e.lhs), canon_e(e.rhs))
+        else:
+            return ("*", e.coeff, canon_e(e.e))
+
+    try:
+        return {
+            numbering[x]: v if isinstance(v, int) else canon_e(v)
+            for x, v in solutions.items()
+        }
+    except KeyError:
+        return None
+
+
+def _from_canonical(solutions, syms):
+    def subst_e(e):
+        if e[0] == "c":
+            return UEq.Const(e[1])
+        elif e[0] == "v":
+            return UEq.Var(syms[e[1]])
+        elif e[0] == "+":
+            return UEq.Add(subst_e(e[1]), subst_e(e[2]))
+        else:
+            return UEq.Scale(e[1], subst_e(e[2]))
+
+    # case decisions are plain integers
+    return {
+        syms[i]: v if isinstance(v, int) else subst_e(v) for i, v in solutions.items()
+    }
+
+
+# how many problems were solved by each method
+_solver_counts = {"memoized": 0, "closed_form": 0, "smt": 0}
+
+
+def solver_stats():
+    """
+    The number of unification problems that were answered from the memo of
+    earlier solutions, solved in closed form, and solved with an SMT solver,
+    and the fraction of them that did not need the SMT solver
+    """
+    stats = dict(_solver_counts)
+    total = sum(stats.values())
+    stats["without_smt"] = 1.0 - stats["smt"] / total if total > 0 else 1.0
+    return stats
+
+
 @extclass(UEq.problem)
 def solve(prob):
+    key, numbering = _canonical_problem(prob)
+    if key in _solution_cache:
+        _solver_counts["memoized"] += 1
+        solutions = _solution_cache[key]
+        if solutions is None:
+            return None
+        syms = {i: x for x, i in numbering.items()}
+        return _from_canonical(solutions, syms)
+
+    eqs, cases = [], []
+    if all(_split_cases(p, eqs, cases) for p in prob.preds) and (
+        math.prod(len(c) for _, c in cases) <= _MAX_CASE_COMBINATIONS
+    ):
+        _solver_counts["closed_form"] += 1
+        solutions = _solve_closed_form(prob, eqs, cases)
+    else:
+        _solver_counts["smt"] += 1
+        solutions = _solve_smt(prob)
+
+    if solutions is None:
+        canonical = None
+    elif (canonical := _to_canonical(solutions, numbering)) is None:
+        return solutions
+
+    if len(_solution_cache) >= _SOLUTION_CACHE_SIZE:
+        _solution_cache.clear()
+    _solution_cache[key] = canonical
+    return solutions
+
+
+def _solution_expr(knowns, vals):
+    # the affine combination of `knowns` with coefficients `vals`, followed
+    # by a constant offset
+    expr = None
+    for xx, v in zip(knowns, vals):
+        v = int(v)
+        if v == 0:
+            continue
+        elif v == 1:
+            term = UEq.Var(xx)
+        else:
+            term = UEq.Scale(v, UEq.Var(xx))
+
+        expr = term if expr is None else UEq.Add(expr, term)
+
+    # constant offset
+    off = UEq.Const(int(vals[-1]))
+    return off if expr is None else UEq.Add(expr, off)
+
+
+def _split_cases(p, eqs, cases):
+    """
+    Collects the equations of `p` that must hold in `eqs`, and its `Cases`
+    in `cases`.  Returns False if `p` has a disjunction, or cases that are
+    not themselves conjunctions of equations.
+    """
+    if isinstance(p, UEq.Eq):
+        eqs.append(p)
+    elif isinstance(p, UEq.Conj):
+        return all(_split_cases(pp, eqs, cases) for pp in p.preds)
+    elif isinstance(p, UEq.Cases):
+        case_eqs = []
+        for c in p.cases:
+            case_eqs.append([])
+            nested = []
+            if not _split_cases(c, case_eqs[-1], nested) or nested:
+                return False
+        cases.append((p.case_var, case_eqs))
+    else:
+        return False
+    return True
+
+
+# the most combinations of cases to try before using the SMT solver
+_MAX_CASE_COMBINATIONS = 256
+
+
+def _solve_closed_form(prob, eqs, cases):
+    """
+    Solves a problem with the equations `eqs` and the `cases` collected by
+    `_split_cases`, trying each combination of cases in order.  Each hole
+    is solved for as an affine combination of the knowns, so every
+    equation splits into one equation per known (and one for the constant
+    terms) over the coefficients of the holes, all with the same left-hand
+    side.  Those are integer linear systems, solved exactly with a Hermite
+    normal form.
+    """
+    knowns = prob.knowns
+    known_idx = {k: i for i, k in enumerate(knowns)}
+    hole_idx = {k: i for i, k in enumerate(prob.holes)}
+    Nk, Nh = len(knowns), len(prob.holes)
+
+    def linear(e, coeff, hole_cs, rhs, others):
+        # accumulates coeff * e into the row of hole coefficients, and
+        # the negated terms not involving holes into the right-hand sides
+        if isinstance(e, UEq.Const):
+            rhs[Nk] -= coeff * e.val
+        elif isinstance(e, UEq.Var):
+            if e.name in hole_idx:
+                hole_cs[hole_idx[e.name]] += coeff
+            elif e.name in known_idx:
+                rhs[known_idx[e.name]] -= coeff
+            else:
+                others[e.name] = others.get(e.name, 0) + coeff
+        elif isinstance(e, UEq.Add):
+            linear(e.lhs, coeff, hole_cs, rhs, others)
+            linear(e.rhs, coeff, hole_cs, rhs, others)
+        elif isinstance(e, UEq.Scale):
+            linear(e.e, coeff * e.coeff, hole_cs, rhs, others)
+        else:
+            assert False, "bad case"
+
+    def lower(eqs):
+        # returns None if some equation cannot hold
+        rows = []
+        for p in eqs:
+            hole_cs, rhs, others = [0] * Nh, [0] * (Nk + 1), dict()
+            linear(p.lhs, 1, hole_cs, rhs, others)
+            linear(p.rhs, -1, hole_cs, rhs, others)
+            if any(c != 0 for c in others.values()):
+                # variables that are neither holes nor known must cancel
+                return None
+            rows.append((hole_cs, rhs))
+        return rows
+
+    if (rows := lower(eqs)) is None:
+        return None
+    case_rows = [[lower(c) for c in case_eqs] for _, case_eqs in cases]
+
+    for choice in itertools.product(*[range(len(cs)) for cs in case_rows]):
+        system = list(rows)
+        for ci, cs in zip(choice, case_rows):
+            if cs[ci] is None:
+                break
+            system += cs[ci]
+        else:
+            coeffs = _solve_integer_system(
+                [hole_cs for hole_cs, _ in system],
+                [[rhs[j] for _, rhs in system] for j in range(Nk + 1)],
+                Nh,
+            )
+            if coeffs is not None:
+                solutions = {
+                    x: _solution_expr(knowns, [coeffs[j][i] for j in range(Nk + 1)])
+                    for i, x in enumerate(prob.holes)
+                }
+                for (case_var, _), ci in zip(cases, choice):
+                    solutions[case_var] = ci
+                return solutions
+
+    return None
+
+
+def _solve_integer_system(A, bs, n):
+    """
+    Finds an integer vector x with `A x = b` for each b in `bs`, where `A`
+    is a list of rows of length `n`, by reducing `A` to column-style
+    Hermite normal form `H = A U` with a unimodular `U`.  Returns None if
+    any of the systems has no integer solution; free variables are zero.
+    """
+    H = [list(row) for row in A]
+    U = [[int(i == j) for j in range(n)] for i in range(n)]
+
+    def col_sub(dst, src, k):
+        for mat in (H, U):
+            for row in mat:
+                row[dst] -= k * row[src]
+
+    def col_swap(a, b):
+        for mat in (H, U):
+            for row in mat:
+                row[a], row[b] = row[b], row[a]
+
+    # eliminate each row to the right of its pivot using the column
+    # version of Euclid's algorithm
+    pivots = dict()
+    r = 0
+    for i, row in enumerate(H):
+        if r == n:
+            break
+        while nz := [c for c in range(r, n) if row[c] != 0]:
+            c = min(nz, key=lambda c: abs(row[c]))
+            if c != r:
+                col_swap(c, r)
+            if len(nz) == 1:
+                break
+            for c in range(r + 1, n):
+                if row[c] != 0:
+                    col_sub(c, r, row[c] // row[r])
+        if row[r] != 0:
+            pivots[i] = r
+            r += 1
+
+    # then solve H y = b by forward substitution, and let x = U y
+    solutions = []
+    for b in bs:
+        y = [0] * n
+        n_solved = 0
+        for i, row in enumerate(H):
+            acc = sum(row[c] * y[c] for c in range(n_solved))
+            if i in pivots:
+                c = pivots[i]
+                y[c], rem = divmod(b[i] - acc, row[c])
+                if rem != 0:
+                    return None
+                n_solved = c + 1
+            elif acc != b[i]:
+                return None
+        solutions.append([sum(u * yy for u, yy in zip(urow, y)) for urow in U])
+    return solutions
+
+
+def _solve_smt(prob):
     solver = _get_smt_solver()
 
     known_list = prob.knowns
@@ -366,23 +710,7 @@ def solve(prob):
             x_syms = get_var(hole_var)
             x_val_dict = solver.get_py_values(x_syms)
             x_vals = [x_val_dict[x_sym] for x_sym in x_syms]
-            expr = None
-            for xx, v in zip(known_list, x_vals):
-                v = int(v)
-                if v == 0:
-                    continue
-                elif v == 1:
-                    term = UEq.Var(xx)
-                else:
-                    term = UEq.Scale(v, UEq.Var(xx))
-
-                expr = term if expr is None else UEq.Add(expr, term)
-
-            # constant offset
-            off = UEq.Const(int(x_vals[-1]))
-            expr = off if expr is None else UEq.Add(expr, off)
-
-            solutions[hole_var] = expr
+            solutions[hole_var] = _solution_expr(known_list, x_vals)
 
         # report on case decisions
         for x in case_set:
@@ -578,6 +906,147 @@ class BufVar:
             return LoopIR.WindowExpr(buf, idx, w_typ, srcinfo)
 
 
+def check_structure(proc_s, block_s):
+    """
+    Raises the UnificationError that unifying the statements `proc_s` of a
+    sub-procedure with `block_s` would raise because of a difference in
+    their structure (of statements, operators, constants, etc.), without
+    solving for any indices or buffers.  Sub-procedures with stride
+    arguments must not be checked, since those unify with any expression.
+    """
+    _check_same_len(proc_s, block_s)
+
+    for ps, bs in zip(proc_s, block_s):
+        _check_same_stmt(ps, bs)
+        if isinstance(ps, (LoopIR.Assign, LoopIR.Reduce, LoopIR.WindowStmt)):
+            _check_structure_e(ps.rhs, bs.rhs)
+        elif isinstance(ps, LoopIR.WriteConfig):
+            _check_structure_e(ps.rhs, bs.rhs)
+        elif isinstance(ps, LoopIR.If):
+            check_structure(ps.body, bs.body)
+            check_structure(ps.orelse, bs.orelse)
+        elif isinstance(ps, LoopIR.For):
+            check_structure(ps.body, bs.body)
+        elif isinstance(ps, LoopIR.Call):
+            for pe, be in zip(ps.args, bs.args):
+                _check_structure_e(pe, be)
+
+
+def _check_structure_e(pe, be):
+    # indices, conditions and strides are solved for by unification
+    if (
+        pe.type.is_indexable()
+        or pe.type == T.bool
+        or pe.type == T.stride
+        or be.type.is_indexable()
+        or be.type == T.bool
+    ):
+        return
+
+    _check_same_e(pe, be)
+    if isinstance(pe, LoopIR.USub):
+        _check_structure_e(pe.arg, be.arg)
+    elif isinstance(pe, LoopIR.BinOp):
+        _check_structure_e(pe.lhs, be.lhs)
+        _check_structure_e(pe.rhs, be.rhs)
+    elif isinstance(pe, LoopIR.Extern):
+        for pa, ba in zip(pe.args, be.args):
+            _check_structure_e(pa, ba)
+
+
+# The checks below only compare the nodes themselves, not their children.
+# They are shared by `check_structure` and `Unification`, so that both
+# reject the same differences with the same errors.
+
+
+def _check_same_len(proc_s, block_s):
+    if len(proc_s) != len(block_s):
+        ploc, bloc = "", ""
+        if len(proc_s) > 0:
+            ploc = f" (@{proc_s[0].srcinfo})"
+        if len(block_s) > 0:
+            bloc = f" (@{block_s[0].srcinfo})"
+        raise UnificationError(
+            f"cannot unify {len(proc_s)} statement(s){ploc} with "
+            f"{len(block_s)} statement(s){bloc}"
+        )
+
+
+def _check_same_stmt(ps, bs):
+    if type(ps) is not type(bs):
+        raise UnificationError(
+            f"cannot unify a {type(ps)} statement (@{ps.srcinfo}) with "
+            f"a {type(bs)} statement (@{bs.srcinfo})"
+        )
+    elif isinstance(ps, LoopIR.WriteConfig):
+        if ps.config != bs.config or ps.field != bs.field:
+            raise UnificationError(
+                f"cannot unify Writeconfig '{ps.config.name()}.{ps.field}' "
+                f"with Writeconfig '{bs.config.name()}.{bs.field}'"
+            )
+    elif isinstance(ps, LoopIR.Call):
+        if ps.f != bs.f:
+            raise UnificationError(
+                f"cannot unify a call to '{ps.f.name}' (@{ps.srcinfo}) "
+                f"with a call to {bs.f.name} (@{bs.srcinfo})"
+            )
+
+
+def _check_same_e(pe, be):
+    if type(pe) is not type(be):
+        raise UnificationError(
+            f"cannot unify a {type(pe)} expression (@{pe.srcinfo}) with "
+            f"a {type(be)} expression (@{be.srcinfo})"
+        )
+    elif isinstance(pe, LoopIR.Const):
+        if pe.val != be.val:
+            raise UnificationError(
+                f"cannot unify {pe.val} (@{pe.srcinfo}) with "
+                f"{be.val} (@{be.srcinfo})"
+            )
+    elif isinstance(pe, LoopIR.BinOp):
+        # inequalities between indices are all unified as `0 < e`
+        inequality_ops = comparision_ops - {"=="}
+        exprs = [pe.rhs, pe.lhs, be.rhs, be.lhs]
+        if pe.op != be.op and not (
+            pe.op in inequality_ops
+            and be.op in inequality_ops
+            and all(e.type.is_indexable() for e in exprs)
+        ):
+            raise UnificationError(
+                f"cannot unify a '{pe.op}' (@{pe.srcinfo}) with "
+                f"a '{be.op}' (@{be.srcinfo})"
+            )
+    elif isinstance(pe, LoopIR.Extern):
+        if pe.f != be.f:
+            raise UnificationError(
+                f"cannot unify builtin '{pe.f.name()}' (@{pe.srcinfo}) "
+                f"with builtin '{be.f.name()}' (@{be.srcinfo})"
+            )
+    elif isinstance(pe, LoopIR.ReadConfig):
+        if pe.config != be.config or pe.field != be.field:
+            raise UnificationError(
+                f"cannot unify readconfig '{pe.config.name()}.{pe.field}' "
+                f"with readconfig '{be.config.name()}.{be.field}'"
+            )
+    elif isinstance(pe, LoopIR.WindowExpr):
+        if len(pe.idx) != len(be.idx):
+            raise UnificationError(
+                f"cannot unify the windowing of {pe.name} (@{pe.srcinfo}) "
+                f"using {len(pe.idx)} indices with the windowing of "
+                f"{be.name} (@{be.srcinfo}) using {len(be.idx)}"
+            )
+        for i, (pw, bw) in enumerate(zip(pe.idx, be.idx)):
+            if type(pw) is not type(bw):
+                raise UnificationError(
+                    f"cannot unify the windowing of "
+                    f"{pe.name} (@{pe.srcinfo}) with the windowing of "
+                    f"{be.name} (@{be.srcinfo}) because one evaluates to a "
+                    f"point at index {i}, while the other evaluates to an "
+                    f"interval"
+                )
+
+
 class Unification:
     def __init__(self, subproc, stmt_block, live_vars):
         self.equations = []
@@ -863,36 +1332,18 @@ class Unification:
             self.stride_holes[pe.name] = be
 
     def unify_stmts(self, proc_s, block_s):
-        if len(proc_s) != len(block_s):
-            ploc, bloc = "", ""
-            if len(proc_s) > 0:
-                ploc = f" (@{proc_s[0].srcinfo})"
-            if len(block_s) > 0:
-                bloc = f" (@{block_s[0].srcinfo})"
-            raise UnificationError(
-                f"cannot unify {len(proc_s)} statement(s){ploc} with "
-                f"{len(block_s)} statement(s){bloc}"
-            )
-        elif len(proc_s) == 0:
+        _check_same_len(proc_s, block_s)
+        if len(proc_s) == 0:
             return
 
         ps, proc_s = proc_s[0], proc_s[1:]
         bs, block_s = block_s[0], block_s[1:]
 
-        if type(ps) is not type(bs):
-            raise UnificationError(
-                f"cannot unify a {type(ps)} statement (@{ps.srcinfo}) with "
-                f"a {type(bs)} statement (@{bs.srcinfo})"
-            )
-        elif isinstance(ps, (LoopIR.Assign, LoopIR.Reduce)):
+        _check_same_stmt(ps, bs)
+        if isinstance(ps, (LoopIR.Assign, LoopIR.Reduce)):
             self.unify_e(ps.rhs, bs.rhs)
             self.unify_accesses(ps, bs)
         elif isinstance(ps, LoopIR.WriteConfig):
-            if ps.config != bs.config or ps.field != bs.field:
-                raise UnificationError(
-                    f"cannot unify Writeconfig '{pe.config.name()}.{pe.field}' "
-                    f"with Writeconfig '{be.config.name()}.{be.field}'"
-                )
             self.unify_e(ps.rhs, bs.rhs)
         elif isinstance(ps, LoopIR.Pass):
             pass
@@ -916,11 +1367,6 @@ class Unification:
             self.bbuf_types[bs.name] = bs.type
             self.unify_types(ps.type, bs.type, ps, bs)
         elif isinstance(ps, LoopIR.Call):
-            if ps.f != bs.f:
-                raise UnificationError(
-                    f"cannot unify a call to '{ps.f.name()}' (@{ps.srcinfo}) "
-                    f"with a call to {bs.f.name()} (@{bs.srcinfo})"
-                )
             for pe, be in zip(ps.args, bs.args):
                 self.unify_e(pe, be)
         elif isinstance(ps, LoopIR.WindowStmt):
@@ -1131,54 +1577,26 @@ class Unification:
             self.unify_stride_hole(pe, be)
             return
 
-        if type(pe) is not type(be):
-            raise UnificationError(
-                f"cannot unify a {type(pe)} expression (@{pe.srcinfo}) with "
-                f"a {type(be)} expression (@{be.srcinfo})"
-            )
-        elif isinstance(pe, LoopIR.Read):
+        _check_same_e(pe, be)
+        if isinstance(pe, LoopIR.Read):
             assert pe.type.is_numeric(), "unhandled expression type...?"
             self.unify_accesses(pe, be)
-        elif isinstance(pe, LoopIR.Const):
-            if pe.val != be.val:
-                raise UnificationError(
-                    f"cannot unify {pe.val} (@{pe.srcinfo}) with "
-                    f"{be.val} (@{be.srcinfo})"
-                )
+        elif isinstance(pe, (LoopIR.Const, LoopIR.ReadConfig)):
+            pass
         elif isinstance(pe, LoopIR.USub):
             self.unify_e(pe.arg, be.arg)
         elif isinstance(pe, LoopIR.BinOp):
             exprs = [pe.rhs, pe.lhs, be.rhs, be.lhs]
             if pe.op in comparision_ops and all(e.type.is_indexable() for e in exprs):
-                inequality_ops = comparision_ops - {"=="}
-                if pe.op == be.op or (
-                    pe.op in inequality_ops and be.op in inequality_ops
-                ):
-                    pe_e = self.comparision_to_unification_expr(pe)
-                    be_e = self.comparision_to_unification_expr(be)
-                    self.unify_e(pe_e, be_e)
-                    return
-            if pe.op != be.op:
-                raise UnificationError(
-                    f"cannot unify a '{pe.op}' (@{pe.srcinfo}) with "
-                    f"a '{be.op}'' (@{be.srcinfo})"
-                )
+                pe_e = self.comparision_to_unification_expr(pe)
+                be_e = self.comparision_to_unification_expr(be)
+                self.unify_e(pe_e, be_e)
+                return
             self.unify_e(pe.lhs, be.lhs)
             self.unify_e(pe.rhs, be.rhs)
         elif isinstance(pe, LoopIR.Extern):
-            if pe.f != be.f:
-                raise UnificationError(
-                    f"cannot unify builtin '{pe.f.name()}' (@{pe.srcinfo}) "
-                    f"with builtin '{be.f.name()}'' (@{be.srcinfo})"
-                )
             for pa, ba in zip(pe.args, be.args):
                 self.unify_e(pa, ba)
-        elif isinstance(pe, LoopIR.ReadConfig):
-            if pe.config != be.config or pe.field != be.field:
-                raise UnificationError(
-                    f"cannot unify readconfig '{pe.config.name()}.{pe.field}' "
-                    f"with readconfig '{be.config.name()}.{be.field}'"
-                )
         elif isinstance(pe, LoopIR.WindowExpr):
             pvar = self.buf_unknowns[pe.name]
 
@@ -1187,23 +1605,8 @@ class Unification:
             self.unify_types(pvar.typ, self.bbuf_types[be.name], pe, be)
 
             # unify the two windowing expressions
-            if len(pe.idx) != len(be.idx):
-                raise UnificationError(
-                    f"cannot unify the windowing of {pe.name} (@{pe.srcinfo}) "
-                    f"using {len(pe.idx)} indices with the windowing of "
-                    f"{be.name} (@{be.srcinfo}) using {len(be.idx)}"
-                )
-
-            for i, (pw, bw) in enumerate(zip(pe.idx, be.idx)):
-                if type(pw) is not type(bw):
-                    raise UnificationError(
-                        f"cannot unify the windowing of "
-                        f"{pe.name} (@{pe.srcinfo}) with the windowing of "
-                        f"{be.name} (@{be.srcinfo}) because one evaluates to a "
-                        f"point at index {i}, while the other evaluates to an "
-                        f"interval"
-                    )
-                elif isinstance(pw, LoopIR.Point):
+            for pw, bw in zip(pe.idx, be.idx):
+                if isinstance(pw, LoopIR.Point):
                     self.unify_affine_e(pw.pt, bw.pt)
                 else:
                     self.unify_affine_e(pw.lo, bw.lo)
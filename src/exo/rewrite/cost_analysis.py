@@ -0,0 +1,786 @@
+from __future__ import annotations
+
+from collections import ChainMap, defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from ..core.LoopIR import LoopIR, T
+from ..core.LoopIR_pprint import PrintEnv, _print_expr
+from ..core.memory import DRAM
+from .range_analysis import binop, constant_bound, index_range_analysis
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Static cost model
+#
+# Walks a procedure with fixed values for its sizes, computing how often
+# every loop runs, the arithmetic done per precision, the bytes moved per
+# memory, and how far apart (in bytes touched) repeated accesses to the same
+# buffer element are.  Loop bounds are evaluated by the constant range
+# analysis of `range_analysis`, so that bounds depending on enclosing loops
+# (e.g. triangular loops) are approximated by their average.
+
+_itemsize = {
+    T.R: 4,
+    T.f16: 2,
+    T.f32: 4,
+    T.f64: 8,
+    T.i8: 1,
+    T.ui8: 1,
+    T.ui16: 2,
+    T.i32: 4,
+}
+_typename = {
+    T.R: "R",
+    T.f16: "f16",
+    T.f32: "f32",
+    T.f64: "f64",
+    T.i8: "i8",
+    T.ui8: "ui8",
+    T.ui16: "ui16",
+    T.i32: "i32",
+}
+
+
+def itemsize(typ) -> int:
+    """the size in bytes of one element of the numeric type `typ`"""
+    return _itemsize[typ.basetype()]
+
+
+@dataclass
+class LoopCost:
+    """
+    A loop (in `proc`, nested `depth` loops deep) that is entered `entries`
+    times, and runs `trips` iterations on average each time.  `footprint` is
+    the number of distinct bytes one iteration of its body touches.
+    """
+
+    proc: str
+    iter: str
+    depth: int
+    entries: float
+    trips: float
+    footprint: int = 0
+
+    @property
+    def iterations(self) -> float:
+        return self.entries * self.trips
+
+
+@dataclass
+class AccessCost:
+    """
+    An access to `buffer` (in `memory`) executed `count` times.  For each
+    enclosing loop (outermost first), `reuse_distance` is the number of bytes
+    touched between two uses of the same element in consecutive iterations
+    of that loop, or None if the access touches different elements in each
+    iteration.
+    """
+
+    buffer: str
+    kind: str
+    idx: str
+    memory: str
+    count: float
+    reuse_distance: Dict[str, Optional[int]] = field(default_factory=dict)
+
+
+@dataclass
+class CostReport:
+    proc: str
+    loops: List[LoopCost]
+    accesses: List[AccessCost]
+    flops: Dict[str, float]
+    bytes_loaded: Dict[str, float]
+    bytes_stored: Dict[str, float]
+    instr_calls: Dict[str, float]
+    # whether all trip counts are exact, and all branches were decided
+    exact: bool = True
+    # the assignments and reductions executed outside of instructions
+    scalar_stmts: float = 0
+
+    @property
+    def total_flops(self) -> float:
+        return sum(self.flops.values())
+
+    def __str__(self):
+        def fmt(d):
+            return ", ".join(f"{k}: {v:g}" for k, v in d.items()) or "-"
+
+        lines = [
+            f"cost of {self.proc}{'' if self.exact else ' (estimated)'}:",
+            f"  flops:        {fmt(self.flops)}",
+            f"  bytes loaded: {fmt(self.bytes_loaded)}",
+            f"  bytes stored: {fmt(self.bytes_stored)}",
+            f"  instr calls:  {fmt(self.instr_calls)}",
+            f"  scalar stmts: {self.scalar_stmts:g}",
+        ]
+        for lp in self.loops:
+            lines.append(
+                f"  {'  ' * lp.depth}for {lp.iter}: {lp.trips:g} trips x "
+                f"{lp.entries:g}, {lp.footprint} bytes per iteration"
+            )
+        return "\n".join(lines)
+
+
+# The default capacities of the caches (in bytes) considered by
+# `analyze_footprint`, from the innermost outwards
+DEFAULT_CACHE_SIZES = {"L1": 32 * 1024, "L2": 1024 * 1024, "L3": 32 * 1024 * 1024}
+
+
+@dataclass
+class BufferFootprint:
+    """
+    The number of distinct elements of `buffer` touched by one iteration of
+    a loop, and by the whole loop.
+    """
+
+    buffer: str
+    memory: str
+    itemsize: int
+    iteration_elements: int
+    elements: int
+
+    @property
+    def iteration_bytes(self) -> int:
+        return self.iteration_elements * self.itemsize
+
+    @property
+    def bytes(self) -> int:
+        return self.elements * self.itemsize
+
+
+@dataclass
+class LoopFootprint:
+    """
+    The buffers touched by a loop running `trips` iterations, nested `depth`
+    loops deep.  `exceeds` (resp. `iteration_exceeds`) lists the caches
+    that the data touched by the whole loop (resp. by one of its
+    iterations) does not fit in.
+    """
+
+    iter: str
+    depth: int
+    trips: float
+    buffers: Dict[str, BufferFootprint]
+    exceeds: List[str] = field(default_factory=list)
+    iteration_exceeds: List[str] = field(default_factory=list)
+    node: LoopIR.For = field(default=None, repr=False, compare=False)
+
+    @property
+    def iteration_bytes(self) -> int:
+        return sum(b.iteration_bytes for b in self.buffers.values())
+
+    @property
+    def bytes(self) -> int:
+        return sum(b.bytes for b in self.buffers.values())
+
+    def fits(self, cache: str) -> bool:
+        return cache not in self.exceeds
+
+
+@dataclass
+class FootprintReport:
+    proc: str
+    loops: List[LoopFootprint]
+    cache_sizes: Dict[str, int]
+
+    def find(self, loop) -> LoopFootprint:
+        """
+        Returns the footprint of `loop`, given either as a `ForCursor` or by
+        the name of its loop variable (of the first loop with that name)
+        """
+        if isinstance(loop, str):
+            matches = [lp for lp in self.loops if lp.iter == loop]
+        else:
+            node = loop._impl._node
+            matches = [lp for lp in self.loops if lp.node is node]
+        if not matches:
+            raise ValueError(f"no loop {loop} in {self.proc}")
+        return matches[0]
+
+    def __str__(self):
+        lines = [f"footprint of {self.proc}:"]
+        for lp in self.loops:
+            flags = f" (exceeds {', '.join(lp.exceeds)})" if lp.exceeds else ""
+            lines.append(
+                f"  {'  ' * lp.depth}for {lp.iter}: {lp.iteration_bytes} bytes "
+                f"per iteration, {lp.bytes} bytes in total{flags}"
+            )
+            for b in lp.buffers.values():
+                lines.append(
+                    f"  {'  ' * lp.depth}  {b.buffer} @{b.memory}: "
+                    f"{b.iteration_elements} / {b.elements} elements"
+                )
+        return "\n".join(lines)
+
+
+def _is_affine(e):
+    # range analysis only understands sizes, indices and arithmetic
+    if isinstance(e, LoopIR.BinOp):
+        return _is_affine(e.lhs) and _is_affine(e.rhs)
+    elif isinstance(e, LoopIR.USub):
+        return _is_affine(e.arg)
+    return isinstance(e, (LoopIR.Read, LoopIR.Const))
+
+
+class _Buf:
+    def __init__(self, name, mem, itemsize, deps, root=None, dims=None):
+        self.name = name
+        self.mem = mem
+        self.itemsize = itemsize
+        # the loop variables that the window this buffer refers to depends on
+        self.deps = deps
+        # the allocated buffer (a `_Root`) this buffer is a window of, and for
+        # each of its dimensions, either (True, point) or (False, offset)
+        self.root = root
+        self.dims = dims
+
+
+class _Root:
+    def __init__(self, shape):
+        self.shape = shape
+
+
+class _Loop:
+    def __init__(self, cost, node, rng):
+        self.cost = cost
+        self.node = node
+        # constant bounds on the loop variable
+        self.rng = rng
+        # distinct accesses in the body: key -> bytes touched
+        self.accesses = dict()
+
+
+class _Access:
+    def __init__(self, cost, buf, key, loops, varies, idx, subst):
+        self.cost = cost
+        self.buf = buf
+        self.key = key
+        self.loops = loops
+        self.varies = varies
+        # the indices, and the values of the control arguments of the
+        # procedures they occur in
+        self.idx = idx
+        self.subst = subst
+
+
+class CostAnalysis:
+    def __init__(self, proc, sizes):
+        self.env = ChainMap()
+        self.deps = ChainMap()
+        self.bufs = ChainMap()
+        self.subst = ChainMap()
+        self.loop_stack = []
+        self.exact = True
+        self.in_instr = False
+        self.scalar_stmts = 0
+
+        self.loops = []
+        self.accesses = []
+        self.flops = defaultdict(float)
+        self.bytes_loaded = defaultdict(float)
+        self.bytes_stored = defaultdict(float)
+        self.instr_calls = defaultdict(float)
+
+        for a in proc.args:
+            nm = str(a.name)
+            if a.type.is_indexable():
+                if nm not in sizes:
+                    raise ValueError(f"{proc.name}: no value given for '{nm}'")
+                self.env[a.name] = (sizes[nm], sizes[nm])
+                self.deps[a.name] = frozenset()
+            elif a.type.is_numeric():
+                self.bind_root(a.name, nm, a.mem or DRAM, a.type)
+
+        self.do_stmts(proc, proc.body, 1)
+        self.finish()
+
+        self.report = CostReport(
+            proc.name,
+            [lp.cost for lp in self.loops],
+            [acc.cost for acc in self.accesses],
+            dict(self.flops),
+            dict(self.bytes_loaded),
+            dict(self.bytes_stored),
+            dict(self.instr_calls),
+            self.exact,
+            self.scalar_stmts,
+        )
+
+    def bind_root(self, sym, name, mem, typ):
+        root = _Root([self.subst_e(hi) for hi in typ.shape()])
+        elem_size = itemsize(typ)
+        self.bufs[sym] = _Buf(name, mem, elem_size, frozenset(), root)
+
+    def bind_window(self, sym, w, typ):
+        src = self.bufs[w.name]
+        dims = []
+        for i in w.idx:
+            if isinstance(i, LoopIR.Interval):
+                dims.append((False, self.subst_e(i.lo)))
+            else:
+                dims.append((True, self.subst_e(i.pt)))
+
+        # compose with the window `w` is taken of
+        if src.dims is not None:
+            local = iter(dims)
+            dims = []
+            for is_pt, off in src.dims:
+                if is_pt:
+                    dims.append((True, off))
+                else:
+                    pt, e = next(local)
+                    dims.append((pt, binop("+", off, e)))
+
+        elem_size = itemsize(typ)
+        deps = self.expr_deps(w)
+        self.bufs[sym] = _Buf(src.name, src.mem, elem_size, deps, src.root, dims)
+
+    def push(self):
+        self.env = self.env.new_child()
+        self.deps = self.deps.new_child()
+        self.bufs = self.bufs.new_child()
+        self.subst = self.subst.new_child()
+
+    def pop(self):
+        self.env = self.env.parents
+        self.deps = self.deps.parents
+        self.bufs = self.bufs.parents
+        self.subst = self.subst.parents
+
+    def subst_e(self, e):
+        # expresses the control expression `e` in terms of the variables of
+        # the procedure being analyzed
+        return _subst(e, self.subst) if self.subst else e
+
+    # ----------------------------------------------------------------------- #
+    # values
+
+    def bound(self, e):
+        if not _is_affine(e):
+            return (None, None)
+        return constant_bound(e, self.env)
+
+    def avg(self, e):
+        lo, hi = self.bound(e)
+        if lo is None or hi is None:
+            raise ValueError(f"cannot bound {e} at {e.srcinfo}")
+        if lo != hi:
+            self.exact = False
+            return (lo + hi) / 2
+        return lo
+
+    def expr_deps(self, e):
+        if isinstance(e, LoopIR.Read):
+            d = self.deps.get(e.name, frozenset())
+            for i in e.idx:
+                d = d | self.expr_deps(i)
+            return d
+        elif isinstance(e, LoopIR.USub):
+            return self.expr_deps(e.arg)
+        elif isinstance(e, LoopIR.BinOp):
+            return self.expr_deps(e.lhs) | self.expr_deps(e.rhs)
+        elif isinstance(e, LoopIR.WindowExpr):
+            d = self.bufs[e.name].deps
+            for w in e.idx:
+                if isinstance(w, LoopIR.Interval):
+                    d = d | self.expr_deps(w.lo) | self.expr_deps(w.hi)
+                else:
+                    d = d | self.expr_deps(w.pt)
+            return d
+        return frozenset()
+
+    def decide(self, cond):
+        """
+        True or False if `cond` is known to always (resp. never) hold, and
+        None otherwise
+        """
+        if isinstance(cond, LoopIR.Const):
+            return bool(cond.val)
+        elif not isinstance(cond, LoopIR.BinOp):
+            return None
+        elif cond.op in ("and", "or"):
+            lhs, rhs = self.decide(cond.lhs), self.decide(cond.rhs)
+            if cond.op == "and":
+                if lhs is False or rhs is False:
+                    return False
+                return True if lhs and rhs else None
+            if lhs or rhs:
+                return True
+            return False if lhs is False and rhs is False else None
+        elif cond.op not in ("<", ">", "<=", ">=", "=="):
+            return None
+        if not cond.lhs.type.is_indexable():
+            return None
+
+        (l_lo, l_hi), (r_lo, r_hi) = (
+            self.bound(cond.lhs),
+            self.bound(cond.rhs),
+        )
+        if None in (l_lo, l_hi, r_lo, r_hi):
+            return None
+        op = cond.op
+        if op in (">", ">="):
+            (l_lo, l_hi), (r_lo, r_hi) = (r_lo, r_hi), (l_lo, l_hi)
+            op = "<" if op == ">" else "<="
+        if op == "<":
+            return True if l_hi < r_lo else False if l_lo >= r_hi else None
+        elif op == "<=":
+            return True if l_hi <= r_lo else False if l_lo > r_hi else None
+        else:
+            if l_lo == l_hi == r_lo == r_hi:
+                return True
+            return False if l_hi < r_lo or r_hi < l_lo else None
+
+    # ----------------------------------------------------------------------- #
+    # statements
+
+    def do_stmts(self, proc, stmts, mult):
+        for s in stmts:
+            self.do_s(proc, s, mult)
+
+    def do_s(self, proc, s, mult):
+        if isinstance(s, (LoopIR.Assign, LoopIR.Reduce)):
+            if not self.in_instr:
+                self.scalar_stmts += mult
+            self.do_e(s.rhs, mult)
+            if isinstance(s, LoopIR.Reduce):
+                self.flops[_typename[s.type]] += mult
+                self.access(s.name, s.idx, "reduce", mult)
+            else:
+                self.access(s.name, s.idx, "write", mult)
+        elif isinstance(s, LoopIR.WriteConfig):
+            self.do_e(s.rhs, mult)
+        elif isinstance(s, LoopIR.If):
+            taken = self.decide(s.cond)
+            if taken is None:
+                self.exact = False
+            if taken is not False:
+                self.do_stmts(proc, s.body, mult)
+            if taken is not True:
+                self.do_stmts(proc, s.orelse, mult)
+        elif isinstance(s, LoopIR.For):
+            lo, hi = self.avg(s.lo), self.avg(s.hi)
+            trips = max(hi - lo, 0)
+            lo_rng, hi_rng = self.bound(s.lo), self.bound(s.hi)
+            rng = (lo_rng[0], hi_rng[1] - 1)
+            loop = _Loop(
+                LoopCost(proc.name, str(s.iter), len(self.loop_stack), mult, trips),
+                s,
+                rng,
+            )
+            self.loops.append(loop)
+
+            self.push()
+            self.env[s.iter] = rng
+            self.deps[s.iter] = frozenset([s.iter])
+            self.loop_stack.append((s.iter, loop))
+            self.do_stmts(proc, s.body, mult * trips)
+            self.loop_stack.pop()
+            self.pop()
+        elif isinstance(s, LoopIR.Alloc):
+            if s.type.is_numeric():
+                self.bind_root(s.name, str(s.name), s.mem, s.type)
+        elif isinstance(s, LoopIR.WindowStmt):
+            self.bind_window(s.name, s.rhs, s.rhs.type)
+        elif isinstance(s, LoopIR.Call):
+            self.do_call(s, mult)
+        elif isinstance(s, (LoopIR.Pass, LoopIR.Free)):
+            pass
+        else:
+            assert False, f"bad case: {type(s)}"
+
+    def do_call(self, s, mult):
+        if s.f.instr is not None:
+            self.instr_calls[s.f.name] += mult
+
+        bindings = []
+        for sig, arg in zip(s.f.args, s.args):
+            if sig.type.is_indexable():
+                rng = self.bound(arg)
+                val = self.subst_e(arg)
+                bindings.append(("ctrl", sig.name, rng, self.expr_deps(arg), val))
+            elif sig.type.is_numeric():
+                if isinstance(arg, LoopIR.WindowExpr):
+                    bindings.append(("win", sig.name, arg, sig.type))
+                else:
+                    bindings.append(("buf", sig.name, self.bufs[arg.name]))
+            else:
+                self.do_e(arg, mult)
+
+        # the windows are bound in the caller's scope
+        bufs = dict()
+        for b in bindings:
+            if b[0] == "win":
+                _, nm, w, typ = b
+                self.bind_window(nm, w, typ)
+                bufs[nm] = self.bufs.pop(nm)
+            elif b[0] == "buf":
+                bufs[b[1]] = b[2]
+
+        self.push()
+        self.bufs.update(bufs)
+        for b in bindings:
+            if b[0] == "ctrl":
+                _, nm, rng, deps, val = b
+                if None not in rng:
+                    self.env[nm] = rng
+                self.deps[nm] = deps
+                self.subst[nm] = val
+        in_instr, self.in_instr = self.in_instr, self.in_instr or bool(s.f.instr)
+        self.do_stmts(s.f, s.f.body, mult)
+        self.in_instr = in_instr
+        self.pop()
+
+    # ----------------------------------------------------------------------- #
+    # expressions
+
+    def do_e(self, e, mult):
+        if isinstance(e, LoopIR.Read):
+            if e.type.is_numeric():
+                self.access(e.name, e.idx, "read", mult)
+        elif isinstance(e, LoopIR.BinOp):
+            self.do_e(e.lhs, mult)
+            self.do_e(e.rhs, mult)
+            if e.type.is_real_scalar():
+                self.flops[_typename[e.type]] += mult
+        elif isinstance(e, LoopIR.USub):
+            self.do_e(e.arg, mult)
+        elif isinstance(e, LoopIR.Extern):
+            for a in e.args:
+                self.do_e(a, mult)
+            self.flops[_typename[e.type]] += mult
+
+    def access(self, name, idx, kind, mult):
+        buf = self.bufs[name]
+        mem = buf.mem.name()
+        if kind in ("read", "reduce"):
+            self.bytes_loaded[mem] += mult * buf.itemsize
+        if kind in ("write", "reduce"):
+            self.bytes_stored[mem] += mult * buf.itemsize
+
+        deps = buf.deps
+        for i in idx:
+            deps = deps | self.expr_deps(i)
+        varies = [it in deps for it, _ in self.loop_stack]
+        # (printed without reformatting, which is too slow to do here)
+        idx_str = ", ".join(_print_expr(i, PrintEnv()) for i in idx)
+        key = (buf.name, id(buf), idx_str)
+
+        cost = AccessCost(buf.name, kind, idx_str, mem, mult)
+        loops = [lp for _, lp in self.loop_stack]
+        self.accesses.append(_Access(cost, buf, key, loops, varies, idx, self.subst))
+
+    def finish(self):
+        # the footprint of one iteration of a loop's body is made up of the
+        # distinct elements each access inside it touches over the loops
+        # nested inside the loop
+        for acc in self.accesses:
+            elems = 1
+            for k in reversed(range(len(acc.loops))):
+                lp = acc.loops[k]
+                if acc.key not in lp.accesses:
+                    lp.accesses[acc.key] = elems * acc.buf.itemsize
+                if acc.varies[k]:
+                    elems *= lp.cost.trips
+
+        for lp in self.loops:
+            lp.cost.footprint = int(sum(lp.accesses.values()))
+
+        for acc in self.accesses:
+            acc.cost.reuse_distance = {
+                lp.cost.iter: None if v else lp.cost.footprint
+                for lp, v in zip(acc.loops, acc.varies)
+            }
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Footprints
+#
+# The elements of a buffer touched by a loop are approximated by a box: in
+# each dimension, the index expressions of all accesses are bounded by range
+# analysis, where the variables of the loops nested inside are given their
+# full ranges, and the variables of enclosing loops are left symbolic.
+
+
+def _linear(e):
+    # the coefficients and constant term of an affine expression, or None
+    if isinstance(e, LoopIR.Read):
+        return {e.name: 1}, 0
+    elif isinstance(e, LoopIR.Const):
+        return {}, e.val
+    elif isinstance(e, LoopIR.USub):
+        if (arg := _linear(e.arg)) is None:
+            return None
+        return {x: -c for x, c in arg[0].items()}, -arg[1]
+    elif isinstance(e, LoopIR.BinOp) and e.op in ("+", "-", "*"):
+        lhs, rhs = _linear(e.lhs), _linear(e.rhs)
+        if lhs is None or rhs is None:
+            return None
+        if e.op == "*":
+            if lhs[0] and rhs[0]:
+                return None
+            (coeffs, c), k = (lhs, rhs[1]) if not rhs[0] else (rhs, lhs[1])
+            return {x: k * a for x, a in coeffs.items()}, k * c
+        sign = 1 if e.op == "+" else -1
+        coeffs = dict(lhs[0])
+        for x, a in rhs[0].items():
+            coeffs[x] = coeffs.get(x, 0) + sign * a
+        return coeffs, lhs[1] + sign * rhs[1]
+    return None
+
+
+def _range(e, env):
+    """
+    Bounds `e` as (base, lo, hi), where `base` identifies the symbolic part
+    of the range, if it is affine, and is None otherwise
+    """
+    if not _is_affine(e):
+        return (None, None, None)
+    r = index_range_analysis(e, env)
+    if isinstance(r, int):
+        return (frozenset(), r, r)
+    lo, hi = r.lo, r.hi
+    if (lin := _linear(r.base)) is None:
+        return (None, lo, hi)
+    coeffs, c = lin
+    if lo is not None:
+        lo += c
+    if hi is not None:
+        hi += c
+    return (frozenset((x, a) for x, a in coeffs.items() if a != 0), lo, hi)
+
+
+def _join(r1, r2, extent):
+    if r1 is None:
+        return r2
+    (b1, lo1, hi1), (b2, lo2, hi2) = r1, r2
+    if b1 is not None and b1 == b2 and None not in (lo1, hi1, lo2, hi2):
+        return (b1, min(lo1, lo2), max(hi1, hi2))
+    # unrelated ranges: assume they do not overlap
+    w1, w2 = _width(r1, extent), _width(r2, extent)
+    if w1 is None or w2 is None:
+        return (None, None, None)
+    return (None, 0, min(w1 + w2, extent or w1 + w2) - 1)
+
+
+def _width(r, extent):
+    _, lo, hi = r
+    if lo is None or hi is None:
+        return extent
+    w = max(hi - lo + 1, 1)
+    return min(w, extent) if extent else w
+
+
+class FootprintAnalysis:
+    def __init__(self, costs, proc, sizes, cache_sizes):
+        self.sizes = {
+            a.name: (sizes[str(a.name)],) * 2
+            for a in proc.args
+            if a.type.is_indexable()
+        }
+        self.extents = dict()
+
+        loops = [lp for lp in costs.loops if lp.cost.proc == proc.name]
+        inside = {id(lp): [] for lp in loops}
+        for acc in costs.accesses:
+            for k, lp in enumerate(acc.loops):
+                if id(lp) in inside:
+                    inside[id(lp)].append((acc, k))
+
+        self.report = FootprintReport(proc.name, [], dict(cache_sizes))
+        for lp in loops:
+            buffers = self.loop_footprint(lp, inside[id(lp)])
+            fp = LoopFootprint(
+                lp.cost.iter, lp.cost.depth, lp.cost.trips, buffers, node=lp.node
+            )
+            fp.exceeds = [c for c, sz in cache_sizes.items() if fp.bytes > sz]
+            fp.iteration_exceeds = [
+                c for c, sz in cache_sizes.items() if fp.iteration_bytes > sz
+            ]
+            self.report.loops.append(fp)
+
+    def extent(self, root, dim):
+        key = (id(root), dim)
+        if key not in self.extents:
+            base, _, hi = _range(root.shape[dim], self.sizes)
+            self.extents[key] = hi if base == frozenset() else None
+        return self.extents[key]
+
+    def loop_footprint(self, lp, accesses):
+        boxes = dict()
+        for acc, k in accesses:
+            # skip accesses in loops that never run
+            if any(inner.rng[0] > inner.rng[1] for inner in acc.loops[k:]):
+                continue
+            env = ChainMap(dict(), self.sizes)
+            for inner in acc.loops[k + 1 :]:
+                env[inner.node.iter] = inner.rng
+            one = self.box(acc, env)
+            env[lp.node.iter] = lp.rng
+            full = self.box(acc, env)
+
+            buf = acc.buf
+            key = (buf.name, id(buf.root))
+            if key not in boxes:
+                boxes[key] = (buf, [None] * len(one), [None] * len(full))
+            _, one_box, full_box = boxes[key]
+            for d in range(len(one)):
+                ext = self.extent(buf.root, d)
+                one_box[d] = _join(one_box[d], one[d], ext)
+                full_box[d] = _join(full_box[d], full[d], ext)
+
+        buffers = dict()
+        for buf, one_box, full_box in boxes.values():
+            one_n, full_n = 1, 1
+            for d in range(len(one_box)):
+                ext = self.extent(buf.root, d)
+                one_n *= _width(one_box[d], ext) or 1
+                full_n *= _width(full_box[d], ext) or 1
+            if buf.name in buffers:
+                # distinct buffers with the same name
+                prev = buffers[buf.name]
+                one_n += prev.iteration_elements
+                full_n += prev.elements
+            buffers[buf.name] = BufferFootprint(
+                buf.name, buf.mem.name(), buf.itemsize, one_n, full_n
+            )
+        return buffers
+
+    def box(self, acc, env):
+        idx = acc.idx
+        if acc.subst:
+            idx = [_subst(i, acc.subst) for i in idx]
+        if acc.buf.dims is not None:
+            local = iter(idx)
+            idx = [
+                off if is_pt else binop("+", off, next(local))
+                for is_pt, off in acc.buf.dims
+            ]
+
+        return [_range(i, env) for i in idx]
+
+
+def _subst(e, subst):
+    if isinstance(e, LoopIR.Read):
+        return subst.get(e.name, e)
+    elif isinstance(e, LoopIR.USub):
+        return e.update(arg=_subst(e.arg, subst))
+    elif isinstance(e, LoopIR.BinOp):
+        return e.update(lhs=_subst(e.lhs, subst), rhs=_subst(e.rhs, subst))
+    return e
+
+
+def analyze_footprint(proc, sizes, cache_sizes=None) -> FootprintReport:
+    assert isinstance(proc, LoopIR.proc)
+    costs = CostAnalysis(proc, sizes)
+    if cache_sizes is None:
+        cache_sizes = DEFAULT_CACHE_SIZES
+    return FootprintAnalysis(costs, proc, sizes, cache_sizes).report
+
+
+def analyze_cost(proc, sizes) -> CostReport:
+    assert isinstance(proc, LoopIR.proc)
+    return CostAnalysis(proc, sizes).report
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from collections import ChainMap
+
+from ..core.LoopIR import LoopIR, T
+from ..core import internal_cursors as ic
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Structural signatures for instruction selection
+#
+# `replace` unifies the body of a sub-procedure with a block of statements.
+# Unification only succeeds if both have the same statement constructors,
+# arithmetic operators, constants, calls, and so on; only the index
+# expressions, boolean conditions and the windowing of buffers are solved
+# for.  The signature of a statement erases exactly those parts, so that a
+# block can only be unified with a sub-procedure if their signatures are
+# equal.  This lets `replace_all` index the candidate blocks of a procedure
+# once per instruction, rather than attempting unification everywhere.
+
+_INDEX = "i"
+_BOOL = "b"
+
+
+class Signatures:
+    """
+    Computes signatures of statements and expressions, memoized by node
+    identity, so that the parts of a procedure that are unchanged by a
+    rewrite need not be traversed again
+    """
+
+    def __init__(self):
+        self.memo = dict()
+
+    def block(self, stmts):
+        return tuple(self.stmt(s) for s in stmts)
+
+    def stmt(self, s):
+        # keep the node alive, so that its id is not reused
+        if (hit := self.memo.get(id(s))) is not None and hit[0] is s:
+            return hit[1]
+
+        styp = type(s)
+        if styp is LoopIR.Assign or styp is LoopIR.Reduce:
+            sig = (styp.__name__, self.expr(s.rhs))
+        elif styp is LoopIR.For:
+            sig = ("For", self.block(s.body))
+        elif styp is LoopIR.If:
+            sig = ("If", self.block(s.body), self.block(s.orelse))
+        elif styp is LoopIR.WriteConfig:
+            sig = ("WriteConfig", s.config.name(), s.field, self.expr(s.rhs))
+        elif styp is LoopIR.Alloc:
+            sig = ("Alloc", len(s.type.shape()) if s.type.is_numeric() else 0)
+        elif styp is LoopIR.Call:
+            sig = ("Call", s.f.name, tuple(self.expr(a) for a in s.args))
+        elif styp is LoopIR.WindowStmt:
+            sig = ("WindowStmt", self.expr(s.rhs))
+        else:
+            sig = (styp.__name__,)
+
+        self.memo[id(s)] = (s, sig)
+        return sig
+
+    def expr(self, e):
+        if e.type.is_indexable():
+            return _INDEX
+        elif e.type == T.bool:
+            return _BOOL
+
+        etyp = type(e)
+        if etyp is LoopIR.Read:
+            return "Read"
+        elif etyp is LoopIR.Const:
+            return ("Const", e.val)
+        elif etyp is LoopIR.USub:
+            return ("USub", self.expr(e.arg))
+        elif etyp is LoopIR.BinOp:
+            return (e.op, self.expr(e.lhs), self.expr(e.rhs))
+        elif etyp is LoopIR.Extern:
+            return ("Extern", e.f.name(), tuple(self.expr(a) for a in e.args))
+        elif etyp is LoopIR.ReadConfig:
+            return ("ReadConfig", e.config.name(), e.field)
+        elif etyp is LoopIR.WindowExpr:
+            return ("Window", tuple(type(w).__name__ for w in e.idx))
+        else:
+            return (etyp.__name__,)
+
+
+def _has_stride_holes(subproc):
+    # a stride argument unifies with any expression, so such sub-procedures
+    # have no useful signature
+    return any(fa.type == T.stride for fa in subproc.args)
+
+
+def _accesses(ps, bs, pairs):
+    """
+    Pairs the buffers accessed by the statement (or expression) `ps` of a
+    sub-procedure with those accessed by `bs`, whose signatures are equal
+    """
+    if isinstance(ps, (LoopIR.Assign, LoopIR.Reduce)):
+        pairs.append((ps.name, bs.name))
+        _accesses(ps.rhs, bs.rhs, pairs)
+    elif isinstance(ps, LoopIR.For):
+        for p, b in zip(ps.body, bs.body):
+            _accesses(p, b, pairs)
+    elif isinstance(ps, LoopIR.If):
+        for p, b in zip(ps.body + ps.orelse, bs.body + bs.orelse):
+            _accesses(p, b, pairs)
+    elif isinstance(ps, (LoopIR.Read, LoopIR.WindowExpr)):
+        if ps.type.is_numeric():
+            pairs.append((ps.name, bs.name))
+    elif isinstance(ps, LoopIR.USub):
+        _accesses(ps.arg, bs.arg, pairs)
+    elif isinstance(ps, LoopIR.BinOp):
+        _accesses(ps.lhs, bs.lhs, pairs)
+        _accesses(ps.rhs, bs.rhs, pairs)
+    elif isinstance(ps, LoopIR.Extern):
+        for p, b in zip(ps.args, bs.args):
+            _accesses(p, b, pairs)
+
+
+class InstrPattern:
+    """
+    The signature of the body of `subproc`, and the memories and element
+    types of its buffer arguments.  `supported` is False if the
+    sub-procedure cannot be indexed, in which case `replace_all` tries to
+    unify it with every block starting like its body instead.
+    """
+
+    # the statements `replace_all` looks for at the start of a block
+    _first_stmts = (LoopIR.Assign, LoopIR.Reduce, LoopIR.For)
+
+    def __init__(self, subproc, sigs: Signatures):
+        self.subproc = subproc
+        self.sigs = sigs
+        self.n_stmts = len(subproc.body)
+        self.supported = isinstance(
+            subproc.body[0], self._first_stmts
+        ) and not _has_stride_holes(subproc)
+        self.signature = sigs.block(subproc.body)
+        self.args = {
+            fa.name: (fa.mem, fa.type.basetype())
+            for fa in subproc.args
+            if fa.type.is_numeric()
+        }
+
+    def compatible(self, stmts, env, mem_aware):
+        """
+        Whether the buffers accessed by `stmts` can be passed to the
+        arguments of the sub-procedure they are paired with, given the
+        memory and element type of each buffer in `env` (or None if unknown)
+        """
+        pairs = []
+        for ps, bs in zip(self.subproc.body, stmts):
+            _accesses(ps, bs, pairs)
+        for pname, bname in pairs:
+            if pname not in self.args or (binfo := env.get(bname)) is None:
+                continue
+            (pmem, ptyp), (bmem, btyp) = self.args[pname], binfo
+            if mem_aware and not issubclass(bmem, pmem):
+                return False
+            if ptyp != btyp and ptyp != T.R and btyp != T.R:
+                return False
+        return True
+
+    def candidates(self, proc, mem_aware):
+        """
+        The first statements of the blocks of `proc` (a LoopIR.proc) with
+        the signature of the sub-procedure, as internal cursors, in the
+        order in which `proc.find` visits them
+        """
+        assert self.supported
+        first = self.signature[0]
+        n = self.n_stmts
+        found = []
+
+        env = ChainMap(
+            {
+                fa.name: (fa.mem, fa.type.basetype())
+                for fa in proc.args
+                if fa.type.is_numeric()
+            }
+        )
+
+        def visit(block, stmts):
+            nonlocal env
+            env = env.new_child()
+            for i, s in enumerate(stmts):
+                if (
+                    self.sigs.stmt(s) == first
+                    and i + n <= len(stmts)
+                    and self.sigs.block(stmts[i : i + n]) == self.signature
+                    and self.compatible(stmts[i : i + n], env, mem_aware)
+                ):
+                    found.append(block[i])
+                if isinstance(s, LoopIR.For):
+                    visit(block[i].body(), s.body)
+                elif isinstance(s, LoopIR.If):
+                    visit(block[i].body(), s.body)
+                    if s.orelse:
+                        visit(block[i].orelse(), s.orelse)
+                elif isinstance(s, LoopIR.Alloc):
+                    env[s.name] = (s.mem, s.type.basetype())
+                elif isinstance(s, LoopIR.WindowStmt):
+                    env[s.name] = None
+            env = env.parents
+
+        root = ic.Cursor.create(proc)
+        visit(root.body(), proc.body)
+        return found
+
+
+def replaced_stmt(proc, block):
+    """
+    A cursor into `proc` to the statement replacing the internal block
+    cursor `block`, after a rewrite replacing it by a single statement
+    """
+    return ic.Node(proc, block._anchor._path + [(block._attr, block._range.start)])
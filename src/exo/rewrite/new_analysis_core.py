@@ -9,8 +9,9 @@ Z3 = z3lib.z3
 from pysmt import logics
 from pysmt import shortcuts as SMT
 
-from asdl_adt import ADT, validators
+from asdl_adt import validators
 from asdl_adt.validators import ValidationError
+from ..core.adt import ADT
 from ..core.LoopIR import T, LoopIR
 from ..core.prelude import *
 
@@ -616,8 +617,8 @@ def is_ternary(x):
 
 class SMTSolver:
     def __init__(self, verbose=False):
-        self.env = ChainMap()
-        self.stride_sym = ChainMap()
+        self.env = SymTable()
+        self.stride_sym = SymTable()
         self.const_sym = dict()
         self.const_sym_count = 1
         self.solver = _get_smt_solver()
@@ -653,14 +654,14 @@ class SMTSolver:
         self.z3slv.pop()
 
     def internal_push(self):
-        self.env = self.env.new_child()
-        self.stride_sym = self.stride_sym.new_child()
+        self.env.push()
+        self.stride_sym.push()
         self.frames.append(DebugSolverFrame())
 
     def internal_pop(self):
         self.frames.pop()
-        self.stride_sym = self.stride_sym.parents
-        self.env = self.env.parents
+        self.stride_sym.pop()
+        self.env.pop()
 
     def debug_str(self, smt=False):
         lines = []
@@ -1,6 +1,7 @@
 from collections import OrderedDict, ChainMap
 from enum import Enum
 from itertools import chain
+import weakref
 
 from ..core.LoopIR import Alpha_Rename, SubstArgs, LoopIR_Do
 from ..core.configs import reverse_config_lookup, Config
@@ -21,6 +22,39 @@ def get_simple_proc(proc):
     return _simple_proc_cache[orig_repr]
 
 
+class _NodeCache:
+    """
+    Memoizes a function of LoopIR nodes by node identity.
+
+    LoopIR nodes compare structurally, which is both expensive to hash and
+    too coarse for analyses whose results bind fresh symbols.  Scheduling
+    rewrites share every unchanged sub-tree between a procedure and its
+    successor, so keying on identity lets successive checks reuse the
+    results for everything except the edited spine.  Entries hold only a
+    weak reference to their node and are dropped when the node dies.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.entries = dict()
+
+    def __call__(self, node):
+        key = id(node)
+        hit = self.entries.get(key)
+        if hit is not None and hit[0]() is node:
+            return hit[1]
+
+        val = self.fn(node)
+        entries = self.entries
+
+        def drop(ref):
+            if entries.get(key, (None,))[0] is ref:
+                del entries[key]
+
+        entries[key] = (weakref.ref(node, drop), val)
+        return val
+
+
 @dataclass
 class APoint:
     name: Sym
@@ -456,135 +490,139 @@ def possible_config_writes(stmts):
 
 
 def globenv(stmts):
-    aenvs = []
-    for s in stmts:
-        if isinstance(s, LoopIR.WriteConfig):
-            globname = s.config._INTERNAL_sym(s.field)
-            rhs = lift_e(s.rhs)
-            aenvs.append(AEnv(globname, rhs, addnames=True))
-        elif isinstance(s, LoopIR.WindowStmt):
-            win = lift_e(s.rhs)
-            aenvs.append(AEnv(s.name, win))
-        elif isinstance(s, LoopIR.Alloc):
-            win = AWinAlloc(s.name, s.type.shape())
-            aenvs.append(AEnv(s.name, win))
-        elif isinstance(s, LoopIR.If):
-            # extract environments for each side of the branch
-            body_env = globenv(s.body)
-            else_env = globenv(s.orelse)
-            # get the map from old to new names, and binding env
-            bvarmap, benv = body_env.bind_to_copies()
-            evarmap, eenv = else_env.bind_to_copies()
-            aenvs += [benv, eenv]
-            oldvars = {
-                nm: A.Var(nm, newv.type, s.srcinfo)
-                for nm, newv in chain(bvarmap.items(), evarmap.items())
-            }
+    return aenv_join([_stmt_globenv(s) for s in stmts])
 
-            # bind the condition so it isn't duplicated
-            condsym = Sym("if_cond")
-            condvar = A.Var(condsym, T.bool, s.cond.srcinfo)
-            cond = lift_e(s.cond)
-            aenvs.append(AEnv(condsym, cond))
-
-            # We must now construct an environment that defines the
-            # new value for variables `x` among the possibilities
-            newbinds = dict()
-            for nm, oldv in oldvars.items():
-                # default to old-value
-                tcase = bvarmap.get(nm, oldv)
-                fcase = evarmap.get(nm, oldv)
-                val = A.Select(condvar, tcase, fcase, oldv.type, s.srcinfo)
-                newbinds[nm] = val
-            aenvs.append(AEnvPar(newbinds, addnames=True))
 
-        elif isinstance(s, LoopIR.For):
-            # extract environment for the body and bind its
-            # results via copies of the variables
-            i, j = s.iter, s.iter.copy()
-            body_env = globenv(s.body)
-            bvarmap, benv = body_env.bind_to_copies()
-            aenvs.append(benv)
-
-            # bind the bounds condition so it isn't duplicated
-            # non_empty   = AInt(0) < lift_e(s.hi)
-            def fix(x, body_x):
-                bds = AAnd(lift_e(s.lo) <= AInt(i), AInt(i) < lift_e(s.hi))
-                no_change = AImplies(bds, AEq(body_x, x))
-                return A.ForAll(i, no_change, T.bool, s.srcinfo)
-
-            # extract possible RHS values for config-fields
-            # cfg_writes = possible_config_writes([s])
-            # for cfgfld in cfg_writes:
-            #     pass
-
-            # def fix_cfg(x, rhs, body_x, lower=0):
-            #     bds = AAnd(AInt(lower) <= AInt(i), AInt(i) < lift_e(s.hi))
-            #     is_assigned = A.Exists(
-            #         i, AAnd(bds, AEq(body_x, rhs)), T.bool, s.srcinfo
-            #     )
-            #     no_change_or_assign = AOr(AEq(body_x, rhs), AEq(body_x, x))
-            #     AImplies
-
-            #     no_change = 23
-            #     # A.Exists(i, is_assigned, T.bool, s.srcinfo)
-            #     no_change = A
-            #     no_change = AImplies(bds, AEq(body_x, x))
-            #     return A.ForAll(i, no_change, T.bool, s.srcinfo)
-
-            # define the value of variables due to the first iteration alone
-            # def iter0(x,body_x):
-            #    non_empty   = AInt(0) < lift_e(s.hi)
-            #    is_iter0    = AEq(AInt(i), AInt(0))
-
-            # optional attempt to have tricky conditions
-            # body_j_env  = AEnv(i, AInt(j)) + body_env
-            # j_bvarmap, j_benv = body_j_env.bind_to_copies()
-            # aenvs.append(j_benv)
-            # bds_j       = AAnd(AInt(0) <= AInt(j),
-            #                   AInt(j) < lift_e(s.hi))
-            # def same_after(body_x,body_j_x):
-            #    consistent =  A.ForAll(i, AImplies(bds,
-            #                    A.ForAll(j, AImplies(bds_j,
-            #                                AEq(body_x, body_j_x)),
-            #                             T.bool, s.srcinfo)),
-            #                    T.bool, s.srcinfo)
-            #    return AAnd(non_empty, consistent)
-
-            # Now construct an environment that defines the new
-            # value for variables `x` based on fixed-point conditions
-            newbinds = dict()
-            for nm, bvar in bvarmap.items():
-                oldvar = A.Var(nm, bvar.type, s.srcinfo)
-                val = A.Select(
-                    fix(oldvar, bvar),
-                    oldvar,
-                    A.Unk(oldvar.type, s.srcinfo),
-                    oldvar.type,
-                    s.srcinfo,
-                )
+@_NodeCache
+def _stmt_globenv(s):
+    aenvs = []
+    if isinstance(s, LoopIR.WriteConfig):
+        globname = s.config._INTERNAL_sym(s.field)
+        rhs = lift_e(s.rhs)
+        aenvs.append(AEnv(globname, rhs, addnames=True))
+    elif isinstance(s, LoopIR.WindowStmt):
+        win = lift_e(s.rhs)
+        aenvs.append(AEnv(s.name, win))
+    elif isinstance(s, LoopIR.Alloc):
+        win = AWinAlloc(s.name, s.type.shape())
+        aenvs.append(AEnv(s.name, win))
+    elif isinstance(s, LoopIR.If):
+        # extract environments for each side of the branch
+        body_env = globenv(s.body)
+        else_env = globenv(s.orelse)
+        # get the map from old to new names, and binding env
+        bvarmap, benv = body_env.bind_to_copies()
+        evarmap, eenv = else_env.bind_to_copies()
+        aenvs += [benv, eenv]
+        oldvars = {
+            nm: A.Var(nm, newv.type, s.srcinfo)
+            for nm, newv in chain(bvarmap.items(), evarmap.items())
+        }
 
-                # j_bvar  = j_bvarmap[nm]
-                # oldvar  = A.Var(nm, bvar.type, s.srcinfo)
-                # val     = A.Select(fix(oldvar, bvar),
-                #                   oldvar,
-                #                   A.Unk(oldvar.type, s.srcinfo),
-                #                   #A.Select(same_after(bvar, j_bvar),
-                #                   #         bvar,
-                #                   #         A.Unk(oldvar.type, s.srcinfo),
-                #                   #         oldvar.type, s.srcinfo),
-                #                   oldvar.type, s.srcinfo)
-                newbinds[nm] = val
-            aenvs.append(AEnvPar(newbinds, addnames=True))
+        # bind the condition so it isn't duplicated
+        condsym = Sym("if_cond")
+        condvar = A.Var(condsym, T.bool, s.cond.srcinfo)
+        cond = lift_e(s.cond)
+        aenvs.append(AEnv(condsym, cond))
+
+        # We must now construct an environment that defines the
+        # new value for variables `x` among the possibilities
+        newbinds = dict()
+        for nm, oldv in oldvars.items():
+            # default to old-value
+            tcase = bvarmap.get(nm, oldv)
+            fcase = evarmap.get(nm, oldv)
+            val = A.Select(condvar, tcase, fcase, oldv.type, s.srcinfo)
+            newbinds[nm] = val
+        aenvs.append(AEnvPar(newbinds, addnames=True))
+
+    elif isinstance(s, LoopIR.For):
+        # extract environment for the body and bind its
+        # results via copies of the variables
+        i, j = s.iter, s.iter.copy()
+        body_env = globenv(s.body)
+        bvarmap, benv = body_env.bind_to_copies()
+        aenvs.append(benv)
+
+        # bind the bounds condition so it isn't duplicated
+        # non_empty   = AInt(0) < lift_e(s.hi)
+        def fix(x, body_x):
+            bds = AAnd(lift_e(s.lo) <= AInt(i), AInt(i) < lift_e(s.hi))
+            no_change = AImplies(bds, AEq(body_x, x))
+            return A.ForAll(i, no_change, T.bool, s.srcinfo)
+
+        # extract possible RHS values for config-fields
+        # cfg_writes = possible_config_writes([s])
+        # for cfgfld in cfg_writes:
+        #     pass
+
+        # def fix_cfg(x, rhs, body_x, lower=0):
+        #     bds = AAnd(AInt(lower) <= AInt(i), AInt(i) < lift_e(s.hi))
+        #     is_assigned = A.Exists(
+        #         i, AAnd(bds, AEq(body_x, rhs)), T.bool, s.srcinfo
+        #     )
+        #     no_change_or_assign = AOr(AEq(body_x, rhs), AEq(body_x, x))
+        #     AImplies
+
+        #     no_change = 23
+        #     # A.Exists(i, is_assigned, T.bool, s.srcinfo)
+        #     no_change = A
+        #     no_change = AImplies(bds, AEq(body_x, x))
+        #     return A.ForAll(i, no_change, T.bool, s.srcinfo)
+
+        # define the value of variables due to the first iteration alone
+        # def iter0(x,body_x):
+        #    non_empty   = AInt(0) < lift_e(s.hi)
+        #    is_iter0    = AEq(AInt(i), AInt(0))
+
+        # optional attempt to have tricky conditions
+        # body_j_env  = AEnv(i, AInt(j)) + body_env
+        # j_bvarmap, j_benv = body_j_env.bind_to_copies()
+        # aenvs.append(j_benv)
+        # bds_j       = AAnd(AInt(0) <= AInt(j),
+        #                   AInt(j) < lift_e(s.hi))
+        # def same_after(body_x,body_j_x):
+        #    consistent =  A.ForAll(i, AImplies(bds,
+        #                    A.ForAll(j, AImplies(bds_j,
+        #                                AEq(body_x, body_j_x)),
+        #                             T.bool, s.srcinfo)),
+        #                    T.bool, s.srcinfo)
+        #    return AAnd(non_empty, consistent)
+
+        # Now construct an environment that defines the new
+        # value for variables `x` based on fixed-point conditions
+        newbinds = dict()
+        for nm, bvar in bvarmap.items():
+            oldvar = A.Var(nm, bvar.type, s.srcinfo)
+            val = A.Select(
+                fix(oldvar, bvar),
+                oldvar,
+                A.Unk(oldvar.type, s.srcinfo),
+                oldvar.type,
+                s.srcinfo,
+            )
 
-        elif isinstance(s, LoopIR.Call):
-            sub_proc = get_simple_proc(s.f)
-            sub_env = globenv_proc(sub_proc)
-            call_env = call_bindings(s.args, sub_proc.args)
-            aenvs += [call_env, sub_env]
+            # j_bvar  = j_bvarmap[nm]
+            # oldvar  = A.Var(nm, bvar.type, s.srcinfo)
+            # val     = A.Select(fix(oldvar, bvar),
+            #                   oldvar,
+            #                   A.Unk(oldvar.type, s.srcinfo),
+            #                   #A.Select(same_after(bvar, j_bvar),
+            #                   #         bvar,
+            #                   #         A.Unk(oldvar.type, s.srcinfo),
+            #                   #         oldvar.type, s.srcinfo),
+            #                   oldvar.type, s.srcinfo)
+            newbinds[nm] = val
+        aenvs.append(AEnvPar(newbinds, addnames=True))
+
+    elif isinstance(s, LoopIR.Call):
+        sub_proc = get_simple_proc(s.f)
+        sub_env = globenv_proc(sub_proc)
+        call_env = call_bindings(s.args, sub_proc.args)
+        aenvs += [call_env, sub_env]
 
-        else:
-            pass
+    else:
+        pass
 
     return aenv_join(aenvs)
 
@@ -1158,67 +1196,71 @@ def list_expr_effs(es):
 
 
 def stmts_effs(stmts):
+    return [eff for s in stmts for eff in _stmt_effs(s)]
+
+
+@_NodeCache
+def _stmt_effs(s):
     effs = []
-    for s in stmts:
-        if isinstance(s, (LoopIR.Assign, LoopIR.Reduce)):
-            EConstruct = E.Write if isinstance(s, LoopIR.Assign) else E.Reduce
-            effs += list_expr_effs(s.idx)
-            effs += expr_effs(s.rhs)
-            effs.append(EConstruct(s.name, lift_es(s.idx)))
-        elif isinstance(s, LoopIR.WriteConfig):
-            effs += expr_effs(s.rhs)
-            globname = s.config._INTERNAL_sym(s.field)
-            effs.append(
-                E.GlobalWrite(globname, s.config.lookup_type(s.field), lift_e(s.rhs))
-            )
-        elif isinstance(s, LoopIR.If):
-            effs += expr_effs(s.cond)
-            effs += [
-                E.Guard(lift_e(s.cond), stmts_effs(s.body)),
-                E.Guard(ANot(lift_e(s.cond)), stmts_effs(s.orelse)),
-            ]
-        elif isinstance(s, LoopIR.For):
-            effs += expr_effs(s.lo)
-            effs += expr_effs(s.hi)
-            bds = AAnd(lift_e(s.lo) <= AInt(s.iter), AInt(s.iter) < lift_e(s.hi))
-            # we must prefix the body with the loop-invariant dataflow
-            # analysis of the loop, since that is the only precondition
-            # we are sound in assuming for global values in the loop body
-            body = [E.BindEnv(globenv([s]))] + stmts_effs(s.body)
-            effs += [E.Loop(s.iter, [E.Guard(bds, body)])]
-        elif isinstance(s, LoopIR.Call):
-            # must filter out arguments that are simply
-            # Read of a numeric buffer, since those arguments are
-            # passed by reference, not by reading and passing a value.
-            # Must also filter out numeric ReadConfigs, since those are
-            # likewise being passed by reference, not being accessed
-            for fa, a in zip(s.f.args, s.args):
-                if fa.type.is_numeric() and isinstance(a, LoopIR.Read):
-                    pass  # this is the case we want to skip
-                elif fa.type.is_numeric() and isinstance(a, LoopIR.ReadConfig):
-                    pass
-                else:
-                    effs += expr_effs(a)
-            sub_proc = get_simple_proc(s.f)
-            call_env = call_bindings(s.args, sub_proc.args)
-            effs += [E.BindEnv(call_env)]
-            effs += proc_effs(sub_proc)
-        elif isinstance(s, LoopIR.Alloc):
-            if isinstance(s.type, T.Tensor):
-                effs += list_expr_effs(s.type.hi)
-            effs += [E.Alloc(s.name, len(s.type.shape()))]
-        elif isinstance(s, LoopIR.WindowStmt):
-            effs += expr_effs(s.rhs)
-        elif isinstance(s, (LoopIR.Free, LoopIR.Pass)):
-            pass
-        else:
-            assert False, f"bad case: {type(s)}"
+    if isinstance(s, (LoopIR.Assign, LoopIR.Reduce)):
+        EConstruct = E.Write if isinstance(s, LoopIR.Assign) else E.Reduce
+        effs += list_expr_effs(s.idx)
+        effs += expr_effs(s.rhs)
+        effs.append(EConstruct(s.name, lift_es(s.idx)))
+    elif isinstance(s, LoopIR.WriteConfig):
+        effs += expr_effs(s.rhs)
+        globname = s.config._INTERNAL_sym(s.field)
+        effs.append(
+            E.GlobalWrite(globname, s.config.lookup_type(s.field), lift_e(s.rhs))
+        )
+    elif isinstance(s, LoopIR.If):
+        effs += expr_effs(s.cond)
+        effs += [
+            E.Guard(lift_e(s.cond), stmts_effs(s.body)),
+            E.Guard(ANot(lift_e(s.cond)), stmts_effs(s.orelse)),
+        ]
+    elif isinstance(s, LoopIR.For):
+        effs += expr_effs(s.lo)
+        effs += expr_effs(s.hi)
+        bds = AAnd(lift_e(s.lo) <= AInt(s.iter), AInt(s.iter) < lift_e(s.hi))
+        # we must prefix the body with the loop-invariant dataflow
+        # analysis of the loop, since that is the only precondition
+        # we are sound in assuming for global values in the loop body
+        body = [E.BindEnv(globenv([s]))] + stmts_effs(s.body)
+        effs += [E.Loop(s.iter, [E.Guard(bds, body)])]
+    elif isinstance(s, LoopIR.Call):
+        # must filter out arguments that are simply
+        # Read of a numeric buffer, since those arguments are
+        # passed by reference, not by reading and passing a value.
+        # Must also filter out numeric ReadConfigs, since those are
+        # likewise being passed by reference, not being accessed
+        for fa, a in zip(s.f.args, s.args):
+            if fa.type.is_numeric() and isinstance(a, LoopIR.Read):
+                pass  # this is the case we want to skip
+            elif fa.type.is_numeric() and isinstance(a, LoopIR.ReadConfig):
+                pass
+            else:
+                effs += expr_effs(a)
+        sub_proc = get_simple_proc(s.f)
+        call_env = call_bindings(s.args, sub_proc.args)
+        effs += [E.BindEnv(call_env)]
+        effs += proc_effs(sub_proc)
+    elif isinstance(s, LoopIR.Alloc):
+        if isinstance(s.type, T.Tensor):
+            effs += list_expr_effs(s.type.hi)
+        effs += [E.Alloc(s.name, len(s.type.shape()))]
+    elif isinstance(s, LoopIR.WindowStmt):
+        effs += expr_effs(s.rhs)
+    elif isinstance(s, (LoopIR.Free, LoopIR.Pass)):
+        pass
+    else:
+        assert False, f"bad case: {type(s)}"
 
-        # secondly, insert global value modifications into
-        # the sequence of effects
-        effs.append(E.BindEnv(globenv([s])))
+    # secondly, insert global value modifications into
+    # the sequence of effects
+    effs.append(E.BindEnv(globenv([s])))
 
-    return effs
+    return tuple(effs)
 
 
 _proc_effs_cache = dict()
@@ -1278,6 +1320,284 @@ def get_changing_scalars(stmts, changeset=None, aliases=None):
     return changeset
 
 
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Access Summaries
+#
+# A cheaper, coarser alternative to effects: the buffers and globals each
+# statement may access, with the coordinates of accesses kept as affine
+# maps (an integer constant and integer coefficients of index variables)
+# where possible.  Summaries are computed once per statement node and
+# concatenated for blocks, so they do not need to be recomputed when
+# statements are moved.  They can prove that statements commute when
+# their accesses are disjoint, in which case the effects, location sets
+# and SMT queries for a check need not be constructed at all.
+
+
+@dataclass
+class Access:
+    name: Sym
+    kind: str  # "read", "write", "reduce" or "alloc"
+    # affine maps (const, {var: coeff}) per coordinate, or None if
+    # the accessed coordinates are unknown
+    coords: Any
+
+
+@dataclass
+class AccessSummary:
+    accesses: list[Access]
+    # the bounds (lo, hi) of the loops within the statements, or None
+    # if they are not constant
+    bounds: dict
+    # buffer names introduced by window statements, and the buffers
+    # they window
+    windows: dict
+
+    def __add__(lhs, rhs):
+        bounds = {**lhs.bounds, **rhs.bounds}
+        for x in lhs.bounds.keys() & rhs.bounds.keys():
+            # a loop variable bound by different loops
+            if lhs.bounds[x] != rhs.bounds[x]:
+                bounds[x] = None
+        return AccessSummary(
+            lhs.accesses + rhs.accesses, bounds, {**lhs.windows, **rhs.windows}
+        )
+
+
+def affine_e(e):
+    """
+    The affine map (const, {var: coeff}) of the index expression `e`,
+    or None if it is not an affine function of index variables
+    """
+    if isinstance(e, LoopIR.Const):
+        return (e.val, dict())
+    elif isinstance(e, LoopIR.Read):
+        return (0, {e.name: 1}) if len(e.idx) == 0 else None
+    elif isinstance(e, LoopIR.USub):
+        arg = affine_e(e.arg)
+        if arg is None:
+            return None
+        return (-arg[0], {x: -c for x, c in arg[1].items()})
+    elif isinstance(e, LoopIR.BinOp) and e.op in ("+", "-"):
+        lhs, rhs = affine_e(e.lhs), affine_e(e.rhs)
+        if lhs is None or rhs is None:
+            return None
+        sign = 1 if e.op == "+" else -1
+        coeffs = dict(lhs[1])
+        for x, c in rhs[1].items():
+            coeffs[x] = coeffs.get(x, 0) + sign * c
+        return (lhs[0] + sign * rhs[0], coeffs)
+    elif isinstance(e, LoopIR.BinOp) and e.op == "*":
+        lhs, rhs = affine_e(e.lhs), affine_e(e.rhs)
+        if lhs is None or rhs is None:
+            return None
+        if len(lhs[1]) > 0:
+            lhs, rhs = rhs, lhs
+        if len(lhs[1]) > 0:
+            return None
+        return (lhs[0] * rhs[0], {x: lhs[0] * c for x, c in rhs[1].items()})
+    else:
+        return None
+
+
+def _expr_accesses(e, accs):
+    if isinstance(e, LoopIR.Read):
+        if e.type.is_numeric():
+            coords = [affine_e(i) for i in e.idx]
+            coords = None if None in coords else coords
+            accs.append(Access(e.name, "read", coords))
+        for i in e.idx:
+            _expr_accesses(i, accs)
+    elif isinstance(e, LoopIR.USub):
+        _expr_accesses(e.arg, accs)
+    elif isinstance(e, LoopIR.BinOp):
+        _expr_accesses(e.lhs, accs)
+        _expr_accesses(e.rhs, accs)
+    elif isinstance(e, LoopIR.Extern):
+        for a in e.args:
+            _expr_accesses(a, accs)
+    elif isinstance(e, LoopIR.WindowExpr):
+        for w in e.idx:
+            if isinstance(w, LoopIR.Interval):
+                _expr_accesses(w.lo, accs)
+                _expr_accesses(w.hi, accs)
+            else:
+                _expr_accesses(w.pt, accs)
+    elif isinstance(e, LoopIR.ReadConfig):
+        globname = e.config._INTERNAL_sym(e.field)
+        accs.append(Access(globname, "read", []))
+
+
+def stmts_summary(stmts):
+    summ = AccessSummary([], dict(), dict())
+    for s in stmts:
+        summ = summ + _stmt_summary(s)
+    return summ
+
+
+@_NodeCache
+def _stmt_summary(s):
+    accs = []
+    summ = AccessSummary(accs, dict(), dict())
+    if isinstance(s, (LoopIR.Assign, LoopIR.Reduce)):
+        for i in s.idx:
+            _expr_accesses(i, accs)
+        _expr_accesses(s.rhs, accs)
+        coords = [affine_e(i) for i in s.idx]
+        coords = None if None in coords else coords
+        kind = "write" if isinstance(s, LoopIR.Assign) else "reduce"
+        accs.append(Access(s.name, kind, coords))
+    elif isinstance(s, LoopIR.WriteConfig):
+        _expr_accesses(s.rhs, accs)
+        globname = s.config._INTERNAL_sym(s.field)
+        accs.append(Access(globname, "write", []))
+    elif isinstance(s, LoopIR.If):
+        _expr_accesses(s.cond, accs)
+        summ = summ + stmts_summary(s.body) + stmts_summary(s.orelse)
+    elif isinstance(s, LoopIR.For):
+        _expr_accesses(s.lo, accs)
+        _expr_accesses(s.hi, accs)
+        lo, hi = affine_e(s.lo), affine_e(s.hi)
+        if lo is not None and hi is not None and not lo[1] and not hi[1]:
+            summ.bounds[s.iter] = (lo[0], hi[0])
+        else:
+            summ.bounds[s.iter] = None
+        summ = summ + stmts_summary(s.body)
+    elif isinstance(s, LoopIR.Call):
+        for fa, a in zip(s.f.args, s.args):
+            # buffers are passed by reference, and accessed by the callee
+            if not fa.type.is_numeric() or isinstance(a, LoopIR.WindowExpr):
+                _expr_accesses(a, accs)
+        accs += _call_accesses(s)
+    elif isinstance(s, LoopIR.Alloc):
+        if isinstance(s.type, T.Tensor):
+            for hi in s.type.hi:
+                _expr_accesses(hi, accs)
+        accs.append(Access(s.name, "alloc", None))
+    elif isinstance(s, LoopIR.WindowStmt):
+        _expr_accesses(s.rhs, accs)
+        summ.windows[s.name] = s.rhs.name
+    return summ
+
+
+@_NodeCache
+def _proc_summary(proc):
+    return stmts_summary(proc.body)
+
+
+def _call_accesses(s):
+    # the accesses of the callee to the buffers passed to it, to scalars
+    # passed by reference, and to globals; buffers allocated by the callee
+    # cannot be accessed by the caller
+    sub_proc = s.f
+    sub_summ = _proc_summary(sub_proc)
+
+    actuals = dict()
+    for fa, a in zip(sub_proc.args, s.args):
+        if not fa.type.is_numeric():
+            continue
+        elif isinstance(a, LoopIR.ReadConfig):
+            actuals[fa.name] = (a.config._INTERNAL_sym(a.field), [])
+        else:
+            scalar = isinstance(a, LoopIR.Read) and len(a.type.shape()) == 0
+            actuals[fa.name] = (a.name, [] if scalar else None)
+
+    allocs = {acc.name for acc in sub_summ.accesses if acc.kind == "alloc"}
+    accs = []
+    for acc in sub_summ.accesses:
+        name = acc.name
+        while name in sub_summ.windows:
+            name = sub_summ.windows[name]
+        if name in allocs:
+            continue
+        elif name in actuals:
+            name, coords = actuals[name]
+            accs.append(Access(name, acc.kind, coords))
+        else:
+            accs.append(acc)  # globals
+    return accs
+
+
+def _diff_range(f1, f2, bounds1, bounds2):
+    # the range [lo, hi] of f1 - f2, for the affine maps of a coordinate
+    # on either side, or None if it is unbounded.  Variables bound by
+    # loops on either side range over the bounds of those loops, and all
+    # other variables have the same value on both sides
+    (k1, m1), (k2, m2) = f1, f2
+    terms = []
+    for x, a in m1.items():
+        if x in bounds1:
+            terms.append((a, bounds1[x]))
+        elif x in bounds2 or m2.get(x, 0) != a:
+            return None
+    for x, a in m2.items():
+        if x in bounds2:
+            terms.append((-a, bounds2[x]))
+        elif x in bounds1 or m1.get(x, 0) != a:
+            return None
+
+    lo = hi = k1 - k2
+    for a, bd in terms:
+        if bd is None or bd[0] >= bd[1]:
+            return None
+        lo += min(a * bd[0], a * (bd[1] - 1))
+        hi += max(a * bd[0], a * (bd[1] - 1))
+    return lo, hi
+
+
+def _disjoint_coords(c1, c2, bounds1, bounds2):
+    if c1 is None or c2 is None or len(c1) != len(c2):
+        return False
+    for f1, f2 in zip(c1, c2):
+        rng = _diff_range(f1, f2, bounds1, bounds2)
+        if rng is not None and (rng[0] > 0 or rng[1] < 0):
+            return True
+    return False
+
+
+def _kinds_conflict(k1, k2):
+    # reads commute with reads, and reductions with reductions
+    return k1 != k2 or k1 not in ("read", "reduce")
+
+
+def summaries_commute(summ1, summ2, windows):
+    """
+    Whether the statements summarized by `summ1` and `summ2` certainly
+    commute, because they do not access the same locations (other than
+    both reading, or both reducing into them).  `windows` maps the window
+    names defined around the statements to the buffers they window.
+    """
+    names1 = {acc.name for acc in summ1.accesses}
+    names2 = {acc.name for acc in summ2.accesses}
+    if names1 & summ2.windows.keys() or names2 & summ1.windows.keys():
+        return False
+    windows = {**windows, **summ1.windows, **summ2.windows}
+
+    def resolve(acc):
+        name, coords = acc.name, acc.coords
+        while name in windows:
+            name, coords = windows[name], None
+        return name, coords
+
+    accs1 = dict()
+    for acc in summ1.accesses:
+        name, coords = resolve(acc)
+        accs1.setdefault(name, []).append((acc.kind, coords))
+    for acc in summ2.accesses:
+        name, coords2 = resolve(acc)
+        for kind1, coords1 in accs1.get(name, []):
+            if _kinds_conflict(kind1, acc.kind) and not _disjoint_coords(
+                coords1, coords2, summ1.bounds, summ2.bounds
+            ):
+                return False
+    return True
+
+
+def proc_windows(proc):
+    """the window names defined in `proc`, and the buffers they window"""
+    return _proc_summary(proc).windows
+
+
 # --------------------------------------------------------------------------- #
 # --------------------------------------------------------------------------- #
 # Context Processing
@@ -1426,12 +1746,7 @@ class ContextExtraction:
             return None
 
     def loop_preenv(self, s):
-        assert isinstance(s, LoopIR.For)
-        old_i = LoopIR.Read(s.iter, [], T.index, s.srcinfo)
-        new_i = LoopIR.Read(s.iter.copy(), [], T.index, s.srcinfo)
-        pre_body = SubstArgs(s.body, {s.iter: new_i}).result()
-        pre_loop = LoopIR.For(new_i.name, s.lo, old_i, pre_body, s.loop_mode, s.srcinfo)
-        return globenv([pre_loop])
+        return _loop_preenv(s)
 
     def loop_posteff(self, s, hi):
         # want to generate a loop
@@ -1451,6 +1766,18 @@ class ContextExtraction:
         return stmts_effs([post_loop])
 
 
+# the environment before an arbitrary iteration `i` of the loop, i.e.
+# after running `for i' in seq(lo, i): s[i -> i']`
+@_NodeCache
+def _loop_preenv(s):
+    assert isinstance(s, LoopIR.For)
+    old_i = LoopIR.Read(s.iter, [], T.index, s.srcinfo)
+    new_i = LoopIR.Read(s.iter.copy(), [], T.index, s.srcinfo)
+    pre_body = SubstArgs(s.body, {s.iter: new_i}).result()
+    pre_loop = LoopIR.For(new_i.name, s.lo, old_i, pre_body, s.loop_mode, s.srcinfo)
+    return globenv([pre_loop])
+
+
 # --------------------------------------------------------------------------- #
 # --------------------------------------------------------------------------- #
 # Common Predicates
@@ -1611,6 +1938,10 @@ def loop_globenv(i, lo_expr, hi_expr, body):
 
 
 def Check_ReorderStmts(proc, s1, s2):
+    # avoid building the effects when the statements access different data
+    if summaries_commute(stmts_summary([s1]), stmts_summary([s2]), proc_windows(proc)):
+        return
+
     ctxt = ContextExtraction(proc, [s1, s2])
 
     p = ctxt.get_control_predicate()
@@ -1764,6 +2095,24 @@ def Check_ParallelizeLoop(proc, s):
 #                     Commutes(a1', a2) /\ AllocCommutes(a1, a2) )
 #
 def Check_FissionLoop(proc, loop, stmts1, stmts2, no_loop_var_1=False):
+    # avoid building the effects when the statements access different data,
+    # in any two iterations of the loop
+    summ1, summ2 = stmts_summary(stmts1), stmts_summary(stmts2)
+    lo, hi = affine_e(loop.lo), affine_e(loop.hi)
+    if lo is not None and hi is not None and not lo[1] and not hi[1]:
+        iters = AccessSummary([], {loop.iter: (lo[0], hi[0])}, dict())
+    else:
+        iters = AccessSummary([], {loop.iter: None}, dict())
+    bds = []
+    _expr_accesses(loop.lo, bds)
+    _expr_accesses(loop.hi, bds)
+    bds = AccessSummary(bds, dict(), dict())
+    windows = proc_windows(proc)
+    if summaries_commute(iters + summ1, iters + summ2, windows) and (
+        summaries_commute(bds, summ1 + summ2, windows)
+    ):
+        return
+
     ctxt = ContextExtraction(proc, [loop])
     chgG = get_changing_scalars(proc.body)
 
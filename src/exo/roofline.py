@@ -0,0 +1,270 @@
+"""
+Roofline reports of compiled procedures.
+
+    from exo.roofline import MachinePeaks, roofline, format_markdown
+
+    peaks = MachinePeaks(gflops=1200.0, bandwidth=80.0)
+    entries = roofline([sgemm, saxpy], {"sgemm": {"M": 512, ...}, ...}, peaks)
+    print(format_markdown(entries, peaks))
+
+For each procedure, the FLOP count and the bytes accessed are derived from
+LoopIR by `exo.analyze_cost`, for the sizes given by name.  The arithmetic
+intensity is the FLOP count over the compulsory traffic of one call, i.e.
+the total size of its buffer arguments.  If `measure` is set, the
+procedures are compiled to a shared library and timed on random inputs
+(see `exo.bench`), giving the achieved GFLOP/s and GB/s, and the fraction
+of the attainable performance `min(peak, intensity * bandwidth)` reached.
+
+`exocc --perf-summary CONFIG.json` writes such a report alongside the
+generated C code, where the JSON configuration file has the form
+
+    {
+      "peaks": {"gflops": 1200.0, "bandwidth": 80.0},
+      "sizes": {"sgemm": {"M": 512, "N": 512, "K": 512}},
+      "measure": true,
+      "n_runs": 20
+    }
+
+Measuring requires NumPy.
+"""
+
+from __future__ import annotations
+
+import json
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .API import Procedure, analyze_cost
+from .rewrite.cost_analysis import itemsize
+from .rewrite.range_analysis import constant_bound
+
+
+@dataclass
+class MachinePeaks:
+    """Peak compute throughput (GFLOP/s) and memory bandwidth (GB/s)"""
+
+    gflops: float
+    bandwidth: float
+
+    @property
+    def ridge_point(self) -> float:
+        """the arithmetic intensity (FLOP/byte) at which both peaks meet"""
+        return self.gflops / self.bandwidth
+
+
+@dataclass
+class RooflineEntry:
+    """
+    The position of one procedure on the roofline.  `bytes` is the
+    compulsory traffic of one call, and `accessed_bytes` the bytes loaded
+    and stored by all accesses.  Measured fields are None unless the
+    procedure was timed, and relative ones unless peaks were given.
+    `skipped` says why a procedure was not timed although measuring, or
+    why its static counts are missing too.
+    """
+
+    proc: str
+    sizes: Dict[str, int]
+    flops: Optional[float] = None
+    bytes: Optional[int] = None
+    accessed_bytes: Optional[float] = None
+    time: Optional[float] = None
+    attainable_gflops: Optional[float] = None
+    bound: Optional[str] = None
+    skipped: Optional[str] = None
+
+    @property
+    def intensity(self) -> Optional[float]:
+        """FLOP per byte of compulsory traffic"""
+        return self.flops / self.bytes if self.bytes else None
+
+    @property
+    def gflops(self) -> Optional[float]:
+        if self.time is None:
+            return None
+        return self.flops / self.time / 1e9
+
+    @property
+    def bandwidth(self) -> Optional[float]:
+        """GB/s of compulsory traffic"""
+        if self.time is None:
+            return None
+        return self.bytes / self.time / 1e9
+
+    @property
+    def fraction_of_peak(self) -> Optional[float]:
+        if self.gflops is None or not self.attainable_gflops:
+            return None
+        return self.gflops / self.attainable_gflops
+
+    def to_dict(self):
+        d = asdict(self)
+        for nm in ("intensity", "gflops", "bandwidth", "fraction_of_peak"):
+            d[nm] = getattr(self, nm)
+        return d
+
+
+def _compulsory_bytes(proc, sizes):
+    env = {a.name: (sizes[str(a.name)],) * 2 for a in proc.args if str(a.name) in sizes}
+    total = 0
+    for a in proc.args:
+        if not a.type.is_numeric():
+            continue
+        n = itemsize(a.type)
+        for hi in a.type.shape():
+            _, ext = constant_bound(hi, env)
+            n *= ext or 0
+        total += n
+    return total
+
+
+def static_entry(
+    proc: Procedure, sizes: Dict[str, int], peaks: Optional[MachinePeaks] = None
+) -> RooflineEntry:
+    """
+    The roofline entry of `proc` from its static counts alone
+    """
+    report = analyze_cost(proc, sizes)
+    entry = RooflineEntry(
+        proc.name(),
+        dict(sizes),
+        report.total_flops,
+        _compulsory_bytes(proc._loopir_proc, sizes),
+        sum(report.bytes_loaded.values()) + sum(report.bytes_stored.values()),
+    )
+    if peaks is not None and entry.intensity is not None:
+        memory_gflops = entry.intensity * peaks.bandwidth
+        entry.attainable_gflops = min(peaks.gflops, memory_gflops)
+        entry.bound = "memory" if memory_gflops < peaks.gflops else "compute"
+    return entry
+
+
+def roofline(
+    procs: List[Procedure],
+    sizes: Dict[str, Dict[str, int]],
+    peaks: Optional[MachinePeaks] = None,
+    *,
+    measure: bool = True,
+    n_runs: int = 20,
+    n_warmup: int = 3,
+    seed: int = 0,
+    workdir: Optional[Path] = None,
+    **kwargs,
+) -> List[RooflineEntry]:
+    """
+    Roofline entries of the procedures in `procs`, at the sizes, indices
+    and integers given by name in `sizes` (a dict from procedure names);
+    procedures without control arguments need none, and those missing
+    from `sizes` otherwise are marked as skipped.  If `measure` is set,
+    all procedures are compiled into one library in `workdir` and each is
+    timed over `n_runs` calls on random inputs, except for those taking
+    windows, which cannot be called with random inputs and are marked as
+    skipped.  The remaining keyword arguments are passed to
+    `exo.bench.compile_library`.
+    """
+    entries = []
+    measured = []
+    for p in procs:
+        ctrl = [a for a in p._loopir_proc.args if a.type.is_indexable()]
+        if p.name() not in sizes and ctrl:
+            entries.append(RooflineEntry(p.name(), {}, skipped="no sizes given"))
+            continue
+        entry = static_entry(p, sizes.get(p.name(), {}), peaks)
+        entries.append(entry)
+        if any(a.type.is_win() for a in p._loopir_proc.args):
+            if measure:
+                entry.skipped = "window arguments"
+        else:
+            measured.append((p, entry))
+
+    if measure and measured:
+        import numpy as np
+
+        from .bench import compile_library, run_benchmark
+        from .difftest import random_inputs
+
+        workdir = Path(workdir or tempfile.mkdtemp(prefix="exo_roofline_"))
+        lib = compile_library(
+            [p for p, _ in measured], workdir, name="roofline", **kwargs
+        )
+        rng = np.random.default_rng(seed)
+        for p, entry in measured:
+            inputs = random_inputs(p, rng, sizes=entry.sizes)
+            result = run_benchmark(
+                getattr(lib, p.name()), inputs, n_runs=n_runs, n_warmup=n_warmup
+            )
+            entry.time = result.median
+
+    return entries
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Reports
+
+
+def format_json(entries: List[RooflineEntry], peaks: Optional[MachinePeaks]) -> str:
+    return json.dumps(
+        {
+            "peaks": asdict(peaks) if peaks is not None else None,
+            "procs": [e.to_dict() for e in entries],
+        },
+        indent=2,
+    )
+
+
+def format_markdown(entries: List[RooflineEntry], peaks: Optional[MachinePeaks]) -> str:
+    def fmt(v, spec):
+        return "-" if v is None else format(v, spec)
+
+    lines = []
+    if peaks is not None:
+        lines += [
+            f"Peaks: {peaks.gflops:g} GFLOP/s, {peaks.bandwidth:g} GB/s "
+            f"(ridge point {peaks.ridge_point:.2f} FLOP/byte)",
+            "",
+        ]
+    lines += [
+        "| proc | FLOPs | bytes | FLOP/byte | time | GFLOP/s | GB/s "
+        "| bound | % of attainable |",
+        "|------|-------|-------|-----------|------|---------|------"
+        "|-------|-----------------|",
+    ]
+    for e in entries:
+        frac = e.fraction_of_peak
+        lines.append(
+            f"| {e.proc} | {fmt(e.flops, 'g')} | {fmt(e.bytes, '')} "
+            f"| {fmt(e.intensity, '.3f')} "
+            f"| {fmt(e.time and e.time * 1e6, '.2f')}{' us' if e.time else ''} "
+            f"| {fmt(e.gflops, '.2f')} | {fmt(e.bandwidth, '.2f')} "
+            f"| {e.bound or '-'} | {fmt(frac and 100 * frac, '.1f')} |"
+        )
+    skipped = [f"{e.proc} ({e.skipped})" for e in entries if e.skipped]
+    if skipped:
+        lines += ["", f"Not measured: {', '.join(skipped)}"]
+    return "\n".join(lines)
+
+
+def write_summary(
+    procs: List[Procedure], config: Dict, outdir: Path, stem: str
+) -> List[RooflineEntry]:
+    """
+    Write the roofline report of `procs` described by `config` (see the
+    module documentation) to `{stem}.perf.json` and `{stem}.perf.md` in
+    `outdir`
+    """
+    peaks = config.get("peaks")
+    peaks = MachinePeaks(**peaks) if peaks is not None else None
+    entries = roofline(
+        procs,
+        config.get("sizes", {}),
+        peaks,
+        measure=config.get("measure", True),
+        n_runs=config.get("n_runs", 20),
+        workdir=outdir / f"{stem}_perf",
+    )
+    (outdir / f"{stem}.perf.json").write_text(format_json(entries, peaks) + "\n")
+    (outdir / f"{stem}.perf.md").write_text(format_markdown(entries, peaks) + "\n")
+    return entries
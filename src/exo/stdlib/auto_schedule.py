@@ -0,0 +1,379 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from exo import *
+from exo.API import compile_procs_to_strings
+from exo.API_types import ExoType
+from exo.core.configs import ConfigError
+from exo.core.memory import MemGenError
+from exo.libs.memories import AVX2, AVX512
+from exo.platforms.x86 import avx2_instrs, avx512_instrs
+
+from .scheduling import *
+from .inspection import *
+from .higher_order import *
+from .stdlib import fma_rule, hoist_from_loop, tile_loops, vectorize, auto_stage_mem
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Automatic scheduling of dense loop nests
+#
+# A perfect loop nest `for i, j, k: C[i, j] += ...` whose output is indexed
+# by the iteration variable `j` of one of the loops in its last dimension is
+# register blocked: `i` and `j` are tiled by R and U vectors, the loops not
+# indexing the output (the reduction loops) are moved out of the tile, the
+# output tile is staged into vector registers across the innermost of them,
+# and the tile is vectorized, unrolled, and mapped to instructions.
+#
+# The tile sizes are chosen to maximize the FLOPs per load of the
+# micro-kernel within the vector registers of the target.  When the problem
+# sizes are known, the best few candidates are scheduled and compared by the
+# static cost model (`exo.analyze_cost`), which accounts for the remainders
+# left to scalar code.  Every step that fails leaves the procedure as it
+# was, and the result is checked to compile, and (if NumPy is available)
+# to agree with the original procedure on random inputs.
+
+
+@dataclass
+class Target:
+    name: str
+    mem: type
+    # the vector lanes and instructions of each supported precision
+    vec_width: Dict[str, int]
+    instructions: Dict[str, List[Procedure]]
+    n_registers: int
+
+
+AVX2_TARGET = Target("AVX2", AVX2, {"f32": 8, "f64": 4}, avx2_instrs, 16)
+AVX512_TARGET = Target("AVX512", AVX512, {"f32": 16}, avx512_instrs, 32)
+
+
+@dataclass
+class _Nest:
+    proc: Procedure
+    loops: List[str]
+    stmt: StmtCursor
+    precision: str
+    # the loop indexing the last dimension of the output
+    vec_loop: Optional[str]
+    # the other loops indexing the output, and those that do not
+    par_loops: List[str] = field(default_factory=list)
+    red_loops: List[str] = field(default_factory=list)
+
+
+_precisions = {ExoType.F32: "f32", ExoType.F64: "f64"}
+
+
+def _find_nest(proc, loop):
+    if loop is None:
+        loops = [s for s in proc.body() if isinstance(s, ForCursor)]
+        if not loops:
+            raise SchedulingError("auto_schedule: no loop nest found")
+        loop = loops[0]
+    loop = proc.forward(loop) if not isinstance(loop, str) else proc.find_loop(loop)
+
+    loops = []
+    s = loop
+    while isinstance(s, ForCursor):
+        if len(s.body()) != 1:
+            raise SchedulingError("auto_schedule: expected a perfect loop nest")
+        loops.append(s.name())
+        s = s.body()[0]
+    if not isinstance(s, (AssignCursor, ReduceCursor)):
+        raise SchedulingError(
+            "auto_schedule: expected the innermost loop body to be a single "
+            "assignment or reduction"
+        )
+    if len(set(loops)) != len(loops):
+        raise SchedulingError("auto_schedule: loop variables must be distinct")
+
+    precision = _precisions.get(s.rhs().type())
+    if precision is None:
+        raise SchedulingError(f"auto_schedule: unsupported precision {s.rhs().type()}")
+
+    used = {nm for i in s.idx() for nm in get_symbols(proc, i)}
+    vec_loop = None
+    if len(s.idx()) > 0 and isinstance(s.idx()[-1], ReadCursor):
+        if s.idx()[-1].name() in loops:
+            vec_loop = s.idx()[-1].name()
+
+    if vec_loop is not None and not _unit_stride(proc, s, vec_loop):
+        vec_loop = None
+
+    nest = _Nest(proc, loops, s, precision, vec_loop)
+    for nm in loops:
+        if nm == vec_loop:
+            continue
+        (nest.par_loops if nm in used else nest.red_loops).append(nm)
+    return nest
+
+
+def _coefficient(proc, e, name):
+    # the coefficient of `name` in the index expression `e` if it is known
+    # to be 0 or +/-1, and None otherwise
+    if name not in get_symbols(proc, e):
+        return 0
+    if isinstance(e, ReadCursor):
+        return 1 if len(e.idx()) == 0 else None
+    elif isinstance(e, UnaryMinusCursor):
+        c = _coefficient(proc, e.arg(), name)
+        return None if c is None else -c
+    elif isinstance(e, BinaryOpCursor) and e.op() in ("+", "-"):
+        lhs = _coefficient(proc, e.lhs(), name)
+        rhs = _coefficient(proc, e.rhs(), name)
+        if lhs is None or rhs is None:
+            return None
+        c = lhs + rhs if e.op() == "+" else lhs - rhs
+        return c if c in (-1, 0, 1) else None
+    return None
+
+
+def _unit_stride(proc, s, name):
+    """
+    Whether the loop variable `name` indexes every buffer accessed by `s` in
+    its last dimension only, so that vectorizing it accesses contiguous
+    vectors
+    """
+    accesses = [s] + [c for c in lrn(proc, s.rhs()) if isinstance(c, ReadCursor)]
+    for acc in accesses:
+        idx = list(acc.idx())
+        for k, e in enumerate(idx):
+            c = _coefficient(proc, e, name)
+            if c is None or (c != 0 and (k < len(idx) - 1 or c != 1)):
+                return False
+    return True
+
+
+def _innermost(loop):
+    while len(loop.body()) == 1 and isinstance(loop.body()[0], ForCursor):
+        loop = loop.body()[0]
+    return loop
+
+
+def _sink(proc, loop, stop=None):
+    """
+    Move `loop` inwards until it is innermost, or directly encloses `stop`
+    """
+    loop = proc.forward(loop)
+    while len(loop.body()) == 1 and isinstance(loop.body()[0], ForCursor):
+        if stop is not None and loop.body()[0].name() == stop:
+            break
+        proc = reorder_loops(proc, loop)
+        loop = proc.forward(loop)
+    return proc
+
+
+# --------------------------------------------------------------------------- #
+# Schedules
+
+
+def _register_blocked(proc, nest, target, R, U):
+    W = target.vec_width[nest.precision]
+    mem = target.mem
+    out = nest.stmt.name()
+    r = nest.par_loops[-1] if nest.par_loops else None
+    v = nest.vec_loop
+
+    pairs = [(proc.find_loop(r), R)] if r else []
+    pairs.append((proc.find_loop(v), W * U))
+    pairs.sort(key=lambda p: nest.loops.index(p[0].name()))
+    names = [lp.name() for lp, _ in pairs]
+    proc, inner = tile_loops(proc, pairs)
+    vi = inner[names.index(v)]
+    ri = inner[names.index(r)] if r else None
+
+    # the register tile is innermost, below the reduction loops
+    proc = _sink(proc, vi)
+    if ri is not None:
+        proc = _sink(proc, ri, stop=proc.forward(vi).name())
+    tile = proc.forward(ri if ri is not None else vi)
+    red = tile.parent()
+    if not (isinstance(red, ForCursor) and red.name() in nest.red_loops):
+        raise SchedulingError("auto_schedule: no reduction loop to block over")
+
+    proc = simplify(auto_stage_mem(proc, red, out, "reg"))
+    alloc = proc.forward(red).prev().prev()
+    proc = simplify(divide_dim(proc, alloc, len(alloc.shape()) - 1, W))
+    proc = set_memory(proc, alloc, mem)
+
+    # vectorize the loads, the computation and the stores of the tile
+    red = proc.forward(red)
+    loops = [_innermost(red.prev()), _innermost(red), _innermost(red.next())]
+    for lp in loops:
+        proc = vectorize(
+            proc, lp, W, nest.precision, mem, rules=[fma_rule], tail="perfect"
+        )
+    proc = simplify(proc)
+
+    # unroll the tile, and reuse the loaded vectors across its rows
+    red = proc.forward(red)
+    tile = proc.forward(ri) if ri is not None else None
+    for lp in _tile_loops(red):
+        if tile is not None and lp == tile:
+            continue
+        proc, (_, lp) = hoist_from_loop(proc, lp, rc=True)
+        proc = unroll_loop(proc, lp)
+    if tile is not None:
+        proc, (_, tile) = hoist_from_loop(proc, tile, rc=True)
+        proc = unroll_loop(proc, tile)
+    for nb in (proc.forward(red).prev(), proc.forward(red).next()):
+        proc = _unroll_nest(proc, nb)
+
+    proc = simplify(proc)
+    return replace_all(proc, target.instructions[nest.precision])
+
+
+def _is_vector_loop(loop):
+    return not any(isinstance(c, ForCursor) for c in loop.body())
+
+
+def _tile_loops(red):
+    # the loops over the register tile nested in `red`, innermost first
+    loops = []
+
+    def visit(s):
+        for c in s.body():
+            if isinstance(c, ForCursor) and not _is_vector_loop(c):
+                visit(c)
+                if isinstance(c.hi(), LiteralCursor):
+                    loops.append(c)
+
+    visit(red)
+    return loops
+
+
+def _unroll_nest(proc, loop):
+    loop = proc.forward(loop)
+    if not isinstance(loop, ForCursor) or _is_vector_loop(loop):
+        return proc
+    for c in list(loop.body()):
+        proc = _unroll_nest(proc, c)
+    if isinstance(proc.forward(loop).hi(), LiteralCursor):
+        proc = unroll_loop(proc, loop)
+    return proc
+
+
+def _vectorized(proc, nest, target):
+    W = target.vec_width[nest.precision]
+    mem = target.mem
+    proc = _sink(proc, proc.find_loop(nest.vec_loop))
+    proc = vectorize(
+        proc,
+        proc.find_loop(nest.vec_loop),
+        W,
+        nest.precision,
+        mem,
+        target.instructions[nest.precision],
+        tail="cut",
+    )
+    return simplify(proc)
+
+
+def _trip_counts(nest, sizes):
+    # the trip counts of the loops of the nest, where they are known
+    if sizes is None:
+        return lambda nm: None
+    report = analyze_cost(nest.proc, sizes)
+    trips = {lp.iter: lp.trips for lp in report.loops}
+    return lambda nm: trips.get(nm)
+
+
+def _tile_candidates(nest, target, sizes):
+    """
+    Register tiles (R, U), i.e. of R rows of U vectors, fitting in the vector
+    registers with the U vectors loaded and the value broadcast per row, by
+    decreasing FLOPs per load
+    """
+    W = target.vec_width[nest.precision]
+    extent = _trip_counts(nest, sizes)
+    r = nest.par_loops[-1] if nest.par_loops else None
+    candidates = []
+    for R in range(1, 9) if r else [1]:
+        for U in range(1, 5):
+            if R * U + U + 1 > target.n_registers:
+                continue
+            if r and extent(r) is not None and R > max(extent(r), 1):
+                continue
+            if extent(nest.vec_loop) is not None and W * U > extent(nest.vec_loop):
+                continue
+            candidates.append((R * U / (R + U), R, U))
+    candidates.sort(reverse=True)
+    return [(R, U) for _, R, U in candidates]
+
+
+def _estimated_cost(proc, sizes):
+    report = analyze_cost(proc, sizes)
+    return report.scalar_stmts + sum(report.instr_calls.values())
+
+
+def _compiles(proc):
+    try:
+        compile_procs_to_strings([proc], "auto_schedule.h")
+        return True
+    except (MemGenError, ConfigError, SchedulingError):
+        return False
+
+
+def _verify(original, proc):
+    try:
+        from exo.difftest import check_equivalent
+    except ImportError:
+        return
+    mismatch = check_equivalent(original, proc, n_trials=8, max_size=24, n_workers=1)
+    if mismatch is not None:
+        raise SchedulingError(f"auto_schedule: schedule is not equivalent:\n{mismatch}")
+
+
+def auto_schedule(
+    proc,
+    target=AVX2_TARGET,
+    loop=None,
+    sizes=None,
+    n_candidates=3,
+    verify=True,
+):
+    """
+    Schedule the perfect loop nest `loop` (by default, the first loop of
+    `proc`) for the vector instructions of `target`, by register blocking
+    and vectorizing it when its output is indexed by a loop variable in its
+    last dimension.  When `sizes` are given (by argument name), the
+    `n_candidates` most promising register tiles are compared by the static
+    cost model.  Steps that cannot be applied are skipped, so that the
+    result can always serve as a starting point for hand-tuning.
+    """
+    nest = _find_nest(proc, loop)
+    if nest.vec_loop is None or nest.precision not in target.vec_width:
+        return proc
+    extent = _trip_counts(nest, sizes)(nest.vec_loop)
+    if extent is not None and extent < target.vec_width[nest.precision]:
+        return proc
+
+    schedules = []
+    if nest.red_loops:
+        candidates = _tile_candidates(nest, target, sizes)
+        for R, U in candidates[: n_candidates if sizes is not None else 1]:
+            try:
+                p = _register_blocked(proc, nest, target, R, U)
+            except SchedulingError:
+                continue
+            if _compiles(p):
+                schedules.append(p)
+
+    if not schedules:
+        try:
+            p = _vectorized(proc, nest, target)
+            if _compiles(p):
+                schedules.append(p)
+        except SchedulingError:
+            pass
+
+    if not schedules:
+        return proc
+    if sizes is not None:
+        schedules.sort(key=lambda p: _estimated_cost(p, sizes))
+    best = schedules[0]
+    if verify:
+        _verify(proc, best)
+    return best
@@ -96,7 +96,13 @@ from ..API_scheduling import (
 
 from .analysis import check_call_mem_types
 from ..API_cursors import *
+from ..API_cursors import lift_cursor as _lift_cursor
 from ..rewrite.LoopIR_unification import UnificationError as _UnificationError
+from ..rewrite.instr_selection import (
+    InstrPattern as _InstrPattern,
+    Signatures as _Signatures,
+    replaced_stmt as _replaced_stmt,
+)
 
 
 # --------------------------------------------------------------------------- #
@@ -205,24 +211,25 @@ class MemoryError(Exception):
         return self._err_msg
 
 
+def _check_all_calls(body_cursor):
+    check_passed = True
+    for cursor in body_cursor:
+        if isinstance(cursor, CallCursor):
+            check_passed = check_passed and check_call_mem_types(cursor)
+        elif isinstance(cursor, IfCursor):
+            check_passed = check_passed and _check_all_calls(cursor.body())
+            if type(cursor.orelse()) is not InvalidCursor:
+                check_passed = check_passed and _check_all_calls(cursor.orelse())
+        elif isinstance(cursor, ForCursor):
+            check_passed = check_passed and _check_all_calls(cursor.body())
+    return check_passed
+
+
 @sched_op([BlockCursorA, ProcA, BoolA])
 def call_site_mem_aware_replace(proc, block_cursor, subproc, quiet=False):
     proc = replace(proc, block_cursor, subproc, quiet=quiet)
 
-    def check_all_calls(body_cursor):
-        check_passed = True
-        for cursor in body_cursor:
-            if isinstance(cursor, CallCursor):
-                check_passed = check_passed and check_call_mem_types(cursor)
-            elif isinstance(cursor, IfCursor):
-                check_passed = check_passed and check_all_calls(cursor.body())
-                if type(cursor.orelse()) is not InvalidCursor:
-                    check_passed = check_passed and check_all_calls(cursor.orelse())
-            elif isinstance(cursor, ForCursor):
-                check_passed = check_passed and check_all_calls(cursor.body())
-        return check_passed
-
-    if not check_all_calls(proc.body()):
+    if not _check_all_calls(proc.body()):
         raise MemoryError(
             "replace failed due to memory type mismatch between block and subproc"
         )
@@ -230,14 +237,9 @@ def call_site_mem_aware_replace(proc, block_cursor, subproc, quiet=False):
     return proc
 
 
-def _replace_helper(proc, subprocs, mem_aware, once):
-
-    if not isinstance(subprocs, list):
-        subprocs = [subprocs]
-
-    for subproc in subprocs:
-        assert isinstance(subproc, Procedure), "expected Procedure as 2nd argument"
-
+def _replace_by_find(proc, subproc, mem_aware, once):
+    # tries to unify `subproc` with every block starting like its body, for
+    # the sub-procedures `_InstrPattern` cannot index
     patterns = {
         AssignCursor: "_ = _",
         ReduceCursor: "_ += _",
@@ -250,36 +252,100 @@ def _replace_helper(proc, subprocs, mem_aware, once):
         WindowStmtCursor: "TODO",
     }
 
+    body = subproc.body()
+    pattern = patterns[type(body[0])]
+    i = 0
+    while True:
+        try:
+            block = proc.find(f"{pattern} #{i}").expand(0, len(body) - 1)
+            if len(block) != len(body):
+                raise _UnificationError("Unification failed due to length mismatch")
+
+            if mem_aware:
+                proc = call_site_mem_aware_replace(proc, block, subproc, quiet=True)
+            else:
+                proc = replace(proc, block, subproc, quiet=True)
+            if once:
+                break
+        except (TypeError, SchedulingError) as e:
+            if "failed to find matches" in str(e):
+                break
+            raise
+        except (
+            _UnificationError,
+            MemoryError,
+            NotImplementedError,
+        ):
+            i += 1
+
+    return proc
+
+
+def _replace_helper(proc, subprocs, mem_aware, once):
+
+    if not isinstance(subprocs, list):
+        subprocs = [subprocs]
+
+    for subproc in subprocs:
+        assert isinstance(subproc, Procedure), "expected Procedure as 2nd argument"
+
+    # the calls already in `proc` are checked once here, and each new call
+    # as it is made, rather than all of them after every replacement
+    if mem_aware and not _check_all_calls(proc.body()):
+        return proc
+
+    sigs = _Signatures()
     for subproc in subprocs:
-        body = subproc.body()
-        pattern = patterns[type(body[0])]
+        pattern = _InstrPattern(subproc._loopir_proc, sigs)
+        if not pattern.supported:
+            proc = _replace_by_find(proc, subproc, mem_aware, once)
+            continue
+
+        # only the blocks with the same signature as `subproc` can unify
+        candidates = [
+            _lift_cursor(c, proc)
+            for c in pattern.candidates(proc._loopir_proc, mem_aware)
+        ]
         i = 0
-        while True:
+        while i < len(candidates):
+            block = candidates[i].expand(0, pattern.n_stmts - 1)
+            i += 1
             try:
-                block = proc.find(f"{pattern} #{i}").expand(0, len(body) - 1)
-                if len(block) != len(body):
-                    raise _UnificationError("Unification failed due to length mismatch")
-
+                new_proc = replace(proc, block, subproc, quiet=True)
                 if mem_aware:
-                    proc = call_site_mem_aware_replace(proc, block, subproc, quiet=True)
-                else:
-                    proc = replace(proc, block, subproc, quiet=True)
-                if once:
-                    break
-            except (TypeError, SchedulingError) as e:
-                if "failed to find matches" in str(e):
-                    break
-                raise
+                    call = _replaced_stmt(new_proc._loopir_proc, block._impl)
+                    if not check_call_mem_types(_lift_cursor(call, new_proc)):
+                        raise MemoryError(
+                            "replace failed due to memory type mismatch between "
+                            "block and subproc"
+                        )
             except (
                 _UnificationError,
                 MemoryError,
                 NotImplementedError,
             ):
-                i += 1
+                continue
+
+            proc = new_proc
+            if once:
+                break
+            candidates = _forward_all(proc, candidates[i:])
+            i = 0
 
     return proc
 
 
+def _forward_all(proc, cursors):
+    # the cursors that still exist in `proc`
+    result = []
+    for c in cursors:
+        try:
+            result.append(proc.forward(c))
+        except InvalidCursorError:
+            pass
+    return result
+
+
 def replace_all(proc, subprocs, mem_aware=True):
     """
     Givin a proc and subprocs, replace the body of proc with subproc
@@ -343,3 +409,88 @@ def lift_if(proc, cursor, n_lifts=1):
                 proc=proc,
             ) from e
     return proc
+
+
+def multiversion(proc, cases, schedule=None, name=None):
+    """
+    Generate a single dispatching entry point for `proc` which branches
+    on the predicates of each case to a specialized (and separately
+    scheduled) variant, falling back to the generic procedure when no
+    case applies.  Cases are tested in order, so the fastest variants
+    should be listed first.
+
+    args:
+        cases    - list of predicate sets.  Each predicate set is either a
+                   single predicate string or a list of predicate strings
+                   over the arguments of `proc`, e.g.
+                   `["M % 6 == 0", "N % 64 == 0"]`
+        schedule - optional callback `schedule(variant, preds)` returning a
+                   scheduled version of `variant`, which has the predicates
+                   of its case added as assertions
+        name     - name of the dispatching procedure (defaults to the name
+                   of `proc`)
+
+    returns:
+        a tuple (dispatch, variants), where `variants` lists the scheduled
+        variant of each case followed by the generic fallback
+
+    rewrite:
+        `B`
+            ->
+        `if preds_0:`
+        `    name_v0(...)`
+        `elif preds_1:`
+        `    name_v1(...)`
+        ...
+        `else:`
+        `    name_generic(...)`
+    """
+    if not isinstance(proc, Procedure):
+        raise TypeError("expected a Procedure as first argument")
+    if not isinstance(cases, list) or len(cases) == 0:
+        raise TypeError("expected a non-empty list of predicate sets")
+    if schedule is not None and not callable(schedule):
+        raise TypeError("expected schedule to be None or a callable")
+
+    name = name or proc.name()
+
+    case_preds = []
+    for preds in cases:
+        preds = [preds] if isinstance(preds, str) else list(preds)
+        if not preds or not all(isinstance(p, str) for p in preds):
+            raise TypeError("expected each case to be a non-empty list of strings")
+        case_preds.append(preds)
+
+    # build the unscheduled variant of each case, and its scheduled version
+    variants = []
+    for i, preds in enumerate(case_preds):
+        variant = rename(proc, f"{name}_v{i}")
+        for pred in preds:
+            variant = variant.add_assertion(pred)
+        scheduled = schedule(variant, preds) if schedule else variant
+        if not isinstance(scheduled, Procedure):
+            raise TypeError("expected schedule to return a Procedure")
+        variants.append((variant, scheduled))
+
+    generic = rename(proc, f"{name}_generic")
+
+    conds = [" and ".join(f"({p})" for p in preds) for preds in case_preds]
+    dispatch = rename(proc, name)
+    dispatch = specialize(dispatch, dispatch.body(), conds)
+
+    def branch(p, i):
+        # the i-th case lives in the body of the i-th nested If-statement,
+        # and the fallback in the orelse of the last one
+        if_stmt = p.body()[0]
+        for _ in range(min(i, len(conds) - 1)):
+            if_stmt = if_stmt.orelse()[0]
+        return if_stmt.body() if i < len(conds) else if_stmt.orelse()
+
+    for i, (variant, scheduled) in enumerate(variants):
+        dispatch = replace(dispatch, branch(dispatch, i), variant, quiet=True)
+        if scheduled is not variant:
+            dispatch = call_eqv(dispatch, branch(dispatch, i)[0], scheduled)
+    dispatch = replace(dispatch, branch(dispatch, len(conds)), generic, quiet=True)
+    dispatch = simplify(dispatch)
+
+    return dispatch, [scheduled for _, scheduled in variants] + [generic]
@@ -0,0 +1,334 @@
+"""
+Autotuning of schedule parameters.
+
+    from exo.tune import tune
+
+    def schedule(M_BLK, N_BLK):
+        p = divide_loop(sgemm, "i", M_BLK, ["io", "ii"], tail="cut")
+        ...
+        return p
+
+    result = tune(
+        schedule,
+        {"M_BLK": [4, 8, 16], "N_BLK": [16, 32, 64]},
+        inputs,
+        strategy="evolution",
+        n_trials=30,
+        db="sgemm_tuning.jsonl",
+    )
+    print(result.best.params, result.best.time)
+
+`schedule` maps a point of the search space (by parameter name) to a
+procedure; points where it raises a `SchedulingError` are skipped.  The
+variants are compiled to shared libraries by a pool of worker threads,
+and then timed one at a time on `inputs` (as in `exo.bench`).
+
+Every measurement is appended to the results database `db` (a JSON lines
+file), keyed by the point and by a hash of the generated C code, so that
+rerunning a tuning session only compiles and times new variants.  This
+module requires NumPy.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import os
+import random
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+from .API import Procedure, compile_procs_to_strings
+from .bench import DEFAULT_CFLAGS, BenchError, Inputs, LibraryBuild, run_benchmark
+from .core.configs import ConfigError
+from .core.memory import MemGenError
+from .rewrite.LoopIR_scheduling import SchedulingError
+
+Space = Dict[str, Sequence]
+
+
+@dataclass
+class Trial:
+    """
+    The outcome of one point of the search space: the median time of the
+    scheduled procedure (in seconds), or the reason it could not be timed.
+    `cached` trials were loaded from the results database.
+    """
+
+    params: Dict[str, object]
+    time: Optional[float] = None
+    error: Optional[str] = None
+    proc: Optional[Procedure] = field(default=None, repr=False)
+    cached: bool = False
+
+
+@dataclass
+class TuneResult:
+    trials: List[Trial]
+
+    @property
+    def best(self) -> Optional[Trial]:
+        timed = [t for t in self.trials if t.time is not None]
+        return min(timed, key=lambda t: t.time, default=None)
+
+
+def _key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+class _Database:
+    def __init__(self, path):
+        self.path = path and Path(path)
+        self.records = dict()
+        if self.path and self.path.exists():
+            for line in self.path.read_text().splitlines():
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    # e.g. a line truncated by an interrupted run
+                    continue
+                self.records[(_key(rec["params"]), rec["source"])] = rec
+
+    def lookup(self, params, source):
+        return self.records.get((_key(params), source))
+
+    def add(self, params, source, trial):
+        rec = dict(params=params, source=source, time=trial.time, error=trial.error)
+        self.records[(_key(params), source)] = rec
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(rec) + "\n")
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Search strategies
+
+
+def _grid(space):
+    names = list(space)
+    for values in itertools.product(*(space[nm] for nm in names)):
+        yield dict(zip(names, values))
+
+
+def _random_point(space, rng):
+    return {nm: rng.choice(list(vals)) for nm, vals in space.items()}
+
+
+def _mutate(point, space, rng):
+    point = dict(point)
+    nm = rng.choice(list(space))
+    vals = list(space[nm])
+    i = vals.index(point[nm])
+    # prefer moving to a neighbouring value, which is usually similar
+    if rng.random() < 0.75:
+        i = min(max(i + rng.choice((-1, 1)), 0), len(vals) - 1)
+    else:
+        i = rng.randrange(len(vals))
+    point[nm] = vals[i]
+    return point
+
+
+def _crossover(a, b, rng):
+    return {nm: (a if rng.random() < 0.5 else b)[nm] for nm in a}
+
+
+def _space_size(space):
+    n = 1
+    for vals in space.values():
+        n *= len(vals)
+    return n
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------------------------------------------------- #
+# Tuning
+
+
+class _Tuner:
+    def __init__(self, schedule, inputs, db, workdir, n_workers, opts):
+        self.schedule = schedule
+        self.inputs = inputs
+        self.db = db
+        self.workdir = workdir
+        self.n_workers = n_workers
+        self.opts = opts
+        self.trials = dict()
+
+    def evaluate(self, points):
+        """
+        Evaluates the points not evaluated yet, and returns their trials
+        """
+        points = [p for p in points if _key(p) not in self.trials]
+        todo = []
+        for point in points:
+            trial, build, source = self.prepare(point)
+            self.trials[_key(point)] = trial
+            if build is not None:
+                todo.append((trial, build, source))
+
+        def run(build):
+            try:
+                build.run()
+            except BenchError as err:
+                return str(err)
+
+        with ThreadPoolExecutor(self.n_workers) as pool:
+            errors = list(pool.map(run, [b for _, b, _ in todo]))
+
+        # time the variants one at a time, so they do not disturb each other
+        for (trial, build, source), err in zip(todo, errors):
+            if err is None:
+                kernel = getattr(build.load(), trial.proc.name())
+                result = run_benchmark(
+                    kernel,
+                    self.inputs,
+                    n_runs=self.opts["n_runs"],
+                    n_warmup=self.opts["n_warmup"],
+                )
+                trial.time = result.median
+            else:
+                trial.error = err
+            self.db.add(trial.params, source, trial)
+
+        return [self.trials[_key(p)] for p in points]
+
+    def prepare(self, point):
+        try:
+            proc = self.schedule(**point)
+        except SchedulingError as err:
+            return Trial(point, error=f"SchedulingError: {err}"), None, None
+
+        codegen = self.opts["codegen"]
+        try:
+            c_src, h_src = compile_procs_to_strings([proc], "tune.h", **codegen)
+        except (MemGenError, ConfigError) as err:
+            error = f"{type(err).__name__}: {err}"
+            return Trial(point, error=error, proc=proc), None, None
+        source = hashlib.sha256((c_src + h_src).encode()).hexdigest()
+
+        if (rec := self.db.lookup(point, source)) is not None:
+            trial = Trial(point, rec["time"], rec["error"], proc, cached=True)
+            return trial, None, source
+
+        build = LibraryBuild.write(
+            [proc],
+            self.workdir / f"trial{len(self.trials)}",
+            name="tune",
+            cc=self.opts["cc"],
+            cflags=self.opts["cflags"],
+            sources=(c_src, h_src),
+        )
+        return Trial(point, proc=proc), build, source
+
+
+def tune(
+    schedule: Callable[..., Procedure],
+    space: Space,
+    inputs: Inputs,
+    *,
+    strategy: str = "random",
+    n_trials: Optional[int] = None,
+    population: int = 8,
+    db: Union[str, Path, None] = None,
+    n_workers: Optional[int] = None,
+    n_runs: int = 20,
+    n_warmup: int = 3,
+    seed: int = 0,
+    workdir: Optional[Path] = None,
+    cc: Optional[str] = None,
+    cflags=None,
+    **kwargs,
+) -> TuneResult:
+    """
+    Searches `space` (a dict from parameter names to their candidate
+    values) for the parameters for which the procedure returned by
+    `schedule(**params)` runs fastest on `inputs`.
+
+    `strategy` is one of
+      - "grid":      all points of the space, in order;
+      - "random":    points sampled uniformly without replacement;
+      - "evolution": starting from `population` random points, each
+                     generation mutates and crosses over the fastest half
+                     of the points evaluated so far.
+    At most `n_trials` points are evaluated (by default the whole space for
+    "grid", and 32 points otherwise).  Results are read from and appended
+    to the database `db`, if given.  Variants are compiled by `n_workers`
+    threads (by default one per CPU) with `cc` and `cflags`, and timed over
+    `n_runs` calls.  The remaining keyword arguments are code generation
+    options (see `compile_procs_to_strings`).
+    """
+    if strategy not in ("grid", "random", "evolution"):
+        raise ValueError(f"unknown strategy '{strategy}'")
+    if any(len(vals) == 0 for vals in space.values()):
+        raise ValueError("every parameter needs at least one candidate value")
+
+    size = _space_size(space)
+    if n_trials is None:
+        n_trials = size if strategy == "grid" else 32
+    n_trials = min(n_trials, size)
+
+    tuner = _Tuner(
+        schedule,
+        inputs,
+        _Database(db),
+        Path(workdir or tempfile.mkdtemp(prefix="exo_tune_")),
+        n_workers or os.cpu_count() or 1,
+        dict(
+            n_runs=n_runs,
+            n_warmup=n_warmup,
+            cc=cc,
+            cflags=DEFAULT_CFLAGS if cflags is None else cflags,
+            codegen=kwargs,
+        ),
+    )
+    rng = random.Random(seed)
+
+    if strategy == "grid":
+        tuner.evaluate(itertools.islice(_grid(space), n_trials))
+
+    elif strategy == "random":
+        seen = set()
+        points = []
+        while len(points) < n_trials:
+            p = _random_point(space, rng)
+            if _key(p) not in seen:
+                seen.add(_key(p))
+                points.append(p)
+        tuner.evaluate(points)
+
+    else:
+
+        def fitness(t):
+            return t.time if t.time is not None else float("inf")
+
+        batch = min(population, n_trials)
+        points = []
+        while len(points) < batch:
+            p = _random_point(space, rng)
+            if p not in points:
+                points.append(p)
+        tuner.evaluate(points)
+
+        stale = 0
+        while len(tuner.trials) < n_trials and stale < 10:
+            ranked = sorted(tuner.trials.values(), key=fitness)
+            parents = ranked[: max(2, len(ranked) // 2)]
+            children = []
+            for _ in range(10 * population):
+                if len(children) >= min(population, n_trials - len(tuner.trials)):
+                    break
+                a, b = rng.choice(parents), rng.choice(parents)
+                child = _mutate(_crossover(a.params, b.params, rng), space, rng)
+                if _key(child) not in tuner.trials and child not in children:
+                    children.append(child)
+            # count generations that found nothing new to evaluate
+            stale = stale + 1 if not children else 0
+            tuner.evaluate(children)
+
+    return TuneResult(list(tuner.trials.values()))
@@ -686,8 +686,6 @@ def test_amx_memories_tile_number_limit(compiler, sde64):
             CMAKE_C_FLAGS="-mamx-int8 -mamx-tile",
         )
 
-    AMX_TILE.reset_allocations()
-
 
 def test_amx_memories_free(compiler, sde64):
     @proc
@@ -815,7 +813,6 @@ def test_amx_memories_tile_size_limit(compiler, sde64):
             CMAKE_C_COMPILER=os.getenv("CLANG", os.getenv("CC", "clang-13")),
             CMAKE_C_FLAGS="-mamx-int8 -mamx-tile",
         )
-    AMX_TILE.reset_allocations()
 
     for bad_byte_proc in [too_many_bytes_i8, too_many_bytes_i32]:
         with pytest.raises(MemGenError, match="Number of bytes per row"):
@@ -824,7 +821,6 @@ def test_amx_memories_tile_size_limit(compiler, sde64):
                 CMAKE_C_COMPILER=os.getenv("CLANG", os.getenv("CC", "clang-13")),
                 CMAKE_C_FLAGS="-mamx-int8 -mamx-tile",
             )
-        AMX_TILE.reset_allocations()
 
 
 def test_static_memory_register_allocation(compiler, sde64):
@@ -850,7 +846,6 @@ def test_static_memory_register_allocation(compiler, sde64):
             CMAKE_C_COMPILER=os.getenv("CLANG", os.getenv("CC", "clang-13")),
             CMAKE_C_FLAGS="-mamx-int8 -mamx-tile",
         )
-    AMX_TILE.reset_allocations()
 
 
 def _run_amx(compiler, sde64, procs, test_source):
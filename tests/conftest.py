@@ -187,13 +187,24 @@ class Compiler:
         additional_file=None,
         compile_only: bool = False,
         skip_on_fail: bool = False,
+        strength_reduce=False,
+        hoist_windows=False,
+        inline_subprocs=False,
         **kwargs,
     ):
         test_files = test_files or {}
         if isinstance(procs, Procedure):
             procs = [procs]
 
-        compile_procs(procs, self.workdir, f"{self.basename}.c", f"{self.basename}.h")
+        compile_procs(
+            procs,
+            self.workdir,
+            f"{self.basename}.c",
+            f"{self.basename}.h",
+            strength_reduce=strength_reduce,
+            hoist_windows=hoist_windows,
+            inline_subprocs=inline_subprocs,
+        )
 
         atl = self.workdir / f"{self.basename}_pretty.atl"
         atl.write_text("\n".join(map(str, procs)))
@@ -10,12 +10,12 @@ import exo.main
 REPO_ROOT = Path(__file__).parent.parent.resolve()
 
 
-def _test_app(module_file: Path):
+def _test_app(module_file: Path, **kwargs):
     module_file = module_file.resolve(strict=True)
     mod = exo.main.load_user_code(module_file)
     procs = exo.main.get_procs_from_module(mod)
 
-    c_file, h_file = exo.compile_procs_to_strings(procs, "test_case.h")
+    c_file, h_file = exo.compile_procs_to_strings(procs, "test_case.h", **kwargs)
 
     return f"{h_file}\n{c_file}"
 
@@ -33,6 +33,23 @@ def test_x86_conv(golden):
     assert _test_app(module_file) == golden
 
 
+@pytest.mark.slow
+def test_x86_sgemm_strength_reduce(golden):
+    module_file = REPO_ROOT / "apps" / "x86" / "sgemm" / "sgemm.py"
+    assert _test_app(module_file, strength_reduce=True) == golden
+
+
+def test_x86_conv_strength_reduce(golden):
+    module_file = REPO_ROOT / "apps" / "x86" / "conv" / "conv.py"
+    assert _test_app(module_file, strength_reduce=True) == golden
+
+
+@pytest.mark.slow
+def test_x86_sgemm_hoist_windows(golden):
+    module_file = REPO_ROOT / "apps" / "x86" / "sgemm" / "sgemm.py"
+    assert _test_app(module_file, hoist_windows=True) == golden
+
+
 def test_neon_sgemm(golden):
     module_file = REPO_ROOT / "apps" / "aarch64" / "sgemm" / "sgemm.py"
     assert _test_app(module_file) == golden
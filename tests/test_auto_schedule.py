@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import pytest
+
+from exo import SchedulingError, proc
+from exo.libs.memories import AVX2
+from exo.difftest import check_equivalent
+from exo.stdlib.auto_schedule import AVX2_TARGET, AVX512_TARGET, auto_schedule
+
+
+@proc
+def gemm(M: size, N: size, K: size, A: f32[M, K], B: f32[K, N], C: f32[M, N]):
+    for i in seq(0, M):
+        for j in seq(0, N):
+            for k in seq(0, K):
+                C[i, j] += A[i, k] * B[k, j]
+
+
+@proc
+def axpy(n: size, a: f32, x: f32[n], y: f32[n]):
+    for i in seq(0, n):
+        y[i] += a * x[i]
+
+
+def _instrs(p):
+    return {c.subproc().name() for c in p.find("_(_)", many=True)}
+
+
+def test_auto_schedule_gemm():
+    p = auto_schedule(gemm, AVX2_TARGET)
+
+    assert _instrs(p) == {
+        "mm256_loadu_ps",
+        "mm256_storeu_ps",
+        "mm256_broadcast_ss",
+        "mm256_fmadd_ps",
+    }
+    # 4 rows of 3 vectors, the vectors of B, and one broadcast of A
+    reg = p.find("reg: _")
+    assert reg.mem() is AVX2
+    assert [e.value() for e in reg.shape()] == [4, 3, 8]
+    assert check_equivalent(gemm, p, n_trials=8, sizes={"K": 5}) is None
+
+
+def test_auto_schedule_axpy():
+    p = auto_schedule(axpy, AVX512_TARGET)
+
+    assert _instrs(p) == {
+        "mm512_loadu_ps",
+        "mm512_storeu_ps",
+        "mm512_set1_ps_scalar",
+        "mm512_mul_ps",
+        "mm512_add_ps",
+    }
+
+
+def test_auto_schedule_sizes():
+    # loops shorter than a vector are left alone
+    assert auto_schedule(axpy, AVX2_TARGET, sizes={"n": 4}) is axpy
+    assert auto_schedule(axpy, AVX2_TARGET, sizes={"n": 16}) is not axpy
+
+    # and register tiles are bounded by the trip counts
+    p = auto_schedule(gemm, AVX2_TARGET, sizes={"M": 2, "N": 8, "K": 16})
+    reg = p.find("reg: _")
+    assert [e.value() for e in reg.shape()] == [2, 1, 8]
+
+
+def test_auto_schedule_unsupported():
+    @proc
+    def rowsum(n: size, m: size, x: f32[n, m], y: f32[n]):
+        for i in seq(0, n):
+            for j in seq(0, m):
+                y[i] += x[i, j]
+
+    @proc
+    def not_perfect(n: size, x: f32[n], y: f32[n]):
+        for i in seq(0, n):
+            x[i] = 1.0
+            y[i] = 2.0
+
+    # `i` does not index the last dimension of `x`
+    assert auto_schedule(rowsum) is rowsum
+    with pytest.raises(SchedulingError, match="perfect loop nest"):
+        auto_schedule(not_perfect)
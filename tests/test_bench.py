@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from exo import proc
+from exo.bench import (
+    BenchError,
+    benchmark,
+    compare,
+    compile_library,
+    format_results,
+)
+from exo.stdlib.scheduling import *
+
+
+@proc
+def gemm(N: size, A: f32[N, N], B: f32[N, N], C: f32[N, N]):
+    for i in seq(0, N):
+        for j in seq(0, N):
+            for k in seq(0, N):
+                C[i, j] += A[i, k] * B[k, j]
+
+
+def gemm_inputs(N=16):
+    rng = np.random.default_rng(0)
+    return {
+        "N": N,
+        "A": rng.random((N, N), dtype=np.float32),
+        "B": rng.random((N, N), dtype=np.float32),
+        "C": np.zeros((N, N), dtype=np.float32),
+    }
+
+
+def test_compile_library(tmp_path):
+    @proc
+    def scal(N: size, alpha: f32, x: f32[N]):
+        for i in seq(0, N):
+            x[i] = alpha * x[i]
+
+    lib = compile_library([gemm, scal], tmp_path)
+
+    x = np.arange(4, dtype=np.float32)
+    lib.scal(N=4, alpha=2.0, x=x)
+    np.testing.assert_almost_equal(x, [0, 2, 4, 6])
+
+    inputs = gemm_inputs()
+    lib.gemm(**inputs)
+    np.testing.assert_allclose(inputs["C"], inputs["A"] @ inputs["B"], rtol=1e-5)
+
+
+def test_compile_library_bad_inputs(tmp_path):
+    lib = compile_library(gemm, tmp_path)
+
+    with pytest.raises(BenchError, match="missing input 'C'"):
+        lib.gemm(N=4, A=np.zeros((4, 4), np.float32), B=np.zeros((4, 4), np.float32))
+
+    inputs = gemm_inputs()
+    inputs["A"] = inputs["A"].astype(np.float64)
+    with pytest.raises(BenchError, match="expected dtype float32 for 'A'"):
+        lib.gemm(**inputs)
+
+
+def test_benchmark(tmp_path):
+    N = 16
+    res = benchmark(
+        gemm, gemm_inputs(N), flops=2 * N**3, n_runs=5, n_warmup=1, workdir=tmp_path
+    )
+
+    assert res.name == "gemm"
+    assert len(res.times) == 5
+    assert res.bytes_moved == 3 * N * N * 4
+    assert res.gflops > 0
+    assert res.percentile(0) <= res.median <= res.percentile(100)
+    assert str(res).startswith("gemm: median ")
+
+
+def test_compare(tmp_path):
+    tiled = divide_loop(gemm, "j", 4, ["jo", "ji"], tail="cut")
+    tiled = reorder_loops(tiled, "ji k #0")
+
+    results = compare(
+        [gemm, tiled],
+        lambda: gemm_inputs(16),
+        flops=2 * 16**3,
+        n_runs=3,
+        n_warmup=1,
+        workdir=tmp_path,
+        cflags=["-O1"],
+    )
+    assert [r.name for r in results] == ["gemm", "gemm"]
+
+    table = format_results(results).splitlines()
+    assert len(table) == 4
+    assert table[2].startswith("| 0 | gemm |")
+    assert table[2].endswith("| 1.00x |")
+
+
+def test_compare_mismatch(tmp_path):
+    @proc
+    def wrong(N: size, A: f32[N, N], B: f32[N, N], C: f32[N, N]):
+        for i in seq(0, N):
+            for j in seq(0, N):
+                C[i, j] = A[i, j]
+
+    wrong = rename(wrong, "gemm")
+
+    with pytest.raises(
+        BenchError, match="variant 1 \\(gemm\\) computes a different 'C'"
+    ):
+        compare([gemm, wrong], gemm_inputs(), workdir=tmp_path)
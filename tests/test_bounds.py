@@ -4,7 +4,8 @@ import pytest
 
 from exo import proc, DRAM
 from exo.libs.memories import GEMM_SCRATCH
-from exo.stdlib.scheduling import SchedulingError
+from exo.stdlib.scheduling import SchedulingError, rename
+from exo.frontend.boundscheck import CheckBounds
 
 
 # ------- Bounds check tests ---------
@@ -514,3 +515,43 @@ def test_partial_eval_bounds():
     @proc
     def bar(A: f32[10, 20]):
         foo(A)
+
+
+def test_bounds_batched_errors():
+    with pytest.raises(TypeError) as exc:
+
+        @proc
+        def foo(n: size, A: i8[n, n], B: i8[n]):
+            for i in seq(0, n):
+                for j in seq(0, n):
+                    A[i, j] = B[j + 1]
+                    A[j, i + 1] = 0.0
+
+    msg = str(exc.value)
+    assert "B is read out-of-bounds (in dimension 0)" in msg
+    assert "A is written out-of-bounds (in dimension 1)" in msg
+    assert msg.count("out-of-bounds") == 2
+
+
+def test_bounds_check_timing():
+    @proc
+    def foo(n: size, A: i8[n]):
+        for i in seq(0, n):
+            A[i] = 0.0
+
+    checker = CheckBounds(foo._loopir_proc)
+    assert checker.n_queries > 0
+    assert checker.elapsed >= 0
+
+
+def test_bounds_check_stats_on_procedure():
+    @proc
+    def foo(n: size, A: i8[n]):
+        for i in seq(0, n):
+            A[i] = 0.0
+
+    stats = foo._bounds_check_stats
+    assert stats["n_queries"] > 0 and stats["elapsed"] >= 0
+
+    # procs derived by scheduling are not checked again
+    assert rename(foo, "bar")._bounds_check_stats is None
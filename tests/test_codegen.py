@@ -7,8 +7,16 @@ import pytest
 from PIL import Image
 
 from exo import proc, instr, Procedure, DRAM, compile_procs_to_strings
-from exo.libs.memories import MDRAM, MemGenError, StaticMemory, DRAM_STACK
+from exo.libs.memories import (
+    MDRAM,
+    MemGenError,
+    StaticMemory,
+    DRAM_STACK,
+    AVX2,
+    RegisterPressureWarning,
+)
 from exo.libs.externs import *
+from exo.platforms.x86 import mm256_setzero_ps, mm256_setzero_pd
 from exo.stdlib.scheduling import *
 
 mock_registers = 0
@@ -462,6 +470,99 @@ def test_static_memory_check(compiler):
         compiler.compile(caller)
 
 
+class MOCK_TILES(StaticMemory):
+    @classmethod
+    def num_chunks(cls):
+        return 2
+
+    @classmethod
+    def can_read(cls):
+        return False
+
+    @classmethod
+    def alloc(cls, new_name, prim_type, shape, srcinfo, chunk):
+        return f"#define {new_name} {chunk}"
+
+    @classmethod
+    def free(cls, new_name, prim_type, shape, srcinfo, chunk):
+        return f"#undef {new_name}"
+
+
+@instr("mock_zero({dst_data});")
+def mock_zero(dst: [f32][4] @ MOCK_TILES):
+    for i in seq(0, 4):
+        dst[i] = 0.0
+
+
+def test_static_memory_allocation():
+    @proc
+    def foo():
+        a: f32[4] @ MOCK_TILES
+        b: f32[4] @ MOCK_TILES
+        mock_zero(a)
+        mock_zero(b)
+        c: f32[4] @ MOCK_TILES
+        mock_zero(c)
+
+    @proc
+    def bar():
+        a: f32[4] @ MOCK_TILES
+        b: f32[4] @ MOCK_TILES
+        c: f32[4] @ MOCK_TILES
+        mock_zero(a)
+        mock_zero(b)
+        mock_zero(c)
+
+    c_file, _ = compile_procs_to_strings([foo], "test.h")
+    assert "#define a 0" in c_file
+    assert "#define b 1" in c_file
+    assert "#define c 0" in c_file
+
+    with pytest.raises(
+        MemGenError, match="Cannot allocate more than 2 chunks at a time"
+    ):
+        compile_procs_to_strings([bar], "test.h")
+
+    # allocation state is not shared between compilations
+    assert compile_procs_to_strings([foo], "test.h")[0] == c_file
+
+
+def test_register_pressure(recwarn):
+    @proc
+    def foo():
+        a: f32[8, 8] @ AVX2
+        for i in seq(0, 2):
+            b: f32[4, 8] @ AVX2
+            c: f64[4, 4] @ AVX2
+            mm256_setzero_ps(b[0, :])
+            mm256_setzero_pd(c[0, :])
+        mm256_setzero_ps(a[0, :])
+        d: f32[8] @ AVX2
+        mm256_setzero_ps(d[:])
+
+    @proc
+    def bar():
+        a: f32[8, 8] @ AVX2
+        for i in seq(0, 2):
+            b: f32[5, 8] @ AVX2
+            c: f64[4, 4] @ AVX2
+            mm256_setzero_ps(b[0, :])
+            mm256_setzero_pd(c[0, :])
+        mm256_setzero_ps(a[0, :])
+
+    compile_procs_to_strings([foo], "test.h")
+    assert len(recwarn) == 0
+
+    with pytest.warns(
+        RegisterPressureWarning,
+        match=r"17 AVX2 registers are live at once \(13 x f32, 4 x f64\)",
+    ):
+        compile_procs_to_strings([bar], "test.h")
+
+    with pytest.raises(MemGenError, match="but only 16 exist"):
+        compile_procs_to_strings([bar], "test.h", strict_registers=True)
+
+
 # Tests for NO exo_floor_div
 
 
@@ -700,3 +801,155 @@ def test_memcpy_instr(compiler, golden):
 
     np.testing.assert_almost_equal(dst, expected)
     np.testing.assert_almost_equal(src, expected)
+
+
+# Tests for strength reduction of index arithmetic
+
+
+def test_strength_reduce(golden, compiler):
+    @proc
+    def gemm(M: size, N: size, K: size, A: f32[M, K], B: f32[K, N], C: f32[M, N]):
+        for i in seq(0, M):
+            for j in seq(0, N):
+                for k in seq(0, K):
+                    C[i, j] += A[i, k] * B[k, j]
+
+    gemm = divide_loop(gemm, "j", 4, ["jo", "ji"], tail="cut_and_guard")
+
+    c_file, h_file = compile_procs_to_strings([gemm], "test.h", strength_reduce=True)
+    assert f"{h_file}\n{c_file}" == golden
+
+    fn = compiler.compile(gemm, strength_reduce=True)
+
+    M, N, K = 7, 9, 5
+    A = np.arange(M * K, dtype=np.float32).reshape((M, K))
+    B = np.arange(K * N, dtype=np.float32).reshape((K, N))
+    C = np.zeros((M, N), dtype=np.float32)
+    fn(None, M, N, K, A, B, C)
+
+    np.testing.assert_almost_equal(C, A @ B)
+
+
+def test_strength_reduce_selected_procs(golden):
+    @proc
+    def foo(N: size, x: f32[N, 4], y: [f32][4, N]):
+        for i in seq(0, N):
+            for j in seq(0, 4):
+                x[i, j] = y[j, i]
+
+    # accesses with mismatched steps or non-affine indices are not reduced
+    @proc
+    def bar(N: size, x: f32[N, N], y: f32[N]):
+        for i in seq(0, N):
+            x[i, i] = y[i / 2]
+            x[0, i] = 0.0
+
+    c_file, _ = compile_procs_to_strings([foo, bar], "test.h", strength_reduce=[foo])
+    assert c_file == golden
+
+
+# Tests for hoisting loop-invariant windows
+
+
+def test_hoist_windows(golden, compiler):
+    @proc
+    def axpy4(a: [f32][4], x: [f32][4], y: [f32][4]):
+        assert stride(x, 0) == 1
+        assert stride(y, 0) == 1
+        for k in seq(0, 4):
+            y[k] += a[k] * x[k]
+
+    @proc
+    def foo(N: size, a: f32[2, 4], x: f32[N, 4], y: f32[N, 4]):
+        for i in seq(0, N):
+            w = a[1, :]
+            axpy4(a[0, :], x[i, :], y[i, :])
+            axpy4(w, x[i, :], y[i, :])
+
+    c_file, h_file = compile_procs_to_strings([foo], "test.h", hoist_windows=True)
+    assert f"{h_file}\n{c_file}" == golden
+
+    fn = compiler.compile(foo, hoist_windows=True)
+
+    N = 5
+    a = np.arange(8, dtype=np.float32).reshape((2, 4))
+    x = np.arange(N * 4, dtype=np.float32).reshape((N, 4))
+    y = np.zeros((N, 4), dtype=np.float32)
+    fn(None, N, a, x, y)
+
+    np.testing.assert_almost_equal(y, (a[0] + a[1]) * x)
+
+
+def test_hoist_windows_strided_raw_window(compiler):
+    @proc
+    def inner(x: [f32][4]):
+        for k in seq(0, 4):
+            x[k] += 1.0
+
+    @proc
+    def mid(x: [f32][2, 4]):
+        assert stride(x, 0) == 8
+        assert stride(x, 1) == 1
+        inner(x[1, :])
+
+    @proc
+    def top(a: f32[2, 8]):
+        mid(a[:, 0:4])
+
+    c_file, _ = compile_procs_to_strings([top], "test.h", hoist_windows=True)
+    assert "&x[8]" in c_file
+
+    fn = compiler.compile(top, hoist_windows=True)
+
+    a = np.zeros((2, 8), dtype=np.float32)
+    fn(None, a)
+
+    expected = np.zeros((2, 8), dtype=np.float32)
+    expected[1, 0:4] = 1.0
+    np.testing.assert_almost_equal(a, expected)
+
+
+# Tests for inlining internal procs
+
+
+def test_inline_subprocs(golden, compiler):
+    @proc
+    def scale(x: [f32][4]):
+        for k in seq(0, 4):
+            x[k] = 2.0 * x[k]
+
+    # too large to be inlined, and not called from an innermost loop
+    @proc
+    def big(x: [f32][4]):
+        for k in seq(0, 4):
+            x[k] += 1.0
+            x[k] += 1.0
+            x[k] += 1.0
+            x[k] += 1.0
+            x[k] += 1.0
+            x[k] += 1.0
+            x[k] += 1.0
+            x[k] += 1.0
+
+    @proc
+    def foo(N: size, x: f32[N, 4]):
+        for i in seq(0, N):
+            scale(x[i, :])
+        big(x[0, :])
+        big(x[N - 1, :])
+
+    c_file, _ = compile_procs_to_strings([foo], "test.h", inline_subprocs=True)
+    assert c_file == golden
+    assert "static EXO_ALWAYS_INLINE void scale" in c_file
+    assert "static void big" in c_file
+
+    fn = compiler.compile(foo, inline_subprocs=True)
+
+    N = 3
+    x = np.arange(N * 4, dtype=np.float32).reshape((N, 4))
+    expected = 2.0 * x
+    expected[0] += 8.0
+    expected[N - 1] += 8.0
+    fn(None, N, x)
+
+    np.testing.assert_almost_equal(x, expected)
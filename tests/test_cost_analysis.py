@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from exo import proc, analyze_cost, analyze_footprint
+from exo.rewrite.cost_analysis import BufferFootprint
+from exo.platforms.x86 import *
+from exo.stdlib.scheduling import *
+
+
+@proc
+def gemm(M: size, N: size, K: size, A: f32[M, K], B: f32[K, N], C: f32[M, N]):
+    for i in seq(0, M):
+        for j in seq(0, N):
+            for k in seq(0, K):
+                C[i, j] += A[i, k] * B[k, j]
+
+
+SIZES = {"M": 64, "N": 32, "K": 16}
+
+
+def test_cost_gemm():
+    report = analyze_cost(gemm, SIZES)
+    assert report.exact
+    assert [(lp.iter, lp.trips, lp.entries) for lp in report.loops] == [
+        ("i", 64, 1),
+        ("j", 32, 64),
+        ("k", 16, 64 * 32),
+    ]
+    n = 64 * 32 * 16
+    # a multiply and an add per iteration
+    assert report.flops == {"f32": 2 * n}
+    assert report.bytes_loaded == {"DRAM": 3 * 4 * n}
+    assert report.bytes_stored == {"DRAM": 4 * n}
+    assert report.instr_calls == {}
+
+
+def test_cost_reuse_distance():
+    report = analyze_cost(gemm, SIZES)
+    A, B, C = report.accesses
+    assert (A.buffer, B.buffer, C.buffer) == ("A", "B", "C")
+    assert (A.idx, C.kind, C.count) == ("i, k", "reduce", 64 * 32 * 16)
+
+    # one iteration of k touches one element of each matrix; one of j a row
+    # of A, a column of B and an element of C; and one of i a row of A and C,
+    # and all of B
+    k_bytes = 3 * 4
+    j_bytes = 4 * (16 + 16 + 1)
+    i_bytes = 4 * (16 + 16 * 32 + 32)
+    assert [lp.footprint for lp in report.loops] == [i_bytes, j_bytes, k_bytes]
+
+    assert A.reuse_distance == {"i": None, "j": j_bytes, "k": None}
+    assert B.reuse_distance == {"i": i_bytes, "j": None, "k": None}
+    assert C.reuse_distance == {"i": None, "j": None, "k": k_bytes}
+
+    tiled = divide_loop(gemm, "j", 8, ["jo", "ji"], tail="cut")
+    tiled = reorder_loops(tiled, "ji k")
+    A, B, C = analyze_cost(tiled, SIZES).accesses[:3]
+    # after tiling j, A is reused across the innermost loop
+    jo_bytes = 4 * (16 + 16 * 8 + 8)
+    assert A.reuse_distance == {"i": None, "jo": jo_bytes, "k": None, "ji": 12}
+
+
+def test_cost_instr_calls():
+    @proc
+    def vadd(x: f32[16], y: f32[16], z: f32[16]):
+        for i in seq(0, 16):
+            z[i] = x[i] + y[i]
+
+    vadd = divide_loop(vadd, "i", 8, ["io", "ii"], perfect=True)
+    vadd = stage_mem(vadd, "for ii in _: _", "x[8 * io:8 * io + 8]", "xv")
+    vadd = set_memory(vadd, "xv", AVX2)
+    vadd = replace_all(vadd, mm256_loadu_ps)
+
+    report = analyze_cost(vadd, {})
+    assert report.instr_calls == {"mm256_loadu_ps": 2}
+    assert report.bytes_loaded == {"DRAM": 2 * 16 * 4, "AVX2": 16 * 4}
+    assert report.bytes_stored == {"DRAM": 16 * 4, "AVX2": 16 * 4}
+    assert report.flops == {"f32": 16}
+
+
+def test_cost_estimates():
+    @proc
+    def tri(n: size, x: f32[n, n]):
+        for i in seq(0, n):
+            for j in seq(0, i):
+                if i < n - 1:
+                    x[i, j] = 0.0
+            if n > 4:
+                x[i, i] = 1.0
+
+    report = analyze_cost(tri, {"n": 10})
+    assert not report.exact
+    assert report.loops[1].trips == 4.5
+    assert report.bytes_stored == {"DRAM": 4 * (45 + 10)}
+    assert "cost of tri (estimated)" in str(report)
+
+    assert analyze_cost(tri, {"n": 4}).bytes_stored == {"DRAM": 4 * 6}
+
+    with pytest.raises(ValueError, match="no value given for 'n'"):
+        analyze_cost(tri, {})
+
+
+def test_cost_is_fast():
+    start = time.perf_counter()
+    for _ in range(100):
+        analyze_cost(gemm, SIZES)
+    assert time.perf_counter() - start < 1
+
+
+def test_footprint_gemm():
+    report = analyze_footprint(gemm, SIZES)
+    i, j, k = report.loops
+
+    assert k.buffers["A"] == BufferFootprint("A", "DRAM", 4, 1, 16)
+    assert (k.buffers["B"].elements, k.buffers["C"].elements) == (16, 1)
+    assert j.buffers["B"].iteration_elements == 16
+    assert j.buffers["B"].elements == 16 * 32
+    assert i.buffers["B"].iteration_elements == 16 * 32
+    assert i.bytes == 4 * (64 * 16 + 16 * 32 + 64 * 32)
+    assert i.iteration_bytes == 4 * (16 + 16 * 32 + 32)
+
+    assert report.find("j") is j
+    assert report.find(gemm.find_loop("k")) is k
+    with pytest.raises(ValueError, match="no loop"):
+        report.find("x")
+
+
+def test_footprint_cache_flags():
+    report = analyze_footprint(gemm, SIZES, cache_sizes={"L1": 2048, "L2": 8192})
+    i, j, k = report.loops
+    assert i.exceeds == ["L1", "L2"] and i.iteration_exceeds == ["L1"]
+    assert j.exceeds == ["L1"] and j.iteration_exceeds == []
+    assert k.exceeds == [] and k.fits("L1")
+    assert "exceeds L1, L2" in str(report)
+
+
+def test_footprint_windows_and_calls():
+    @proc
+    def scale(n: size, alpha: f32, x: [f32][n]):
+        for i in seq(0, n):
+            x[i] = alpha * x[i]
+
+    @proc
+    def foo(n: size, m: size, alpha: f32, x: f32[n, m]):
+        for i in seq(0, n):
+            row = x[i, :]
+            scale(m, alpha, row)
+        for j in seq(0, m):
+            scale(n, alpha, x[:, j])
+
+    report = analyze_footprint(foo, {"n": 10, "m": 20})
+    i, j = report.loops
+    assert (i.buffers["x"].iteration_elements, i.buffers["x"].elements) == (20, 200)
+    assert (j.buffers["x"].iteration_elements, j.buffers["x"].elements) == (10, 200)
+
+
+def test_footprint_drives_tiling():
+    # pick the largest tile of j whose loop over k fits in a small cache
+    def tile(n):
+        p = divide_loop(gemm, "j", n, ["jo", "ji"], tail="cut")
+        return reorder_loops(p, "ji k")
+
+    sizes = {"M": 64, "N": 64, "K": 64}
+    fitting = [
+        n
+        for n in (4, 8, 16, 32)
+        if analyze_footprint(tile(n), sizes, cache_sizes={"L1": 4096})
+        .find("k")
+        .fits("L1")
+    ]
+    assert fitting == [4, 8]
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from exo import proc
+from exo.difftest import DiffTestError, check_equivalent, random_inputs
+from exo.stdlib.scheduling import *
+
+
+@proc
+def gemm(M: size, N: size, K: size, A: f32[M, K], B: f32[K, N], C: f32[M, N]):
+    for i in seq(0, M):
+        for j in seq(0, N):
+            for k in seq(0, K):
+                C[i, j] += A[i, k] * B[k, j]
+
+
+@proc
+def shift(n: size, x: f32[n + 1], y: f32[n]):
+    for i in seq(0, n):
+        y[i] = x[i]
+        x[i + 1] = y[i] * 2.0
+
+
+def test_random_inputs():
+    @proc
+    def foo(n: size, m: size, x: i8[n, 2 * m]):
+        assert n % 8 == 0
+        assert m == 3
+        pass
+
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        inputs = random_inputs(foo, rng)
+        assert inputs["n"] % 8 == 0 and inputs["m"] == 3
+        assert inputs["x"].shape == (inputs["n"], 6)
+        assert inputs["x"].dtype == np.int8
+
+    assert random_inputs(foo, rng, sizes={"n": 16})["n"] == 16
+    with pytest.raises(DiffTestError, match="could not generate arguments"):
+        random_inputs(foo, rng, sizes={"n": 3}, max_tries=10)
+
+
+def test_check_equivalent():
+    tiled = divide_loop(gemm, "j", 4, ["jo", "ji"], tail="cut")
+    tiled = reorder_loops(tiled, "ji k #0")
+
+    assert check_equivalent(gemm, tiled, n_trials=20, n_workers=2) is None
+
+
+def test_check_equivalent_satisfies_both_preds():
+    @proc
+    def gemm4(M: size, N: size, K: size, A: f32[M, K], B: f32[K, N], C: f32[M, N]):
+        assert N % 4 == 0
+        for i in seq(0, M):
+            for jo in seq(0, N / 4):
+                for k in seq(0, K):
+                    for ji in seq(0, 4):
+                        C[i, 4 * jo + ji] += A[i, k] * B[k, 4 * jo + ji]
+
+    rng = np.random.default_rng(0)
+    for _ in range(10):
+        assert random_inputs([gemm, gemm4], rng)["N"] % 4 == 0
+
+    assert check_equivalent(gemm, gemm4, n_trials=20, n_workers=1) is None
+
+
+def test_check_equivalent_mismatch():
+    bad = fission(shift, shift.find("y[_] = _").after(), unsafe_disable_checks=True)
+
+    mismatch = check_equivalent(shift, bad, n_trials=20, n_workers=1)
+    assert mismatch is not None
+    assert list(mismatch.outputs) == ["x", "y"]
+    assert str(mismatch).startswith(f"trial {mismatch.trial}: procedures differ")
+
+    # only a single iteration has no loop-carried dependence
+    assert check_equivalent(shift, bad, n_trials=5, sizes={"n": 1}) is None
+
+
+def test_check_equivalent_concurrent():
+    bad = fission(shift, shift.find("y[_] = _").after(), unsafe_disable_checks=True)
+    tiled = divide_loop(gemm, "j", 4, ["jo", "ji"], tail="cut")
+
+    # each call keeps its own procedures and options
+    with ThreadPoolExecutor(2) as pool:
+        mismatches = list(
+            pool.map(
+                lambda procs: check_equivalent(*procs, n_trials=40, n_workers=1),
+                [(shift, bad), (gemm, tiled)] * 2,
+            )
+        )
+    assert [m is None for m in mismatches] == [False, True] * 2
+
+
+def test_check_equivalent_compiled(tmp_path):
+    bad = fission(shift, shift.find("y[_] = _").after(), unsafe_disable_checks=True)
+
+    mismatch = check_equivalent(
+        shift, bad, n_trials=4, backend="compile", workdir=tmp_path, cflags=["-O1"]
+    )
+    assert mismatch is not None and "x" in mismatch.outputs
+
+    with pytest.raises(DiffTestError, match="different signatures"):
+        check_equivalent(gemm, shift)
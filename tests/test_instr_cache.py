@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pytest
+
+from exo import DRAM, instr, proc
+from exo.frontend import instr_cache
+from exo.frontend.pyparser import ParseError
+from exo.stdlib.scheduling import *
+
+
+def vec_add(dst: [f32][4] @ DRAM, src: [f32][4] @ DRAM):
+    assert stride(dst, 0) == 1
+    assert stride(src, 0) == 1
+
+    for i in seq(0, 4):
+        dst[i] += src[i]
+
+
+VEC_ADD = "vec_add_f32({dst_data}, {src_data});"
+
+
+def test_instr_cache_roundtrip(tmp_path, monkeypatch):
+    monkeypatch.setenv("EXO_CACHE_DIR", str(tmp_path))
+
+    key = instr_cache.cache_key(vec_add, VEC_ADD, "")
+    assert key is not None
+    assert instr_cache.load(key) is None
+
+    first = instr(VEC_ADD)(vec_add)
+    cached = instr_cache.load(key)
+    assert cached is not None
+
+    second = instr(VEC_ADD)(vec_add)
+    assert str(second) == str(first)
+    assert second.c_code_str() == first.c_code_str()
+
+    # loaded symbols are fresh
+    assert second._loopir_proc.args[0].name != first._loopir_proc.args[0].name
+
+    @proc
+    def foo(x: f32[8], y: f32[8]):
+        for i in seq(0, 8):
+            x[i] += y[i]
+
+    foo = divide_loop(foo, "i", 4, ["io", "ii"], perfect=True)
+    foo = replace(foo, "for ii in _: _", second)
+    assert "vec_add(x[4 * io + 0:4 * io + 4], y[4 * io + 0:4 * io + 4])" in str(foo)
+
+
+def test_instr_cache_key():
+    def local_fn(x: f32):
+        x = 0.0
+
+    assert instr_cache.cache_key(local_fn, "", "") is None
+
+    key = instr_cache.cache_key(vec_add, VEC_ADD, "")
+    assert key == instr_cache.cache_key(vec_add, VEC_ADD, "")
+    assert key != instr_cache.cache_key(vec_add, VEC_ADD + " ", "")
+
+
+def test_instr_cache_disabled(monkeypatch):
+    monkeypatch.setenv("EXO_CACHE_DIR", "")
+    assert instr_cache.cache_key(vec_add, VEC_ADD, "") is None
+
+
+def test_lazy_instr():
+    def bad(dst: [f32][4] @ DRAM):
+        for i in seq(0, 4):
+            dst[i] = undefined_name
+
+    # errors only surface when the instruction is first used
+    p = instr("bad({dst_data});", lazy=True)(bad)
+    assert p.is_instr()
+    with pytest.raises(ParseError, match="undefined_name"):
+        p.name()
+
+    p = instr(VEC_ADD, lazy=True)(vec_add)
+    assert "_loopir_proc" not in vars(p)
+    assert p.name() == "vec_add"
+    assert str(p) == str(instr(VEC_ADD)(vec_add))
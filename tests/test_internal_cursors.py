@@ -6,6 +6,7 @@ from exo import proc, SchedulingError, Procedure
 from exo.core.LoopIR import LoopIR, T
 from exo.core.LoopIR_pprint import _print_cursor
 from exo.core.internal_cursors import (
+    BatchEdit,
     Cursor,
     Block,
     InvalidCursorError,
@@ -968,3 +969,80 @@ def test_move_forwarding_for_blocks_gap_after(proc_baz, golden):
         output.append(_print_cursor(fwd(b_with_endpoint_in_moved_block)))
 
     assert "\n\n".join(output) == golden
+
+
+def test_batch_edit_matches_sequential(proc_bar):
+    for_j = _find_stmt(proc_bar, "for j in _: _")
+    src = for_j._node.srcinfo
+    body = for_j.body()
+    rhs = _find_stmt(proc_bar, "x = 4.0")._child_node("rhs")
+    x_orig = [_find_stmt(proc_bar, f"x = {i}.0") for i in range(6)]
+
+    edits = BatchEdit(proc_bar._loopir_proc)
+    edits.delete(body[1])
+    edits.replace(body[2:4], [LoopIR.Pass(src)])
+    edits.insert(body[5].before(), [LoopIR.Pass(src), LoopIR.Pass(src)])
+    edits.replace(rhs, LoopIR.Const(7.0, T.f32, src))
+    bar_batch, fwd_batch = edits.commit()
+
+    fwds = []
+
+    def fwd_seq(cur):
+        for fwd in fwds:
+            cur = fwd(cur)
+        return cur
+
+    bar_seq, fwd = body[1]._delete()
+    fwds.append(fwd)
+    bar_seq, fwd = fwd_seq(body[2:4])._replace([LoopIR.Pass(src)])
+    fwds.append(fwd)
+    bar_seq, fwd = fwd_seq(body[5].before())._insert(
+        [LoopIR.Pass(src), LoopIR.Pass(src)]
+    )
+    fwds.append(fwd)
+    bar_seq, fwd = fwd_seq(rhs)._replace(LoopIR.Const(7.0, T.f32, src))
+    fwds.append(fwd)
+
+    assert str(bar_batch) == str(bar_seq)
+    for c in x_orig + [body, body[4:6], rhs]:
+        try:
+            expected = fwd_seq(c)
+        except InvalidCursorError:
+            with pytest.raises(InvalidCursorError):
+                fwd_batch(c)
+            continue
+        assert fwd_batch(c) == expected
+        assert fwd_batch(c)._root is bar_batch
+
+
+def test_batch_edit_lift(proc_baz):
+    for_i = _find_stmt(proc_baz, "for i in _: _")
+    x_assign = _find_stmt(proc_baz, "x = 0.0")
+    for_k = _find_stmt(proc_baz, "for k in _: _")
+
+    edits = BatchEdit(proc_baz._loopir_proc)
+    edits.lift(_find_stmt(proc_baz, "for j in _: _"), "body")
+    edits.delete(for_k.body()[0])
+    baz, fwd = edits.commit()
+
+    for_i2 = Cursor.create(baz).body()[0]
+    assert len(for_i2.body()) == 5
+    assert fwd(x_assign) == for_i2.body()[1]
+    assert fwd(for_k) == for_i2.body()[4]
+    assert len(fwd(for_k)._node.body) == 1
+    assert fwd(_find_stmt(proc_baz, "for j in _: _").body()[1:3]) == (
+        for_i2.body()[1:3]
+    )
+
+    with pytest.raises(InvalidCursorError, match="node no longer exists"):
+        fwd(_find_stmt(proc_baz, "for j in _: _"))
+
+
+def test_batch_edit_overlap(proc_bar):
+    body = _find_stmt(proc_bar, "for j in _: _").body()
+
+    edits = BatchEdit(proc_bar._loopir_proc)
+    edits.delete(body[1:3])
+    edits.delete(body[2])
+    with pytest.raises(InvalidCursorError, match="overlapping edits"):
+        edits.commit()
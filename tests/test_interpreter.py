@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pytest
+
+from exo import proc, config, interpret
+from exo.backend.LoopIR_interpreter import InterpreterError
+from exo.libs.externs import relu, select, sqrt
+from exo.platforms.x86 import *
+from exo.stdlib.scheduling import *
+
+
+@proc
+def gemm(N: size, A: f32[N, N], B: f32[N, N], C: f32[N, N]):
+    for i in seq(0, N):
+        for j in seq(0, N):
+            for k in seq(0, N):
+                C[i, j] += A[i, k] * B[k, j]
+
+
+def gemm_inputs(N):
+    rng = np.random.default_rng(0)
+    return {
+        "N": N,
+        "A": rng.random((N, N), dtype=np.float32),
+        "B": rng.random((N, N), dtype=np.float32),
+        "C": np.zeros((N, N), dtype=np.float32),
+    }
+
+
+def test_interpret_gemm():
+    inputs = gemm_inputs(256)
+
+    start = time.perf_counter()
+    interpret(gemm, **inputs)
+    assert time.perf_counter() - start < 1
+
+    np.testing.assert_allclose(inputs["C"], inputs["A"] @ inputs["B"], rtol=1e-4)
+
+
+def test_interpret_scheduled_gemm():
+    tiled = divide_loop(gemm, "j", 4, ["jo", "ji"], tail="cut")
+    tiled = reorder_loops(tiled, "ji k #0")
+
+    inputs = gemm_inputs(30)
+    interpret(tiled, **inputs)
+    np.testing.assert_allclose(inputs["C"], inputs["A"] @ inputs["B"], rtol=1e-4)
+
+
+def test_interpret_loop_carried():
+    @proc
+    def prefix_sum(n: size, x: f32[n]):
+        for i in seq(1, n):
+            x[i] += x[i - 1]
+
+    @proc
+    def rev(n: size, x: i32[n]):
+        for i in seq(0, n / 2):
+            tmp: i32
+            tmp = x[i]
+            x[i] = x[n - 1 - i]
+            x[n - 1 - i] = tmp
+
+    x = np.arange(10, dtype=np.float32)
+    interpret(prefix_sum, n=10, x=x)
+    np.testing.assert_array_equal(x, np.cumsum(np.arange(10)))
+
+    x = np.arange(9, dtype=np.int32)
+    interpret(rev, n=9, x=x)
+    np.testing.assert_array_equal(x, np.arange(9)[::-1])
+
+
+def test_interpret_reductions():
+    @proc
+    def dot(n: size, x: f32[n], y: f32[n], res: f32):
+        res = 0.0
+        for i in seq(0, n):
+            res += x[i] * y[i]
+
+    @proc
+    def diag_sums(n: size, x: i32[n, n], res: i32[2 * n]):
+        for i in seq(0, n):
+            for j in seq(0, n):
+                res[i + j] += x[i, j]
+
+    x = np.arange(8, dtype=np.float32)
+    res = np.zeros((), dtype=np.float32)
+    interpret(dot, n=8, x=x, y=x, res=res)
+    assert res == np.dot(x, x)
+
+    x = np.arange(16, dtype=np.int32).reshape(4, 4)
+    res = np.zeros(8, dtype=np.int32)
+    interpret(diag_sums, n=4, x=x, res=res)
+    expected = [np.trace(x[:, ::-1], offset=3 - k) for k in range(8)]
+    np.testing.assert_array_equal(res, expected)
+
+
+def test_interpret_windows_and_calls():
+    @proc
+    def scale(n: size, alpha: f32, x: [f32][n]):
+        for i in seq(0, n):
+            x[i] = alpha * x[i]
+
+    @proc
+    def foo(n: size, m: size, alpha: f32, x: f32[n, m]):
+        assert stride(x, 1) == 1
+        for i in seq(0, n):
+            row = x[i, :]
+            scale(m, alpha, row)
+        for j in seq(0, m):
+            scale(n, alpha, x[:, j])
+
+    x = np.ones((3, 5), dtype=np.float32)
+    interpret(foo, n=3, m=5, alpha=2.0, x=x)
+    np.testing.assert_array_equal(x, np.full((3, 5), 4.0))
+
+    with pytest.raises(InterpreterError, match="assertion"):
+        interpret(foo, n=5, m=3, alpha=2.0, x=np.ones((3, 5), np.float32).T)
+
+
+def test_interpret_instr():
+    @proc
+    def vadd(x: f32[16], y: f32[16], z: f32[16]):
+        for i in seq(0, 16):
+            z[i] = x[i] + y[i]
+
+    vadd = divide_loop(vadd, "i", 8, ["io", "ii"], perfect=True)
+    vadd = stage_mem(vadd, "for ii in _: _", "x[8 * io:8 * io + 8]", "xv")
+    vadd = set_memory(vadd, "xv", AVX2)
+    vadd = replace_all(vadd, mm256_loadu_ps)
+    assert "mm256_loadu_ps" in str(vadd)
+
+    x = np.arange(16, dtype=np.float32)
+    z = np.zeros(16, dtype=np.float32)
+    interpret(vadd, x=x, y=x, z=z)
+    np.testing.assert_array_equal(z, 2 * x)
+
+
+def test_interpret_configs_and_externs():
+    @config
+    class Cfg:
+        scale: f32
+        n: index
+
+    @proc
+    def foo(n: size, x: f32[n], y: f32[n]):
+        Cfg.scale = 2.0
+        Cfg.n = n - 1
+        for i in seq(0, n):
+            y[i] = select(x[i], 0.0, x[i], Cfg.scale * sqrt(relu(x[i])))
+        y[Cfg.n] = 0.0
+
+    x = np.array([-1.0, 4.0, 9.0, 1.0], dtype=np.float32)
+    y = np.zeros(4, dtype=np.float32)
+    interpret(foo, n=4, x=x, y=y)
+    np.testing.assert_array_equal(y, [-1.0, 4.0, 6.0, 0.0])
+
+
+def test_interpret_bad_inputs():
+    inputs = gemm_inputs(4)
+    del inputs["C"]
+    with pytest.raises(InterpreterError, match="missing argument 'C'"):
+        interpret(gemm, **inputs)
+
+    inputs = gemm_inputs(4)
+    inputs["A"] = inputs["A"].astype(np.float64)
+    with pytest.raises(InterpreterError, match="expected dtype float32 for 'A'"):
+        interpret(gemm, **inputs)
+
+    inputs = gemm_inputs(4)
+    inputs["N"] = 5
+    with pytest.raises(InterpreterError, match="expected shape \\(5, 5\\) for 'A'"):
+        interpret(gemm, **inputs)
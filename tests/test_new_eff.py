@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import gc
+import weakref
+
 import pytest
 
 from exo.rewrite.new_eff import *
@@ -336,3 +339,69 @@ def test_alias_check():
         @proc
         def bar(N: size, x: [f32][N]):
             foo(N, x, x)
+
+
+def test_summaries_commute():
+    @proc
+    def foo(N: size, x: R[16], y: R[N], z: R[4]):
+        x[0] = 1.0
+        x[1] = x[0]
+        for i in seq(0, 4):
+            x[i + 2] = z[i]
+        for i in seq(0, 4):
+            x[i + 6] = x[i]
+        for j in seq(0, N):
+            y[j] += 1.0
+        for j in seq(0, N):
+            y[j] += 2.0
+
+    def commute(i, j):
+        s1, s2 = foo.body()[i]._impl._node, foo.body()[j]._impl._node
+        windows = proc_windows(foo._loopir_proc)
+        return summaries_commute(stmts_summary([s1]), stmts_summary([s2]), windows)
+
+    assert not commute(0, 1)
+    # x[0] and x[i + 2] never overlap, but x[i] and x[i + 2] can
+    assert commute(0, 2)
+    assert not commute(2, 3)
+    assert commute(1, 4)
+    # reductions commute with each other
+    assert commute(4, 5)
+
+
+def test_effects_shared_across_procs():
+    @proc
+    def foo(N: size, x: R[8], y: R[N]):
+        for i in seq(0, 8):
+            x[i] = 1.0
+        for j in seq(0, N):
+            y[j] = 2.0
+
+    bar = divide_loop(foo, "j", 4, ["jo", "ji"], tail="cut")
+    s0 = foo._loopir_proc.body[0]
+    assert bar._loopir_proc.body[0] is s0
+
+    # untouched statements reuse the effects computed for the original proc
+    (env,) = globenv([s0]).bindings
+    assert globenv(bar._loopir_proc.body[:1]).bindings[0] is env
+    assert stmts_effs([s0])[0] is stmts_effs(bar._loopir_proc.body)[0]
+
+    # the edited loop is analyzed afresh
+    s1, t1 = foo._loopir_proc.body[1], bar._loopir_proc.body[1]
+    assert stmts_effs([s1])[-1] is not stmts_effs([t1])[-1]
+
+
+def test_proc_windows_does_not_retain_procs():
+    @proc
+    def foo(x: R[8]):
+        y = x[0:4]
+        for i in seq(0, 4):
+            y[i] = 1.0
+
+    p = foo._loopir_proc.update(name="tmp")
+    assert list(proc_windows(p).values())[0] == p.args[0].name
+
+    ref = weakref.ref(p)
+    del p
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from exo.core.prelude import Sym, SymTable
+
+
+def test_sym_table_scopes():
+    x, y = Sym("x"), Sym("x")
+    assert x != y and x == x
+
+    env = SymTable()
+    env[x] = 1
+    env.push()
+    env[x] = 2
+    env[y] = 3
+    assert env[x] == 2 and env[y] == 3
+    env.push()
+    env[y] = 4
+    assert dict(env.items()) == {x: 2, y: 4}
+    env.pop()
+    assert env[y] == 3
+    env.pop()
+    assert env[x] == 1 and y not in env and len(env) == 1
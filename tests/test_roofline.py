@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import sys
+
+import pytest
+
+import exo.main
+from exo import proc
+from exo.roofline import (
+    MachinePeaks,
+    format_json,
+    format_markdown,
+    roofline,
+    static_entry,
+)
+
+
+@proc
+def gemm(N: size, A: f32[N, N], B: f32[N, N], C: f32[N, N]):
+    for i in seq(0, N):
+        for j in seq(0, N):
+            for k in seq(0, N):
+                C[i, j] += A[i, k] * B[k, j]
+
+
+@proc
+def axpy(n: size, alpha: f32, x: f32[n], y: f32[n]):
+    for i in seq(0, n):
+        y[i] += alpha * x[i]
+
+
+PEAKS = MachinePeaks(gflops=100.0, bandwidth=10.0)
+
+
+def test_static_entry():
+    e = static_entry(gemm, {"N": 64}, PEAKS)
+    assert e.flops == 2 * 64**3
+    assert e.bytes == 3 * 4 * 64 * 64
+    assert e.accessed_bytes == 4 * 4 * 64**3
+    assert e.intensity == pytest.approx(2 * 64 / 12)
+    assert e.bound == "compute" and e.attainable_gflops == 100.0
+    assert e.gflops is None and e.fraction_of_peak is None
+
+    e = static_entry(axpy, {"n": 1000}, PEAKS)
+    assert e.bytes == 4 * (1 + 2 * 1000)
+    assert e.bound == "memory"
+    assert e.attainable_gflops == pytest.approx(e.intensity * 10.0)
+
+
+def test_roofline_measured(tmp_path):
+    entries = roofline(
+        [gemm, axpy], {"gemm": {"N": 32}}, PEAKS, n_runs=3, workdir=tmp_path
+    )
+    # axpy has no sizes, and is only listed
+    assert [e.proc for e in entries] == ["gemm", "axpy"]
+    e, skipped = entries
+    assert skipped.skipped == "no sizes given"
+    assert skipped.flops is None and skipped.time is None
+    assert e.time > 0 and e.gflops > 0 and e.bandwidth > 0
+    assert e.bound == "memory" and e.attainable_gflops == pytest.approx(
+        5.333 * 10, 1e-3
+    )
+    assert e.fraction_of_peak == pytest.approx(e.gflops / e.attainable_gflops)
+
+    report = json.loads(format_json(entries, PEAKS))
+    assert report["peaks"] == {"gflops": 100.0, "bandwidth": 10.0}
+    assert report["procs"][0]["gflops"] == e.gflops
+
+    md = format_markdown(entries, PEAKS).splitlines()
+    assert md[0] == "Peaks: 100 GFLOP/s, 10 GB/s (ridge point 10.00 FLOP/byte)"
+    assert md[4].startswith("| gemm | 65536 | 12288 | 5.333 |")
+    assert md[5].startswith("| axpy | - | - | - | - |")
+    assert md[-1] == "Not measured: axpy (no sizes given)"
+
+
+def test_roofline_skips_window_args(tmp_path):
+    @proc
+    def scale(n: size, x: [f32][n]):
+        for i in seq(0, n):
+            x[i] = 2.0 * x[i]
+
+    entries = roofline(
+        [gemm, scale],
+        {"gemm": {"N": 8}, "scale": {"n": 16}},
+        PEAKS,
+        n_runs=1,
+        workdir=tmp_path,
+    )
+    assert [e.proc for e in entries] == ["gemm", "scale"]
+    assert entries[0].time > 0 and entries[0].skipped is None
+    assert entries[1].time is None and entries[1].skipped == "window arguments"
+    assert entries[1].flops == 16
+
+    md = format_markdown(entries, PEAKS)
+    assert md.endswith("Not measured: scale (window arguments)")
+
+
+def test_exocc_perf_summary(tmp_path, monkeypatch):
+    src = tmp_path / "lib.py"
+    src.write_text(
+        "from __future__ import annotations\n"
+        "from exo import proc\n"
+        "@proc\n"
+        "def axpy(n: size, alpha: f32, x: f32[n], y: f32[n]):\n"
+        "    for i in seq(0, n):\n"
+        "        y[i] += alpha * x[i]\n"
+    )
+    config = tmp_path / "perf.json"
+    config.write_text(
+        json.dumps(
+            {
+                "peaks": {"gflops": 100.0, "bandwidth": 10.0},
+                "sizes": {"axpy": {"n": 1024}},
+                "n_runs": 3,
+            }
+        )
+    )
+    out = tmp_path / "out"
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["exocc", "-o", str(out), "--perf-summary", str(config), str(src)],
+    )
+    exo.main.main()
+
+    assert (out / "lib.c").exists()
+    report = json.loads((out / "lib.perf.json").read_text())
+    assert report["procs"][0]["proc"] == "axpy"
+    assert report["procs"][0]["bound"] == "memory"
+    assert report["procs"][0]["time"] > 0
+    assert "| axpy |" in (out / "lib.perf.md").read_text()
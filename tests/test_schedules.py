@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import pytest
 
-from exo import ParseFragmentError, proc, DRAM, Procedure, config
+from exo import ParseFragmentError, proc, instr, DRAM, Procedure, config
 from exo.libs.memories import GEMM_SCRATCH
 from exo.stdlib.scheduling import *
 from exo.platforms.x86 import *
@@ -3900,6 +3900,104 @@ def test_replace_all_length_mismatch(golden):
     assert str(foo) == golden
 
 
+def test_replace_all_unrolled(golden):
+    @proc
+    def bar(src: f32[4, 8] @ DRAM):
+        dst: f32[4, 8] @ AVX2
+        w: f32[8] @ AVX2
+        out: f32[8] @ AVX2
+        for j in seq(0, 4):
+            for i in seq(0, 8):
+                dst[j, i] = src[j, i]
+        for j in seq(0, 4):
+            for i in seq(0, 8):
+                out[i] = dst[j, i] * w[i]
+            for i in seq(0, 8):
+                src[j, i] = out[i]
+
+    bar = unroll_loop(bar, "j")
+    bar = unroll_loop(bar, "j")
+    arch = [mm256_storeu_ps, mm256_mul_ps, mm256_fmadd_ps, mm256_loadu_ps]
+    bar = replace_all(bar, arch)
+    assert str(bar) == golden
+
+
+def test_replace_all_stride_arg():
+    @config
+    class CfgStride:
+        s: stride
+
+    @instr("zero_strided(&{x_data}, {s});")
+    def zero_strided(s: stride, x: [f32][4] @ DRAM):
+        for i in seq(0, 4):
+            x[i] = 0.0
+        CfgStride.s = s
+
+    @proc
+    def bar(a: f32[4, 4] @ DRAM):
+        for i in seq(0, 4):
+            a[1, i] = 0.0
+        CfgStride.s = stride(a, 0)
+
+    bar = replace_all(bar, [zero_strided])
+    assert "zero_strided(stride(a, 0), a[1, 0:4])" in str(bar)
+
+
+def test_replace_all_precision_mismatch():
+    @proc
+    def bar(src: f64[8] @ DRAM, dst: f64[8] @ DRAM):
+        for i in seq(0, 8):
+            dst[i] = src[i]
+        for i in seq(0, 4):
+            dst[i] = src[i]
+
+    assert replace_all(bar, [mm256_loadu_ps], mem_aware=False) is bar
+    assert "mm256_loadu_pd" in str(
+        replace_all(bar, [mm256_loadu_ps, mm256_loadu_pd], mem_aware=False)
+    )
+
+
+def test_replace_structure_mismatch():
+    @proc
+    def bar(src: f32[8] @ DRAM, dst: f32[8] @ AVX2):
+        for i in seq(0, 8):
+            dst[i] = src[i] + 1.0
+
+    with pytest.raises(Exception, match="cannot unify a <class"):
+        replace(bar, "for i in _:_", mm256_loadu_ps, quiet=True)
+
+
+def test_replace_same_problem():
+    @proc
+    def bar(n: size, src: f32[n, 8] @ DRAM, dst: f32[n, 8] @ AVX2, y: f32[n, 8]):
+        for k in seq(0, n):
+            for i in seq(0, 8):
+                dst[k, i] = src[k, i]
+            for j in seq(0, 8):
+                y[k, j] = dst[k, j]
+
+    # both blocks pose the same unification problem, up to variable names
+    bar = replace(bar, "for i in _:_", mm256_loadu_ps)
+    bar = replace(bar, "for j in _:_", mm256_loadu_ps)
+    assert "mm256_loadu_ps(dst[k + 0, 0:8], src[k + 0, 0:8])" in str(bar)
+    assert "mm256_loadu_ps(y[k + 0, 0:8], dst[k + 0, 0:8])" in str(bar)
+
+
+def test_replace_closed_form():
+    from exo.rewrite.LoopIR_unification import solver_stats
+
+    @proc
+    def bar(A: f32[4, 4] @ DRAM, dst: f32[8] @ AVX2):
+        for i in seq(0, 8):
+            dst[i] = A[2, 3]
+
+    # the choice of which dimension of A to window is made without SMT
+    n_smt = solver_stats()["smt"]
+    bar = replace(bar, "for i in _:_", mm256_broadcast_ss)
+    assert "mm256_broadcast_ss(dst[0:8], A[2, 3:4])" in str(bar)
+    assert solver_stats()["smt"] == n_smt
+
+
 def test_eliminate_dead_code(golden):
     @proc
     def foo():
@@ -4325,6 +4423,36 @@ def test_specialize_alloc_fails():
         foo = specialize(foo, foo.body()[0], "n > 0")
 
 
+def test_multiversion(golden):
+    @proc
+    def scal(N: size, x: f32[N]):
+        for i in seq(0, N):
+            x[i] = 2.0 * x[i]
+
+    def schedule(p, preds):
+        p = divide_loop(p, "i", 4, ["io", "ii"], perfect=True)
+        return simplify(p)
+
+    scal, variants = multiversion(
+        scal, [["N % 4 == 0", "N >= 8"], "N % 4 == 0"], schedule=schedule
+    )
+    assert [v.name() for v in variants] == ["scal_v0", "scal_v1", "scal_generic"]
+    assert "\n".join(str(p) for p in [scal] + variants) == golden
+
+
+def test_multiversion_bad_case():
+    @proc
+    def foo(n: size, x: f32[n]):
+        for i in seq(0, n):
+            x[i] = 0.0
+
+    with pytest.raises(TypeError, match="non-empty list of predicate sets"):
+        multiversion(foo, [])
+
+    with pytest.raises(TypeError, match="non-empty list of strings"):
+        multiversion(foo, [[]])
+
+
 def test_extract_subproc(golden):
     @proc
     def foo():
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import json
+from math import prod
+
+import numpy as np
+import pytest
+
+from exo import proc, DRAM
+from exo.core.memory import MemGenError
+from exo.stdlib.scheduling import *
+from exo.tune import tune
+
+
+@proc
+def gemm(N: size, A: f32[N, N], B: f32[N, N], C: f32[N, N]):
+    assert N % 4 == 0
+    for i in seq(0, N):
+        for j in seq(0, N):
+            for k in seq(0, N):
+                C[i, j] += A[i, k] * B[k, j]
+
+
+def schedule(J_BLK, unroll):
+    p = divide_loop(gemm, "j", J_BLK, ["jo", "ji"], perfect=True)
+    p = reorder_loops(p, "ji k")
+    if unroll:
+        p = unroll_loop(p, "ji")
+    return p
+
+
+def gemm_inputs():
+    N = 16
+    rng = np.random.default_rng(0)
+    return {
+        "N": N,
+        "A": rng.random((N, N), dtype=np.float32),
+        "B": rng.random((N, N), dtype=np.float32),
+        "C": np.zeros((N, N), dtype=np.float32),
+    }
+
+
+SPACE = {"J_BLK": [2, 3, 4], "unroll": [False, True]}
+OPTS = dict(n_runs=2, n_warmup=1, cflags=["-O1"])
+
+
+def test_tune_grid(tmp_path):
+    db = tmp_path / "tune.jsonl"
+    result = tune(schedule, SPACE, gemm_inputs, strategy="grid", db=db, **OPTS)
+
+    assert [t.params for t in result.trials] == [
+        {"J_BLK": b, "unroll": u} for b in (2, 3, 4) for u in (False, True)
+    ]
+    # the loop can't be divided perfectly by 3
+    for t in result.trials:
+        if t.params["J_BLK"] == 3:
+            assert t.time is None and t.error.startswith("SchedulingError")
+        else:
+            assert t.time > 0 and not t.cached
+    assert result.best.params["J_BLK"] != 3
+    assert len(db.read_text().splitlines()) == 4
+
+    # rerunning resumes from the database
+    rerun = tune(schedule, SPACE, gemm_inputs, strategy="grid", db=db, **OPTS)
+    assert all(t.cached for t in rerun.trials if t.params["J_BLK"] != 3)
+    assert rerun.best.params == result.best.params
+    assert len(db.read_text().splitlines()) == 4
+
+    rec = json.loads(db.read_text().splitlines()[0])
+    assert rec["params"] == {"J_BLK": 2, "unroll": False}
+
+
+def test_tune_generates_code_once(tmp_path, monkeypatch):
+    import exo.API
+    import exo.bench
+    import exo.tune
+
+    calls = []
+
+    def counting(*args, **kwargs):
+        calls.append(args)
+        return compile_procs_to_strings(*args, **kwargs)
+
+    compile_procs_to_strings = exo.tune.compile_procs_to_strings
+    monkeypatch.setattr(exo.API, "compile_procs_to_strings", counting)
+    monkeypatch.setattr(exo.tune, "compile_procs_to_strings", counting)
+    monkeypatch.setattr(exo.bench, "compile_procs_to_strings", counting)
+
+    space = {"J_BLK": [2, 4], "unroll": [False]}
+    result = tune(schedule, space, gemm_inputs, strategy="grid", **OPTS)
+    assert all(t.time > 0 for t in result.trials)
+    assert len(calls) == 2
+
+
+class Tiny(DRAM):
+    @classmethod
+    def alloc(cls, new_name, prim_type, shape, srcinfo):
+        if not all(sz.isdecimal() for sz in shape) or prod(map(int, shape)) > 4:
+            raise MemGenError(f"{srcinfo}: Tiny buffers hold at most 4 values")
+        return f"{prim_type} {new_name}[{' * '.join(shape) or 1}];"
+
+    @classmethod
+    def free(cls, new_name, prim_type, shape, srcinfo):
+        return ""
+
+
+@proc
+def copy4(x: f32[16], y: f32[16]):
+    for io in seq(0, 4):
+        tmp: f32[4] @ Tiny
+        for ii in seq(0, 4):
+            tmp[ii] = x[4 * io + ii]
+        for ii in seq(0, 4):
+            y[4 * io + ii] = tmp[ii]
+
+
+@proc
+def copy8(x: f32[16], y: f32[16]):
+    for io in seq(0, 2):
+        tmp: f32[8] @ Tiny
+        for ii in seq(0, 8):
+            tmp[ii] = x[8 * io + ii]
+        for ii in seq(0, 8):
+            y[8 * io + ii] = tmp[ii]
+
+
+def test_tune_codegen_error(tmp_path):
+    def schedule(blk):
+        return {4: copy4, 8: copy8}[blk]
+
+    inputs = {"x": np.ones(16, dtype=np.float32), "y": np.zeros(16, dtype=np.float32)}
+    db = tmp_path / "tune.jsonl"
+    result = tune(schedule, {"blk": [4, 8]}, inputs, strategy="grid", db=db, **OPTS)
+
+    ok, bad = result.trials
+    assert ok.time > 0 and ok.error is None
+    assert bad.time is None
+    assert bad.error.startswith("MemGenError") and "at most 4 values" in bad.error
+    assert result.best is ok
+
+
+@pytest.mark.parametrize("strategy", ["random", "evolution"])
+def test_tune_sampling(tmp_path, strategy):
+    space = {"J_BLK": [1, 2, 4, 8], "unroll": [False, True]}
+    result = tune(
+        schedule,
+        space,
+        gemm_inputs(),
+        strategy=strategy,
+        n_trials=5,
+        population=2,
+        workdir=tmp_path,
+        **OPTS,
+    )
+
+    assert len(result.trials) == 5
+    assert len({tuple(t.params.values()) for t in result.trials}) == 5
+    timed = [t.time for t in result.trials if t.time is not None]
+    assert result.best.time == min(timed)
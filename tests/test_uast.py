@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import weakref
+
 import pytest
 
-from exo import DRAM
+from exo import DRAM, proc
 from exo.frontend.pyparser import (
     Parser,
     get_src_locals,
@@ -119,3 +121,39 @@ def test_variable_lookup_name_error():
 
     with pytest.raises(ParseError, match="'xyzzy' undefined"):
         to_uast(func)
+
+
+def test_uast_nodes_are_slotted():
+    def func(n: size, x: R[n]):
+        for i in seq(0, n):
+            x[i] = 0.0
+
+    proc = to_uast(func)
+    assert not hasattr(proc, "__dict__")
+    assert not hasattr(proc.body[0], "__dict__")
+
+    # identical source locations share one SrcInfo object
+    srcinfo = proc.body[0].srcinfo
+    assert (
+        type(srcinfo)(
+            srcinfo.filename,
+            srcinfo.lineno,
+            srcinfo.col_offset,
+            srcinfo.end_lineno,
+            srcinfo.end_col_offset,
+            srcinfo.function,
+        )
+        is srcinfo
+    )
+
+
+def test_loopir_nodes_are_slotted():
+    @proc
+    def foo(n: size, x: R[n]):
+        for i in seq(0, n):
+            x[i] = 0.0
+
+    ir = foo._loopir_proc
+    for node in (ir, ir.args[1], ir.body[0], ir.body[0].body[0], ir.body[0].hi):
+        assert not hasattr(node, "__dict__")
+        assert weakref.ref(node)() is node